@@ -1,7 +1,10 @@
+from functools import lru_cache
+from typing import Optional
+
 from fastapi import Depends, Request, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.infrastructure.database.session import get_db
+from app.infrastructure.database.session import get_db, configurar_rls
 from app.core.config import get_settings, Settings
 from app.core.security import verify_token
 from app.infrastructure.database.uow import SqlAlchemyUnitOfWork
@@ -11,21 +14,32 @@ from app.domain.uow import AbstractUnitOfWork
 from app.infrastructure.repositories.sqlalchemy_turno_repository import SqlAlchemyTurnoRepository
 from app.infrastructure.repositories.sqlalchemy_usuario_repository import SqlAlchemyUsuarioRepository
 from app.infrastructure.repositories.sqlalchemy_assinatura_repository import SqlAlchemyAssinaturaRepository
+from app.infrastructure.repositories.sqlalchemy_calendario_feed_repository import SqlAlchemyCalendarioFeedRepository
+from app.infrastructure.repositories.sqlalchemy_dashboard_repository import SqlAlchemyDashboardRepository
 
 # Services
 from app.infrastructure.external.caldav_service import CalDAVService
 from app.infrastructure.services.pdf_service import ReportLabPdfService
+from app.infrastructure.services.pdf_cache import DiskPdfCache
+from app.infrastructure.services.feed_cache import InvalidacaoCacheComposta, MemoriaFeedCache
+from app.infrastructure.services.ics_feed import IcsFeedService
+from app.domain.ports.cache_port import InvalidacaoCachePort, TipoTurnoCachePort
 from app.domain.services.calendar_service import CalendarService
 from app.domain.services.relatorio_service import RelatorioService
+from app.domain.services.feed_calendario_service import FeedCalendarioService
 
 # Use Cases
 from app.application.use_cases.turnos.criar_turno import CriarTurnoUseCase
+from app.application.use_cases.turnos.criar_turnos_em_lote import CriarTurnosEmLoteUseCase
 from app.application.use_cases.turnos.listar_turnos import ListarTurnosPeriodoUseCase, ListarTurnosRecentesUseCase
 from app.application.use_cases.turnos.deletar_turno import DeletarTurnoUseCase
 from app.application.use_cases.usuarios.criar_usuario import CriarUsuarioUseCase
 from app.application.use_cases.usuarios.atualizar_usuario import AtualizarUsuarioUseCase
+from app.application.use_cases.usuarios.obter_dashboard import ObterDashboardUseCase
 from app.application.use_cases.relatorios.gerar_relatorio import GerarRelatorioUseCase
 from app.application.use_cases.relatorios.baixar_relatorio import BaixarRelatorioPdfUseCase
+from app.application.use_cases.calendario.obter_feed import ObterFeedCalendarioUseCase
+from app.application.use_cases.calendario.gerar_token import GerarTokenCalendarioUseCase
 
 # Scheme para OpenAPI
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
@@ -73,12 +87,62 @@ def get_usuario_repo(db: AsyncSession = Depends(get_db)) -> SqlAlchemyUsuarioRep
 def get_assinatura_repo(db: AsyncSession = Depends(get_db)) -> SqlAlchemyAssinaturaRepository:
     return SqlAlchemyAssinaturaRepository(db)
 
+def get_calendario_feed_repo(db: AsyncSession = Depends(get_db)) -> SqlAlchemyCalendarioFeedRepository:
+    return SqlAlchemyCalendarioFeedRepository(db)
+
+def get_dashboard_repo(db: AsyncSession = Depends(get_db)) -> SqlAlchemyDashboardRepository:
+    return SqlAlchemyDashboardRepository(db)
+
+
+async def get_feed_user_id(
+    token: str,
+    db: AsyncSession = Depends(get_db),
+    repo: SqlAlchemyCalendarioFeedRepository = Depends(get_calendario_feed_repo),
+) -> int:
+    """
+    Autentica o feed .ics pelo token da URL (clientes de calendário não enviam
+    headers) e configura o RLS da sessão para o dono do token.
+    """
+    user_id = await repo.buscar_usuario_por_token(token) if len(token) <= 64 else None
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="Calendário não encontrado")
+    await configurar_rls(db, user_id)
+    return user_id
+
 # Service Providers
 def get_calendar_service(settings: Settings = Depends(get_settings)) -> CalendarService:
     return CalDAVService(settings)
 
-def get_relatorio_service() -> RelatorioService:
-    return ReportLabPdfService()
+def get_relatorio_service(request: Request) -> RelatorioService:
+    # Pool iniciado no lifespan; sem ele (ex.: testes sem lifespan) usa o executor padrão
+    return ReportLabPdfService(getattr(request.app.state, "pdf_pool", None))
+
+def get_pdf_cache(request: Request) -> Optional[DiskPdfCache]:
+    # Iniciado no lifespan; None quando desabilitado (PDF_CACHE_HABILITADO=false) ou em testes
+    return getattr(request.app.state, "pdf_cache", None)
+
+def get_feed_cache(request: Request) -> Optional[MemoriaFeedCache]:
+    # Iniciado no lifespan; None em testes sem lifespan
+    return getattr(request.app.state, "feed_cache", None)
+
+def get_invalidacao_cache(request: Request) -> Optional[InvalidacaoCachePort]:
+    """Caches derivados de turnos que precisam saber de escritas (PDF, feed .ics)."""
+    caches = [c for c in (get_pdf_cache(request), get_feed_cache(request)) if c is not None]
+    if len(caches) > 1:
+        return InvalidacaoCacheComposta(caches)
+    return caches[0] if caches else None
+
+def get_tipo_turno_cache(request: Request) -> Optional[TipoTurnoCachePort]:
+    # Iniciado no lifespan; None em testes sem lifespan
+    return getattr(request.app.state, "tipo_turno_cache", None)
+
+@lru_cache(maxsize=4)
+def _ics_feed_service(timezone: str) -> IcsFeedService:
+    # Sem estado por requisição; o cabeçalho (com VTIMEZONE) é montado uma vez
+    return IcsFeedService(timezone)
+
+def get_feed_calendario_service(settings: Settings = Depends(get_settings)) -> FeedCalendarioService:
+    return _ics_feed_service(settings.timezone)
 
 
 
@@ -86,6 +150,8 @@ def get_uow(db: AsyncSession = Depends(get_db)) -> SqlAlchemyUnitOfWork:
     return SqlAlchemyUnitOfWork(db)
 
 from app.infrastructure.background_adapter import FastAPIBackgroundTaskQueue
+from app.infrastructure.tasks.postgres_queue import PostgresJobQueue
+from app.domain.ports.background import BackgroundTaskQueue
 from fastapi import BackgroundTasks
 
 # Ports and Adapters
@@ -96,8 +162,15 @@ from app.infrastructure.services.caldav_sync_adapter import CalDavSyncTaskAdapte
 # Use Case Factories
 def get_caldav_sync_task_port(
     background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    settings: Settings = Depends(get_settings),
 ) -> CalDavSyncTaskPort:
-    bg_queue = FastAPIBackgroundTaskQueue(background_tasks)
+    # Mesma sessão do UoW (get_db é cacheado por requisição): o job entra no commit do caso de uso
+    bg_queue: BackgroundTaskQueue
+    if settings.fila_tarefas == "postgres":
+        bg_queue = PostgresJobQueue(db, max_tentativas=settings.jobs_max_tentativas)
+    else:
+        bg_queue = FastAPIBackgroundTaskQueue(background_tasks)
     return CalDavSyncTaskAdapter(bg_queue)
 
 
@@ -106,8 +179,20 @@ def get_criar_turno_use_case(
     calendar_service: CalendarService = Depends(get_calendar_service),
     settings: Settings = Depends(get_settings),
     caldav_sync_task_port: CalDavSyncTaskPort = Depends(get_caldav_sync_task_port),
+    invalidacao_cache: Optional[InvalidacaoCachePort] = Depends(get_invalidacao_cache),
+    tipo_cache: Optional[TipoTurnoCachePort] = Depends(get_tipo_turno_cache),
 ) -> CriarTurnoUseCase:
-    return CriarTurnoUseCase(uow, calendar_service, settings, caldav_sync_task_port)
+    return CriarTurnoUseCase(
+        uow, calendar_service, settings, caldav_sync_task_port, invalidacao_cache, tipo_cache
+    )
+
+def get_criar_turnos_em_lote_use_case(
+    uow: AbstractUnitOfWork = Depends(get_uow),
+    settings: Settings = Depends(get_settings),
+    caldav_sync_task_port: CalDavSyncTaskPort = Depends(get_caldav_sync_task_port),
+    invalidacao_cache: Optional[InvalidacaoCachePort] = Depends(get_invalidacao_cache),
+) -> CriarTurnosEmLoteUseCase:
+    return CriarTurnosEmLoteUseCase(uow, settings, caldav_sync_task_port, invalidacao_cache)
 
 def get_listar_turnos_periodo_use_case(
     turno_repo: SqlAlchemyTurnoRepository = Depends(get_turno_repo),
@@ -121,8 +206,9 @@ def get_listar_turnos_recentes_use_case(
 
 def get_deletar_turno_use_case(
     uow: AbstractUnitOfWork = Depends(get_uow),
+    invalidacao_cache: Optional[InvalidacaoCachePort] = Depends(get_invalidacao_cache),
 ) -> DeletarTurnoUseCase:
-    return DeletarTurnoUseCase(uow)
+    return DeletarTurnoUseCase(uow, invalidacao_cache)
 
 def get_criar_usuario_use_case(
     uow: AbstractUnitOfWork = Depends(get_uow),
@@ -144,5 +230,42 @@ def get_baixar_relatorio_pdf_use_case(
     usuario_repo: SqlAlchemyUsuarioRepository = Depends(get_usuario_repo),
     assinatura_repo: SqlAlchemyAssinaturaRepository = Depends(get_assinatura_repo),
     relatorio_service: RelatorioService = Depends(get_relatorio_service),
+    pdf_cache: Optional[DiskPdfCache] = Depends(get_pdf_cache),
+    db: AsyncSession = Depends(get_db),
 ) -> BaixarRelatorioPdfUseCase:
-    return BaixarRelatorioPdfUseCase(turno_repo, usuario_repo, assinatura_repo, relatorio_service)
+    # Commit após as leituras devolve a conexão ao pool antes de renderizar o PDF
+    return BaixarRelatorioPdfUseCase(
+        turno_repo, usuario_repo, assinatura_repo, relatorio_service, pdf_cache, liberar_conexao=db.commit
+    )
+
+def get_obter_feed_calendario_use_case(
+    request: Request,
+    turno_repo: SqlAlchemyTurnoRepository = Depends(get_turno_repo),
+    feed_service: FeedCalendarioService = Depends(get_feed_calendario_service),
+    settings: Settings = Depends(get_settings),
+) -> ObterFeedCalendarioUseCase:
+    return ObterFeedCalendarioUseCase(
+        turno_repo,
+        feed_service,
+        get_feed_cache(request),
+        dias_passados=settings.calendario_feed_dias_passados,
+        dias_futuros=settings.calendario_feed_dias_futuros,
+        ttl_segundos=settings.calendario_feed_cache_ttl_segundos,
+        max_bytes_cache=settings.calendario_feed_cache_max_kb * 1024,
+    )
+
+async def get_obter_dashboard_use_case(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    repo: SqlAlchemyDashboardRepository = Depends(get_dashboard_repo),
+    settings: Settings = Depends(get_settings),
+) -> ObterDashboardUseCase:
+    # A web (JWT) não passa pelo RLSMiddleware: RLS do usuário autenticado,
+    # aplicado no BEGIN da única query do dashboard
+    await configurar_rls(db, user_id)
+    return ObterDashboardUseCase(repo, settings)
+
+def get_gerar_token_calendario_use_case(
+    uow: AbstractUnitOfWork = Depends(get_uow),
+) -> GerarTokenCalendarioUseCase:
+    return GerarTokenCalendarioUseCase(uow)
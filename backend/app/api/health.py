@@ -6,7 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.infrastructure.database.session import get_db
+from app.api.metrics import verificar_coletor
+from app.infrastructure.database.pool_metrics import resumo_pool
+from app.infrastructure.database.session import engine, get_db
 
 logger = logging.getLogger(__name__)
 
@@ -25,3 +27,14 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     except Exception as e:
         logger.error("Health check failed", extra={"error": str(e)})
         raise HTTPException(status_code=503, detail="Database connection failed")
+
+
+@router.get("/health/db-pool", tags=["Monitoring"], dependencies=[Depends(verificar_coletor)])
+async def db_pool():
+    """
+    Uso do pool de conexões deste processo (em uso, overflow, esperas por
+    conexão e timeouts), para dimensionar DB_POOL_SIZE e DB_MAX_OVERFLOW.
+
+    Fica sob o prefixo público /health, mas exige o mesmo segredo do /metrics.
+    """
+    return resumo_pool(engine.sync_engine.pool)
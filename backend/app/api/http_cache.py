@@ -0,0 +1,27 @@
+"""
+Helpers de requisições condicionais (ETag / Last-Modified) dos routers.
+"""
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def chave_if_none_match(valor: Optional[str]) -> Optional[str]:
+    """Extrai a primeira entity-tag de um If-None-Match (aceita W/ e aspas)."""
+    if not valor:
+        return None
+    primeira = valor.split(",")[0].strip()
+    if primeira.startswith("W/"):
+        primeira = primeira[2:]
+    return primeira.strip('"') or None
+
+
+def data_if_modified_since(valor: Optional[str]) -> Optional[datetime]:
+    """Converte um If-Modified-Since (HTTP-date); valores inválidos são ignorados (RFC 9110)."""
+    if not valor:
+        return None
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    return data if data.tzinfo is not None else None
@@ -0,0 +1,33 @@
+"""
+Endpoint de métricas no formato Prometheus.
+"""
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+
+from app.core.config import Settings, get_settings
+from app.infrastructure.metrics import gerar_metricas
+
+router = APIRouter()
+
+
+def verificar_coletor(request: Request, settings: Settings = Depends(get_settings)) -> None:
+    """
+    Aceita o Shared Secret no header X-Internal-Secret ou como Bearer token
+    (o que o Prometheus envia com `authorization: credentials: ...`).
+    """
+    autorizacao = request.headers.get("authorization", "")
+    candidatos = (
+        request.headers.get("x-internal-secret"),
+        autorizacao[7:] if autorizacao.lower().startswith("bearer ") else None,
+    )
+    if not any(c and secrets.compare_digest(c, settings.internal_api_key) for c in candidatos):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@router.get("/metrics", tags=["Monitoring"], dependencies=[Depends(verificar_coletor)])
+def metrics():
+    """Métricas de todos os workers deste servidor (ver app.infrastructure.metrics)."""
+    conteudo, content_type = gerar_metricas()
+    return Response(content=conteudo, media_type=content_type)
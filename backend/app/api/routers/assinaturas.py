@@ -1,4 +1,6 @@
 from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+
 from app.presentation import schemas
 from app.services.stripe_service import StripeService
 
@@ -8,10 +10,13 @@ router = APIRouter()
 async def criar_checkout(payload: schemas.CheckoutRequest):
     """
     Cria uma sessão de checkout do Stripe para o usuário.
+
+    A rota não depende de get_db: nenhuma conexão do pool fica presa durante
+    a chamada ao Stripe. O SDK é síncrono, então a chamada roda numa thread
+    para não travar o event loop (e as requisições que estão usando o banco).
     """
     try:
-        # Static method call, no DB dependency needed currently
-        url = StripeService.create_checkout_session(payload.telegram_user_id)
+        url = await run_in_threadpool(StripeService.create_checkout_session, payload.telegram_user_id)
         return {"url": url}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,48 @@
+from email.utils import format_datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Response
+from fastapi.responses import StreamingResponse
+
+from app.api.http_cache import chave_if_none_match, data_if_modified_since
+from app.application.use_cases.calendario.obter_feed import ObterFeedCalendarioUseCase
+from app.api.deps import get_feed_user_id, get_obter_feed_calendario_use_case
+
+router = APIRouter()
+
+MEDIA_TYPE_ICS = "text/calendar; charset=utf-8"
+
+
+@router.get(
+    "/{token}.ics",
+    summary="Feed de assinatura do calendário (.ics)",
+    response_class=Response,
+)
+async def feed_ics(
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+    user_id: int = Depends(get_feed_user_id),
+    use_case: ObterFeedCalendarioUseCase = Depends(get_obter_feed_calendario_use_case),
+):
+    """
+    Turnos do usuário dono do token como VCALENDAR, para assinatura em apps de
+    calendário (Google, Apple, Outlook...).
+
+    Responde com ETag e Last-Modified; com If-None-Match/If-Modified-Since
+    atuais, retorna 304 sem ler os turnos. O corpo é transmitido em partes.
+    """
+    resultado = await use_case.execute(
+        user_id,
+        etag_cliente=chave_if_none_match(if_none_match),
+        modificado_desde=data_if_modified_since(if_modified_since),
+    )
+    headers = {"ETag": f'"{resultado.etag}"', "Cache-Control": "private, no-cache"}
+    if resultado.ultima_modificacao:
+        headers["Last-Modified"] = format_datetime(resultado.ultima_modificacao, usegmt=True)
+
+    if resultado.nao_modificado:
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = 'inline; filename="turnos.ics"'
+    if resultado.conteudo is not None:
+        return Response(content=resultado.conteudo, media_type=MEDIA_TYPE_ICS, headers=headers)
+    return StreamingResponse(resultado.partes, media_type=MEDIA_TYPE_ICS, headers=headers)
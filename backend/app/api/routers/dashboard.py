@@ -0,0 +1,62 @@
+import hashlib
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+
+from app.api.deps import get_current_user_id, get_obter_dashboard_use_case
+from app.api.http_cache import chave_if_none_match
+from app.application.use_cases.usuarios.obter_dashboard import ObterDashboardUseCase
+from app.presentation import schemas
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_model=schemas.DashboardRead,
+    summary="Resumo do dashboard (perfil, plano, mês e turnos recentes)",
+    responses={304: {"description": "Conteúdo igual ao do ETag enviado"}},
+)
+async def obter_dashboard(
+    if_none_match: Optional[str] = Header(default=None),
+    user_id: int = Depends(get_current_user_id),
+    use_case: ObterDashboardUseCase = Depends(get_obter_dashboard_use_case),
+):
+    """
+    Tudo o que o dashboard mostra numa chamada (uma query no banco).
+
+    Responde com ETag forte (hash do corpo); com If-None-Match igual, retorna
+    304 sem corpo, para os polls repetidos do dashboard.
+    """
+    dashboard = await use_case.execute(user_id)
+    if dashboard is None:
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+    resumo = dashboard.resumo
+    payload = schemas.DashboardRead(
+        usuario=schemas.DashboardUsuario(
+            telegram_user_id=resumo.usuario.telegram_user_id,
+            nome=resumo.usuario.nome,
+            numero_funcionario=resumo.usuario.numero_funcionario,
+        ),
+        plano=schemas.DashboardPlano(
+            status=resumo.assinatura_status or "inactive",
+            plano=resumo.assinatura_plano or "free",
+            data_fim=resumo.assinatura_data_fim,
+            limite_turnos_mes=dashboard.limite_turnos_mes,
+            turnos_disponiveis=dashboard.turnos_disponiveis,
+        ),
+        mes=schemas.DashboardMes(
+            inicio=resumo.mes_inicio,
+            turnos=resumo.turnos_mes,
+            total_minutos=resumo.minutos_mes,
+        ),
+        turnos_recentes=[schemas.TurnoResumo.model_validate(t) for t in resumo.turnos_recentes],
+    )
+
+    corpo = payload.model_dump_json().encode()
+    etag = f'"{hashlib.sha256(corpo).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if chave_if_none_match(if_none_match) == etag.strip('"'):
+        return Response(status_code=304, headers=headers)
+    return Response(content=corpo, media_type="application/json", headers=headers)
@@ -1,8 +1,10 @@
 import calendar
 from datetime import date
-from fastapi import APIRouter, Depends, Query, Response, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, Response, HTTPException
 
 from app.presentation import schemas
+from app.api.http_cache import chave_if_none_match
 from app.application.use_cases.relatorios.gerar_relatorio import GerarRelatorioUseCase
 from app.application.use_cases.relatorios.baixar_relatorio import BaixarRelatorioPdfUseCase
 from app.api.deps import (
@@ -72,10 +74,16 @@ async def relatorio_mes(
 async def relatorio_mes_pdf(
     ano: int,
     mes: int,
+    if_none_match: Optional[str] = Header(default=None),
     user_id: int = Depends(get_current_user_id),
     use_case: BaixarRelatorioPdfUseCase = Depends(get_baixar_relatorio_pdf_use_case),
 ):
-    """Gera relatório em PDF dos turnos do mês."""
+    """
+    Gera relatório em PDF dos turnos do mês.
+
+    Responde com ETag (hash do conteúdo); com If-None-Match igual, retorna 304
+    sem renderizar nem enviar o PDF.
+    """
     # Validar mês
     try:
         last_day = calendar.monthrange(ano, mes)[1]
@@ -84,14 +92,22 @@ async def relatorio_mes_pdf(
     except Exception:
         raise HTTPException(status_code=400, detail="Data inválida")
     
-    pdf_bytes = await use_case.execute(user_id, inicio, fim)
-    if not pdf_bytes:
+    resultado = await use_case.execute(user_id, inicio, fim, chave_if_none_match(if_none_match))
+    etag = f'"{resultado.chave}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if resultado.nao_modificado:
+        return Response(status_code=304, headers=headers)
+
+    if not resultado.conteudo:
             # Caso raro onde passou checks mas gerou None
             raise HTTPException(status_code=500, detail="Erro ao gerar PDF")
             
     filename = f"relatorio_{ano}_{mes:02d}.pdf"
+    headers["Content-Disposition"] = f"attachment; filename={filename}"
     return Response(
-        content=pdf_bytes,
+        content=resultado.conteudo,
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        headers=headers,
     )
+
@@ -1,13 +1,20 @@
 from datetime import date
-from fastapi import APIRouter, Depends, Query
+from typing import AsyncIterator, Literal, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from app.presentation import schemas
 from app.application.use_cases.turnos.criar_turno import CriarTurnoUseCase
+from app.application.use_cases.turnos.criar_turnos_em_lote import CODIGO_LIMITE_TURNOS, CriarTurnosEmLoteUseCase
+from app.application.dtos.turno_lote_dto import ItemTurnoLote
+from app.domain.entities.turno import Turno
+from app.infrastructure.metrics import FREEMIUM_REJEICOES
 from app.application.use_cases.turnos.listar_turnos import ListarTurnosPeriodoUseCase, ListarTurnosRecentesUseCase
 from app.application.use_cases.turnos.deletar_turno import DeletarTurnoUseCase
 from app.api.deps import (
     get_current_user_id,
     get_criar_turno_use_case,
+    get_criar_turnos_em_lote_use_case,
     get_listar_turnos_periodo_use_case,
     get_listar_turnos_recentes_use_case,
     get_deletar_turno_use_case
@@ -15,6 +22,9 @@ from app.api.deps import (
 
 router = APIRouter()
 
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+LINHAS_POR_CHUNK = 200
+
 @router.post(
     "",
     response_model=schemas.TurnoRead,
@@ -38,20 +48,108 @@ async def criar_turno(
     return schemas.TurnoRead.model_validate(turno_entity)
 
 
+@router.post(
+    "/lote",
+    response_model=schemas.TurnoLoteResultado,
+    summary="Criar vários turnos de uma vez",
+)
+async def criar_turnos_em_lote(
+    lote_in: schemas.TurnoLoteCreate,
+    user_id: int = Depends(get_current_user_id),
+    use_case: CriarTurnosEmLoteUseCase = Depends(get_criar_turnos_em_lote_use_case),
+):
+    """
+    Cria todos os turnos do lote numa única transação.
+    Linhas que excedem o limite do plano Free são reportadas individualmente.
+    """
+    itens = [
+        ItemTurnoLote(
+            data_referencia=t.data_referencia,
+            hora_inicio=t.hora_inicio,
+            hora_fim=t.hora_fim,
+            tipo=t.tipo,
+            descricao_opcional=t.descricao_opcional,
+        )
+        for t in lote_in.turnos
+    ]
+    resultados = await use_case.execute(user_id, itens)
+
+    itens_resultado = [
+        schemas.TurnoLoteItemResultado(
+            indice=r.indice,
+            sucesso=r.sucesso,
+            turno=schemas.TurnoRead.model_validate(r.turno) if r.turno else None,
+            erro=r.erro,
+            codigo_erro=r.codigo_erro,
+        )
+        for r in resultados
+    ]
+    criados = sum(1 for r in itens_resultado if r.sucesso)
+    recusados_limite = sum(1 for r in itens_resultado if r.codigo_erro == CODIGO_LIMITE_TURNOS)
+    if recusados_limite:
+        FREEMIUM_REJEICOES.labels("lote").inc(recusados_limite)
+    return schemas.TurnoLoteResultado(
+        criados=criados,
+        rejeitados=len(itens_resultado) - criados,
+        resultados=itens_resultado,
+    )
+
+
 @router.get(
     "",
-    response_model=list[schemas.TurnoRead],
+    response_model=Union[list[schemas.TurnoRead], schemas.TurnoPagina],
     summary="Listar turnos por período",
+    responses={200: {"content": {MEDIA_TYPE_NDJSON: {}}}},
 )
 async def listar_turnos(
     inicio: date = Query(..., description="Data inicial (YYYY-MM-DD)"),
     fim: date = Query(..., description="Data final (YYYY-MM-DD)"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Número máximo de turnos por página"),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
+    formato: Optional[Literal["json", "ndjson"]] = Query(
+        None, description="ndjson: todos os turnos do período, um JSON por linha, em streaming"
+    ),
+    accept: Optional[str] = Header(default=None),
     user_id: int = Depends(get_current_user_id),
     use_case: ListarTurnosPeriodoUseCase = Depends(get_listar_turnos_periodo_use_case),
 ):
-    """Lista turnos do usuário dentro do período especificado."""
-    turnos = await use_case.execute(user_id, inicio, fim)
-    return [schemas.TurnoRead.model_validate(t) for t in turnos]
+    """
+    Lista turnos do usuário dentro do período especificado, em ordem de data,
+    hora de início e id.
+
+    JSON sem `limit` nem `cursor`: lista com o período inteiro (formato
+    original da rota, mantido para os clientes existentes).
+    JSON com `limit` ou `cursor`: páginas de até `limit` turnos (100 se
+    omitido); passe `next_cursor` em `cursor` para a próxima (null na última).
+    NDJSON (`formato=ndjson` ou `Accept: application/x-ndjson`): o período
+    inteiro, transmitido conforme as linhas saem do banco.
+    """
+    if formato == "ndjson" or (formato is None and accept and MEDIA_TYPE_NDJSON in accept):
+        return StreamingResponse(_ndjson(use_case.iterar(user_id, inicio, fim)), media_type=MEDIA_TYPE_NDJSON)
+
+    if limit is None and cursor is None:
+        return [schemas.TurnoRead.model_validate(t) async for t in use_case.iterar(user_id, inicio, fim)]
+
+    try:
+        pagina = await use_case.execute(user_id, inicio, fim, limite=limit or 100, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return schemas.TurnoPagina(
+        itens=[schemas.TurnoRead.model_validate(t) for t in pagina.itens],
+        next_cursor=pagina.proximo_cursor,
+    )
+
+
+async def _ndjson(turnos: AsyncIterator[Turno]) -> AsyncIterator[bytes]:
+    """Serializa os turnos em NDJSON, agrupando linhas para não enviar um chunk por turno."""
+    linhas = []
+    async for turno in turnos:
+        linhas.append(schemas.TurnoRead.model_validate(turno).model_dump_json())
+        if len(linhas) >= LINHAS_POR_CHUNK:
+            yield ("\n".join(linhas) + "\n").encode("utf-8")
+            linhas = []
+    if linhas:
+        yield ("\n".join(linhas) + "\n").encode("utf-8")
 
 
 @router.get(
@@ -84,6 +182,5 @@ async def deletar_turno(
     # Exceção de "Turno não encontrado" deveria vir do UseCase
     # Mas mantendo consistência com anterior:
     if not sucesso:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Turno não encontrado")
     return None
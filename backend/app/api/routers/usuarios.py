@@ -1,3 +1,6 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -8,10 +11,13 @@ from app.infrastructure.database import models
 from app.infrastructure.repositories.sqlalchemy_usuario_repository import SqlAlchemyUsuarioRepository
 from app.application.use_cases.usuarios.criar_usuario import CriarUsuarioUseCase
 from app.application.use_cases.usuarios.atualizar_usuario import AtualizarUsuarioUseCase
+from app.application.use_cases.calendario.gerar_token import GerarTokenCalendarioUseCase
+from app.core.config import Settings, get_settings
 from app.api.deps import (
     get_usuario_repo,
     get_criar_usuario_use_case,
     get_atualizar_usuario_use_case,
+    get_gerar_token_calendario_use_case,
     get_current_user_id,
 )
 
@@ -26,10 +32,30 @@ async def get_me(
     current_user_id: int = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
     repo: SqlAlchemyUsuarioRepository = Depends(get_usuario_repo),
+    settings: Settings = Depends(get_settings),
 ):
     """Busca os dados do próprio usuário autenticado (via Token ou Header)."""
     # Reutiliza a lógica de busca por ID
-    return await get_usuario(current_user_id, db, repo)
+    return await get_usuario(current_user_id, db, repo, settings)
+
+
+@router.post(
+    "/me/calendario-token",
+    response_model=schemas.CalendarioTokenRead,
+    summary="Gerar URL de assinatura do calendário (.ics)",
+)
+async def gerar_token_calendario(
+    current_user_id: int = Depends(get_current_user_id),
+    use_case: GerarTokenCalendarioUseCase = Depends(get_gerar_token_calendario_use_case),
+    settings: Settings = Depends(get_settings),
+):
+    """
+    Gera o token do feed .ics do usuário. Chamar de novo gera outro token e
+    invalida a URL anterior.
+    """
+    token = await use_case.execute(current_user_id)
+    url = f"{settings.base_url.rstrip('/')}/calendario/{token}.ics"
+    return schemas.CalendarioTokenRead(token=token, url=url)
 
 
 @router.get(
@@ -41,6 +67,7 @@ async def get_usuario(
     telegram_user_id: int,
     db: AsyncSession = Depends(get_db), # Direct DB needed for eager load (custom query)
     repo: SqlAlchemyUsuarioRepository = Depends(get_usuario_repo),
+    settings: Settings = Depends(get_settings),
 ):
     """Busca um usuário pelo seu Telegram User ID."""
     usuario = await repo.buscar_por_telegram_id(telegram_user_id)
@@ -55,25 +82,14 @@ async def get_usuario(
     result = await db.execute(stmt)
     assinatura = result.scalar()
     
-    # 🌟 Contar turnos do mês atual (para controle do plano Free)
-    from datetime import date
-    from sqlalchemy import func
-    today = date.today()
-    start_date = date(today.year, today.month, 1)
-    if today.month == 12:
-        end_date = date(today.year + 1, 1, 1)
-    else:
-        end_date = date(today.year, today.month + 1, 1) # Primeiro dia do mês seguinte (exclusivo)
-
-    # Precisamos do ID interno do usuário (FK na tabela Turno é owner_id)
-    # CORREÇÃO: O modelo Turno usa telegram_user_id direto, não FK para tabela usuario
-    count_stmt = select(func.count()).select_from(models.TurnoModel).where(
-        models.TurnoModel.telegram_user_id == telegram_user_id,
-        models.TurnoModel.data_referencia >= start_date,
-        models.TurnoModel.data_referencia < end_date
+    # 🌟 Turnos do mês atual (para controle do plano Free), lidos do contador mensal;
+    # mês no fuso da aplicação, como no dashboard (o contador é por data_referencia)
+    mes_inicio = datetime.now(ZoneInfo(settings.timezone)).date().replace(day=1)
+    count_stmt = select(models.TurnoContagemMensal.total).where(
+        models.TurnoContagemMensal.telegram_user_id == telegram_user_id,
+        models.TurnoContagemMensal.ano_mes == mes_inicio,
     )
-    count_result = await db.execute(count_stmt)
-    turnos_mes = count_result.scalar() or 0
+    turnos_mes = await db.scalar(count_stmt) or 0
 
     # Converter para schema e preencher campos extras
     usuario_read = schemas.UsuarioRead.model_validate(usuario)
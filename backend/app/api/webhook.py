@@ -1,22 +1,35 @@
 """
 Stripe webhook handlers for subscription management.
+
+O endpoint só verifica a assinatura do Stripe, registra o evento em
+`stripe_eventos` e enfileira o processamento na fila de jobs, tudo numa
+transação curta: reenvios do mesmo evento são descartados pelo ID e o Stripe
+recebe a resposta sem esperar pelos handlers. Os handlers (e a verificação de
+ordem dos eventos) estão em app.infrastructure.tasks.stripe_eventos.
 """
+import json
 import logging
+import time
 import stripe
 from fastapi import APIRouter, Request, Header, HTTPException, Depends
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime, UTC
 
 from app.core.config import get_settings
 from app.infrastructure.database.session import get_db
-from app.infrastructure.database.models import Assinatura
+from app.infrastructure.database.models import StripeEvento
+from app.infrastructure.metrics import STRIPE_EVENTOS, STRIPE_WEBHOOK_DURACAO
+from app.infrastructure.tasks.postgres_queue import PostgresJobQueue
+from app.infrastructure.tasks.stripe_eventos import HANDLERS, dados_do_evento, processar_evento_stripe
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 settings = get_settings()
 
+# Tipos com handler; os demais são rotulados "ignorado" nas métricas
+EVENTOS_TRATADOS = set(HANDLERS)
+
 
 @router.post("/webhook/stripe", tags=["Webhooks"])
 async def stripe_webhook(
@@ -25,12 +38,17 @@ async def stripe_webhook(
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Recebe eventos do Stripe e atualiza o status da assinatura.
+    Recebe eventos do Stripe e enfileira a atualização da assinatura.
+
+    Um evento já recebido responde "duplicate" sem enfileirar de novo. O
+    worker aplica o evento e pede ao bot que invalide o perfil em cache do
+    usuário afetado (ver bot_notificador).
     """
     payload = await request.body()
-    
+    inicio = time.perf_counter()
+
     try:
-        event = stripe.Webhook.construct_event(
+        stripe.Webhook.construct_event(
             payload, stripe_signature, settings.stripe_webhook_secret
         )
     except ValueError:
@@ -40,111 +58,41 @@ async def stripe_webhook(
         logger.warning("Stripe webhook: Invalid signature")
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    # Processar eventos
-    event_type = event['type']
-    logger.info(f"Processing Stripe event: {event_type}")
-    
-    if event_type == 'checkout.session.completed':
-        session = event['data']['object']
-        await handle_checkout_completed(session, db)
-    
-    elif event_type == 'customer.subscription.updated':
-        subscription = event['data']['object']
-        await handle_subscription_updated(subscription, db)
-        
-    elif event_type == 'customer.subscription.deleted':
-        subscription = event['data']['object']
-        await handle_subscription_deleted(subscription, db)
-
-    return {"status": "success"}
-
+    # Payload já verificado: o JSON cru basta (não precisa do StripeObject)
+    evento = json.loads(payload)
+    event_type = evento['type']
+    tratado = event_type in EVENTOS_TRATADOS
 
-async def handle_checkout_completed(session, db: AsyncSession):
-    """
-    Processa checkout bem-sucedido: cria ou atualiza assinatura.
-    """
-    telegram_user_id = session.get('client_reference_id')
-    stripe_customer_id = session.get('customer')
-    stripe_subscription_id = session.get('subscription')
-    
-    if not telegram_user_id:
-        logger.error("Webhook Error: telegram_user_id not found in checkout session")
-        return
+    try:
+        # Tipos sem handler não são gravados nem enfileirados
+        if not tratado:
+            return {"status": "ignored"}
 
-    # Buscar assinatura existente
-    stmt = select(Assinatura).where(Assinatura.telegram_user_id == int(telegram_user_id))
-    result = await db.execute(stmt)
-    assinatura = result.scalar()
-    
-    if not assinatura:
-        assinatura = Assinatura(
-            telegram_user_id=int(telegram_user_id),
-            stripe_customer_id=stripe_customer_id,
-            stripe_subscription_id=stripe_subscription_id,
-            status="active",
-            plano="pro",
-            criado_em=datetime.now(UTC),
-            atualizado_em=datetime.now(UTC)
+        inserido = await db.scalar(
+            insert(StripeEvento)
+            .values(**dados_do_evento(evento))
+            .on_conflict_do_nothing(index_elements=[StripeEvento.id])
+            .returning(StripeEvento.id)
         )
-        db.add(assinatura)
-        logger.info(
-            "Nova assinatura criada",
-            extra={"telegram_user_id": telegram_user_id, "plano": "pro"}
-        )
-    else:
-        assinatura.stripe_customer_id = stripe_customer_id
-        assinatura.stripe_subscription_id = stripe_subscription_id
-        assinatura.status = "active"
-        assinatura.plano = "pro"
-        assinatura.atualizado_em = datetime.now(UTC)
-        logger.info(
-            "Assinatura atualizada para ativa",
-            extra={"telegram_user_id": telegram_user_id, "plano": "pro"}
-        )
-    
-    await db.commit()
-
+        if inserido is None:
+            await db.rollback()
+            STRIPE_EVENTOS.labels("duplicado").inc()
+            logger.info("Evento do Stripe repetido ignorado", extra={"stripe_event_id": evento['id']})
+            return {"status": "duplicate"}
 
-async def handle_subscription_updated(subscription, db: AsyncSession):
-    """
-    Atualiza status da assinatura (ex: pagamento falhou, renovou).
-    """
-    stripe_subscription_id = subscription.get('id')
-    status = subscription.get('status')
-    current_period_end = subscription.get('current_period_end')
-    
-    stmt = select(Assinatura).where(Assinatura.stripe_subscription_id == stripe_subscription_id)
-    result = await db.execute(stmt)
-    assinatura = result.scalar()
-    
-    if assinatura:
-        assinatura.status = status
-        if current_period_end:
-            assinatura.data_fim = datetime.fromtimestamp(current_period_end)
-        assinatura.atualizado_em = datetime.now(UTC)
-        await db.commit()
-        logger.info(
-            "Status de assinatura atualizado",
-            extra={"stripe_subscription_id": stripe_subscription_id, "status": status}
+        # Mesmo commit do evento: ou os dois ficam gravados, ou nenhum (e o Stripe reenvia)
+        PostgresJobQueue(db, max_tentativas=settings.jobs_max_tentativas).add_task(
+            processar_evento_stripe, evento_id=evento['id']
         )
-
-
-async def handle_subscription_deleted(subscription, db: AsyncSession):
-    """
-    Assinatura cancelada.
-    """
-    stripe_subscription_id = subscription.get('id')
-    
-    stmt = select(Assinatura).where(Assinatura.stripe_subscription_id == stripe_subscription_id)
-    result = await db.execute(stmt)
-    assinatura = result.scalar()
-    
-    if assinatura:
-        assinatura.status = "canceled"
-        assinatura.plano = "free"
-        assinatura.atualizado_em = datetime.now(UTC)
         await db.commit()
+        STRIPE_EVENTOS.labels("novo").inc()
         logger.info(
-            "Assinatura cancelada",
-            extra={"stripe_subscription_id": stripe_subscription_id}
+            "Evento do Stripe enfileirado",
+            extra={"stripe_event_id": evento['id'], "event_type": event_type},
         )
+    finally:
+        STRIPE_WEBHOOK_DURACAO.labels(
+            event_type if tratado else "ignorado"
+        ).observe(time.perf_counter() - inicio)
+
+    return {"status": "success"}
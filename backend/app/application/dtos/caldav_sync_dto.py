@@ -6,3 +6,4 @@ class SyncTurnoCalDavCommand:
     Comando para a tarefa de sincronização de turno com CalDAV.
     """
     turno_id: int
+    telegram_user_id: int
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from app.domain.entities.dashboard import ResumoDashboard
+
+
+@dataclass(frozen=True)
+class Dashboard:
+    """
+    Resumo do dashboard com o limite do plano aplicado.
+
+    `limite_turnos_mes` é None quando o plano não tem limite (Pro ativo ou trial).
+    """
+    resumo: ResumoDashboard
+    limite_turnos_mes: Optional[int] = None
+
+    @property
+    def turnos_disponiveis(self) -> Optional[int]:
+        if self.limite_turnos_mes is None:
+            return None
+        return max(0, self.limite_turnos_mes - self.resumo.turnos_mes)
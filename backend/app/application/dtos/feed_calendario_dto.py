@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+
+@dataclass(frozen=True)
+class FeedCalendarioResultado:
+    """
+    Resultado da consulta ao feed .ics.
+
+    `etag`/`ultima_modificacao` identificam a versão atual. O corpo vem pronto
+    em `conteudo` (cache) ou em `partes`, gerado sob demanda enquanto é
+    transmitido; ambos são None quando o cliente já possui essa versão.
+    """
+    etag: str
+    ultima_modificacao: Optional[datetime] = None
+    conteudo: Optional[bytes] = None
+    partes: Optional[AsyncIterator[bytes]] = None
+
+    @property
+    def nao_modificado(self) -> bool:
+        return self.conteudo is None and self.partes is None
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class RelatorioPdfResultado:
+    """
+    Resultado da geração do PDF mensal.
+
+    `chave` identifica o conteúdo (usada como ETag). `conteudo` é None quando o
+    cliente já possui essa versão.
+    """
+    chave: str
+    conteudo: Optional[bytes] = None
+
+    @property
+    def nao_modificado(self) -> bool:
+        return self.conteudo is None
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from datetime import date, time
+from typing import Optional
+
+from app.domain.entities.turno import Turno
+
+
+@dataclass(frozen=True)
+class ItemTurnoLote:
+    """
+    Uma linha de um pedido de criação de turnos em lote.
+    """
+    data_referencia: date
+    hora_inicio: time
+    hora_fim: time
+    tipo: Optional[str] = None
+    descricao_opcional: Optional[str] = None
+
+
+@dataclass
+class ResultadoItemLote:
+    """
+    Resultado de uma linha do lote: o turno criado ou o motivo da rejeição.
+    """
+    indice: int
+    turno: Optional[Turno] = None
+    erro: Optional[str] = None
+    codigo_erro: Optional[str] = None
+
+    @property
+    def sucesso(self) -> bool:
+        return self.turno is not None
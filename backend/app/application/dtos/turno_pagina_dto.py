@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.domain.entities.turno import Turno
+
+
+@dataclass(frozen=True)
+class PaginaTurnos:
+    """
+    Uma página da listagem por período. `proximo_cursor` é None na última página.
+    """
+    itens: List[Turno]
+    proximo_cursor: Optional[str] = None
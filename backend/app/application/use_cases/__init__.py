@@ -5,6 +5,7 @@ Exposes all application use cases.
 """
 from app.application.use_cases.turnos import (
     CriarTurnoUseCase,
+    CriarTurnosEmLoteUseCase,
     ListarTurnosPeriodoUseCase,
     ListarTurnosRecentesUseCase,
     DeletarTurnoUseCase,
@@ -16,6 +17,7 @@ from app.application.use_cases.relatorios import (
 __all__ = [
     # Turnos
     "CriarTurnoUseCase",
+    "CriarTurnosEmLoteUseCase",
     "ListarTurnosPeriodoUseCase",
     "ListarTurnosRecentesUseCase",
     "DeletarTurnoUseCase",
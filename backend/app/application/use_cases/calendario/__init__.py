@@ -0,0 +1,10 @@
+"""
+Calendar subscription (.ics feed) use cases package.
+"""
+from app.application.use_cases.calendario.obter_feed import ObterFeedCalendarioUseCase
+from app.application.use_cases.calendario.gerar_token import GerarTokenCalendarioUseCase
+
+__all__ = [
+    "ObterFeedCalendarioUseCase",
+    "GerarTokenCalendarioUseCase",
+]
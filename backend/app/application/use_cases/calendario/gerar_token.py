@@ -0,0 +1,25 @@
+"""
+Use case for creating (or rotating) the calendar subscription token.
+"""
+import secrets
+
+from app.domain.uow import AbstractUnitOfWork
+
+
+class GerarTokenCalendarioUseCase:
+    """
+    Gera um novo token opaco para o feed .ics do usuário.
+
+    O token é a única credencial da URL de assinatura (clientes de calendário
+    não enviam headers), então gerar outro revoga o anterior.
+    """
+
+    def __init__(self, uow: AbstractUnitOfWork):
+        self.uow = uow
+
+    async def execute(self, telegram_user_id: int) -> str:
+        token = secrets.token_urlsafe(32)
+        async with self.uow:
+            await self.uow.calendario_feeds.salvar_token(telegram_user_id, token)
+            await self.uow.commit()
+        return token
@@ -0,0 +1,164 @@
+"""
+Use case for serving the calendar subscription (.ics) feed.
+"""
+import hashlib
+import time
+from dataclasses import replace
+from datetime import UTC, date, datetime, timedelta
+from typing import AsyncIterator, Callable, List, Optional
+
+from app.application.dtos.feed_calendario_dto import FeedCalendarioResultado
+from app.domain.entities.feed_calendario import FeedRenderizado, VersaoPeriodo
+from app.domain.entities.turno import Turno
+from app.domain.ports.cache_port import FeedCalendarioCachePort
+from app.domain.repositories.turno_repository import TurnoRepository
+from app.domain.services.feed_calendario_service import FeedCalendarioService
+
+# Incrementar quando o formato do feed mudar, para invalidar as versões dos clientes
+VERSAO_FORMATO = 1
+
+
+def calcular_etag_feed(telegram_user_id: int, inicio: date, fim: date, versao: VersaoPeriodo) -> str:
+    """
+    ETag do feed a partir do validador do período (sem ler os turnos).
+    """
+    ultima = versao.ultima_alteracao.isoformat() if versao.ultima_alteracao else ""
+    payload = f"{VERSAO_FORMATO}|{telegram_user_id}|{inicio}|{fim}|{ultima}|{versao.total}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class ObterFeedCalendarioUseCase:
+    """
+    Feed .ics dos turnos numa janela móvel em torno de hoje.
+
+    Clientes de calendário consultam o feed a cada poucos minutos, quase sempre
+    sem mudança. Por isso:
+    - a versão (ETag/Last-Modified) vem de uma agregação, não dos turnos;
+    - dentro do TTL, a versão em cache dispensa até essa consulta (escritas no
+      mesmo processo forçam a revalidação na hora);
+    - corpos pequenos ficam em memória; o feed é gerado em lotes enquanto é
+      transmitido, sem montar o histórico inteiro na memória.
+    """
+
+    def __init__(
+        self,
+        turno_repository: TurnoRepository,
+        feed_service: FeedCalendarioService,
+        feed_cache: Optional[FeedCalendarioCachePort] = None,
+        dias_passados: int = 90,
+        dias_futuros: int = 365,
+        ttl_segundos: float = 60.0,
+        max_bytes_cache: int = 256 * 1024,
+        tamanho_lote: int = 100,
+        hoje: Callable[[], date] = date.today,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.turno_repository = turno_repository
+        self.feed_service = feed_service
+        self.feed_cache = feed_cache
+        self.dias_passados = dias_passados
+        self.dias_futuros = dias_futuros
+        self.ttl_segundos = ttl_segundos
+        self.max_bytes_cache = max_bytes_cache
+        self.tamanho_lote = tamanho_lote
+        self.hoje = hoje
+        self.relogio = relogio
+
+    async def execute(
+        self,
+        telegram_user_id: int,
+        etag_cliente: Optional[str] = None,
+        modificado_desde: Optional[datetime] = None,
+    ) -> FeedCalendarioResultado:
+        """
+        Retorna a versão atual do feed e, se o cliente ainda não a possui
+        (If-None-Match / If-Modified-Since), o corpo.
+        """
+        hoje = self.hoje()
+        inicio = hoje - timedelta(days=self.dias_passados)
+        fim = hoje + timedelta(days=self.dias_futuros)
+
+        feed = await self._versao_atual(telegram_user_id, inicio, fim)
+        resultado = FeedCalendarioResultado(etag=feed.etag, ultima_modificacao=feed.ultima_modificacao)
+
+        if self._cliente_atualizado(feed, etag_cliente, modificado_desde):
+            return resultado
+        if feed.conteudo is not None:
+            return replace(resultado, conteudo=feed.conteudo)
+        return replace(resultado, partes=self._gerar(telegram_user_id, inicio, fim, feed))
+
+    async def _versao_atual(self, telegram_user_id: int, inicio: date, fim: date) -> FeedRenderizado:
+        agora = self.relogio()
+        em_cache = self.feed_cache.obter(telegram_user_id) if self.feed_cache else None
+        if em_cache and em_cache.inicio != inicio:
+            em_cache = None  # A janela andou (virada do dia)
+        if em_cache and agora - em_cache.verificado_em < self.ttl_segundos:
+            return em_cache
+
+        versao = await self.turno_repository.versao_periodo(telegram_user_id, inicio, fim)
+        etag = calcular_etag_feed(telegram_user_id, inicio, fim, versao)
+        if em_cache and em_cache.etag == etag:
+            feed = replace(em_cache, verificado_em=agora)
+        else:
+            ultima = versao.ultima_alteracao
+            if ultima is not None and ultima.tzinfo is None:
+                ultima = ultima.replace(tzinfo=UTC)
+            if em_cache and em_cache.ultima_modificacao and (ultima is None or ultima <= em_cache.ultima_modificacao):
+                # Remoção: o conteúdo mudou sem avançar o maior atualizado_em
+                ultima = datetime.now(UTC)
+            feed = FeedRenderizado(etag=etag, inicio=inicio, ultima_modificacao=ultima, verificado_em=agora)
+
+        if self.feed_cache:
+            self.feed_cache.salvar(telegram_user_id, feed)
+        return feed
+
+    @staticmethod
+    def _cliente_atualizado(
+        feed: FeedRenderizado,
+        etag_cliente: Optional[str],
+        modificado_desde: Optional[datetime],
+    ) -> bool:
+        # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110, 13.2.2)
+        if etag_cliente is not None:
+            return etag_cliente == feed.etag
+        if modificado_desde is not None and feed.ultima_modificacao is not None:
+            return feed.ultima_modificacao.replace(microsecond=0) <= modificado_desde
+        return False
+
+    async def _gerar(
+        self, telegram_user_id: int, inicio: date, fim: date, feed: FeedRenderizado
+    ) -> AsyncIterator[bytes]:
+        """
+        Gera o feed em partes de `tamanho_lote` eventos. Se couber no limite,
+        o corpo completo vai para o cache (a menos que uma escrita o tenha
+        invalidado durante a geração).
+        """
+        acumulado: Optional[List[bytes]] = [] if self.feed_cache else None
+        tamanho = 0
+
+        def guardar(parte: bytes) -> bytes:
+            nonlocal acumulado, tamanho
+            if acumulado is not None:
+                tamanho += len(parte)
+                if tamanho > self.max_bytes_cache:
+                    acumulado = None
+                else:
+                    acumulado.append(parte)
+            return parte
+
+        yield guardar(self.feed_service.cabecalho())
+        lote: List[Turno] = []
+        async for turno in self.turno_repository.iterar_por_periodo(telegram_user_id, inicio, fim):
+            lote.append(turno)
+            if len(lote) >= self.tamanho_lote:
+                yield guardar(self.feed_service.eventos(lote))
+                lote = []
+        if lote:
+            yield guardar(self.feed_service.eventos(lote))
+        yield guardar(self.feed_service.rodape())
+
+        if acumulado is not None:
+            atual = self.feed_cache.obter(telegram_user_id)
+            # Invalidado durante a geração: o corpo pode não corresponder à versão
+            if atual is not None and atual.etag == feed.etag and atual.verificado_em >= feed.verificado_em:
+                self.feed_cache.salvar(telegram_user_id, replace(atual, conteudo=b"".join(acumulado)))
@@ -1,10 +1,43 @@
+import hashlib
+import json
 from datetime import date
-from typing import Optional, Dict
+from typing import Awaitable, Callable, Iterable, Optional, Dict
 
 from app.domain.repositories.turno_repository import TurnoRepository
 from app.domain.repositories.usuario_repository import UsuarioRepository
 from app.domain.repositories.assinatura_repository import AssinaturaRepository
 from app.domain.services.relatorio_service import RelatorioService
+from app.domain.entities.turno import Turno
+from app.domain.ports.cache_port import PdfCachePort
+from app.application.dtos.relatorio_pdf_dto import RelatorioPdfResultado
+
+
+def calcular_chave_pdf(
+    turnos: Iterable[Turno],
+    inicio: date,
+    fim: date,
+    usuario_info: Optional[Dict] = None,
+) -> str:
+    """
+    Hash (sha256) de tudo que aparece no PDF: período, dados do usuário e linhas de turnos.
+    """
+    linhas = sorted(
+        (
+            t.data_referencia.isoformat(),
+            t.hora_inicio.isoformat(),
+            t.hora_fim.isoformat(),
+            t.duracao_minutos,
+            t.tipo or "",
+        )
+        for t in turnos
+    )
+    payload = json.dumps(
+        [inicio.isoformat(), fim.isoformat(), usuario_info or {}, linhas],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 
 class BaixarRelatorioPdfUseCase:
     """
@@ -16,26 +49,29 @@ class BaixarRelatorioPdfUseCase:
         turno_repository: TurnoRepository,
         usuario_repository: UsuarioRepository,
         assinatura_repository: AssinaturaRepository,
-        relatorio_service: RelatorioService
+        relatorio_service: RelatorioService,
+        pdf_cache: Optional[PdfCachePort] = None,
+        liberar_conexao: Optional[Callable[[], Awaitable[None]]] = None,
     ):
         self.turno_repository = turno_repository
         self.usuario_repository = usuario_repository
         self.assinatura_repository = assinatura_repository
         self.relatorio_service = relatorio_service
+        self.pdf_cache = pdf_cache
+        # Encerra a transação de leitura: a renderização não precisa do banco
+        self.liberar_conexao = liberar_conexao
 
     async def execute(
         self,
         telegram_user_id: int,
         inicio: date,
-        fim: date
-    ) -> Optional[bytes]:
+        fim: date,
+        chave_cliente: Optional[str] = None,
+    ) -> RelatorioPdfResultado:
         """
         Executa a geração do relatório.
-        Retorna bytes do PDF ou None se não permitido/erro.
-        Poderia levantar exceções específicas para 403/404.
-        Para simplificar e manter compatibilidade com controller atual, vamos levantar aqui ou retornar None?
-        
-        Melhor: O UseCase deve levantar exceções de negócio.
+        Retorna a chave do conteúdo e os bytes do PDF (None quando `chave_cliente`
+        já corresponde ao conteúdo atual). Levanta exceções de negócio (403).
         """
         # 1. Verificar Assinatura (Premium Check)
         assinatura = await self.assinatura_repository.get_by_user_id(telegram_user_id)
@@ -55,8 +91,23 @@ class BaixarRelatorioPdfUseCase:
 
         # 3. Buscar Turnos
         turnos = await self.turno_repository.listar_por_periodo(telegram_user_id, inicio, fim)
+        if self.liberar_conexao:
+            await self.liberar_conexao()
+
+        # 4. Cache endereçado pelo conteúdo
+        chave = calcular_chave_pdf(turnos, inicio, fim, usuario_info)
+        if chave_cliente == chave:
+            return RelatorioPdfResultado(chave=chave)
+
+        if self.pdf_cache:
+            em_cache = await self.pdf_cache.obter(telegram_user_id, inicio.year, inicio.month, chave)
+            if em_cache is not None:
+                return RelatorioPdfResultado(chave=chave, conteudo=em_cache)
+
+        # 5. Gerar PDF (Service)
+        pdf_bytes = await self.relatorio_service.gerar_pdf_mes(turnos, inicio, fim, usuario_info)
+
+        if self.pdf_cache and pdf_bytes:
+            await self.pdf_cache.salvar(telegram_user_id, inicio.year, inicio.month, chave, pdf_bytes)
 
-        # 4. Gerar PDF (Service)
-        pdf_bytes = self.relatorio_service.gerar_pdf_mes(turnos, inicio, fim, usuario_info)
-        
-        return pdf_bytes
+        return RelatorioPdfResultado(chave=chave, conteudo=pdf_bytes)
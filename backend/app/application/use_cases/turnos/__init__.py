@@ -2,6 +2,7 @@
 Turnos use cases package.
 """
 from app.application.use_cases.turnos.criar_turno import CriarTurnoUseCase
+from app.application.use_cases.turnos.criar_turnos_em_lote import CriarTurnosEmLoteUseCase
 from app.application.use_cases.turnos.listar_turnos import (
     ListarTurnosPeriodoUseCase,
     ListarTurnosRecentesUseCase,
@@ -10,6 +11,7 @@ from app.application.use_cases.turnos.deletar_turno import DeletarTurnoUseCase
 
 __all__ = [
     "CriarTurnoUseCase",
+    "CriarTurnosEmLoteUseCase",
     "ListarTurnosPeriodoUseCase",
     "ListarTurnosRecentesUseCase",
     "DeletarTurnoUseCase",
@@ -2,11 +2,11 @@
 Use case for creating a new Turno.
 """
 import logging
-import calendar
 from datetime import date, time
 from typing import Optional
 
 from app.domain.entities.turno import Turno
+from app.domain.entities.tipo_turno import TipoTurno
 from app.domain.uow import AbstractUnitOfWork
 from app.domain.services.calendar_service import CalendarService
 
@@ -16,9 +16,40 @@ from app.domain.entities.assinatura import Assinatura, AssinaturaStatus, PlanoTy
 from app.domain.exceptions.freemium_exception import LimiteTurnosExcedidoException
 from app.core.config import Settings
 from app.domain.ports.caldav_sync_port import CalDavSyncTaskPort
+from app.domain.ports.cache_port import InvalidacaoCachePort, TipoTurnoCachePort
 from app.application.dtos.caldav_sync_dto import SyncTurnoCalDavCommand
 
 
+async def obter_assinatura_com_lock(uow: AbstractUnitOfWork, telegram_user_id: int) -> Assinatura:
+    """
+    Busca a assinatura do usuário com SELECT ... FOR UPDATE.
+
+    Usuários legacy (sem assinatura) recebem uma assinatura FREE padrão na mesma
+    transação, para que o lock e a verificação de limites funcionem.
+    """
+    assinatura = await uow.assinaturas.get_by_user_id(telegram_user_id, for_update=True)
+    if assinatura:
+        return assinatura
+
+    logger.info(f"Usuário {telegram_user_id} sem assinatura (legacy). Criando assinatura FREE padrão.")
+    agora = datetime.now(UTC)
+    nova_assinatura = Assinatura(
+        id=None, # DB will generate
+        telegram_user_id=telegram_user_id,
+        stripe_customer_id=f"legacy_{telegram_user_id}", # Placeholder
+        stripe_subscription_id=None,
+        status=AssinaturaStatus.ACTIVE.value,
+        plano=PlanoType.FREE.value,
+        data_inicio=agora,
+        data_fim=None,
+        criado_em=agora,
+        atualizado_em=agora,
+    )
+    # 'criar' faz flush/refresh: a nova linha já pertence a esta transação,
+    # e um insert concorrente bloquearia na constraint unique de telegram_user_id.
+    return await uow.assinaturas.criar(nova_assinatura)
+
+
 class CriarTurnoUseCase:
     """
     Use case for creating a new work shift.
@@ -33,11 +64,15 @@ class CriarTurnoUseCase:
         calendar_service: CalendarService,
         settings: Settings,
         caldav_sync_task_port: CalDavSyncTaskPort,
+        invalidacao_cache: Optional[InvalidacaoCachePort] = None,
+        tipo_cache: Optional[TipoTurnoCachePort] = None,
     ):
         self.uow = uow
         self.calendar_service = calendar_service
         self.settings = settings
         self.caldav_sync_task_port = caldav_sync_task_port
+        self.invalidacao_cache = invalidacao_cache
+        self.tipo_cache = tipo_cache
 
     async def execute(
         self,
@@ -54,37 +89,12 @@ class CriarTurnoUseCase:
         async with self.uow:
             # 0. Check Freemium Limits
             # Lock row to prevent race condition
-            assinatura = await self.uow.assinaturas.get_by_user_id(telegram_user_id, for_update=True)
-            
-            # 0.1 If Legacy User (no signature), create default FREE one now to enable locking/checking
-            if not assinatura:
-                logger.info(f"Usuário {telegram_user_id} sem assinatura (legacy). Criando assinatura FREE padrão.")
-                agora = datetime.now(UTC)
-                nova_assinatura = Assinatura(
-                    id=None, # DB will generate
-                    telegram_user_id=telegram_user_id,
-                    stripe_customer_id=f"legacy_{telegram_user_id}", # Placeholder
-                    stripe_subscription_id=None,
-                    status=AssinaturaStatus.ACTIVE.value,
-                    plano=PlanoType.FREE.value,
-                    data_inicio=agora,
-                    data_fim=None,
-                    criado_em=agora,
-                    atualizado_em=agora,
-                )
-                assinatura = await self.uow.assinaturas.criar(nova_assinatura)
-                # Note: 'criar' usually does flush/refresh, so we get the ID and it's part of the transaction.
-                # Since we are in the same transaction, we effectively hold the lock on this new row if we were to select it again,
-                # but since we just created it, no one else could have it yet (or they would have blocked us on insert if unique constraint exists).
+            assinatura = await obter_assinatura_com_lock(self.uow, telegram_user_id)
             
             if assinatura and assinatura.is_free:
                 
-                # Determine start/end of the month for data_referencia
-                start_date = data_referencia.replace(day=1)
-                _, last_day = calendar.monthrange(data_referencia.year, data_referencia.month)
-                end_date = data_referencia.replace(day=last_day)
-                
-                count = await self.uow.turnos.contar_por_periodo(telegram_user_id, start_date, end_date)
+                # Contador mensal pré-agregado: lookup por PK com o lock ainda retido
+                count = await self.uow.turnos.contar_mes(telegram_user_id, data_referencia)
                 
                 if count >= self.settings.free_tier_max_shifts:
                     raise LimiteTurnosExcedidoException(self.settings.free_tier_max_shifts, count)
@@ -101,19 +111,35 @@ class CriarTurnoUseCase:
             
             # 1.1 Normalize Tipo (Domain Logic moved from Infrastructure)
             if tipo:
-                tipo_existente = await self.uow.turnos.buscar_tipo_por_nome(tipo)
+                tipo_existente = await self._resolver_tipo(telegram_user_id, tipo)
                 if tipo_existente:
                     turno.tipo_id = tipo_existente.id
             
             # 2. Persist (Infrastructure)
             saved_turno = await self.uow.turnos.criar(turno)
             
-            # 3. Commit Transaction (Must commit to get ID before background task usually)
+            # 3. CalDAV Integration (Background)
+            # Enfileirado antes do commit: na fila persistente o job é gravado
+            # na mesma transação do turno (ID já disponível após o flush).
+            if assinatura and not assinatura.is_free:
+                self.caldav_sync_task_port.add_sync_task(
+                    SyncTurnoCalDavCommand(turno_id=saved_turno.id, telegram_user_id=telegram_user_id)
+                )
+
+            # 4. Commit Transaction
             # UoW commit does flush and commit.
             await self.uow.commit()
 
-            # 4. CalDAV Integration (Background)
-            if assinatura and not assinatura.is_free:
-                self.caldav_sync_task_port.add_sync_task(SyncTurnoCalDavCommand(turno_id=saved_turno.id))
-            
+            if self.invalidacao_cache:
+                await self.invalidacao_cache.turnos_alterados(telegram_user_id, [saved_turno.data_referencia])
+
             return saved_turno
+
+    async def _resolver_tipo(self, telegram_user_id: int, tipo: str) -> Optional[TipoTurno]:
+        """Tipo cadastrado com esse nome, pelo cache quando disponível."""
+        def buscar():
+            return self.uow.turnos.buscar_tipo_por_nome(tipo, telegram_user_id)
+
+        if self.tipo_cache is None:
+            return await buscar()
+        return await self.tipo_cache.resolver(telegram_user_id, tipo, buscar)
@@ -0,0 +1,128 @@
+"""
+Use case for creating several Turnos in one transaction.
+"""
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+from app.core.config import Settings
+from app.domain.entities.turno import Turno
+from app.domain.uow import AbstractUnitOfWork
+from app.domain.exceptions.freemium_exception import LimiteTurnosExcedidoException
+from app.domain.ports.caldav_sync_port import CalDavSyncTaskPort
+from app.domain.ports.cache_port import InvalidacaoCachePort
+from app.application.dtos.caldav_sync_dto import SyncTurnoCalDavCommand
+from app.application.dtos.turno_lote_dto import ItemTurnoLote, ResultadoItemLote
+from app.application.use_cases.turnos.criar_turno import obter_assinatura_com_lock
+
+logger = logging.getLogger(__name__)
+
+CODIGO_LIMITE_TURNOS = "limite_turnos"
+
+
+class CriarTurnosEmLoteUseCase:
+    """
+    Use case for creating many work shifts at once (multi-line Telegram messages).
+
+    Takes the subscription lock once, counts the freemium usage once per
+    affected month, resolves every tipo in a single query and inserts all
+    accepted rows with one multi-row INSERT. Each line gets its own result.
+    """
+
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        settings: Settings,
+        caldav_sync_task_port: CalDavSyncTaskPort,
+        invalidacao_cache: Optional[InvalidacaoCachePort] = None,
+    ):
+        self.uow = uow
+        self.settings = settings
+        self.caldav_sync_task_port = caldav_sync_task_port
+        self.invalidacao_cache = invalidacao_cache
+
+    async def execute(
+        self,
+        telegram_user_id: int,
+        itens: List[ItemTurnoLote],
+    ) -> List[ResultadoItemLote]:
+        """
+        Creates the turnos and returns one result per input line, in order.
+        """
+        resultados = [ResultadoItemLote(indice=i) for i in range(len(itens))]
+        if not itens:
+            return resultados
+
+        async with self.uow:
+            # 0. Lock único da assinatura para o lote inteiro
+            assinatura = await obter_assinatura_com_lock(self.uow, telegram_user_id)
+
+            # 1. Freemium: uma contagem por mês afetado
+            limite = self.settings.free_tier_max_shifts
+            contagem_por_mes: Dict[date, int] = {}
+            if assinatura.is_free:
+                for mes in {item.data_referencia.replace(day=1) for item in itens}:
+                    contagem_por_mes[mes] = await self.uow.turnos.contar_mes(telegram_user_id, mes)
+
+            # 2. Resolver todos os tipos numa única consulta
+            tipos = await self.uow.turnos.buscar_tipos_por_nomes(
+                (item.tipo for item in itens if item.tipo), telegram_user_id
+            )
+
+            # 3. Montar entidades aceitas
+            aceitos: List[int] = []
+            novos: List[Turno] = []
+            for indice, item in enumerate(itens):
+                if assinatura.is_free:
+                    mes = item.data_referencia.replace(day=1)
+                    atual = contagem_por_mes[mes]
+                    if atual >= limite:
+                        resultados[indice].erro = str(LimiteTurnosExcedidoException(limite, atual))
+                        resultados[indice].codigo_erro = CODIGO_LIMITE_TURNOS
+                        continue
+                    contagem_por_mes[mes] = atual + 1
+
+                turno = Turno.criar(
+                    telegram_user_id=telegram_user_id,
+                    data_referencia=item.data_referencia,
+                    hora_inicio=item.hora_inicio,
+                    hora_fim=item.hora_fim,
+                    tipo=item.tipo,
+                    descricao_opcional=item.descricao_opcional,
+                )
+                if item.tipo:
+                    tipo_existente = tipos.get(item.tipo.lower())
+                    if tipo_existente:
+                        turno.tipo_id = tipo_existente.id
+
+                aceitos.append(indice)
+                novos.append(turno)
+
+            # 4. INSERT multi-linha e commit único
+            salvos = await self.uow.turnos.criar_em_lote(novos)
+
+            # 5. CalDAV Integration (Background), na mesma transação dos turnos
+            if not assinatura.is_free:
+                for turno in salvos:
+                    self.caldav_sync_task_port.add_sync_task(
+                        SyncTurnoCalDavCommand(turno_id=turno.id, telegram_user_id=telegram_user_id)
+                    )
+
+            await self.uow.commit()
+
+        for indice, turno in zip(aceitos, salvos):
+            resultados[indice].turno = turno
+
+        if self.invalidacao_cache and salvos:
+            await self.invalidacao_cache.turnos_alterados(telegram_user_id, [t.data_referencia for t in salvos])
+
+        logger.info(
+            "Lote de turnos processado",
+            extra={
+                "telegram_user_id": telegram_user_id,
+                "criados": len(salvos),
+                "rejeitados": len(itens) - len(salvos),
+            },
+        )
+
+        return resultados
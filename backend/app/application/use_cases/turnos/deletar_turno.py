@@ -1,7 +1,10 @@
 """
 Use case for deleting a turno.
 """
+from typing import Optional
+
 from app.domain.uow import AbstractUnitOfWork
+from app.domain.ports.cache_port import InvalidacaoCachePort
 
 
 class DeletarTurnoUseCase:
@@ -9,8 +12,9 @@ class DeletarTurnoUseCase:
     Use case for deleting a work shift.
     """
 
-    def __init__(self, uow: AbstractUnitOfWork):
+    def __init__(self, uow: AbstractUnitOfWork, invalidacao_cache: Optional[InvalidacaoCachePort] = None):
         self.uow = uow
+        self.invalidacao_cache = invalidacao_cache
 
     async def execute(self, turno_id: int, telegram_user_id: int) -> bool:
         """
@@ -24,7 +28,16 @@ class DeletarTurnoUseCase:
             True if deleted, False if not found
         """
         async with self.uow:
+            # Data do turno só é necessária para invalidar caches do mês
+            turno = None
+            if self.invalidacao_cache:
+                turno = await self.uow.turnos.buscar_por_id(turno_id, telegram_user_id)
+                if not turno:
+                    return False
+
             result = await self.uow.turnos.deletar(turno_id, telegram_user_id)
             if result:
                 await self.uow.commit()
+                if turno:
+                    await self.invalidacao_cache.turnos_alterados(telegram_user_id, [turno.data_referencia])
             return result
@@ -2,15 +2,20 @@
 Use case for listing turnos by period.
 """
 from datetime import date
-from typing import List
+from typing import AsyncIterator, List, Optional
 
+from app.application.dtos.turno_pagina_dto import PaginaTurnos
 from app.domain.entities.turno import Turno
 from app.domain.repositories.turno_repository import TurnoRepository
+from app.domain.value_objects.cursor_turno import CursorTurno
 
 
 class ListarTurnosPeriodoUseCase:
     """
     Use case for listing turnos within a date range.
+
+    Paginated by an opaque cursor (keyset on data, hora_inicio, id) so no
+    request loads an unbounded range; `iterar` streams the whole range.
     """
 
     def __init__(self, turno_repository: TurnoRepository):
@@ -21,23 +26,44 @@ class ListarTurnosPeriodoUseCase:
         telegram_user_id: int,
         inicio: date,
         fim: date,
-    ) -> List[Turno]:
+        limite: int = 100,
+        cursor: Optional[str] = None,
+    ) -> PaginaTurnos:
         """
-        Lists turnos for a user within the given period.
+        Lists one page of turnos for a user within the given period.
         
         Args:
             telegram_user_id: ID of the user
             inicio: Start date (inclusive)
             fim: End date (inclusive)
+            limite: Maximum number of turnos in the page
+            cursor: `proximo_cursor` of the previous page (None for the first)
             
         Returns:
-            List of Turno entities ordered by date and time
+            Page of Turno entities ordered by date, time and id
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        return await self.turno_repository.listar_por_periodo(
+        apos = CursorTurno.decodificar(cursor) if cursor else None
+        # Um a mais para saber se existe próxima página sem um COUNT
+        turnos = await self.turno_repository.listar_pagina(
             telegram_user_id=telegram_user_id,
             inicio=inicio,
             fim=fim,
+            limite=limite + 1,
+            apos=apos,
         )
+        if len(turnos) <= limite:
+            return PaginaTurnos(itens=turnos)
+        itens = turnos[:limite]
+        return PaginaTurnos(itens=itens, proximo_cursor=CursorTurno.do_turno(itens[-1]).codificar())
+
+    def iterar(self, telegram_user_id: int, inicio: date, fim: date) -> AsyncIterator[Turno]:
+        """
+        Streams every turno in the period, in the same order, with flat memory.
+        """
+        return self.turno_repository.iterar_por_periodo(telegram_user_id, inicio, fim)
 
 
 class ListarTurnosRecentesUseCase:
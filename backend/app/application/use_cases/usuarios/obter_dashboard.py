@@ -0,0 +1,47 @@
+"""
+Use case for the dashboard summary (web dashboard).
+"""
+from datetime import date, datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.application.dtos.dashboard_dto import Dashboard
+from app.core.config import Settings
+from app.domain.entities.assinatura import Assinatura
+from app.domain.repositories.dashboard_repository import DashboardRepository
+
+
+class ObterDashboardUseCase:
+    """
+    Perfil, plano, contadores do mês e turnos recentes numa única leitura.
+
+    Substitui as chamadas separadas a /usuarios/me, /turnos/recentes e
+    /relatorios/mes (cada uma com sua sessão e seu set_config de RLS).
+    """
+
+    def __init__(self, dashboard_repository: DashboardRepository, settings: Settings):
+        self.dashboard_repository = dashboard_repository
+        self.settings = settings
+
+    async def execute(
+        self,
+        telegram_user_id: int,
+        hoje: Optional[date] = None,
+        limite_recentes: int = 5,
+    ) -> Optional[Dashboard]:
+        """
+        Returns:
+            Dashboard do usuário, ou None se ele não está cadastrado
+        """
+        # Mês corrente no fuso da aplicação, não no do servidor
+        hoje = hoje or datetime.now(ZoneInfo(self.settings.timezone)).date()
+        mes_inicio = hoje.replace(day=1)
+        resumo = await self.dashboard_repository.obter_resumo(telegram_user_id, mes_inicio, limite_recentes)
+        if resumo is None:
+            return None
+
+        plano_free = Assinatura.plano_e_free(resumo.assinatura_plano, resumo.assinatura_status)
+        return Dashboard(
+            resumo=resumo,
+            limite_turnos_mes=self.settings.free_tier_max_shifts if plano_free else None,
+        )
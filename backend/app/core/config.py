@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
-from typing import Optional, List, Union
+from typing import Literal, Optional, List, Union
 from functools import lru_cache
 import os
 
@@ -13,25 +13,79 @@ class Settings(BaseSettings):
     # DB
     database_url: Optional[str] = None
     sqlite_path: str = "data/gestao_turnos.db"
+    # Pool do PostgreSQL (por processo); ver GET /health/db-pool para dimensionar
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_segundos: float = 30.0
+    db_pool_recycle_segundos: int = 3600
     
     # Logic
     free_tier_max_shifts: int = 30
+
+    # PDF (renderização fora do event loop)
+    pdf_executor: Literal["process", "thread"] = "process"
+    pdf_max_workers: int = 2
+    pdf_max_fila: int = 8
+    pdf_timeout_segundos: float = 30.0
+    pdf_cache_habilitado: bool = True
+    pdf_cache_dir: str = "data/pdf_cache"
+    pdf_cache_max_mb: int = 200
+    pdf_cache_max_entradas: int = 5000
     
+    # Feed de assinatura do calendário (.ics): janela móvel em torno de hoje
+    calendario_feed_dias_passados: int = 90
+    calendario_feed_dias_futuros: int = 365
+    calendario_feed_cache_ttl_segundos: float = 60.0
+    calendario_feed_cache_max_entradas: int = 2000
+    calendario_feed_cache_max_kb: int = 256
+
+    # Cache por processo da resolução nome -> tipo de turno
+    tipo_turno_cache_ttl_segundos: float = 300.0
+    tipo_turno_cache_max_entradas: int = 10000
+
+    # Fila de tarefas (sync CalDAV): "postgres" = tabela jobs + app.worker;
+    # "memoria" = BackgroundTasks do FastAPI no próprio processo web
+    fila_tarefas: Literal["postgres", "memoria"] = "postgres"
+    jobs_max_tentativas: int = 8
+    jobs_backoff_base_segundos: float = 10.0
+    jobs_backoff_max_segundos: float = 3600.0
+    jobs_reter_concluidos_horas: float = 24.0
+    worker_concorrencia: int = 4
+    worker_intervalo_segundos: float = 2.0
+    worker_lease_segundos: float = 300.0
+    # Porta do /metrics do app.worker (0 = sem servidor de métricas)
+    worker_metricas_porta: int = 0
+
     # Stripe Configuration
     stripe_api_key: str = ""
     stripe_webhook_secret: str = ""
     stripe_price_id_pro: str = ""
+    # Eventos processados ficam guardados para deduplicar reenvios (o Stripe reenvia por até 3 dias)
+    stripe_eventos_reter_dias: float = 30.0
     base_url: str = "http://localhost:8000"
 
     # Telegram
     telegram_bot_token: str = ""
     telegram_allowed_users: List[int] = []
+    # Endpoint interno do bot para invalidar perfis em cache (vazio = não avisa)
+    bot_interno_url: str = ""
     
     # Security
     internal_api_key: str
     secret_key: str = Field(default="CHANGE_ME_IN_PROD", validation_alias="SECRET_KEY")
     access_token_expire_minutes: int = 60 * 24 * 7 # 7 days
     
+    # Logs: fração das requisições com logs INFO nas rotas quentes (prefixos)
+    log_amostragem_info: float = 1.0
+    log_rotas_amostradas: Union[List[str], str] = []
+
+    @field_validator("log_rotas_amostradas", mode="before")
+    @classmethod
+    def parse_rotas_amostradas(cls, v):
+        if isinstance(v, str):
+            return [rota.strip() for rota in v.split(",") if rota.strip()]
+        return v
+
     # CORS
     backend_cors_origins: Union[List[str], str] = []
 
@@ -51,6 +105,7 @@ class Settings(BaseSettings):
     caldav_username: str = ""
     caldav_password: str = ""
     caldav_calendar_path: str = ""
+    caldav_cache_ttl_segundos: int = 3600
 
     @field_validator("telegram_allowed_users", mode="before")
     @classmethod
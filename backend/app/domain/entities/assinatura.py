@@ -35,4 +35,9 @@ class Assinatura:
 
     @property
     def is_free(self) -> bool:
-        return self.plano == "free" or not self.is_active()
+        return self.plano_e_free(self.plano, self.status)
+
+    @staticmethod
+    def plano_e_free(plano: Optional[str], status: Optional[str]) -> bool:
+        """Regra do plano Free a partir das colunas; sem assinatura (None) também é Free."""
+        return plano == "free" or status not in ("active", "trialing")
@@ -0,0 +1,25 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional
+
+from app.domain.entities.turno import Turno
+from app.domain.entities.usuario import Usuario
+
+
+@dataclass(frozen=True)
+class ResumoDashboard:
+    """
+    Tudo o que o dashboard mostra de um usuário, lido de uma vez.
+
+    Sem assinatura, os campos de assinatura ficam None (plano Free). O mês é o
+    de `mes_inicio` (primeiro dia); `turnos_mes` vem do contador mensal e
+    `minutos_mes` soma a duração dos turnos com data de referência no mês.
+    """
+    usuario: Usuario
+    mes_inicio: date
+    turnos_mes: int
+    minutos_mes: int
+    assinatura_status: Optional[str] = None
+    assinatura_plano: Optional[str] = None
+    assinatura_data_fim: Optional[datetime] = None
+    turnos_recentes: List[Turno] = field(default_factory=list)
@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class VersaoPeriodo:
+    """
+    Validador barato dos turnos de um período: última alteração e quantidade.
+
+    A quantidade cobre remoções, que não avançam `ultima_alteracao`.
+    """
+    ultima_alteracao: Optional[datetime]
+    total: int
+
+
+@dataclass(frozen=True)
+class FeedRenderizado:
+    """
+    Versão do feed .ics de um usuário mantida em cache.
+
+    `conteudo` é None quando o feed não coube no limite do cache (ou ainda não
+    foi gerado): a versão continua servindo para responder 304.
+    `verificado_em` é o relógio monotônico da última consulta ao banco.
+    """
+    etag: str
+    inicio: date
+    ultima_modificacao: Optional[datetime]
+    verificado_em: float
+    conteudo: Optional[bytes] = None
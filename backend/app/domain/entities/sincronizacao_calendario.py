@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class SincronizacaoCalendario:
+    """
+    Estado da última sincronização de um turno com o calendário remoto.
+
+    `url` e `etag` permitem o PUT condicional (If-Match) direto no evento;
+    `conteudo_hash` é o SHA-256 do iCalendar enviado, usado para pular a
+    sincronização quando o evento gerado não mudou.
+    """
+    turno_id: int
+    event_uid: str
+    url: Optional[str] = None
+    etag: Optional[str] = None
+    conteudo_hash: Optional[str] = None
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from datetime import date
+
+
+@dataclass(frozen=True)
+class TotalDiaTipo:
+    """
+    Total de minutos trabalhados num dia para um tipo de turno.
+
+    Linha agregada devolvida pelo repositório para relatórios; o tipo é o
+    nome do TipoTurno, o tipo livre ou "sem_tipo".
+    """
+    data: date
+    tipo: str
+    total_minutos: int
@@ -8,7 +8,7 @@ from datetime import date, time, datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Turno:
     """
     Represents a work shift (turno) in the domain.
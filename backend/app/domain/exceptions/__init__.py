@@ -1,2 +1,3 @@
 from .freemium_exception import LimiteTurnosExcedidoException, FreemiumException
 from .acesso_negado_exception import AcessoNegadoException
+from .servico_indisponivel_exception import ServicoIndisponivelException
@@ -0,0 +1,6 @@
+class ServicoIndisponivelException(Exception):
+    """Exceção levantada quando um recurso está saturado e a requisição deve ser tentada mais tarde."""
+    def __init__(self, message: str = "Serviço temporariamente indisponível", retry_after: int = 5):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
@@ -0,0 +1,68 @@
+from datetime import date
+from typing import Awaitable, Callable, Iterable, Optional, Protocol
+
+from app.domain.entities.feed_calendario import FeedRenderizado
+from app.domain.entities.tipo_turno import TipoTurno
+
+
+class PdfCachePort(Protocol):
+    """
+    Porta para o cache de PDFs mensais, endereçado pelo conteúdo.
+
+    `chave` é o hash das linhas de turnos e dos dados do usuário usados na
+    renderização; o mesmo conteúdo sempre gera a mesma chave.
+    """
+    async def obter(self, telegram_user_id: int, ano: int, mes: int, chave: str) -> Optional[bytes]:
+        """Retorna o PDF em cache ou None."""
+        ...
+
+    async def salvar(self, telegram_user_id: int, ano: int, mes: int, chave: str, conteudo: bytes) -> None:
+        """Armazena o PDF, substituindo versões anteriores do mesmo mês."""
+        ...
+
+
+class InvalidacaoCachePort(Protocol):
+    """
+    Porta para avisar caches derivados de turnos que dados do usuário mudaram.
+
+    Assíncrona porque implementações podem fazer I/O (o cache de PDFs apaga
+    arquivos em disco).
+    """
+    async def turnos_alterados(self, telegram_user_id: int, datas: Iterable[date]) -> None:
+        """
+        Invalida entradas que dependem dos turnos do usuário nas datas informadas.
+        """
+        ...
+
+
+class FeedCalendarioCachePort(Protocol):
+    """
+    Porta para o cache em memória dos feeds .ics, um por usuário.
+    """
+    def obter(self, telegram_user_id: int) -> Optional[FeedRenderizado]:
+        """Retorna a versão em cache (mesmo que precise de revalidação) ou None."""
+        ...
+
+    def salvar(self, telegram_user_id: int, feed: FeedRenderizado) -> None:
+        """Armazena a versão do feed, substituindo a anterior."""
+        ...
+
+
+class TipoTurnoCachePort(Protocol):
+    """
+    Porta para o cache da resolução nome -> tipo de turno, por usuário.
+    """
+    async def resolver(
+        self,
+        telegram_user_id: int,
+        nome: str,
+        buscar: Callable[[], Awaitable[Optional[TipoTurno]]],
+    ) -> Optional[TipoTurno]:
+        """
+        Retorna o tipo em cache (inclusive "não existe") ou chama `buscar` e guarda o resultado.
+        """
+        ...
+
+    def invalidar(self, telegram_user_id: int) -> None:
+        """Descarta os nomes resolvidos do usuário."""
+        ...
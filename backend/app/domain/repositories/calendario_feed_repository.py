@@ -0,0 +1,25 @@
+"""
+Repository interface for the calendar subscription (.ics) tokens.
+"""
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class CalendarioFeedRepository(ABC):
+    """
+    Tokens opacos que dão acesso, sem outra autenticação, ao feed de um usuário.
+    """
+
+    @abstractmethod
+    async def buscar_usuario_por_token(self, token: str) -> Optional[int]:
+        """
+        Retorna o telegram_user_id dono do token ou None.
+        """
+        pass
+
+    @abstractmethod
+    async def salvar_token(self, telegram_user_id: int, token: str) -> None:
+        """
+        Define o token do usuário, substituindo (e revogando) o anterior.
+        """
+        pass
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Optional
+
+from app.domain.entities.dashboard import ResumoDashboard
+
+
+class DashboardRepository(ABC):
+    @abstractmethod
+    async def obter_resumo(
+        self, telegram_user_id: int, mes_inicio: date, limite_recentes: int = 5
+    ) -> Optional[ResumoDashboard]:
+        """
+        Perfil, assinatura, contadores do mês e turnos recentes do usuário
+        (None se o usuário não existe).
+        """
+        pass
@@ -5,10 +5,14 @@ Defines the contract that any Turno repository implementation must follow.
 """
 from abc import ABC, abstractmethod
 from datetime import date
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 
 from app.domain.entities.turno import Turno
 from app.domain.entities.tipo_turno import TipoTurno
+from app.domain.entities.total_turno import TotalDiaTipo
+from app.domain.entities.sincronizacao_calendario import SincronizacaoCalendario
+from app.domain.entities.feed_calendario import VersaoPeriodo
+from app.domain.value_objects.cursor_turno import CursorTurno
 
 
 class TurnoRepository(ABC):
@@ -31,6 +35,19 @@ class TurnoRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def criar_em_lote(self, turnos: List[Turno]) -> List[Turno]:
+        """
+        Persiste vários turnos com um único INSERT multi-linha.
+        
+        Args:
+            turnos: Entidades Turno a serem persistidas
+            
+        Returns:
+            Turnos persistidos, na mesma ordem da entrada
+        """
+        pass
+
     @abstractmethod
     async def buscar_por_id(self, turno_id: int, telegram_user_id: int) -> Optional[Turno]:
         """
@@ -45,6 +62,13 @@ class TurnoRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def buscar_por_ids(self, turno_ids: Iterable[int], telegram_user_id: int) -> List[Turno]:
+        """
+        Busca vários turnos do usuário numa única query (IDs inexistentes são ignorados).
+        """
+        pass
+
     @abstractmethod
     async def listar_por_periodo(
         self,
@@ -65,6 +89,67 @@ class TurnoRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def listar_pagina(
+        self,
+        telegram_user_id: int,
+        inicio: date,
+        fim: date,
+        limite: int,
+        apos: Optional[CursorTurno] = None,
+    ) -> List[Turno]:
+        """
+        Até `limite` turnos do período em ordem (data, hora de início, id),
+        começando depois de `apos` (keyset: custo constante em qualquer página).
+        """
+        pass
+
+    @abstractmethod
+    def iterar_por_periodo(
+        self,
+        telegram_user_id: int,
+        inicio: date,
+        fim: date,
+    ) -> AsyncIterator[Turno]:
+        """
+        Percorre os turnos de um período (mesma ordem de listar_por_periodo)
+        em lotes do cursor do banco, sem carregar o período inteiro na memória.
+        """
+        pass
+
+    @abstractmethod
+    async def versao_periodo(
+        self,
+        telegram_user_id: int,
+        inicio: date,
+        fim: date,
+    ) -> VersaoPeriodo:
+        """
+        Maior `atualizado_em` e quantidade de turnos do período, numa única
+        agregação: muda sempre que o conteúdo do período muda.
+        """
+        pass
+
+    @abstractmethod
+    async def agregar_por_dia_e_tipo(
+        self,
+        telegram_user_id: int,
+        inicio: date,
+        fim: date,
+    ) -> List[TotalDiaTipo]:
+        """
+        Soma a duração dos turnos de um período agrupando por dia e tipo.
+        
+        Args:
+            telegram_user_id: ID do usuário
+            inicio: Data inicial (inclusive)
+            fim: Data final (inclusive)
+            
+        Returns:
+            Linhas agregadas ordenadas por data e tipo
+        """
+        pass
+
     @abstractmethod
     async def listar_recentes(
         self,
@@ -104,6 +189,25 @@ class TurnoRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def buscar_sincronizacoes(
+        self, turno_ids: Iterable[int], telegram_user_id: int
+    ) -> Dict[int, SincronizacaoCalendario]:
+        """
+        Estado da última sincronização CalDAV dos turnos ({turno_id: estado}).
+        Turnos nunca sincronizados não aparecem no resultado.
+        """
+        pass
+
+    @abstractmethod
+    async def salvar_sincronizacoes(
+        self, telegram_user_id: int, sincronizacoes: List[SincronizacaoCalendario]
+    ) -> None:
+        """
+        Grava UID, URL, ETag e hash do evento remoto de vários turnos num único upsert.
+        """
+        pass
+
     @abstractmethod
     async def contar_por_periodo(
         self,
@@ -117,8 +221,28 @@ class TurnoRepository(ABC):
         pass
 
     @abstractmethod
-    async def buscar_tipo_por_nome(self, nome: str) -> Optional[TipoTurno]:
+    async def contar_mes(self, telegram_user_id: int, referencia: date) -> int:
+        """
+        Retorna o número de turnos do usuário no mês de `referencia`.
+        
+        Lê o contador mensal pré-agregado (mantido pelo banco a cada escrita em turnos),
+        sem varrer a tabela de turnos.
+        """
+        pass
+
+    @abstractmethod
+    async def buscar_tipo_por_nome(self, nome: str, telegram_user_id: int) -> Optional[TipoTurno]:
+        """
+        Busca um tipo de turno do usuário pelo nome, sem diferenciar maiúsculas.
+        """
+        pass
+
+    @abstractmethod
+    async def buscar_tipos_por_nomes(self, nomes: Iterable[str], telegram_user_id: int) -> Dict[str, TipoTurno]:
         """
-        Busca um tipo de turno pelo nome.
+        Busca vários tipos de turno do usuário numa única consulta.
+        
+        Returns:
+            Dicionário indexado pelo nome em minúsculas
         """
         pass
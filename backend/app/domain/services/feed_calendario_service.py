@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import List
+from app.domain.entities.turno import Turno
+
+class FeedCalendarioService(ABC):
+    """
+    Serializa turnos num feed de calendário em partes, para que o feed possa
+    ser transmitido sem montar o documento inteiro na memória:
+    cabecalho() + eventos(lote) + ... + rodape().
+    """
+    @abstractmethod
+    def cabecalho(self) -> bytes:
+        pass
+
+    @abstractmethod
+    def eventos(self, turnos: List[Turno]) -> bytes:
+        pass
+
+    @abstractmethod
+    def rodape(self) -> bytes:
+        pass
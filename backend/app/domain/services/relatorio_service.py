@@ -5,8 +5,11 @@ from app.domain.entities.turno import Turno
 
 class RelatorioService(ABC):
     @abstractmethod
-    def gerar_pdf_mes(self, turnos: List[Turno], inicio: date, fim: date, usuario_info: Optional[Dict] = None) -> bytes:
+    async def gerar_pdf_mes(self, turnos: List[Turno], inicio: date, fim: date, usuario_info: Optional[Dict] = None) -> bytes:
         """
         Gera o binário PDF do relatório mensal de turnos.
+
+        A renderização não deve bloquear o event loop. Implementações podem
+        levantar ServicoIndisponivelException quando estiverem saturadas.
         """
         pass
@@ -3,12 +3,14 @@ from typing import Optional
 from app.domain.repositories.turno_repository import TurnoRepository
 from app.domain.repositories.usuario_repository import UsuarioRepository
 from app.domain.repositories.assinatura_repository import AssinaturaRepository
+from app.domain.repositories.calendario_feed_repository import CalendarioFeedRepository
 
 class AbstractUnitOfWork(ABC):
 
     turnos: TurnoRepository
     usuarios: UsuarioRepository
     assinaturas: AssinaturaRepository
+    calendario_feeds: CalendarioFeedRepository
 
     async def __aenter__(self) -> "AbstractUnitOfWork":
         return self
@@ -0,0 +1,43 @@
+"""
+Cursor opaco da paginação de turnos por período.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, time
+
+from app.domain.entities.turno import Turno
+
+
+@dataclass(frozen=True)
+class CursorTurno:
+    """
+    Posição na ordenação (data_referencia, hora_inicio, id): a próxima página
+    começa no primeiro turno estritamente depois dela (keyset pagination).
+    """
+    data_referencia: date
+    hora_inicio: time
+    id: int
+
+    @classmethod
+    def do_turno(cls, turno: Turno) -> "CursorTurno":
+        return cls(turno.data_referencia, turno.hora_inicio, turno.id)
+
+    def codificar(self) -> str:
+        bruto = json.dumps(
+            [self.data_referencia.isoformat(), self.hora_inicio.isoformat(), self.id],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(bruto.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+    @classmethod
+    def decodificar(cls, valor: str) -> "CursorTurno":
+        """Levanta ValueError para cursores malformados."""
+        try:
+            bruto = base64.urlsafe_b64decode(valor + "=" * (-len(valor) % 4))
+            data_str, hora_str, turno_id = json.loads(bruto)
+            if not isinstance(turno_id, int):
+                raise TypeError("id do cursor não é inteiro")
+            return cls(date.fromisoformat(data_str), time.fromisoformat(hora_str), turno_id)
+        except (TypeError, ValueError, UnicodeDecodeError) as e:
+            raise ValueError("Cursor inválido") from e
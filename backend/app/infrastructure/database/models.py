@@ -1,7 +1,8 @@
 from datetime import datetime, date, time, UTC
 from typing import Optional
 
-from sqlalchemy import Integer, BigInteger, String, Date, Time, DateTime, ForeignKey
+from sqlalchemy import Integer, BigInteger, String, Text, Date, Time, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .session import Base
@@ -9,6 +10,10 @@ from .session import Base
 
 class TipoTurno(Base):
     __tablename__ = "tipos_turno"
+    __table_args__ = (
+        # Resolução do nome digitado pelo usuário (lower(nome) = ..., por usuário)
+        Index("ix_tipos_turno_usuario_nome_lower", "telegram_user_id", text("lower(nome)")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     
@@ -27,16 +32,38 @@ class TipoTurno(Base):
 
 class TurnoModel(Base):
     __tablename__ = "turnos"
+    __table_args__ = (
+        # Consultas por usuário + intervalo de datas (listagem, contagem, relatórios).
+        # INCLUDE permite index-only scan sem visitar a tabela; `id` na chave
+        # desempata a ordenação da paginação por cursor sem sort extra.
+        # descricao_opcional, criado_em e atualizado_em ficam de fora de
+        # propósito: com eles a listagem vira index-only, mas no
+        # benchmarks/bench_indices_turnos (fase "cobrindo") a latência não
+        # muda, o índice cresce ~20% e o planner passa a usá-lo (com sort) nos
+        # turnos recentes no lugar de ix_turnos_usuario_criado_em.
+        Index(
+            "ix_turnos_usuario_data_hora_id",
+            "telegram_user_id", "data_referencia", "hora_inicio", "id",
+            postgresql_include=["hora_fim", "duracao_minutos", "tipo_turno_id", "tipo_livre"],
+        ),
+        # Turnos recentes por usuário (ORDER BY criado_em DESC LIMIT n)
+        Index(
+            "ix_turnos_usuario_criado_em",
+            "telegram_user_id", text("criado_em DESC"),
+            postgresql_include=["id"],
+        ),
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     
     # ✅ Multi-tenancy: isolamento por usuário
+    # (indexado pelos índices compostos em __table_args__)
     telegram_user_id: Mapped[int] = mapped_column(
-        BigInteger, nullable=False, index=True,
+        BigInteger, nullable=False,
         doc="ID do usuário do Telegram (multi-tenancy)"
     )
 
-    data_referencia: Mapped[date] = mapped_column(Date, index=True)
+    data_referencia: Mapped[date] = mapped_column(Date)
     hora_inicio: Mapped[time] = mapped_column(Time)
     hora_fim: Mapped[time] = mapped_column(Time)
 
@@ -73,6 +100,91 @@ class TurnoModel(Base):
     )
 
 
+class TurnoContagemMensal(Base):
+    """
+    Contador pré-agregado de turnos por usuário e mês.
+
+    Mantido por triggers em `turnos` (qualquer INSERT/UPDATE/DELETE, inclusive
+    SQL direto) na mesma transação das escritas, para que a verificação do
+    plano Free e o perfil leiam uma linha em vez de contar turnos.
+    """
+    __tablename__ = "turnos_contagem_mensal"
+
+    telegram_user_id: Mapped[int] = mapped_column(
+        BigInteger, primary_key=True,
+        doc="ID do usuário do Telegram (multi-tenancy)"
+    )
+    ano_mes: Mapped[date] = mapped_column(
+        Date, primary_key=True, doc="Primeiro dia do mês de referência."
+    )
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class JobModel(Base):
+    """
+    Fila de tarefas persistente (ex.: sincronização CalDAV).
+
+    Consumida por `python -m app.worker`, que reivindica jobs com
+    SELECT ... FOR UPDATE SKIP LOCKED. Tabela de sistema: sem RLS.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Busca do worker: só jobs pendentes, em ordem de execução
+        Index(
+            "ix_jobs_pendentes",
+            "executar_apos",
+            postgresql_where=text("status = 'pendente'"),
+        ),
+        # Fusão de jobs agrupáveis (ex.: sync CalDAV por usuário)
+        Index(
+            "ix_jobs_agrupamento",
+            "tarefa", "chave_agrupamento",
+            postgresql_where=text("status = 'pendente' AND chave_agrupamento IS NOT NULL"),
+        ),
+        # Recuperação de jobs cujo worker morreu no meio da execução
+        Index(
+            "ix_jobs_executando",
+            "travado_ate",
+            postgresql_where=text("status = 'executando'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    tarefa: Mapped[str] = mapped_column(
+        String(100), nullable=False, doc="Nome registrado da tarefa (ver app.infrastructure.tasks.registro)."
+    )
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    chave_agrupamento: Mapped[Optional[str]] = mapped_column(
+        String(200), nullable=True,
+        doc="Jobs pendentes da mesma tarefa com a mesma chave são fundidos pelo worker.",
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default="pendente",
+        doc="pendente | executando | concluido | morto",
+    )
+    tentativas: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_tentativas: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    executar_apos: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC), nullable=False
+    )
+    travado_ate: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True, doc="Fim do lease do worker que está executando o job."
+    )
+    ultimo_erro: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    criado_em: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC), nullable=False
+    )
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+        nullable=False,
+    )
+
+
 class IntegracaoCalendario(Base):
     __tablename__ = "integracao_calendario"
 
@@ -89,6 +201,15 @@ class IntegracaoCalendario(Base):
         nullable=False,
         doc="UID do evento no calendário remoto.",
     )
+    url: Mapped[Optional[str]] = mapped_column(
+        String(1024), nullable=True, doc="URL do recurso .ics no servidor CalDAV."
+    )
+    etag: Mapped[Optional[str]] = mapped_column(
+        String(255), nullable=True, doc="ETag devolvido no último PUT (para If-Match)."
+    )
+    conteudo_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True, doc="SHA-256 do iCalendar sincronizado."
+    )
 
     criado_em: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.now(UTC), nullable=False
@@ -148,6 +269,10 @@ class Assinatura(Base):
     
     data_inicio: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     data_fim: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    stripe_evento_em: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True,
+        doc="`created` (UTC) do último evento do Stripe aplicado: eventos mais antigos são descartados.",
+    )
     
     criado_em: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.now(UTC), nullable=False
@@ -160,3 +285,53 @@ class Assinatura(Base):
     )
 
 
+class StripeEvento(Base):
+    """
+    Eventos de webhook do Stripe já recebidos, pelo ID do evento.
+
+    O webhook grava com INSERT ... ON CONFLICT DO NOTHING: reenvios do Stripe
+    caem no conflito e não são processados de novo. O processamento fica com
+    o worker (tarefa stripe.processar_evento). Tabela de sistema: sem RLS.
+    """
+    __tablename__ = "stripe_eventos"
+    __table_args__ = (
+        # Limpeza dos eventos processados antigos
+        Index(
+            "ix_stripe_eventos_processado_em",
+            "processado_em",
+            postgresql_where=text("processado_em IS NOT NULL"),
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(String(255), primary_key=True, doc="ID do evento no Stripe (evt_...).")
+    tipo: Mapped[str] = mapped_column(String(100), nullable=False)
+    criado_stripe: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, doc="Campo `created` do evento (UTC): ordena eventos da mesma assinatura."
+    )
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False, doc="`data.object` do evento.")
+    recebido_em: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC), nullable=False
+    )
+    processado_em: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    resultado: Mapped[Optional[str]] = mapped_column(
+        String(20), nullable=True, doc="aplicado | obsoleto | ignorado"
+    )
+
+
+class CalendarioFeed(Base):
+    """
+    Token opaco da assinatura do calendário (.ics) de um usuário.
+
+    Sem RLS: a URL pública só traz o token, e é por ele que se descobre o
+    usuário antes de existir qualquer contexto RLS.
+    """
+    __tablename__ = "calendario_feeds"
+
+    token: Mapped[str] = mapped_column(String(64), primary_key=True)
+    telegram_user_id: Mapped[int] = mapped_column(
+        BigInteger, unique=True, nullable=False,
+        doc="ID do usuário do Telegram (dono do feed)"
+    )
+    criado_em: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC), nullable=False
+    )
@@ -0,0 +1,127 @@
+"""
+Pool de conexões com medição de uso, para dimensionar pool_size/max_overflow.
+
+O QueuePool do SQLAlchemy só expõe o estado instantâneo (checkedout(),
+overflow()). Este pool registra também quanto tempo cada checkout esperou por
+uma conexão livre, quantos estouraram o pool_timeout e o pico de conexões em
+uso desde o início do processo (ou do último `zerar`).
+
+Leitura dos números:
+  - pico_em_uso perto de pool_size + max_overflow, ou timeouts > 0: pool curto
+    (ou conexões presas por muito tempo em cada requisição);
+  - espera_p95 alto com overflow baixo: conexões novas lentas (rede/TLS);
+  - pico_em_uso bem abaixo de pool_size: pool_size pode diminuir.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Union
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Esperas recentes guardadas para os percentis
+JANELA_ESPERAS = 1024
+
+
+class EstatisticasPool:
+    """Contadores acumulados dos checkouts de um pool."""
+
+    def __init__(self, janela: int = JANELA_ESPERAS):
+        self._lock = threading.Lock()
+        self._janela = janela
+        # Chamados com (espera_s, timeout) a cada checkout e com (em_uso, overflow)
+        # a cada empréstimo/devolução; p.ex. para exportar as métricas
+        self.observadores: List[Callable[[float, bool], None]] = []
+        self.observadores_uso: List[Callable[[int, int], None]] = []
+        self.zerar()
+
+    def zerar(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.espera_total_s = 0.0
+            self.espera_max_s = 0.0
+            self.pico_em_uso = 0
+            self._esperas: Deque[float] = deque(maxlen=self._janela)
+
+    def registrar_checkout(self, espera_s: float, em_uso: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total_s += espera_s
+            self.espera_max_s = max(self.espera_max_s, espera_s)
+            self.pico_em_uso = max(self.pico_em_uso, em_uso)
+            self._esperas.append(espera_s)
+        for observador in self.observadores:
+            observador(espera_s, False)
+
+    def registrar_timeout(self, espera_s: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.espera_max_s = max(self.espera_max_s, espera_s)
+        for observador in self.observadores:
+            observador(espera_s, True)
+
+    def percentil_espera(self, p: float) -> float:
+        with self._lock:
+            esperas = sorted(self._esperas)
+        if not esperas:
+            return 0.0
+        return esperas[min(len(esperas) - 1, int(len(esperas) * p))]
+
+
+class PoolMedido(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool que cronometra cada checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estatisticas = EstatisticasPool()
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except PoolTimeoutError:
+            self.estatisticas.registrar_timeout(time.perf_counter() - inicio)
+            raise
+        self.estatisticas.registrar_checkout(time.perf_counter() - inicio, self.checkedout())
+        self._notificar_uso()
+        return conexao
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._notificar_uso()
+
+    def _notificar_uso(self) -> None:
+        for observador in self.estatisticas.observadores_uso:
+            observador(self.checkedout(), max(self.overflow(), 0))
+
+    def recreate(self) -> "PoolMedido":
+        # engine.dispose() troca o pool; os contadores continuam no novo
+        novo = super().recreate()
+        novo.estatisticas = self.estatisticas
+        return novo
+
+
+def resumo_pool(pool) -> Dict[str, Union[int, float]]:
+    """Estado atual e contadores do pool (os contadores só existem no PoolMedido)."""
+    resumo: Dict[str, Union[int, float]] = {
+        "pool_size": pool.size(),
+        "max_overflow": getattr(pool, "_max_overflow", 0),
+        "em_uso": pool.checkedout(),
+        "ociosas": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    estatisticas = getattr(pool, "estatisticas", None)
+    if isinstance(estatisticas, EstatisticasPool):
+        resumo.update({
+            "checkouts": estatisticas.checkouts,
+            "timeouts": estatisticas.timeouts,
+            "pico_em_uso": estatisticas.pico_em_uso,
+            "espera_media_ms": round(
+                estatisticas.espera_total_s * 1000 / estatisticas.checkouts, 3
+            ) if estatisticas.checkouts else 0.0,
+            "espera_p95_ms": round(estatisticas.percentil_espera(0.95) * 1000, 3),
+            "espera_max_ms": round(estatisticas.espera_max_s * 1000, 3),
+        })
+    return resumo
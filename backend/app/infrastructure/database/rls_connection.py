@@ -0,0 +1,72 @@
+"""
+Conexão psycopg que define o usuário do RLS junto com o BEGIN.
+
+Fora do modo pipeline o psycopg abre a transação com um BEGIN enviado antes
+da primeira query, num round trip próprio. Esta conexão envia, nesse mesmo
+round trip, o `set_config('app.current_user_id', ..., true)` do RLS
+("BEGIN; SELECT set_config(...)" pelo protocolo simples): a transação já
+começa com o usuário definido, sem um SELECT dedicado antes das queries.
+
+O usuário fica pendente em `rls_pendente` (preenchido pela sessão no início
+de cada transação) e é consumido no BEGIN seguinte. Como o valor é SET LOCAL,
+termina com a transação; o pendente é limpo também ao devolver a conexão ao pool.
+
+Depende de internos do psycopg (_start_query, _check_connection_ok,
+_get_tx_start_command, _autocommit, _pipeline, pgconn._encoding): o pyproject
+fixa a série 3.3 e tests/test_rls_isolation.py falha se algum deles mudar.
+O modo pipeline (API pública) não serve: o psycopg faz Sync logo depois do
+BEGIN e espera a resposta antes do set_config.
+"""
+from typing import Optional
+
+import psycopg
+from psycopg import errors as e
+from psycopg import generators, pq
+
+RLS_GUC = "app.current_user_id"
+
+
+class RlsAsyncConnection(psycopg.AsyncConnection):
+    # Atributos de classe: AsyncConnection.connect() não passa por __init__ da subclasse
+    rls_pendente: Optional[int] = None
+    rls_transacao: Optional[int] = None
+
+    def adiar_rls(self, telegram_user_id: int) -> bool:
+        """
+        Agenda o usuário para o próximo BEGIN. Retorna False se a transação já
+        começou com outro usuário (ou nenhum): aí só um set_config explícito resolve.
+        """
+        if self.pgconn.transaction_status == pq.TransactionStatus.IDLE and not self.autocommit:
+            self.rls_pendente = telegram_user_id
+            return True
+        return self.rls_transacao == telegram_user_id
+
+    def limpar_rls(self) -> None:
+        self.rls_pendente = None
+        self.rls_transacao = None
+
+    def _start_query(self):
+        usuario = self.rls_pendente
+        if (
+            usuario is None
+            or self._autocommit
+            or self._pipeline
+            or self.pgconn.transaction_status != pq.TransactionStatus.IDLE
+        ):
+            if self.pgconn.transaction_status == pq.TransactionStatus.IDLE:
+                self.rls_transacao = None
+            yield from super()._start_query()
+            return
+
+        self._check_connection_ok()
+        self.rls_pendente = None
+        # int(): o valor vai inline no SQL (o protocolo simples não aceita parâmetros)
+        comando = self._get_tx_start_command() + (
+            b"; SELECT set_config('%s', '%d', true)" % (RLS_GUC.encode(), int(usuario))
+        )
+        self.pgconn.send_query(comando)
+        resultados = yield from generators.execute(self.pgconn)
+        for resultado in resultados:
+            if resultado.status == pq.ExecStatus.FATAL_ERROR:
+                raise e.error_from_result(resultado, encoding=self.pgconn._encoding)
+        self.rls_transacao = usuario
@@ -1,12 +1,14 @@
 from typing import AsyncGenerator
 
 from fastapi import Request
-from sqlalchemy import text
+from sqlalchemy import Connection, event, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction
 from pathlib import Path
 
 from app.core.config import get_settings
+from app.infrastructure.database.pool_metrics import PoolMedido
+from app.infrastructure.database.rls_connection import RlsAsyncConnection
 
 
 class Base(DeclarativeBase):
@@ -40,6 +42,7 @@ def _create_engine():
     Cria engine async com configuração apropriada para o banco.
     """
     database_url = _get_database_url()
+    settings = get_settings()
     
     # Configuração base
     engine_kwargs = {}
@@ -50,12 +53,16 @@ def _create_engine():
     
     elif "postgresql" in database_url:
         # ✅ Connection pooling para PostgreSQL
+        # Tamanhos vêm das settings; dimensionar pelo /health/db-pool (pool_metrics)
         engine_kwargs.update({
-            "pool_size": 10,          # Connections simultâneas base
-            "max_overflow": 20,       # Pool elástico em picos
+            "poolclass": PoolMedido,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
             "pool_pre_ping": True,    # Testar connection antes de usar
-            "pool_recycle": 3600,     # Reciclar após 1h
-            "pool_timeout": 30,       # Timeout para pegar connection
+            "pool_recycle": settings.db_pool_recycle_segundos,
+            "pool_timeout": settings.db_pool_timeout_segundos,
+            # set_config do RLS enviado junto com o BEGIN (ver rls_connection)
+            "connect_args": {"async_creator_fn": RlsAsyncConnection.connect},
         })
     
     return create_async_engine(database_url, **engine_kwargs)
@@ -69,6 +76,15 @@ def _is_postgresql() -> bool:
 # ✅ Criar engine async com configuração apropriada
 engine = _create_engine()
 
+
+@event.listens_for(engine.sync_engine.pool, "checkin")
+def _limpar_rls_ao_devolver(dbapi_connection, connection_record) -> None:
+    # Um usuário pendente (transação que não chegou a executar nada) não pode
+    # vazar para o próximo checkout da mesma conexão
+    driver = getattr(dbapi_connection, "driver_connection", None)
+    if isinstance(driver, RlsAsyncConnection):
+        driver.limpar_rls()
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -77,23 +93,84 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+# Em Session.info: usuário do RLS da sessão e o aplicado na transação corrente
+RLS_USUARIO = "rls_usuario"
+RLS_APLICADO = "rls_aplicado"
+
+_SET_CONFIG = text("SELECT set_config('app.current_user_id', :user_id, true)")
+
+
+def _aplicar_rls(conexao: Connection, telegram_user_id: int) -> None:
+    driver = conexao.connection.driver_connection
+    if isinstance(driver, RlsAsyncConnection) and driver.adiar_rls(telegram_user_id):
+        return
+    # Conexão sem suporte (engines de teste) ou transação já iniciada com outro usuário
+    conexao.execute(_SET_CONFIG, {"user_id": str(telegram_user_id)})
+    if isinstance(driver, RlsAsyncConnection):
+        driver.rls_transacao = telegram_user_id
+
+
+@event.listens_for(Session, "after_begin")
+def _rls_no_inicio_da_transacao(session: Session, transaction: SessionTransaction, conexao: Connection) -> None:
+    """
+    Cada transação da sessão começa com o usuário do RLS, inclusive as que
+    vêm depois de um commit (SET LOCAL termina com a transação).
+    """
+    usuario = session.info.get(RLS_USUARIO)
+    if usuario is not None:
+        _aplicar_rls(conexao, usuario)
+    else:
+        driver = conexao.connection.driver_connection
+        if isinstance(driver, RlsAsyncConnection):
+            driver.rls_pendente = None
+    session.info[RLS_APLICADO] = usuario
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _rls_fim_da_transacao(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(RLS_APLICADO, None)
+
+
+async def configurar_rls(db: AsyncSession, telegram_user_id: int) -> None:
+    """
+    Define app.current_user_id (SET LOCAL) para as transações da sessão, de
+    modo que as políticas RLS filtrem as queries seguintes pelo usuário.
+
+    Sem custo de round trip quando chamada antes da primeira query: o valor
+    vai no BEGIN. Com a transação já em andamento para outro usuário (ou
+    nenhum), executa o set_config na hora; para o mesmo usuário, nada.
+    """
+    if not _is_postgresql():
+        return
+    db.info[RLS_USUARIO] = telegram_user_id
+    if RLS_APLICADO not in db.info or db.info[RLS_APLICADO] == telegram_user_id:
+        # Sem conexão na transação ainda (after_begin aplica) ou já aplicado
+        return
+    await db.run_sync(lambda session: _aplicar_rls(session.connection(), telegram_user_id))
+    db.info[RLS_APLICADO] = telegram_user_id
+
+
 async def get_db(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency para FastAPI que fornece sessão assíncrona do banco de dados.
-    
+
+    A sessão é preguiçosa: só pega uma conexão do pool na primeira query e a
+    devolve no commit/rollback, não no fim da requisição. Rotas que fazem
+    trabalho demorado sem banco depois das leituras (PDF, chamadas externas)
+    devem encerrar a transação antes, para não segurar a conexão.
+
     Se request.state.telegram_user_id estiver definido (via RLSMiddleware),
-    configura SET LOCAL app.current_user_id para RLS funcionar corretamente.
+    configura SET LOCAL app.current_user_id para RLS funcionar corretamente
+    (aplicado no BEGIN de cada transação, sem query própria).
     """
     async with AsyncSessionLocal() as db:
         try:
             # Configurar RLS se telegram_user_id estiver disponível
-            if request is not None and _is_postgresql():
+            if request is not None:
                 user_id = getattr(request.state, "telegram_user_id", None)
                 if user_id is not None:
-                    await db.execute(
-                        text("SELECT set_config('app.current_user_id', :user_id, true)"),
-                        {"user_id": str(user_id)}
-                    )
+                    await configurar_rls(db, user_id)
             yield db
         finally:
             await db.close()
@@ -3,6 +3,7 @@ from app.domain.uow import AbstractUnitOfWork
 from app.infrastructure.repositories.sqlalchemy_turno_repository import SqlAlchemyTurnoRepository
 from app.infrastructure.repositories.sqlalchemy_usuario_repository import SqlAlchemyUsuarioRepository
 from app.infrastructure.repositories.sqlalchemy_assinatura_repository import SqlAlchemyAssinaturaRepository
+from app.infrastructure.repositories.sqlalchemy_calendario_feed_repository import SqlAlchemyCalendarioFeedRepository
 
 class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
     def __init__(self, session: AsyncSession):
@@ -11,6 +12,7 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
         self.turnos = SqlAlchemyTurnoRepository(session)
         self.usuarios = SqlAlchemyUsuarioRepository(session)
         self.assinaturas = SqlAlchemyAssinaturaRepository(session)
+        self.calendario_feeds = SqlAlchemyCalendarioFeedRepository(session)
 
     async def __aenter__(self) -> "SqlAlchemyUnitOfWork":
         return self
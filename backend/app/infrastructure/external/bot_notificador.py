@@ -0,0 +1,46 @@
+"""
+Avisos do backend para o bot do Telegram.
+
+O bot guarda os perfis (GET /usuarios/{id}) em cache por alguns minutos;
+quando a assinatura muda (webhook do Stripe), o backend pede a invalidação da
+entrada para o usuário não ficar bloqueado (ou liberado) até o TTL vencer.
+
+O aviso é best-effort: falhas só são logadas, e o TTL do cache do bot é a
+garantia de que o perfil novo aparece em algum momento.
+"""
+import logging
+from typing import Optional
+
+import httpx
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# O bot está na mesma rede: se não responde rápido, desiste
+TIMEOUT_SEGUNDOS = 2.0
+
+
+async def invalidar_perfil_no_bot(telegram_user_id: int, settings: Optional[Settings] = None) -> bool:
+    """
+    POST {bot_interno_url}/interno/perfis/{id}/invalidar.
+
+    Retorna True se o bot confirmou; False se desligado (bot_interno_url vazio)
+    ou se a chamada falhou.
+    """
+    settings = settings or get_settings()
+    if not settings.bot_interno_url:
+        return False
+
+    url = f"{settings.bot_interno_url.rstrip('/')}/interno/perfis/{telegram_user_id}/invalidar"
+    try:
+        async with httpx.AsyncClient(timeout=TIMEOUT_SEGUNDOS) as client:
+            resp = await client.post(url, headers={"X-Internal-Secret": settings.internal_api_key})
+        resp.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.warning(
+            "Falha ao invalidar perfil no bot",
+            extra={"telegram_user_id": telegram_user_id, "error": str(e)},
+        )
+        return False
+    return True
@@ -1,31 +1,71 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
 from zoneinfo import ZoneInfo
 
 import caldav
 from caldav import DAVClient
-from icalendar import Calendar, Event
+from caldav.lib import error as caldav_error
+from caldav.lib.url import URL
+from icalendar import Calendar
 
 from app.core.config import Settings
 from app.domain.services.calendar_service import CalendarService
 from app.domain.entities.turno import Turno
+from app.domain.entities.sincronizacao_calendario import SincronizacaoCalendario
+from app.infrastructure.services.ics_feed import PRODID, construir_evento
+
+logger = logging.getLogger(__name__)
+
+ICAL_HEADERS = {"Content-Type": 'text/calendar; charset="utf-8"'}
+
+# Estado compartilhado entre instâncias (uma por job/requisição) do mesmo processo.
+# Chave: (url, usuário, senha). O DAVClient mantém a sessão HTTP (keep-alive e auth
+# já negociada); a URL do calendário evita a descoberta via PROPFIND a cada sync.
+_Credenciais = Tuple[str, str, str]
+_clientes: Dict[_Credenciais, DAVClient] = {}
+_urls_calendario: Dict[Tuple[_Credenciais, str], Tuple[str, float]] = {}
+_lock = threading.Lock()
+
+
+def limpar_cache_caldav() -> None:
+    """Fecha os clientes compartilhados e descarta as URLs de calendário em cache."""
+    with _lock:
+        for client in _clientes.values():
+            client.close()
+        _clientes.clear()
+        _urls_calendario.clear()
+
 
 class CalDAVService(CalendarService):
     def __init__(self, settings: Settings):
         self.settings = settings
 
-    def _get_client(self) -> DAVClient:
-        url = self.settings.caldav_url.rstrip("/")
-        return DAVClient(
-            url=url,
-            username=self.settings.caldav_username,
-            password=self.settings.caldav_password,
+    @property
+    def _credenciais(self) -> _Credenciais:
+        return (
+            self.settings.caldav_url.rstrip("/"),
+            self.settings.caldav_username,
+            self.settings.caldav_password,
         )
 
-    def _get_calendar(self) -> caldav.Calendar:
-        client = self._get_client()
+    def _get_client(self) -> DAVClient:
+        credenciais = self._credenciais
+        with _lock:
+            client = _clientes.get(credenciais)
+            if client is None:
+                url, username, password = credenciais
+                client = DAVClient(url=url, username=username, password=password)
+                _clientes[credenciais] = client
+            return client
+
+    def _descobrir_calendario(self, client: DAVClient) -> caldav.Calendar:
         principal = client.principal()
         for cal in principal.calendars():
             if self.settings.caldav_calendar_path and self.settings.caldav_calendar_path in str(
@@ -34,59 +74,121 @@ class CalDAVService(CalendarService):
                 return cal
         raise RuntimeError("Calendário CalDAV não encontrado/configurado corretamente.")
 
-    def _build_event(self, turno: Turno) -> Calendar:
+    def _url_calendario(self, forcar_descoberta: bool = False) -> str:
+        """
+        URL do calendário configurado, com cache por `caldav_cache_ttl_segundos`.
+        `forcar_descoberta` ignora o cache (ex.: após 404 no calendário).
+        """
+        chave = (self._credenciais, self.settings.caldav_calendar_path)
+        agora = time.monotonic()
+        if not forcar_descoberta:
+            with _lock:
+                em_cache = _urls_calendario.get(chave)
+            if em_cache and em_cache[1] > agora:
+                return em_cache[0]
+
+        url = str(self._descobrir_calendario(self._get_client()).url)
+        with _lock:
+            _urls_calendario[chave] = (url, agora + self.settings.caldav_cache_ttl_segundos)
+        return url
+
+    def _get_calendar(self) -> caldav.Calendar:
+        client = self._get_client()
+        return caldav.Calendar(client=client, url=self._url_calendario())
+
+    def _build_event(self, turno: Turno, uid: Optional[str] = None) -> Calendar:
         cal = Calendar()
-        cal.add("prodid", "-//gestao-turnos//pt-BR")
+        cal.add("prodid", PRODID)
         cal.add("version", "2.0")
+        cal.add_component(construir_evento(turno, ZoneInfo(self.settings.timezone), uid=uid))
+        return cal
 
-        tz = ZoneInfo(self.settings.timezone)
+    def sincronizar(
+        self, turno: Turno, anterior: Optional[SincronizacaoCalendario] = None
+    ) -> SincronizacaoCalendario:
+        """
+        Grava o evento do turno no calendário remoto e retorna o novo estado.
 
-        dt_start = datetime.combine(turno.data_referencia, turno.hora_inicio).replace(
-            tzinfo=tz
-        )
-        dt_end = datetime.combine(turno.data_referencia, turno.hora_fim).replace(
-            tzinfo=tz
-        )
-        if dt_end <= dt_start:
-            dt_end = dt_end.replace(day=dt_end.day + 1)
-
-        evt = Event()
-        
-        # Lógica híbrida para suportar Model SQLAlchemy e Domain Entity
-        # Como o type hint é Turno entity, acessamos diretamente, mas mantemos robustez
-        tipo_nome = "Turno"
-        if turno.tipo:
-             tipo_nome = turno.tipo
-        
-        horas = turno.duracao_minutos / 60.0
-        evt.add("summary", f"{tipo_nome} ({horas:.2f}h)")
-        evt.add("dtstart", dt_start)
-        evt.add("dtend", dt_end)
-        evt.add(
-            "description",
-            f"Turno {tipo_nome} de {turno.hora_inicio} a {turno.hora_fim} em {turno.data_referencia}",
+        - Hash do iCalendar igual ao da última sync: nada a fazer (zero requisições).
+        - Com URL e ETag conhecidos: PUT condicional (If-Match) direto no evento.
+        - Sem estado: PUT em {calendário}/{uid}.ics (mesmo href que o caldav gera
+          no add_event), então criar e atualizar são um único PUT.
+
+        412 (evento alterado/removido no servidor) é sobrescrito com um PUT
+        incondicional: o app é a fonte da verdade dos turnos. 404/409 num URL
+        derivado do calendário refaz a descoberta e tenta de novo uma vez.
+
+        Bloqueante (caldav usa requests) e propaga erros de rede/servidor, para
+        que a fila de jobs possa agendar uma nova tentativa.
+        """
+        uid = (anterior.event_uid if anterior else None) or turno.event_uid or str(uuid.uuid4())
+        ical = self._build_event(turno, uid=uid).to_ical()
+        conteudo_hash = hashlib.sha256(ical).hexdigest()
+
+        if anterior and anterior.url and anterior.conteudo_hash == conteudo_hash:
+            return anterior
+
+        client = self._get_client()
+        url = anterior.url if anterior and anterior.url else self._url_evento(self._url_calendario(), uid)
+        headers = dict(ICAL_HEADERS)
+        if anterior and anterior.url and anterior.etag:
+            headers["If-Match"] = anterior.etag
+
+        resposta = client.put(url, ical, headers)
+        if resposta.status == 412:
+            logger.warning("Evento CalDAV alterado no servidor; sobrescrevendo", extra={"event_uid": uid})
+            resposta = client.put(url, ical, ICAL_HEADERS)
+        if resposta.status in (404, 409):
+            url = self._url_evento(self._url_calendario(forcar_descoberta=True), uid)
+            resposta = client.put(url, ical, ICAL_HEADERS)
+
+        if resposta.status >= 400:
+            raise caldav_error.PutError(f"PUT do evento {uid} falhou com status {resposta.status}")
+
+        return SincronizacaoCalendario(
+            turno_id=turno.id,
+            event_uid=uid,
+            url=url,
+            # Servidores que transformam o conteúdo não devolvem ETag (RFC 4791 5.3.4)
+            etag=resposta.headers.get("ETag"),
+            conteudo_hash=conteudo_hash,
         )
 
-        cal.add_component(evt)
-        return cal
+    def sincronizar_lote(
+        self,
+        turnos: List[Turno],
+        anteriores: Optional[Dict[int, SincronizacaoCalendario]] = None,
+    ) -> Tuple[Dict[int, SincronizacaoCalendario], Dict[int, Exception]]:
+        """
+        Sincroniza vários turnos pela mesma conexão (cliente compartilhado, uma
+        descoberta no máximo). Retorna ({turno_id: estado}, {turno_id: erro}).
 
-    def sync_event(self, turno: Turno) -> Optional[str]:
-        try:
-            cal = self._get_calendar()
-            ical = self._build_event(turno).to_ical()
+        Um erro respondido pelo servidor afeta só o turno em questão; falha de
+        rede interrompe o lote, já que os demais PUTs falhariam do mesmo jeito.
+        """
+        anteriores = anteriores or {}
+        estados: Dict[int, SincronizacaoCalendario] = {}
+        erros: Dict[int, Exception] = {}
+        for turno in turnos:
+            try:
+                estados[turno.id] = self.sincronizar(turno, anteriores.get(turno.id))
+            except caldav_error.DAVError as e:
+                erros[turno.id] = e
+            except Exception as e:
+                erros[turno.id] = e
+                break
+        return estados, erros
 
-            if turno.event_uid:
-                # busca simples e recria o evento
-                results = cal.search(uid=turno.event_uid)
-                for ev in results:
-                    ev.delete()
+    @staticmethod
+    def _url_evento(url_calendario: str, uid: str) -> str:
+        return str(URL.objectify(url_calendario).join(quote(uid, safe="") + ".ics"))
 
-            new_ev = cal.add_event(ical)
-            return new_ev.vobject_instance.vevent.uid.value
+    def sync_event(self, turno: Turno) -> Optional[str]:
+        try:
+            return self.sincronizar(turno).event_uid
         except Exception as e:
             # Em prod, logar o erro.
             # Retornar None indica falha na sync, mas não deve quebrar o fluxo principal se não for crítico.
             # O user case pode decidir logar ou ignorar.
             print(f"Erro no CalDAV: {e}")
             return None
-
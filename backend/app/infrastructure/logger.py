@@ -1,36 +1,174 @@
+"""
+Logging JSON fora do event loop.
+
+setup_logging instala no root um QueueHandler: no thread de quem loga só a
+mensagem é resolvida (msg % args) e o contexto da requisição é copiado para o
+record; a serialização e a escrita no stdout ficam com um QueueListener em
+thread própria, sem bloquear o loop do uvicorn quando o stdout está lento.
+
+Cada linha leva os campos passados em `extra={...}` e o request_id da
+requisição corrente (RequestIdMiddleware). Com orjson instalado a serialização
+usa ele; senão, json da stdlib.
+"""
+import atexit
+import copy
+import json
 import logging
+import queue
 import sys
-import json
+import zlib
+from contextvars import ContextVar
 from datetime import datetime, UTC
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Any, Callable, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+# Contexto da requisição corrente (definido pelo RequestIdMiddleware)
+request_id_ctx: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+rota_ctx: ContextVar[Optional[str]] = ContextVar("rota", default=None)
+
+# Atributos padrão do LogRecord: o resto do __dict__ veio de extra={...}
+_ATRIBUTOS_PADRAO = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+def _dumps_stdlib(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+def _dumps_orjson(obj: Any) -> str:
+    return orjson.dumps(obj, default=str).decode("utf-8")
+
+
+dumps: Callable[[Any], str] = _dumps_orjson if orjson is not None else _dumps_stdlib
+
 
 class JSONFormatter(logging.Formatter):
     def format(self, record):
         log_record = {
-            "timestamp": datetime.now(UTC).isoformat(),
+            # Momento do log, não da escrita (que acontece depois, no listener)
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
             "funcName": record.funcName,
             "line": record.lineno,
         }
-        
+
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            log_record["request_id"] = request_id
+
+        for chave, valor in record.__dict__.items():
+            if chave not in _ATRIBUTOS_PADRAO and chave not in log_record and chave != "request_id":
+                log_record[chave] = valor
+
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
-            
-        return json.dumps(log_record)
+        elif record.exc_text:
+            log_record["exception"] = record.exc_text
+
+        return dumps(log_record)
+
+
+class ContextoRequisicaoFilter(logging.Filter):
+    """Copia o request_id do contexto para o record (no thread de quem loga)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_ctx.get()
+        return True
+
+
+class AmostragemInfoFilter(logging.Filter):
+    """
+    Mantém só uma fração dos logs INFO (e abaixo) das rotas quentes.
+
+    A decisão é pelo request_id, não por linha: uma requisição amostrada tem
+    todos os seus logs, as demais nenhum. WARNING e acima passam sempre.
+    """
+
+    def __init__(self, taxa: float, rotas: Sequence[str]):
+        super().__init__()
+        self.limite = int(max(0.0, min(taxa, 1.0)) * 10_000)
+        self.rotas = tuple(rotas)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not self.rotas:
+            return True
+        rota = rota_ctx.get()
+        if rota is None or not rota.startswith(self.rotas):
+            return True
+        request_id = getattr(record, "request_id", None) or request_id_ctx.get() or ""
+        return zlib.crc32(request_id.encode()) % 10_000 < self.limite
+
+
+class FilaHandler(QueueHandler):
+    """
+    QueueHandler que deixa a formatação inteira para o listener.
+
+    O prepare padrão formata a linha aqui mesmo (no thread do loop); este só
+    resolve a mensagem, já que os args podem mudar depois da chamada.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def _parar_listener() -> None:
+    """Esvazia a fila no encerramento do processo."""
+    if _listener is not None:
+        _listener.stop()
+
+
+def setup_logging(
+    amostragem_info: float = 1.0,
+    rotas_amostradas: Sequence[str] = (),
+    stream: Optional[IO[str]] = None,
+) -> QueueListener:
+    """
+    Configura logging para saída JSON no stdout, escrita por um QueueListener.
+
+    `amostragem_info` < 1 mantém só essa fração das requisições nos logs INFO
+    das rotas com prefixo em `rotas_amostradas`.
+    """
+    global _listener
+    if _listener is None:
+        atexit.register(_parar_listener)
+    else:
+        _listener.stop()
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JSONFormatter())
+
+    fila: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    fila_handler = FilaHandler(fila)
+    fila_handler.addFilter(ContextoRequisicaoFilter())
+    if amostragem_info < 1.0 and rotas_amostradas:
+        fila_handler.addFilter(AmostragemInfoFilter(amostragem_info, rotas_amostradas))
 
-def setup_logging():
-    """Configura logging para saída JSON no stdout."""
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
-    
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JSONFormatter())
-    
+
     # Remover handlers existentes para evitar duplicação
     root_logger.handlers = []
-    root_logger.addHandler(handler)
-    
+    root_logger.addHandler(fila_handler)
+
+    _listener = QueueListener(fila, handler, respect_handler_level=True)
+    _listener.start()
+
     # Ajustar loggers de bibliotecas barulhentas
     logging.getLogger("uvicorn.access").handlers = []
     logging.getLogger("uvicorn.access").propagate = True
+    return _listener
@@ -0,0 +1,141 @@
+"""
+Métricas no formato Prometheus (exportadas em GET /metrics).
+
+Cada processo agrega os próprios valores; nada é compartilhado entre requisições
+além do contador em si. Com vários workers do uvicorn, defina
+PROMETHEUS_MULTIPROC_DIR (diretório vazio a cada start, ver entrypoint.sh):
+cada worker grava seus valores em arquivos mmap próprios e o /metrics soma os
+arquivos de todos os processos na hora da leitura. Sem a variável, o registry
+padrão do processo é exportado.
+
+Rotas são rotuladas pelo template ("/turnos/{turno_id}"), nunca pelo path
+bruto, para manter a cardinalidade fixa.
+"""
+import os
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.infrastructure.database.pool_metrics import EstatisticasPool
+
+# Requisições que não casaram com nenhuma rota (404, 403 do middleware de segurança)
+ROTA_NAO_MAPEADA = "nao_mapeada"
+
+BUCKETS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUISICOES = Counter(
+    "http_requests_total",
+    "Requisições HTTP por rota (template), método e status.",
+    ["method", "route", "status"],
+)
+HTTP_DURACAO = Histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições HTTP por rota (template) e método.",
+    ["method", "route"],
+    buckets=BUCKETS_HTTP,
+)
+
+# Pool de conexões: gauges somados entre os processos vivos
+DB_POOL_TAMANHO = Gauge(
+    "db_pool_size", "Conexões base do pool (pool_size).", multiprocess_mode="livesum"
+)
+DB_POOL_EM_USO = Gauge(
+    "db_pool_checked_out", "Conexões emprestadas no momento.", multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Conexões abertas além do pool_size.", multiprocess_mode="livesum"
+)
+DB_POOL_ESPERA = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tempo esperando uma conexão do pool (inclui abrir conexão nova).",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts que estouraram o pool_timeout.")
+
+CALDAV_SYNC_TURNOS = Counter(
+    "caldav_sync_turnos_total",
+    "Turnos processados na sync CalDAV, por resultado (enviado, inalterado, falha).",
+    ["resultado"],
+)
+PDF_RENDER_DURACAO = Histogram(
+    "pdf_render_duration_seconds",
+    "Tempo de renderização do PDF no executor, incluindo a espera na fila.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+STRIPE_WEBHOOK_DURACAO = Histogram(
+    "stripe_webhook_duration_seconds",
+    "Tempo de resposta dos webhooks do Stripe (verificação, registro e enfileiramento), por tipo de evento.",
+    ["event_type"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+STRIPE_EVENTOS = Counter(
+    "stripe_events_total",
+    "Eventos do Stripe por resultado (novo, duplicado no webhook; aplicado, ignorado no worker).",
+    ["resultado"],
+)
+FREEMIUM_REJEICOES = Counter(
+    "freemium_limit_rejections_total",
+    "Turnos recusados pelo limite do plano Free, por origem (turno, lote).",
+    ["origem"],
+)
+
+
+def multiprocesso() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def registro() -> CollectorRegistry:
+    """Registry a exportar: agregado dos arquivos de todos os processos, ou o do processo."""
+    if not multiprocesso():
+        return REGISTRY
+    agregado = CollectorRegistry()
+    multiprocess.MultiProcessCollector(agregado)
+    return agregado
+
+
+def gerar_metricas() -> Tuple[bytes, str]:
+    return generate_latest(registro()), CONTENT_TYPE_LATEST
+
+
+def encerrar_processo() -> None:
+    """Remove os gauges `live*` deste processo dos arquivos agregados."""
+    if multiprocesso():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def observar_requisicao(metodo: str, rota: str, status: int, duracao_s: float) -> None:
+    HTTP_REQUISICOES.labels(metodo, rota, str(status)).inc()
+    HTTP_DURACAO.labels(metodo, rota).observe(duracao_s)
+
+
+def _observar_espera(espera_s: float, timeout: bool) -> None:
+    if timeout:
+        DB_POOL_TIMEOUTS.inc()
+    else:
+        DB_POOL_ESPERA.observe(espera_s)
+
+
+def _observar_uso(em_uso: int, overflow: int) -> None:
+    DB_POOL_EM_USO.set(em_uso)
+    DB_POOL_OVERFLOW.set(overflow)
+
+
+def instrumentar_engine(engine: AsyncEngine) -> None:
+    """Publica tamanho, uso e esperas do pool da engine (PoolMedido)."""
+    pool = engine.sync_engine.pool
+    estatisticas = getattr(pool, "estatisticas", None)
+    if not isinstance(estatisticas, EstatisticasPool) or _observar_uso in estatisticas.observadores_uso:
+        return
+    DB_POOL_TAMANHO.set(pool.size())
+    estatisticas.observadores.append(_observar_espera)
+    estatisticas.observadores_uso.append(_observar_uso)
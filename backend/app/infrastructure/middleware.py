@@ -6,74 +6,201 @@ permitindo que as políticas RLS do PostgreSQL isolem os dados automaticamente.
 
 NOTA: O RLS é aplicado em get_db() usando request.state.telegram_user_id,
 garantindo que SET LOCAL seja executado na mesma transação das queries.
+
+Todos os middlewares são ASGI puros (sem BaseHTTPMiddleware): leem os headers
+direto do scope e não envolvem request/response em tasks e memory streams
+extras, o que também preserva respostas em streaming.
 """
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import re
+import secrets
+import time
+import uuid
+from typing import Optional
+
+from starlette.requests import cookie_parser
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
 from app.core.config import get_settings
-import secrets
+from app.infrastructure.logger import request_id_ctx, rota_ctx
+from app.infrastructure.metrics import ROTA_NAO_MAPEADA, observar_requisicao
+
+# Rotas públicas (sem Shared Secret), comparadas por prefixo
+ROTAS_PUBLICAS: tuple[str, ...] = (
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/health",
+    "/webhook",
+    "/auth",
+    "/calendario",  # Feed .ics: autenticado pelo token da URL
+)
 
 
-class RLSMiddleware(BaseHTTPMiddleware):
+def _header(scope: Scope, nome: bytes) -> Optional[str]:
+    """Retorna o primeiro header com `nome` (minúsculo) do scope ASGI."""
+    for chave, valor in scope["headers"]:
+        if chave == nome:
+            return valor.decode("latin-1")
+    return None
+
+
+class RLSMiddleware:
     """
     Middleware que extrai telegram_user_id do header X-Telegram-User-ID
-    e armazena em request.state para uso posterior em get_db().
-    
+    e armazena em scope["state"] (exposto como request.state) para uso
+    posterior em get_db().
+
     O SET LOCAL é executado em get_db() para garantir que esteja
     na mesma transação das queries do endpoint.
     """
-    
-    async def dispatch(self, request: Request, call_next):
-        # Extrair telegram_user_id do header e armazenar em request.state
-        user_id = request.headers.get("X-Telegram-User-ID")
-        
-        if user_id:
-            try:
-                request.state.telegram_user_id = int(user_id)
-            except ValueError:
-                # Header inválido, ignorar
-                pass
-        
-        # Processar request
-        response = await call_next(request)
-        return response
-
-
-class InternalSecurityMiddleware(BaseHTTPMiddleware):
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            user_id = _header(scope, b"x-telegram-user-id")
+            if user_id:
+                try:
+                    scope.setdefault("state", {})["telegram_user_id"] = int(user_id)
+                except ValueError:
+                    # Header inválido, ignorar
+                    pass
+
+        await self.app(scope, receive, send)
+
+
+class InternalSecurityMiddleware:
     """
     Middleware que verifica o Shared Secret (Internal API Key)
     para garantir que requisições venham do Bot ou fontes confiáveis.
     """
-    
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-        
-        # 1. Whitelist de rotas públicas
+
+    def __init__(self, app: ASGIApp, rotas_publicas: tuple[str, ...] = ROTAS_PUBLICAS):
+        self.app = app
+        self.rotas_publicas = rotas_publicas
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # 1. Whitelist de rotas públicas
-        if (
-            path.startswith("/docs") or 
-            path.startswith("/redoc") or 
-            path.startswith("/openapi.json") or
-            path.startswith("/health") or 
-            path.startswith("/webhook") or
-            path.startswith("/auth")
-        ):
-            return await call_next(request)
-            
+        if scope["path"].startswith(self.rotas_publicas):
+            await self.app(scope, receive, send)
+            return
+
         # 2. Verificar Shared Secret
-        settings = get_settings()
-        secret = request.headers.get("X-Internal-Secret")
-        
+        secret = None
+        autorizacao = None
+        cookie = None
+        for chave, valor in scope["headers"]:
+            if chave == b"x-internal-secret":
+                secret = valor.decode("latin-1")
+            elif chave == b"authorization":
+                autorizacao = valor
+            elif chave == b"cookie":
+                cookie = valor
+
         # 2a. Se tem secret válido, passa (Bot)
-        if secret and secrets.compare_digest(secret, settings.internal_api_key):
-             return await call_next(request)
-             
+        if secret and secrets.compare_digest(secret, get_settings().internal_api_key):
+            await self.app(scope, receive, send)
+            return
+
         # 2b. Se tem Authorization header ou Cookie de auth, passa (Web - validação real será no endpoint via deps)
-        if request.headers.get("Authorization") or request.cookies.get("auth_token"):
-            return await call_next(request)
-        
+        if autorizacao or (cookie and cookie_parser(cookie.decode("latin-1")).get("auth_token")):
+            await self.app(scope, receive, send)
+            return
+
         # 3. Bloquear se não tem nenhum dos dois
-        return JSONResponse(
-            status_code=403, 
+        response = JSONResponse(
+            status_code=403,
             content={"detail": "Forbidden: Invalid or missing Internal Secret"}
         )
+        await response(scope, receive, send)
+
+
+def _template_da_rota(scope: Scope) -> str:
+    """
+    Template completo da rota que atendeu a requisição ("/turnos/{turno_id}").
+
+    Rotas de routers incluídos podem trazer só o próprio path ("/{turno_id}"),
+    sem o prefixo do include_router; o prefixo (sempre estático aqui) é
+    recuperado dos segmentos iniciais do path da requisição.
+    """
+    rota = getattr(scope.get("route"), "path", None)
+    if rota is None:
+        return ROTA_NAO_MAPEADA
+    segmentos = [s for s in scope["path"].split("/") if s]
+    excedentes = len(segmentos) - len([s for s in rota.split("/") if s])
+    if excedentes <= 0:
+        return rota
+    return "/" + "/".join(segmentos[:excedentes]) + rota
+
+
+class MetricasMiddleware:
+    """
+    Conta e cronometra cada requisição HTTP, rotulada pelo template da rota
+    (scope["route"], preenchido pelo roteamento) e não pelo path bruto.
+    A duração inclui o corpo inteiro de respostas em streaming.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status = 500
+
+        async def send_com_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_com_status)
+        finally:
+            observar_requisicao(scope["method"], _template_da_rota(scope), status, time.perf_counter() - inicio)
+
+
+# IDs aceitos do cliente (o bot repassa o seu); o resto é substituído por um novo
+_REQUEST_ID_VALIDO = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+
+class RequestIdMiddleware:
+    """
+    Define o request_id da requisição (header X-Request-ID do cliente ou um
+    novo) no contexto dos logs e o devolve no header X-Request-ID da resposta.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _header(scope, b"x-request-id")
+        if not request_id or not _REQUEST_ID_VALIDO.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+        token_id = request_id_ctx.set(request_id)
+        token_rota = rota_ctx.set(scope["path"])
+
+        async def send_com_id(message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_com_id)
+        finally:
+            request_id_ctx.reset(token_id)
+            rota_ctx.reset(token_rota)
@@ -0,0 +1,35 @@
+"""
+SQLAlchemy implementation of CalendarioFeedRepository.
+"""
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.repositories.calendario_feed_repository import CalendarioFeedRepository
+from app.infrastructure.database import models
+
+
+class SqlAlchemyCalendarioFeedRepository(CalendarioFeedRepository):
+    """
+    Tokens do feed .ics na tabela `calendario_feeds` (um por usuário).
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def buscar_usuario_por_token(self, token: str) -> Optional[int]:
+        stmt = select(models.CalendarioFeed.telegram_user_id).where(
+            models.CalendarioFeed.token == token
+        )
+        return await self.session.scalar(stmt)
+
+    async def salvar_token(self, telegram_user_id: int, token: str) -> None:
+        # Upsert pelo usuário: o token anterior deixa de existir na mesma instrução
+        stmt = pg_insert(models.CalendarioFeed).values(telegram_user_id=telegram_user_id, token=token)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.CalendarioFeed.telegram_user_id],
+            set_={"token": stmt.excluded.token, "criado_em": stmt.excluded.criado_em},
+        )
+        await self.session.execute(stmt)
@@ -0,0 +1,107 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.dashboard import ResumoDashboard
+from app.domain.entities.turno import Turno
+from app.domain.entities.usuario import Usuario
+from app.domain.repositories.dashboard_repository import DashboardRepository
+from app.infrastructure.database import models
+from app.infrastructure.repositories.sqlalchemy_turno_repository import _select_turnos
+
+def _proximo_mes(mes_inicio: date) -> date:
+    return date(mes_inicio.year + mes_inicio.month // 12, mes_inicio.month % 12 + 1, 1)
+
+
+class SqlAlchemyDashboardRepository(DashboardRepository):
+    """
+    Resumo do dashboard num único SELECT: usuário LEFT JOIN assinatura,
+    contador do mês e soma de minutos como subconsultas escalares e os turnos
+    recentes como subconsulta juntada com ON true (uma linha por turno, ou uma
+    linha só com o usuário quando não há turnos).
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def obter_resumo(
+        self, telegram_user_id: int, mes_inicio: date, limite_recentes: int = 5
+    ) -> Optional[ResumoDashboard]:
+        turnos_mes = (
+            select(models.TurnoContagemMensal.total)
+            .where(
+                models.TurnoContagemMensal.telegram_user_id == telegram_user_id,
+                models.TurnoContagemMensal.ano_mes == mes_inicio,
+            )
+            .scalar_subquery()
+        )
+        minutos_mes = (
+            select(func.coalesce(func.sum(models.TurnoModel.duracao_minutos), 0))
+            .where(
+                models.TurnoModel.telegram_user_id == telegram_user_id,
+                models.TurnoModel.data_referencia >= mes_inicio,
+                models.TurnoModel.data_referencia < _proximo_mes(mes_inicio),
+            )
+            .scalar_subquery()
+        )
+        # Mesma ordem de listar_recentes, com o id desempatando (ETag estável)
+        recentes = (
+            _select_turnos()
+            .where(models.TurnoModel.telegram_user_id == telegram_user_id)
+            .order_by(models.TurnoModel.criado_em.desc(), models.TurnoModel.id.desc())
+            .limit(limite_recentes)
+            .subquery("recentes")
+        )
+
+        stmt = (
+            select(
+                # Rótulos próprios: as colunas do turno usam os nomes dos campos de Turno
+                models.Usuario.id.label("usuario_id"),
+                models.Usuario.telegram_user_id.label("usuario_telegram_user_id"),
+                models.Usuario.nome.label("usuario_nome"),
+                models.Usuario.numero_funcionario.label("usuario_numero_funcionario"),
+                models.Usuario.criado_em.label("usuario_criado_em"),
+                models.Usuario.atualizado_em.label("usuario_atualizado_em"),
+                models.Assinatura.status.label("assinatura_status"),
+                models.Assinatura.plano.label("assinatura_plano"),
+                models.Assinatura.data_fim.label("assinatura_data_fim"),
+                func.coalesce(turnos_mes, 0).label("turnos_mes"),
+                minutos_mes.label("minutos_mes"),
+                *recentes.c,
+            )
+            .select_from(models.Usuario)
+            .outerjoin(models.Assinatura, models.Assinatura.telegram_user_id == models.Usuario.telegram_user_id)
+            .outerjoin(recentes, true())
+            .where(models.Usuario.telegram_user_id == telegram_user_id)
+            .order_by(recentes.c.criado_em.desc(), recentes.c.id.desc())
+        )
+        linhas = (await self.session.execute(stmt)).all()
+        if not linhas:
+            return None
+
+        campos_turno = recentes.c.keys()
+        primeira = linhas[0]
+        return ResumoDashboard(
+            usuario=Usuario(
+                id=primeira.usuario_id,
+                telegram_user_id=primeira.usuario_telegram_user_id,
+                nome=primeira.usuario_nome,
+                numero_funcionario=primeira.usuario_numero_funcionario,
+                criado_em=primeira.usuario_criado_em,
+                atualizado_em=primeira.usuario_atualizado_em,
+            ),
+            assinatura_status=primeira.assinatura_status,
+            assinatura_plano=primeira.assinatura_plano,
+            assinatura_data_fim=primeira.assinatura_data_fim,
+            mes_inicio=mes_inicio,
+            turnos_mes=primeira.turnos_mes,
+            minutos_mes=primeira.minutos_mes,
+            # Sem turnos, a única linha traz as colunas do turno nulas
+            turnos_recentes=[
+                Turno(**{campo: linha._mapping[campo] for campo in campos_turno})
+                for linha in linhas
+                if linha.id is not None
+            ],
+        )
@@ -1,15 +1,55 @@
-from datetime import date
-from typing import List, Optional
+from datetime import date, datetime, UTC
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sqlalchemy.orm import selectinload
 from app.domain.entities.turno import Turno
 from app.domain.entities.tipo_turno import TipoTurno
+from app.domain.entities.total_turno import TotalDiaTipo
+from app.domain.entities.sincronizacao_calendario import SincronizacaoCalendario
+from app.domain.entities.feed_calendario import VersaoPeriodo
+from app.domain.value_objects.cursor_turno import CursorTurno
 from app.domain.repositories.turno_repository import TurnoRepository
 from app.infrastructure.database import models
 
+# Linhas trazidas do cursor do servidor por vez em iterar_por_periodo
+LOTE_ITERACAO = 500
+
+# Colunas da leitura sem ORM, cada uma com o nome (ou rótulo) de um campo de
+# Turno: cada linha vira a entidade com Turno(**row._mapping)
+COLUNAS_TURNO = (
+    models.TurnoModel.telegram_user_id,
+    models.TurnoModel.data_referencia,
+    models.TurnoModel.hora_inicio,
+    models.TurnoModel.hora_fim,
+    models.TurnoModel.duracao_minutos,
+    func.coalesce(models.TipoTurno.nome, models.TurnoModel.tipo_livre).label("tipo"),
+    models.TurnoModel.descricao_opcional,
+    models.TurnoModel.id,
+    models.TurnoModel.tipo_turno_id.label("tipo_id"),
+    models.IntegracaoCalendario.event_uid,
+    models.TurnoModel.criado_em,
+    models.TurnoModel.atualizado_em,
+)
+
+
+def _select_turnos():
+    """
+    SELECT único das leituras de turnos: LEFT JOIN com o tipo e a integração
+    em vez de objetos ORM mais dois selectinload (três round trips), sem
+    identity map nem _to_entity.
+    """
+    return (
+        select(*COLUNAS_TURNO)
+        .select_from(models.TurnoModel)
+        .outerjoin(models.TipoTurno, models.TurnoModel.tipo_turno_id == models.TipoTurno.id)
+        .outerjoin(models.IntegracaoCalendario, models.IntegracaoCalendario.turno_id == models.TurnoModel.id)
+    )
+
+
 class SqlAlchemyTurnoRepository(TurnoRepository):
     """
     Implementação SQLAlchemy do repositório de turnos.
@@ -53,13 +93,41 @@ class SqlAlchemyTurnoRepository(TurnoRepository):
 
         return db_turno
 
-    async def buscar_tipo_por_nome(self, nome: str) -> Optional[TipoTurno]:
-        stmt = select(models.TipoTurno).where(models.TipoTurno.nome.ilike(nome))
+    async def buscar_tipo_por_nome(self, nome: str, telegram_user_id: int) -> Optional[TipoTurno]:
+        # lower(nome) = e não ILIKE: igualdade exata (% e _ no nome não são
+        # curingas) e usa ix_tipos_turno_usuario_nome_lower
+        stmt = (
+            select(models.TipoTurno)
+            .where(
+                models.TipoTurno.telegram_user_id == telegram_user_id,
+                func.lower(models.TipoTurno.nome) == nome.lower(),
+            )
+            .order_by(models.TipoTurno.id)
+            .limit(1)
+        )
         result = await self.session.scalar(stmt)
         if result:
             return TipoTurno(id=result.id, nome=result.nome)
         return None
 
+    async def buscar_tipos_por_nomes(self, nomes: Iterable[str], telegram_user_id: int) -> Dict[str, TipoTurno]:
+        chaves = {nome.lower() for nome in nomes if nome}
+        if not chaves:
+            return {}
+        stmt = (
+            select(models.TipoTurno)
+            .where(
+                models.TipoTurno.telegram_user_id == telegram_user_id,
+                func.lower(models.TipoTurno.nome).in_(chaves),
+            )
+            .order_by(models.TipoTurno.id)
+        )
+        result = await self.session.scalars(stmt)
+        tipos: Dict[str, TipoTurno] = {}
+        for tipo in result.all():
+            tipos.setdefault(tipo.nome.lower(), TipoTurno(id=tipo.id, nome=tipo.nome))
+        return tipos
+
     async def criar(self, turno: Turno) -> Turno:
         db_turno = self._to_model(turno)
         
@@ -93,15 +161,73 @@ class SqlAlchemyTurnoRepository(TurnoRepository):
             atualizado_em=db_turno.atualizado_em,
         )
 
+    async def criar_em_lote(self, turnos: List[Turno]) -> List[Turno]:
+        if not turnos:
+            return []
+
+        valores = [
+            {
+                "telegram_user_id": t.telegram_user_id,
+                "data_referencia": t.data_referencia,
+                "hora_inicio": t.hora_inicio,
+                "hora_fim": t.hora_fim,
+                "duracao_minutos": t.duracao_minutos,
+                "tipo_turno_id": t.tipo_id,
+                "tipo_livre": t.tipo if not t.tipo_id else None,
+                "descricao_opcional": t.descricao_opcional,
+            }
+            for t in turnos
+        ]
+        # Core INSERT com lista de parâmetros: o SQLAlchemy agrupa as linhas num
+        # único INSERT ... VALUES (...), (...) RETURNING ("insertmanyvalues").
+        stmt = insert(models.TurnoModel).returning(
+            models.TurnoModel.id,
+            models.TurnoModel.criado_em,
+            models.TurnoModel.atualizado_em,
+            sort_by_parameter_order=True,
+        )
+        result = await self.session.execute(stmt, valores)
+        linhas = result.all()
+
+        salvos: List[Turno] = []
+        for turno, row in zip(turnos, linhas):
+            salvos.append(
+                Turno(
+                    id=row.id,
+                    telegram_user_id=turno.telegram_user_id,
+                    data_referencia=turno.data_referencia,
+                    hora_inicio=turno.hora_inicio,
+                    hora_fim=turno.hora_fim,
+                    duracao_minutos=turno.duracao_minutos,
+                    tipo=turno.tipo,
+                    tipo_id=turno.tipo_id,
+                    descricao_opcional=turno.descricao_opcional,
+                    criado_em=row.criado_em,
+                    atualizado_em=row.atualizado_em,
+                )
+            )
+        return salvos
+
     async def buscar_por_id(self, turno_id: int, telegram_user_id: int) -> Optional[Turno]:
-        stmt = select(models.TurnoModel).options(selectinload(models.TurnoModel.tipo)).options(selectinload(models.TurnoModel.integracao)).where(
+        stmt = _select_turnos().where(
             models.TurnoModel.id == turno_id,
             models.TurnoModel.telegram_user_id == telegram_user_id
         )
-        result = await self.session.scalar(stmt)
-        if not result:
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
             return None
-        return self._to_entity(result)
+        return Turno(**row._mapping)
+
+    async def buscar_por_ids(self, turno_ids: Iterable[int], telegram_user_id: int) -> List[Turno]:
+        ids = list(turno_ids)
+        if not ids:
+            return []
+        stmt = _select_turnos().where(
+            models.TurnoModel.id.in_(ids),
+            models.TurnoModel.telegram_user_id == telegram_user_id
+        ).order_by(models.TurnoModel.id)
+        result = await self.session.execute(stmt)
+        return [Turno(**row._mapping) for row in result]
 
     async def listar_por_periodo(
         self,
@@ -110,16 +236,108 @@ class SqlAlchemyTurnoRepository(TurnoRepository):
         fim: date,
     ) -> List[Turno]:
         stmt = (
-            select(models.TurnoModel)
-            .options(selectinload(models.TurnoModel.tipo))
-            .options(selectinload(models.TurnoModel.integracao))
+            _select_turnos()
             .where(models.TurnoModel.telegram_user_id == telegram_user_id)
             .where(models.TurnoModel.data_referencia >= inicio)
             .where(models.TurnoModel.data_referencia <= fim)
             .order_by(models.TurnoModel.data_referencia, models.TurnoModel.hora_inicio)
         )
-        result = await self.session.scalars(stmt)
-        return [self._to_entity(t) for t in result.all()]
+        result = await self.session.execute(stmt)
+        return [Turno(**row._mapping) for row in result]
+
+    async def listar_pagina(
+        self,
+        telegram_user_id: int,
+        inicio: date,
+        fim: date,
+        limite: int,
+        apos: Optional[CursorTurno] = None,
+    ) -> List[Turno]:
+        stmt = (
+            _select_turnos()
+            .where(models.TurnoModel.telegram_user_id == telegram_user_id)
+            .where(models.TurnoModel.data_referencia >= inicio)
+            .where(models.TurnoModel.data_referencia <= fim)
+            .order_by(models.TurnoModel.data_referencia, models.TurnoModel.hora_inicio, models.TurnoModel.id)
+            .limit(limite)
+        )
+        if apos is not None:
+            # Comparação de linha: vira condição de faixa em ix_turnos_usuario_data_hora_id
+            stmt = stmt.where(
+                tuple_(models.TurnoModel.data_referencia, models.TurnoModel.hora_inicio, models.TurnoModel.id)
+                > tuple_(apos.data_referencia, apos.hora_inicio, apos.id)
+            )
+        result = await self.session.execute(stmt)
+        return [Turno(**row._mapping) for row in result]
+
+    async def iterar_por_periodo(
+        self,
+        telegram_user_id: int,
+        inicio: date,
+        fim: date,
+    ) -> AsyncIterator[Turno]:
+        # Cursor do servidor + yield_per: a memória fica limitada a um lote
+        stmt = (
+            _select_turnos()
+            .where(models.TurnoModel.telegram_user_id == telegram_user_id)
+            .where(models.TurnoModel.data_referencia >= inicio)
+            .where(models.TurnoModel.data_referencia <= fim)
+            .order_by(models.TurnoModel.data_referencia, models.TurnoModel.hora_inicio, models.TurnoModel.id)
+            .execution_options(yield_per=LOTE_ITERACAO)
+        )
+        result = await self.session.stream(stmt)
+        try:
+            async for row in result:
+                yield Turno(**row._mapping)
+        finally:
+            await result.close()
+
+    async def versao_periodo(
+        self,
+        telegram_user_id: int,
+        inicio: date,
+        fim: date,
+    ) -> VersaoPeriodo:
+        stmt = (
+            select(func.max(models.TurnoModel.atualizado_em), func.count())
+            .select_from(models.TurnoModel)
+            .where(models.TurnoModel.telegram_user_id == telegram_user_id)
+            .where(models.TurnoModel.data_referencia >= inicio)
+            .where(models.TurnoModel.data_referencia <= fim)
+        )
+        ultima_alteracao, total = (await self.session.execute(stmt)).one()
+        return VersaoPeriodo(ultima_alteracao=ultima_alteracao, total=total)
+
+    async def agregar_por_dia_e_tipo(
+        self,
+        telegram_user_id: int,
+        inicio: date,
+        fim: date,
+    ) -> List[TotalDiaTipo]:
+        nome_tipo = func.coalesce(
+            models.TipoTurno.nome, models.TurnoModel.tipo_livre, literal_column("'sem_tipo'")
+        ).label("tipo")
+        # Literal inline: o mesmo texto no SELECT e no GROUP BY (um bind
+        # parameter geraria placeholders distintos para o Postgres)
+        stmt = (
+            select(
+                models.TurnoModel.data_referencia,
+                nome_tipo,
+                func.sum(models.TurnoModel.duracao_minutos).label("total_minutos"),
+            )
+            .select_from(models.TurnoModel)
+            .outerjoin(models.TipoTurno, models.TurnoModel.tipo_turno_id == models.TipoTurno.id)
+            .where(models.TurnoModel.telegram_user_id == telegram_user_id)
+            .where(models.TurnoModel.data_referencia >= inicio)
+            .where(models.TurnoModel.data_referencia <= fim)
+            .group_by(models.TurnoModel.data_referencia, nome_tipo)
+            .order_by(models.TurnoModel.data_referencia, nome_tipo)
+        )
+        result = await self.session.execute(stmt)
+        return [
+            TotalDiaTipo(data=row.data_referencia, tipo=row.tipo, total_minutos=int(row.total_minutos))
+            for row in result.all()
+        ]
 
     async def listar_recentes(
         self,
@@ -127,15 +345,13 @@ class SqlAlchemyTurnoRepository(TurnoRepository):
         limit: int = 5,
     ) -> List[Turno]:
         stmt = (
-            select(models.TurnoModel)
-            .options(selectinload(models.TurnoModel.tipo))
-            .options(selectinload(models.TurnoModel.integracao))
+            _select_turnos()
             .where(models.TurnoModel.telegram_user_id == telegram_user_id)
             .order_by(models.TurnoModel.criado_em.desc())
             .limit(limit)
         )
-        result = await self.session.scalars(stmt)
-        return [self._to_entity(t) for t in result.all()]
+        result = await self.session.execute(stmt)
+        return [Turno(**row._mapping) for row in result]
 
     async def deletar(self, turno_id: int, telegram_user_id: int) -> bool:
         stmt = select(models.TurnoModel).where(
@@ -180,6 +396,70 @@ class SqlAlchemyTurnoRepository(TurnoRepository):
         await self.session.refresh(db_turno)
         return self._to_entity(db_turno)
 
+    async def buscar_sincronizacoes(
+        self, turno_ids: Iterable[int], telegram_user_id: int
+    ) -> Dict[int, SincronizacaoCalendario]:
+        ids = list(turno_ids)
+        if not ids:
+            return {}
+        stmt = (
+            select(models.IntegracaoCalendario)
+            .join(models.TurnoModel, models.TurnoModel.id == models.IntegracaoCalendario.turno_id)
+            .where(
+                models.IntegracaoCalendario.turno_id.in_(ids),
+                models.TurnoModel.telegram_user_id == telegram_user_id,
+            )
+        )
+        result = await self.session.scalars(stmt)
+        return {
+            m.turno_id: SincronizacaoCalendario(
+                turno_id=m.turno_id,
+                event_uid=m.event_uid,
+                url=m.url,
+                etag=m.etag,
+                conteudo_hash=m.conteudo_hash,
+            )
+            for m in result.all()
+        }
+
+    async def salvar_sincronizacoes(
+        self, telegram_user_id: int, sincronizacoes: List[SincronizacaoCalendario]
+    ) -> None:
+        if not sincronizacoes:
+            return
+        # Só turnos do próprio usuário (além do RLS, a query filtra explicitamente)
+        ids_validos = select(models.TurnoModel.id).where(
+            models.TurnoModel.id.in_([s.turno_id for s in sincronizacoes]),
+            models.TurnoModel.telegram_user_id == telegram_user_id,
+        )
+        validos = set((await self.session.scalars(ids_validos)).all())
+        linhas = [
+            {
+                "turno_id": s.turno_id,
+                "event_uid": s.event_uid,
+                "url": s.url,
+                "etag": s.etag,
+                "conteudo_hash": s.conteudo_hash,
+            }
+            for s in sincronizacoes
+            if s.turno_id in validos
+        ]
+        if not linhas:
+            return
+
+        stmt = pg_insert(models.IntegracaoCalendario).values(linhas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.IntegracaoCalendario.turno_id],
+            set_={
+                "event_uid": stmt.excluded.event_uid,
+                "url": stmt.excluded.url,
+                "etag": stmt.excluded.etag,
+                "conteudo_hash": stmt.excluded.conteudo_hash,
+                "atualizado_em": datetime.now(UTC),
+            },
+        )
+        await self.session.execute(stmt)
+
     async def contar_por_periodo(
         self,
         telegram_user_id: int,
@@ -195,3 +475,9 @@ class SqlAlchemyTurnoRepository(TurnoRepository):
         )
         return await self.session.scalar(stmt) or 0
 
+    async def contar_mes(self, telegram_user_id: int, referencia: date) -> int:
+        stmt = select(models.TurnoContagemMensal.total).where(
+            models.TurnoContagemMensal.telegram_user_id == telegram_user_id,
+            models.TurnoContagemMensal.ano_mes == referencia.replace(day=1),
+        )
+        return await self.session.scalar(stmt) or 0
@@ -1,7 +1,7 @@
 from app.domain.ports.caldav_sync_port import CalDavSyncTaskPort
 from app.application.dtos.caldav_sync_dto import SyncTurnoCalDavCommand
 from app.domain.ports.background import BackgroundTaskQueue
-from app.infrastructure.tasks.caldav import sync_turn_caldav_background # A única importação aqui!
+from app.infrastructure.tasks.caldav import sync_turnos_caldav_background # A única importação aqui!
 
 class CalDavSyncTaskAdapter(CalDavSyncTaskPort):
     def __init__(self, bg_queue: BackgroundTaskQueue):
@@ -10,5 +10,13 @@ class CalDavSyncTaskAdapter(CalDavSyncTaskPort):
     def add_sync_task(self, command: SyncTurnoCalDavCommand) -> None:
         """
         Adiciona a tarefa de sincronização CalDAV à fila de tarefas em background.
+
+        Com a fila persistente o job entra na transação do caso de uso, então
+        deve ser chamado antes do commit. Jobs do mesmo usuário são fundidos
+        pelo worker num único lote.
         """
-        self.bg_queue.add_task(sync_turn_caldav_background, command.turno_id)
+        self.bg_queue.add_task(
+            sync_turnos_caldav_background,
+            telegram_user_id=command.telegram_user_id,
+            turno_ids=[command.turno_id],
+        )
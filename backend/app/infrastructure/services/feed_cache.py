@@ -0,0 +1,66 @@
+"""
+Cache em memória dos feeds .ics (por processo).
+
+Guarda a versão (ETag/Last-Modified) e, quando cabe no limite, o corpo já
+renderizado de cada usuário, em ordem LRU. Escritas de turnos neste processo
+forçam a revalidação na hora; escritas em outros workers são percebidas na
+revalidação feita pelo caso de uso depois do TTL.
+"""
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import date
+from typing import Iterable, Optional, Sequence
+
+from app.core.config import Settings
+from app.domain.entities.feed_calendario import FeedRenderizado
+from app.domain.ports.cache_port import InvalidacaoCachePort
+
+
+class MemoriaFeedCache:
+    """
+    Implementa FeedCalendarioCachePort e InvalidacaoCachePort.
+    """
+
+    def __init__(self, max_entradas: int):
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[int, FeedRenderizado]" = OrderedDict()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "MemoriaFeedCache":
+        return cls(max_entradas=settings.calendario_feed_cache_max_entradas)
+
+    def obter(self, telegram_user_id: int) -> Optional[FeedRenderizado]:
+        feed = self._entradas.get(telegram_user_id)
+        if feed is not None:
+            self._entradas.move_to_end(telegram_user_id)
+        return feed
+
+    def salvar(self, telegram_user_id: int, feed: FeedRenderizado) -> None:
+        self._entradas[telegram_user_id] = feed
+        self._entradas.move_to_end(telegram_user_id)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def invalidar(self, telegram_user_id: int) -> None:
+        # Mantém a versão anterior (o caso de uso compara ETag e Last-Modified
+        # com ela), mas força a revalidação na próxima requisição
+        feed = self._entradas.get(telegram_user_id)
+        if feed is not None:
+            self._entradas[telegram_user_id] = replace(feed, verificado_em=float("-inf"))
+
+    async def turnos_alterados(self, telegram_user_id: int, datas: Iterable[date]) -> None:
+        self.invalidar(telegram_user_id)
+
+
+class InvalidacaoCacheComposta:
+    """
+    Repassa turnos_alterados a vários caches (PDF em disco, feed em memória...).
+    """
+
+    def __init__(self, caches: Sequence[InvalidacaoCachePort]):
+        self.caches = list(caches)
+
+    async def turnos_alterados(self, telegram_user_id: int, datas: Iterable[date]) -> None:
+        datas = list(datas)
+        for cache in self.caches:
+            await cache.turnos_alterados(telegram_user_id, datas)
@@ -0,0 +1,134 @@
+"""
+Geração de iCalendar para os turnos.
+
+`campos_evento` define o conteúdo do evento de um turno, compartilhado pela
+sincronização CalDAV (`construir_evento`, via icalendar) e pelo feed de
+assinatura (`IcsFeedService`). O feed serializa as linhas diretamente: com
+centenas de eventos por resposta, montar componentes icalendar custa ~0,4 ms
+por evento, contra ~0,03 ms formatando o texto.
+"""
+from datetime import UTC, datetime, timedelta
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from icalendar import Event, Timezone
+
+from app.domain.entities.turno import Turno
+from app.domain.services.feed_calendario_service import FeedCalendarioService
+
+PRODID = "-//gestao-turnos//pt-BR"
+
+
+def campos_evento(turno: Turno, tz: ZoneInfo) -> Tuple[datetime, datetime, str, str]:
+    """
+    Início, fim, título e descrição do evento de um turno. Turnos que terminam
+    depois da meia-noite acabam no dia seguinte.
+    """
+    dt_start = datetime.combine(turno.data_referencia, turno.hora_inicio).replace(tzinfo=tz)
+    dt_end = datetime.combine(turno.data_referencia, turno.hora_fim).replace(tzinfo=tz)
+    if dt_end <= dt_start:
+        dt_end += timedelta(days=1)
+
+    tipo_nome = turno.tipo or "Turno"
+    horas = turno.duracao_minutos / 60.0
+    resumo = f"{tipo_nome} ({horas:.2f}h)"
+    descricao = f"Turno {tipo_nome} de {turno.hora_inicio} a {turno.hora_fim} em {turno.data_referencia}"
+    return dt_start, dt_end, resumo, descricao
+
+
+def _carimbo(turno: Turno) -> datetime:
+    # DTSTAMP determinístico (última alteração do turno): o mesmo turno gera
+    # sempre o mesmo iCalendar, o que permite comparar pelo hash
+    carimbo = turno.atualizado_em or datetime.now(UTC)
+    if carimbo.tzinfo is None:
+        carimbo = carimbo.replace(tzinfo=UTC)
+    return carimbo.astimezone(UTC)
+
+
+def construir_evento(turno: Turno, tz: ZoneInfo, uid: Optional[str] = None) -> Event:
+    """VEVENT do turno como componente icalendar (usado na sincronização CalDAV)."""
+    dt_start, dt_end, resumo, descricao = campos_evento(turno, tz)
+    evt = Event()
+    if uid:
+        evt.add("uid", uid)
+        evt.add("dtstamp", _carimbo(turno))
+    evt.add("summary", resumo)
+    evt.add("dtstart", dt_start)
+    evt.add("dtend", dt_end)
+    evt.add("description", descricao)
+    return evt
+
+
+def _texto(valor: str) -> str:
+    """Escapa um valor TEXT (RFC 5545, 3.3.11)."""
+    return (
+        valor.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _dobrar(linha: str) -> str:
+    """Quebra linhas com mais de 75 octetos (RFC 5545, 3.1), sem partir caracteres UTF-8."""
+    if len(linha.encode("utf-8")) <= 75:
+        return linha + "\r\n"
+    partes = []
+    atual, tamanho, limite = [], 0, 75
+    for ch in linha:
+        n = len(ch.encode("utf-8"))
+        if tamanho + n > limite:
+            partes.append("".join(atual))
+            atual, tamanho, limite = [], 0, 74  # Continuações começam com um espaço
+        atual.append(ch)
+        tamanho += n
+    partes.append("".join(atual))
+    return "\r\n ".join(partes) + "\r\n"
+
+
+class IcsFeedService(FeedCalendarioService):
+    """
+    Feed VCALENDAR (RFC 5545) com um VTIMEZONE do fuso da aplicação e um VEVENT
+    por turno. O UID é derivado do ID do turno, estável entre requisições, para
+    que o cliente atualize o evento em vez de duplicá-lo.
+    """
+
+    def __init__(self, timezone: str, nome: str = "Turnos", intervalo_atualizacao: str = "PT1H"):
+        self.tz = ZoneInfo(timezone)
+        self._tzid = timezone
+        linhas = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{nome}",
+            f"X-WR-TIMEZONE:{timezone}",
+            # Sugestão de frequência de polling (RFC 7986 e extensão da Microsoft/Google)
+            f"REFRESH-INTERVAL;VALUE=DURATION:{intervalo_atualizacao}",
+            f"X-PUBLISHED-TTL:{intervalo_atualizacao}",
+        ]
+        self._cabecalho = ("\r\n".join(linhas) + "\r\n").encode("utf-8") + Timezone.from_tzid(timezone).to_ical()
+
+    @staticmethod
+    def uid(turno: Turno) -> str:
+        return f"turno-{turno.id}@gestao-turnos"
+
+    def cabecalho(self) -> bytes:
+        return self._cabecalho
+
+    def evento(self, turno: Turno) -> str:
+        dt_start, dt_end, resumo, descricao = campos_evento(turno, self.tz)
+        return "".join((
+            "BEGIN:VEVENT\r\n",
+            f"UID:{self.uid(turno)}\r\n",
+            f"DTSTAMP:{_carimbo(turno):%Y%m%dT%H%M%SZ}\r\n",
+            _dobrar(f"SUMMARY:{_texto(resumo)}"),
+            f"DTSTART;TZID={self._tzid}:{dt_start:%Y%m%dT%H%M%S}\r\n",
+            f"DTEND;TZID={self._tzid}:{dt_end:%Y%m%dT%H%M%S}\r\n",
+            _dobrar(f"DESCRIPTION:{_texto(descricao)}"),
+            "END:VEVENT\r\n",
+        ))
+
+    def eventos(self, turnos: List[Turno]) -> bytes:
+        return "".join(self.evento(t) for t in turnos).encode("utf-8")
+
+    def rodape(self) -> bytes:
+        return b"END:VCALENDAR\r\n"
@@ -0,0 +1,135 @@
+"""
+Cache em disco dos PDFs mensais.
+
+Layout: {diretorio}/{telegram_user_id}/{ano}-{mes:02d}/{chave}.pdf
+
+O disco é a fonte da verdade (vários workers do uvicorn podem compartilhar o
+diretório). O mtime de cada arquivo é atualizado a cada hit e usado como ordem
+LRU na limpeza, que roda quando o volume escrito desde a última varredura
+passa de uma fração do limite. Todo acesso ao disco roda em thread
+(asyncio.to_thread): o rmtree e a varredura da limpeza não travam o event loop.
+"""
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class DiskPdfCache:
+    """
+    Implementa PdfCachePort e InvalidacaoCachePort com arquivos em disco.
+    """
+
+    def __init__(self, diretorio: str, max_bytes: int, max_entradas: int):
+        self.diretorio = Path(diretorio)
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self._escrito_desde_limpeza = 0
+        self._gravacoes_desde_limpeza = 0
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "DiskPdfCache":
+        return cls(
+            diretorio=settings.pdf_cache_dir,
+            max_bytes=settings.pdf_cache_max_mb * 1024 * 1024,
+            max_entradas=settings.pdf_cache_max_entradas,
+        )
+
+    def _dir_mes(self, telegram_user_id: int, ano: int, mes: int) -> Path:
+        return self.diretorio / str(telegram_user_id) / f"{ano}-{mes:02d}"
+
+    async def obter(self, telegram_user_id: int, ano: int, mes: int, chave: str) -> Optional[bytes]:
+        caminho = self._dir_mes(telegram_user_id, ano, mes) / f"{chave}.pdf"
+        return await asyncio.to_thread(self._ler, caminho)
+
+    async def salvar(self, telegram_user_id: int, ano: int, mes: int, chave: str, conteudo: bytes) -> None:
+        dir_mes = self._dir_mes(telegram_user_id, ano, mes)
+        if not await asyncio.to_thread(self._gravar, telegram_user_id, dir_mes, chave, conteudo):
+            return
+
+        self._escrito_desde_limpeza += len(conteudo)
+        self._gravacoes_desde_limpeza += 1
+        if (
+            self._escrito_desde_limpeza >= self.max_bytes // 10
+            or self._gravacoes_desde_limpeza >= max(1, self.max_entradas // 10)
+        ):
+            await self.limpar()
+
+    async def invalidar_mes(self, telegram_user_id: int, ano: int, mes: int) -> None:
+        await asyncio.to_thread(shutil.rmtree, self._dir_mes(telegram_user_id, ano, mes), ignore_errors=True)
+
+    async def turnos_alterados(self, telegram_user_id: int, datas: Iterable[date]) -> None:
+        for ano, mes in {(d.year, d.month) for d in datas}:
+            await self.invalidar_mes(telegram_user_id, ano, mes)
+
+    async def limpar(self) -> None:
+        """
+        Remove os arquivos menos usados até respeitar os limites de tamanho e quantidade.
+        """
+        self._escrito_desde_limpeza = 0
+        self._gravacoes_desde_limpeza = 0
+        await asyncio.to_thread(self._remover_menos_usados)
+
+    # Métodos síncronos abaixo só rodam em thread (asyncio.to_thread)
+
+    @staticmethod
+    def _ler(caminho: Path) -> Optional[bytes]:
+        try:
+            conteudo = caminho.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(caminho)  # Marca como usado recentemente (LRU)
+        except OSError:
+            pass
+        return conteudo
+
+    @staticmethod
+    def _gravar(telegram_user_id: int, dir_mes: Path, chave: str, conteudo: bytes) -> bool:
+        dir_mes.mkdir(parents=True, exist_ok=True)
+
+        # Escrita atômica: outro worker nunca lê um arquivo pela metade
+        fd, tmp = tempfile.mkstemp(dir=dir_mes, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(conteudo)
+            os.replace(tmp, dir_mes / f"{chave}.pdf")
+        except OSError:
+            logger.exception("Falha ao gravar PDF no cache", extra={"telegram_user_id": telegram_user_id})
+            Path(tmp).unlink(missing_ok=True)
+            return False
+
+        # Versões anteriores do mesmo mês nunca mais serão pedidas
+        for antigo in dir_mes.glob("*.pdf"):
+            if antigo.stem != chave:
+                antigo.unlink(missing_ok=True)
+        return True
+
+    def _remover_menos_usados(self) -> None:
+        arquivos = []
+        total = 0
+        for caminho in self.diretorio.glob("*/*/*.pdf"):
+            try:
+                st = caminho.stat()
+            except FileNotFoundError:
+                continue
+            arquivos.append((st.st_mtime, st.st_size, caminho))
+            total += st.st_size
+
+        arquivos.sort()
+        restantes = len(arquivos)
+        for _, tamanho, caminho in arquivos:
+            if total <= self.max_bytes and restantes <= self.max_entradas:
+                break
+            caminho.unlink(missing_ok=True)
+            total -= tamanho
+            restantes -= 1
@@ -0,0 +1,112 @@
+"""
+Pool de execução para renderização de PDFs fora do event loop.
+
+O ReportLab é CPU-bound e síncrono: rodá-lo dentro do handler trava o loop do
+uvicorn durante todo o build. O pool executa os jobs num ProcessPoolExecutor
+(ou ThreadPoolExecutor, configurável) com número limitado de jobs em andamento,
+timeout por job e rejeição imediata (503) quando saturado.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import Settings
+from app.domain.exceptions import ServicoIndisponivelException
+from app.infrastructure.metrics import PDF_RENDER_DURACAO
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderPool:
+    """
+    Executor limitado para jobs de renderização.
+
+    `max_workers` jobs rodam em paralelo e até `max_fila` aguardam na fila do
+    executor; acima disso a submissão falha com ServicoIndisponivelException.
+    O slot de um job só é liberado quando ele realmente termina, mesmo que o
+    chamador tenha desistido por timeout, para que o limite reflita o trabalho
+    ainda ocupando o executor.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        max_workers: int,
+        max_fila: int,
+        timeout_segundos: float,
+    ):
+        self.executor = executor
+        self.limite = max_workers + max_fila
+        self.timeout_segundos = timeout_segundos
+        self._em_andamento = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "PdfRenderPool":
+        if settings.pdf_executor == "thread":
+            executor: Executor = ThreadPoolExecutor(
+                max_workers=settings.pdf_max_workers, thread_name_prefix="pdf"
+            )
+        else:
+            # spawn: não herda threads/sockets do processo do uvicorn
+            executor = ProcessPoolExecutor(
+                max_workers=settings.pdf_max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        logger.info(
+            "Pool de PDF iniciado",
+            extra={
+                "executor": settings.pdf_executor,
+                "max_workers": settings.pdf_max_workers,
+                "max_fila": settings.pdf_max_fila,
+            },
+        )
+        return cls(
+            executor,
+            max_workers=settings.pdf_max_workers,
+            max_fila=settings.pdf_max_fila,
+            timeout_segundos=settings.pdf_timeout_segundos,
+        )
+
+    @property
+    def em_andamento(self) -> int:
+        return self._em_andamento
+
+    def _liberar(self, _future: Optional[Future] = None) -> None:
+        self._em_andamento -= 1
+
+    async def executar(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Executa `func(*args)` no executor. Os argumentos precisam ser picklable
+        quando o executor é de processos.
+        """
+        if self._em_andamento >= self.limite:
+            raise ServicoIndisponivelException(
+                "Geração de PDF sobrecarregada. Tente novamente em instantes."
+            )
+
+        self._em_andamento += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.executor.submit(func, *args)
+        except Exception:
+            self._em_andamento -= 1
+            raise
+        # Liberação no thread do loop, independente de quem esperou o resultado
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(self._liberar, f))
+
+        inicio = time.perf_counter()
+        try:
+            resultado = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout_segundos)
+            PDF_RENDER_DURACAO.observe(time.perf_counter() - inicio)
+            return resultado
+        except asyncio.TimeoutError:
+            # Jobs ainda na fila são cancelados; um job já em execução segue até o fim
+            future.cancel()
+            logger.warning("Timeout na geração de PDF", extra={"timeout": self.timeout_segundos})
+            raise ServicoIndisponivelException("Tempo limite excedido ao gerar o PDF.")
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
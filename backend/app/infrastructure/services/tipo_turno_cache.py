@@ -0,0 +1,110 @@
+"""
+Cache em memória da resolução nome -> tipo de turno (por processo).
+
+Criar turno resolve o texto digitado pelo usuário para um tipo cadastrado, e
+os tipos quase nunca mudam. As entradas são por usuário, com o nome
+normalizado como na busca do repositório (lower), em ordem LRU e com TTL; "não existe" também é
+guardado, já que a maioria dos turnos usa tipo livre.
+
+Escritas ORM em tipos_turno neste processo invalidam os nomes do usuário no
+commit (eventos do SQLAlchemy); escritas em outros processos ou por SQL direto
+passam a valer quando a entrada expira.
+"""
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import Settings
+from app.domain.entities.tipo_turno import TipoTurno
+from app.infrastructure.database import models
+
+EVENTOS_ESCRITA = ("after_insert", "after_update", "after_delete")
+
+
+class TipoTurnoCache:
+    """
+    Implementa TipoTurnoCachePort.
+    """
+
+    def __init__(
+        self,
+        max_entradas: int,
+        ttl_segundos: float,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self.relogio = relogio
+        self._entradas: "OrderedDict[Tuple[int, str], Tuple[Optional[TipoTurno], float]]" = OrderedDict()
+        # Usuários com tipos alterados na transação corrente de cada sessão
+        self._chave_sessao = f"tipos_turno_alterados:{id(self)}"
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "TipoTurnoCache":
+        return cls(
+            max_entradas=settings.tipo_turno_cache_max_entradas,
+            ttl_segundos=settings.tipo_turno_cache_ttl_segundos,
+        )
+
+    @staticmethod
+    def _chave(telegram_user_id: int, nome: str) -> Tuple[int, str]:
+        # Mesma normalização da busca no repositório (lower(nome) = nome.lower()):
+        # nomes que o banco diferencia não podem dividir a entrada
+        return telegram_user_id, nome.lower()
+
+    async def resolver(
+        self,
+        telegram_user_id: int,
+        nome: str,
+        buscar: Callable[[], Awaitable[Optional[TipoTurno]]],
+    ) -> Optional[TipoTurno]:
+        chave = self._chave(telegram_user_id, nome)
+        entrada = self._entradas.get(chave)
+        if entrada is not None:
+            tipo, expira_em = entrada
+            if self.relogio() < expira_em:
+                self._entradas.move_to_end(chave)
+                return tipo
+            del self._entradas[chave]
+
+        tipo = await buscar()
+        self._entradas[chave] = (tipo, self.relogio() + self.ttl_segundos)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+        return tipo
+
+    def invalidar(self, telegram_user_id: int) -> None:
+        # Varredura linear: escritas em tipos_turno são raras
+        for chave in [c for c in self._entradas if c[0] == telegram_user_id]:
+            del self._entradas[chave]
+
+    # Invalidação por eventos do ORM
+
+    def escutar_escritas(self) -> None:
+        """Passa a invalidar o usuário quando uma transação que alterou tipos_turno faz commit."""
+        for nome in EVENTOS_ESCRITA:
+            event.listen(models.TipoTurno, nome, self._tipo_alterado)
+        event.listen(Session, "after_commit", self._apos_commit)
+        event.listen(Session, "after_rollback", self._apos_rollback)
+
+    def parar_de_escutar(self) -> None:
+        for nome in EVENTOS_ESCRITA:
+            event.remove(models.TipoTurno, nome, self._tipo_alterado)
+        event.remove(Session, "after_commit", self._apos_commit)
+        event.remove(Session, "after_rollback", self._apos_rollback)
+
+    def _tipo_alterado(self, mapper, connection, target: models.TipoTurno) -> None:
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault(self._chave_sessao, set()).add(target.telegram_user_id)
+
+    def _apos_commit(self, session: Session) -> None:
+        alterados: Set[int] = session.info.pop(self._chave_sessao, set())
+        for telegram_user_id in alterados:
+            self.invalidar(telegram_user_id)
+
+    def _apos_rollback(self, session: Session) -> None:
+        session.info.pop(self._chave_sessao, None)
@@ -1,53 +1,93 @@
+import asyncio
 import logging
-from app.infrastructure.database.session import AsyncSessionLocal
+from typing import List
+from app.infrastructure.database.session import AsyncSessionLocal, configurar_rls
 from app.infrastructure.database.uow import SqlAlchemyUnitOfWork
 from app.infrastructure.external.caldav_service import CalDAVService
+from app.infrastructure.metrics import CALDAV_SYNC_TURNOS
+from app.infrastructure.tasks.registro import tarefa
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
-async def sync_turn_caldav_background(turno_id: int):
+# Comandos do mesmo usuário enfileirados dentro desta janela viram um único lote
+JANELA_AGRUPAMENTO_SEGUNDOS = 2.0
+
+
+@tarefa(
+    "caldav.sync_turnos",
+    agrupar_por="telegram_user_id",
+    mesclar="turno_ids",
+    janela_segundos=JANELA_AGRUPAMENTO_SEGUNDOS,
+)
+async def sync_turnos_caldav_background(telegram_user_id: int, turno_ids: List[int]):
     """
-    Background task to sync a turno with CalDAV.
+    Background task to sync a user's turnos with CalDAV.
     Creates its own independent database session and UoW.
+
+    Um ciclo por lote: uma query para os turnos, uma verificação de assinatura,
+    os PUTs pela mesma conexão CalDAV (só dos eventos que mudaram) e um único
+    commit com o novo estado (UID, URL, ETag, hash).
+    Falhas são propagadas depois de gravar o que deu certo: na fila persistente
+    o worker reagenda o job com backoff até esgotar as tentativas.
     """
-    logger.info(f"Starting background CalDAV sync for turno {turno_id}")
-    
+    settings = get_settings()
+    if not settings.caldav_url:
+        logger.info("CalDAV não configurado. Sync ignorada.", extra={"telegram_user_id": telegram_user_id})
+        return
+
+    logger.info(
+        "Iniciando sync CalDAV em lote",
+        extra={"telegram_user_id": telegram_user_id, "turnos": len(turno_ids)},
+    )
+
     async with AsyncSessionLocal() as session:
         uow = SqlAlchemyUnitOfWork(session)
-        settings = get_settings()
-        # Instantiate service (assuming simple init or factory)
-        # Note: CalDAVService might need settings injection
-        calendar_service = CalDAVService(settings) 
-        
-        async with uow:            
+        calendar_service = CalDAVService(settings)
+
+        async with uow:
+            # Sessão própria: o contexto RLS precisa ser definido aqui
+            await configurar_rls(session, telegram_user_id)
+
+            # 1. Check Subscription (Double check, although use case checks it)
+            assinatura = await uow.assinaturas.get_by_user_id(telegram_user_id)
+            if not assinatura or assinatura.is_free:
+                logger.info(f"User {telegram_user_id} is Free/NoSub. Skipping sync.")
+                return
+
+            # 2. Fetch Turnos (removidos nesse meio tempo são ignorados) e estado da última sync
+            turnos = await uow.turnos.buscar_por_ids(turno_ids, telegram_user_id)
+            if not turnos:
+                logger.warning(f"Turnos {turno_ids} not found during background sync.")
+                return
+            anteriores = await uow.turnos.buscar_sincronizacoes(turno_ids, telegram_user_id)
+
+            # 3. Sync (cliente caldav é bloqueante: fora do event loop); sem mudança no hash, sem requisição
             try:
-                # 1. Fetch Turno
-                turno = await uow.turnos.get_by_id(turno_id)
-                if not turno:
-                    logger.warning(f"Turno {turno_id} not found during background sync.")
-                    return
-                
-                # 2. Check Subscription (Double check, although use case checks it)
-                # Optimization: We can trust the caller to only enqueue if valid, 
-                # but fetching subscription ensures we have fresh data.
-                assinatura = await uow.assinaturas.get_by_user_id(turno.telegram_user_id)
-                if not assinatura or assinatura.is_free:
-                    logger.info(f"User {turno.telegram_user_id} is Free/NoSub. Skipping sync.")
-                    return
-
-                # 3. Sync
-                new_uid = calendar_service.sync_event(turno)
-                
-                # 4. Update if UID changed
-                if new_uid and new_uid != turno.event_uid:
-                    turno.event_uid = new_uid
-                    await uow.turnos.atualizar(turno)
-                    await uow.commit()
-                    logger.info(f"Turno {turno_id} synced successfully. UID: {new_uid}")
-                else:
-                    logger.info(f"Turno {turno_id} sync completed (no UID change).")
-
-            except Exception as e:
-                logger.error(f"Failed to sync CalDAV for turno {turno_id} in background: {e}", exc_info=True)
-                # No re-raise, background task end.
+                estados, erros = await asyncio.to_thread(calendar_service.sincronizar_lote, turnos, anteriores)
+            except Exception:
+                CALDAV_SYNC_TURNOS.labels("falha").inc(len(turnos))
+                raise
+
+            # 4. Persist new remote state in one transaction
+            alterados = [e for turno_id, e in estados.items() if anteriores.get(turno_id) != e]
+            if alterados:
+                await uow.turnos.salvar_sincronizacoes(telegram_user_id, alterados)
+                await uow.commit()
+
+    CALDAV_SYNC_TURNOS.labels("enviado").inc(len(alterados))
+    CALDAV_SYNC_TURNOS.labels("inalterado").inc(len(estados) - len(alterados))
+    CALDAV_SYNC_TURNOS.labels("falha").inc(len(erros))
+    logger.info(
+        "Sync CalDAV em lote concluída",
+        extra={
+            "telegram_user_id": telegram_user_id,
+            "enviados": len(alterados),
+            "inalterados": len(estados) - len(alterados),
+            "falhas": len(erros),
+        },
+    )
+    if erros:
+        turno_id, erro = next(iter(erros.items()))
+        raise RuntimeError(f"{len(erros)} turno(s) não sincronizados (turno {turno_id}: {erro})") from erro
+
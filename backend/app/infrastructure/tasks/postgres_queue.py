@@ -0,0 +1,235 @@
+"""
+Fila de tarefas persistente na tabela `jobs`.
+
+Enfileirar é um `session.add` na sessão da requisição: o job é gravado no mesmo
+commit dos dados que o originaram (nada é enfileirado se a transação falhar) e
+sobrevive a restarts. O consumo fica com `python -m app.worker`, que pode rodar
+em várias réplicas: cada uma reivindica jobs com FOR UPDATE SKIP LOCKED e marca
+um lease (`travado_ate`); jobs com lease vencido voltam a ser elegíveis.
+
+Jobs de tarefas agrupáveis (ver registro) recebem uma `chave_agrupamento`: ao
+reivindicar um deles, o worker funde nele os demais pendentes com a mesma chave
+(só jobs que ainda não foram tentados; retentativas seguem sozinhas).
+"""
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database.models import JobModel
+from app.infrastructure.tasks.registro import TAREFAS, definicao_da_funcao
+
+logger = logging.getLogger(__name__)
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+MORTO = "morto"
+
+
+def calcular_backoff(
+    tentativas: int,
+    base_segundos: float,
+    max_segundos: float,
+    jitter: float = 0.1,
+) -> float:
+    """
+    Atraso antes da próxima tentativa: base * 2^(tentativas-1), limitado a
+    `max_segundos`, com jitter proporcional para espalhar retries simultâneos.
+    """
+    atraso = min(max_segundos, base_segundos * (2 ** max(tentativas - 1, 0)))
+    return atraso * (1 + random.uniform(-jitter, jitter))
+
+
+@dataclass(frozen=True)
+class JobReivindicado:
+    id: int
+    tarefa: str
+    payload: Dict[str, Any]
+    tentativas: int
+    max_tentativas: int
+
+
+class PostgresJobQueue:
+    """
+    Implementa BackgroundTaskQueue gravando jobs na tabela `jobs`.
+
+    `func` precisa estar registrada com @tarefa e os argumentos precisam ser
+    serializáveis em JSON.
+    """
+
+    def __init__(self, session: AsyncSession, max_tentativas: int = 5):
+        self.session = session
+        self.max_tentativas = max_tentativas
+
+    def add_task(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        definicao = definicao_da_funcao(func)
+        agora = datetime.now(UTC)
+        chave = None
+        if definicao.agrupar_por:
+            if args:
+                raise ValueError(f"Tarefa agrupável '{definicao.nome}' recebe apenas kwargs")
+            chave = str(kwargs[definicao.agrupar_por])
+
+        self.session.add(
+            JobModel(
+                tarefa=definicao.nome,
+                payload={"args": list(args), "kwargs": kwargs},
+                chave_agrupamento=chave,
+                status=PENDENTE,
+                tentativas=0,
+                max_tentativas=self.max_tentativas,
+                executar_apos=agora + timedelta(seconds=definicao.janela_segundos),
+            )
+        )
+
+
+def _mesclar_payload(destino: Dict[str, Any], origem: Dict[str, Any], campo: str) -> Dict[str, Any]:
+    """Novo payload com a lista `campo` de `origem` anexada à de `destino`, sem repetições."""
+    itens = list(destino["kwargs"].get(campo, []))
+    for item in origem["kwargs"].get(campo, []):
+        if item not in itens:
+            itens.append(item)
+    return {**destino, "kwargs": {**destino["kwargs"], campo: itens}}
+
+
+async def reivindicar_jobs(
+    session: AsyncSession,
+    limite: int,
+    lease_segundos: float,
+) -> List[JobReivindicado]:
+    """
+    Reivindica até `limite` jobs prontos e faz commit, liberando os locks de linha.
+
+    Elegíveis: pendentes com `executar_apos` vencido e jobs em execução cujo
+    lease expirou (worker morto). A tentativa é contada já na reivindicação,
+    para que um job que derruba o worker também chegue ao estado morto.
+    """
+    agora = datetime.now(UTC)
+    stmt = (
+        select(JobModel)
+        .where(
+            or_(
+                and_(JobModel.status == PENDENTE, JobModel.executar_apos <= agora),
+                and_(JobModel.status == EXECUTANDO, JobModel.travado_ate < agora),
+            )
+        )
+        .order_by(JobModel.executar_apos)
+        .limit(limite)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(stmt)
+    jobs = result.scalars().all()
+
+    travado_ate = agora + timedelta(seconds=lease_segundos)
+    reivindicados: List[JobModel] = []
+    lideres: Dict[tuple, JobModel] = {}
+    for job in jobs:
+        if job.status == EXECUTANDO and job.tentativas >= job.max_tentativas:
+            # Lease venceu na última tentativa: não insiste num job que derruba o worker
+            job.status = MORTO
+            job.travado_ate = None
+            job.ultimo_erro = "Lease expirado na última tentativa"
+            logger.error("Job morto após lease expirado", extra={"job_id": job.id, "tarefa": job.tarefa})
+            continue
+
+        definicao = TAREFAS.get(job.tarefa)
+        # Só jobs ainda sem tentativas se fundem: um job em backoff ou retentado
+        # mantém as próprias tentativas e executar_apos, e turnos novos não
+        # herdam a última tentativa de outro job
+        if job.chave_agrupamento and definicao and definicao.mesclar and job.tentativas == 0:
+            grupo = (job.tarefa, job.chave_agrupamento)
+            lider = lideres.get(grupo)
+            if lider is not None:
+                lider.payload = _mesclar_payload(lider.payload, job.payload, definicao.mesclar)
+                await session.delete(job)
+                continue
+            lideres[grupo] = job
+
+        job.status = EXECUTANDO
+        job.tentativas += 1
+        job.travado_ate = travado_ate
+        reivindicados.append(job)
+
+    # Funde no líder os pendentes novos do mesmo grupo (inclusive os ainda dentro da janela)
+    ids_reivindicados = [job.id for job in jobs]
+    for (tarefa, chave), lider in lideres.items():
+        irmaos = await session.scalars(
+            select(JobModel)
+            .where(
+                JobModel.tarefa == tarefa,
+                JobModel.chave_agrupamento == chave,
+                JobModel.status == PENDENTE,
+                JobModel.tentativas == 0,
+                JobModel.id.not_in(ids_reivindicados),
+            )
+            .order_by(JobModel.id)
+            .with_for_update(skip_locked=True)
+        )
+        campo = TAREFAS[tarefa].mesclar
+        for irmao in irmaos.all():
+            lider.payload = _mesclar_payload(lider.payload, irmao.payload, campo)
+            await session.delete(irmao)
+
+    resultado = [
+        JobReivindicado(
+            id=job.id,
+            tarefa=job.tarefa,
+            payload=job.payload,
+            tentativas=job.tentativas,
+            max_tentativas=job.max_tentativas,
+        )
+        for job in reivindicados
+    ]
+    await session.commit()
+    return resultado
+
+
+async def concluir_job(session: AsyncSession, job_id: int) -> None:
+    await session.execute(
+        update(JobModel)
+        .where(JobModel.id == job_id, JobModel.status == EXECUTANDO)
+        .values(status=CONCLUIDO, travado_ate=None, ultimo_erro=None, atualizado_em=datetime.now(UTC))
+    )
+    await session.commit()
+
+
+async def falhar_job(
+    session: AsyncSession,
+    job: JobReivindicado,
+    erro: str,
+    backoff_base_segundos: float,
+    backoff_max_segundos: float,
+) -> str:
+    """
+    Registra a falha: reagenda com backoff exponencial ou, esgotadas as
+    tentativas, move o job para o estado morto. Retorna o novo status.
+    """
+    agora = datetime.now(UTC)
+    if job.tentativas >= job.max_tentativas:
+        valores: Dict[str, Any] = {"status": MORTO}
+    else:
+        atraso = calcular_backoff(job.tentativas, backoff_base_segundos, backoff_max_segundos)
+        valores = {"status": PENDENTE, "executar_apos": agora + timedelta(seconds=atraso)}
+
+    await session.execute(
+        update(JobModel)
+        .where(JobModel.id == job.id, JobModel.status == EXECUTANDO)
+        .values(travado_ate=None, ultimo_erro=erro[:4000], atualizado_em=agora, **valores)
+    )
+    await session.commit()
+    return valores["status"]
+
+
+async def limpar_concluidos(session: AsyncSession, reter_horas: float) -> int:
+    """Remove jobs concluídos mais antigos que `reter_horas`. Mortos ficam para inspeção."""
+    limite = datetime.now(UTC) - timedelta(hours=reter_horas)
+    result = await session.execute(
+        delete(JobModel).where(JobModel.status == CONCLUIDO, JobModel.atualizado_em < limite)
+    )
+    await session.commit()
+    return result.rowcount or 0
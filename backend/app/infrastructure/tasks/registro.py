@@ -0,0 +1,64 @@
+"""
+Registro de tarefas executáveis pelo worker.
+
+A fila persiste apenas o nome da tarefa e os argumentos (JSON); o worker
+resolve o nome para a função registrada aqui. Funções decoradas continuam
+chamáveis diretamente (ex.: via BackgroundTasks do FastAPI).
+
+Tarefas agrupáveis (`agrupar_por` + `mesclar`) recebem apenas kwargs: jobs
+pendentes da mesma tarefa com o mesmo valor de `agrupar_por` são fundidos pelo
+worker num único job, concatenando as listas do kwarg `mesclar`.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+
+@dataclass(frozen=True)
+class DefinicaoTarefa:
+    nome: str
+    func: Callable[..., Any]
+    agrupar_por: Optional[str] = None
+    mesclar: Optional[str] = None
+    janela_segundos: float = 0.0
+
+
+TAREFAS: Dict[str, DefinicaoTarefa] = {}
+
+
+def tarefa(
+    nome: str,
+    agrupar_por: Optional[str] = None,
+    mesclar: Optional[str] = None,
+    janela_segundos: float = 0.0,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Registra a função como tarefa de fila com o `nome` informado.
+
+    `janela_segundos` atrasa a execução de jobs agrupáveis para que comandos
+    enfileirados em sequência (ex.: vários turnos colados) caiam no mesmo lote.
+    """
+    if (agrupar_por is None) != (mesclar is None):
+        raise ValueError("agrupar_por e mesclar devem ser informados juntos")
+
+    def decorador(func: Callable[..., Any]) -> Callable[..., Any]:
+        if nome in TAREFAS and TAREFAS[nome].func is not func:
+            raise ValueError(f"Tarefa '{nome}' já registrada")
+        TAREFAS[nome] = DefinicaoTarefa(nome, func, agrupar_por, mesclar, janela_segundos)
+        func.nome_tarefa = nome
+        return func
+    return decorador
+
+
+def definicao_da_funcao(func: Callable[..., Any]) -> DefinicaoTarefa:
+    """Definição registrada de `func`; falha se a função não foi decorada com @tarefa."""
+    nome = getattr(func, "nome_tarefa", None)
+    if nome is None:
+        raise ValueError(f"{func!r} não está registrada como tarefa (use @tarefa)")
+    return TAREFAS[nome]
+
+
+def obter_tarefa(nome: str) -> DefinicaoTarefa:
+    try:
+        return TAREFAS[nome]
+    except KeyError:
+        raise LookupError(f"Tarefa desconhecida: {nome}") from None
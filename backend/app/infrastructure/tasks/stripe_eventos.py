@@ -0,0 +1,233 @@
+"""
+Processamento dos eventos de webhook do Stripe.
+
+O webhook (app.api.webhook) só verifica a assinatura, grava o evento em
+`stripe_eventos` (ignorando reenvios pelo ID) e enfileira um job; os handlers
+abaixo rodam no worker e só fazem flush (aplicar_evento faz um único commit).
+Como o Stripe não garante a ordem de entrega, cada evento traz o seu
+`created`: se a assinatura já recebeu um evento mais novo
+(`assinaturas.stripe_evento_em`), o evento é obsoleto e não é aplicado. A
+comparação é só com eventos do Stripe: `atualizado_em` também muda em escritas
+locais (assinatura FREE padrão de usuários legacy, trial), e um checkout pago
+não pode ser descartado por causa delas.
+"""
+import logging
+from datetime import datetime, timedelta, UTC
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.database.models import Assinatura, StripeEvento
+from app.infrastructure.database.session import AsyncSessionLocal
+from app.infrastructure.external.bot_notificador import invalidar_perfil_no_bot
+from app.infrastructure.metrics import STRIPE_EVENTOS
+from app.infrastructure.tasks.registro import tarefa
+
+logger = logging.getLogger(__name__)
+
+
+def momento_do_evento(created: int) -> datetime:
+    """`created` do Stripe (epoch) como datetime UTC sem fuso, como as colunas DateTime."""
+    return datetime.fromtimestamp(created, UTC).replace(tzinfo=None)
+
+
+def _obsoleto(assinatura: Assinatura, evento_em: Optional[datetime]) -> bool:
+    """A assinatura já recebeu um evento do Stripe mais novo que este."""
+    if evento_em is None or assinatura.stripe_evento_em is None:
+        return False
+    if assinatura.stripe_evento_em > evento_em:
+        logger.info(
+            "Evento do Stripe fora de ordem ignorado",
+            extra={
+                "telegram_user_id": assinatura.telegram_user_id,
+                "evento_em": evento_em.isoformat(),
+                "stripe_evento_em": assinatura.stripe_evento_em.isoformat(),
+            },
+        )
+        return True
+    return False
+
+
+def _registrar_evento(assinatura: Assinatura, evento_em: Optional[datetime]) -> None:
+    """Marca a assinatura como atualizada, guardando o momento do evento aplicado."""
+    assinatura.atualizado_em = datetime.now(UTC)
+    if evento_em is not None:
+        assinatura.stripe_evento_em = evento_em
+
+
+async def handle_checkout_completed(
+    session, db: AsyncSession, evento_em: Optional[datetime] = None
+) -> Optional[int]:
+    """
+    Processa checkout bem-sucedido: cria ou atualiza assinatura.
+
+    Retorna o telegram_user_id afetado (None se o evento não tinha ou se era
+    mais antigo que o estado atual da assinatura).
+    """
+    telegram_user_id = session.get('client_reference_id')
+    stripe_customer_id = session.get('customer')
+    stripe_subscription_id = session.get('subscription')
+
+    if not telegram_user_id:
+        logger.error("Webhook Error: telegram_user_id not found in checkout session")
+        return None
+
+    # Buscar assinatura existente (lock: eventos concorrentes da mesma assinatura)
+    stmt = select(Assinatura).where(Assinatura.telegram_user_id == int(telegram_user_id)).with_for_update()
+    result = await db.execute(stmt)
+    assinatura = result.scalar()
+
+    if not assinatura:
+        assinatura = Assinatura(
+            telegram_user_id=int(telegram_user_id),
+            stripe_customer_id=stripe_customer_id,
+            stripe_subscription_id=stripe_subscription_id,
+            status="active",
+            plano="pro",
+            criado_em=datetime.now(UTC),
+            atualizado_em=datetime.now(UTC),
+            stripe_evento_em=evento_em,
+        )
+        db.add(assinatura)
+        logger.info(
+            "Nova assinatura criada",
+            extra={"telegram_user_id": telegram_user_id, "plano": "pro"}
+        )
+    elif _obsoleto(assinatura, evento_em):
+        return None
+    else:
+        assinatura.stripe_customer_id = stripe_customer_id
+        assinatura.stripe_subscription_id = stripe_subscription_id
+        assinatura.status = "active"
+        assinatura.plano = "pro"
+        _registrar_evento(assinatura, evento_em)
+        logger.info(
+            "Assinatura atualizada para ativa",
+            extra={"telegram_user_id": telegram_user_id, "plano": "pro"}
+        )
+
+    await db.flush()
+    return int(telegram_user_id)
+
+
+async def handle_subscription_updated(
+    subscription, db: AsyncSession, evento_em: Optional[datetime] = None
+) -> Optional[int]:
+    """
+    Atualiza status da assinatura (ex: pagamento falhou, renovou).
+
+    Retorna o telegram_user_id da assinatura (None se não encontrada ou se o
+    evento era mais antigo que o estado atual).
+    """
+    stripe_subscription_id = subscription.get('id')
+    status = subscription.get('status')
+    current_period_end = subscription.get('current_period_end')
+
+    stmt = select(Assinatura).where(Assinatura.stripe_subscription_id == stripe_subscription_id).with_for_update()
+    result = await db.execute(stmt)
+    assinatura = result.scalar()
+
+    if assinatura and not _obsoleto(assinatura, evento_em):
+        assinatura.status = status
+        if current_period_end:
+            assinatura.data_fim = datetime.fromtimestamp(current_period_end)
+        _registrar_evento(assinatura, evento_em)
+        await db.flush()
+        logger.info(
+            "Status de assinatura atualizado",
+            extra={"stripe_subscription_id": stripe_subscription_id, "status": status}
+        )
+        return assinatura.telegram_user_id
+    return None
+
+
+async def handle_subscription_deleted(
+    subscription, db: AsyncSession, evento_em: Optional[datetime] = None
+) -> Optional[int]:
+    """
+    Assinatura cancelada. Retorna o telegram_user_id (None se não encontrada
+    ou se o evento era mais antigo que o estado atual).
+    """
+    stripe_subscription_id = subscription.get('id')
+
+    stmt = select(Assinatura).where(Assinatura.stripe_subscription_id == stripe_subscription_id).with_for_update()
+    result = await db.execute(stmt)
+    assinatura = result.scalar()
+
+    if assinatura and not _obsoleto(assinatura, evento_em):
+        assinatura.status = "canceled"
+        assinatura.plano = "free"
+        _registrar_evento(assinatura, evento_em)
+        await db.flush()
+        logger.info(
+            "Assinatura cancelada",
+            extra={"stripe_subscription_id": stripe_subscription_id}
+        )
+        return assinatura.telegram_user_id
+    return None
+
+
+HANDLERS: Dict[str, Callable[..., Awaitable[Optional[int]]]] = {
+    "checkout.session.completed": handle_checkout_completed,
+    "customer.subscription.updated": handle_subscription_updated,
+    "customer.subscription.deleted": handle_subscription_deleted,
+}
+
+
+async def aplicar_evento(db: AsyncSession, evento_id: str) -> Optional[int]:
+    """
+    Aplica um evento gravado e o marca como processado na mesma transação.
+
+    Os handlers só fazem flush: assinatura, processado_em e resultado vão no
+    único commit abaixo. O evento fica travado (FOR UPDATE) até esse commit:
+    um job repetido (lease vencido) espera e encontra o evento já processado,
+    e uma falha no meio não deixa o evento processado sem resultado. Retorna o
+    telegram_user_id cuja assinatura mudou, ou None.
+    """
+    evento = await db.get(StripeEvento, evento_id, with_for_update=True)
+    if evento is None or evento.processado_em is not None:
+        return None
+
+    evento.processado_em = datetime.now(UTC)
+    handler = HANDLERS.get(evento.tipo)
+    telegram_user_id = None
+    if handler is not None:
+        telegram_user_id = await handler(evento.payload, db, evento_em=evento.criado_stripe)
+    resultado = "aplicado" if telegram_user_id is not None else "ignorado"
+    evento.resultado = resultado
+    await db.commit()
+    STRIPE_EVENTOS.labels(resultado).inc()
+    return telegram_user_id
+
+
+@tarefa("stripe.processar_evento")
+async def processar_evento_stripe(evento_id: str) -> None:
+    """Tarefa do worker: aplica o evento e avisa o bot se o perfil mudou."""
+    async with AsyncSessionLocal() as db:
+        telegram_user_id = await aplicar_evento(db, evento_id)
+    if telegram_user_id is not None:
+        await invalidar_perfil_no_bot(telegram_user_id)
+
+
+async def limpar_eventos_processados(db: AsyncSession, reter_dias: float) -> int:
+    """
+    Remove eventos processados há mais de `reter_dias`.
+
+    O Stripe reenvia um evento por até 3 dias: a retenção precisa cobrir isso
+    para os reenvios continuarem caindo no conflito.
+    """
+    limite = datetime.now(UTC) - timedelta(days=reter_dias)
+    result = await db.execute(delete(StripeEvento).where(StripeEvento.processado_em < limite))
+    await db.commit()
+    return result.rowcount or 0
+
+
+def dados_do_evento(evento: Dict[str, Any]) -> Dict[str, Any]:
+    """Colunas de `stripe_eventos` a partir do JSON do evento."""
+    return {
+        "id": evento["id"],
+        "tipo": evento["type"],
+        "criado_stripe": momento_do_evento(evento["created"]),
+        "payload": evento["data"]["object"],
+    }
@@ -9,21 +9,47 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import Response
 
-from app.infrastructure.middleware import RLSMiddleware, InternalSecurityMiddleware
-from app.api import webhook, health, pages
+from app.infrastructure.middleware import (
+    RLSMiddleware,
+    InternalSecurityMiddleware,
+    MetricasMiddleware,
+    RequestIdMiddleware,
+)
+from app.api import webhook, health, metrics, pages
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routers import turnos, usuarios, relatorios, assinaturas, auth
+from app.api.routers import turnos, usuarios, relatorios, assinaturas, auth, calendario, dashboard
 from app.infrastructure.logger import setup_logging
 from app.domain.exceptions.freemium_exception import LimiteTurnosExcedidoException
+from app.infrastructure.services.pdf_render_pool import PdfRenderPool
+from app.infrastructure.services.pdf_cache import DiskPdfCache
+from app.infrastructure.services.feed_cache import MemoriaFeedCache
+from app.infrastructure.services.tipo_turno_cache import TipoTurnoCache
+from app.infrastructure.database.session import engine
+from app.infrastructure.metrics import FREEMIUM_REJEICOES, encerrar_processo, instrumentar_engine
+
+from app.core.config import get_settings
 
 # Configurar logs na inicialização
-setup_logging()
+setup_logging(
+    amostragem_info=get_settings().log_amostragem_info,
+    rotas_amostradas=get_settings().log_rotas_amostradas,
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Setup
+    settings = get_settings()
+    app.state.pdf_pool = PdfRenderPool.from_settings(settings)
+    app.state.pdf_cache = DiskPdfCache.from_settings(settings) if settings.pdf_cache_habilitado else None
+    app.state.feed_cache = MemoriaFeedCache.from_settings(settings)
+    app.state.tipo_turno_cache = TipoTurnoCache.from_settings(settings)
+    app.state.tipo_turno_cache.escutar_escritas()
+    instrumentar_engine(engine)
     yield
     # Cleanup
+    app.state.tipo_turno_cache.parar_de_escutar()
+    app.state.pdf_pool.shutdown()
+    encerrar_processo()
 
 app = FastAPI(
     title="Gestão de Turnos API",
@@ -36,6 +62,7 @@ app = FastAPI(
 
 @app.exception_handler(LimiteTurnosExcedidoException)
 async def freemium_exception_handler(request: Request, exc: LimiteTurnosExcedidoException):
+    FREEMIUM_REJEICOES.labels("turno").inc()
     return Response(
         content=f'{{"detail": "{str(exc)}"}}',
         status_code=403,
@@ -47,14 +74,16 @@ app.include_router(webhook.router)
 
 # Registrar Health Check e Pages (públicos)
 app.include_router(health.router)
+app.include_router(metrics.router)  # Protegido pelo Shared Secret
 app.include_router(pages.router)
 
 # Registrar middleware RLS
 app.add_middleware(RLSMiddleware)
 app.add_middleware(InternalSecurityMiddleware) # Security Last (First to execute)
+app.add_middleware(MetricasMiddleware)  # Por fora da segurança: conta também os 403
+app.add_middleware(RequestIdMiddleware)  # Antes de tudo que loga
 
 # Configurar CORS (Deve ser o último adicionado para ser o PRIMEIRO a executar)
-from app.core.config import get_settings
 settings = get_settings()
 
 if settings.backend_cors_origins:
@@ -66,7 +95,7 @@ if settings.backend_cors_origins:
         allow_headers=["*"],
     )
 
-from app.domain.exceptions import AcessoNegadoException
+from app.domain.exceptions import AcessoNegadoException, ServicoIndisponivelException
 
 @app.exception_handler(AcessoNegadoException)
 async def acesso_negado_handler(request: Request, exc: AcessoNegadoException):
@@ -77,6 +106,16 @@ async def acesso_negado_handler(request: Request, exc: AcessoNegadoException):
     )
 
 
+@app.exception_handler(ServicoIndisponivelException)
+async def servico_indisponivel_handler(request: Request, exc: ServicoIndisponivelException):
+    return Response(
+        content=f'{{"detail": "{str(exc)}"}}',
+        status_code=503,
+        media_type="application/json",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # =============================================================================
 # Rotas da API (Business Logic)
 # =============================================================================
@@ -87,3 +126,5 @@ app.include_router(usuarios.router, prefix="/usuarios", tags=["Usuários"])
 app.include_router(relatorios.router, prefix="/relatorios", tags=["Relatórios"])
 app.include_router(assinaturas.router, prefix="/assinaturas", tags=["Assinaturas"])
 app.include_router(auth.router, prefix="/auth", tags=["Autenticação"])
+app.include_router(calendario.router, prefix="/calendario", tags=["Calendário"])
+app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
@@ -1,7 +1,7 @@
 from datetime import date, time, datetime
 from typing import Optional, Literal
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class TipoTurnoBase(BaseModel):
@@ -71,6 +71,29 @@ class TurnoRead(BaseModel):
         )
 
 
+class TurnoPagina(BaseModel):
+    itens: list[TurnoRead]
+    next_cursor: Optional[str] = None
+
+
+class TurnoLoteCreate(BaseModel):
+    turnos: list[TurnoCreate] = Field(..., min_length=1, max_length=100)
+
+
+class TurnoLoteItemResultado(BaseModel):
+    indice: int
+    sucesso: bool
+    turno: Optional[TurnoRead] = None
+    erro: Optional[str] = None
+    codigo_erro: Optional[str] = None
+
+
+class TurnoLoteResultado(BaseModel):
+    criados: int
+    rejeitados: int
+    resultados: list[TurnoLoteItemResultado]
+
+
 class RelatorioDia(BaseModel):
     data: date
     total_minutos: int
@@ -110,6 +133,51 @@ class UsuarioRead(UsuarioBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TurnoResumo(BaseModel):
+    """Turno sem os timestamps, para payloads compactos."""
+    id: int
+    data_referencia: date
+    hora_inicio: time
+    hora_fim: time
+    duracao_minutos: int
+    tipo: Optional[str] = None
+    descricao_opcional: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DashboardUsuario(BaseModel):
+    telegram_user_id: int
+    nome: str
+    numero_funcionario: str
+
+
+class DashboardPlano(BaseModel):
+    status: str = "inactive"
+    plano: str = "free"
+    data_fim: Optional[datetime] = None
+    # None quando o plano não tem limite mensal
+    limite_turnos_mes: Optional[int] = None
+    turnos_disponiveis: Optional[int] = None
+
+
+class DashboardMes(BaseModel):
+    inicio: date
+    turnos: int
+    total_minutos: int
+
+
+class DashboardRead(BaseModel):
+    usuario: DashboardUsuario
+    plano: DashboardPlano
+    mes: DashboardMes
+    turnos_recentes: list[TurnoResumo]
+
+
+class CalendarioTokenRead(BaseModel):
+    token: str
+    url: str
+
+
 class CheckoutRequest(BaseModel):
     telegram_user_id: int
 
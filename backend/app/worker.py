@@ -0,0 +1,189 @@
+"""
+Worker da fila de tarefas persistente (tabela `jobs`).
+
+Uso:
+    python -m app.worker
+
+Pode rodar em quantas réplicas forem necessárias: a reivindicação usa
+FOR UPDATE SKIP LOCKED, então cada job é executado por um único worker.
+Falhas são reagendadas com backoff exponencial; esgotadas as tentativas, o job
+fica no estado `morto` com o último erro registrado.
+"""
+import asyncio
+import logging
+import signal
+import time
+from typing import Callable, Set
+
+from prometheus_client import start_http_server
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings, get_settings
+from app.infrastructure.database.session import AsyncSessionLocal, engine
+from app.infrastructure.external.caldav_service import limpar_cache_caldav
+from app.infrastructure.logger import request_id_ctx, setup_logging
+from app.infrastructure.metrics import instrumentar_engine, registro
+from app.infrastructure.tasks import caldav, stripe_eventos  # noqa: F401 - registra as tarefas
+from app.infrastructure.tasks.postgres_queue import (
+    JobReivindicado,
+    MORTO,
+    concluir_job,
+    falhar_job,
+    limpar_concluidos,
+    reivindicar_jobs,
+)
+from app.infrastructure.tasks.registro import obter_tarefa
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_LIMPEZA_SEGUNDOS = 3600
+
+
+class Worker:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        concorrencia: int,
+        intervalo_segundos: float,
+        lease_segundos: float,
+        backoff_base_segundos: float,
+        backoff_max_segundos: float,
+        reter_concluidos_horas: float,
+        reter_eventos_stripe_dias: float = 30.0,
+    ):
+        self.session_factory = session_factory
+        self.concorrencia = concorrencia
+        self.intervalo_segundos = intervalo_segundos
+        self.lease_segundos = lease_segundos
+        self.backoff_base_segundos = backoff_base_segundos
+        self.backoff_max_segundos = backoff_max_segundos
+        self.reter_concluidos_horas = reter_concluidos_horas
+        self.reter_eventos_stripe_dias = reter_eventos_stripe_dias
+        self._em_execucao: Set[asyncio.Task] = set()
+        self._ultima_limpeza = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings, session_factory: Callable[[], AsyncSession]) -> "Worker":
+        return cls(
+            session_factory,
+            concorrencia=settings.worker_concorrencia,
+            intervalo_segundos=settings.worker_intervalo_segundos,
+            lease_segundos=settings.worker_lease_segundos,
+            backoff_base_segundos=settings.jobs_backoff_base_segundos,
+            backoff_max_segundos=settings.jobs_backoff_max_segundos,
+            reter_concluidos_horas=settings.jobs_reter_concluidos_horas,
+            reter_eventos_stripe_dias=settings.stripe_eventos_reter_dias,
+        )
+
+    async def executar_job(self, job: JobReivindicado) -> None:
+        """Executa um job reivindicado e registra sucesso ou falha."""
+        log_extra = {"job_id": job.id, "tarefa": job.tarefa, "tentativa": job.tentativas}
+        # Cada job roda na própria task: os logs da tarefa saem com este id
+        request_id_ctx.set(f"job-{job.id}")
+        erro = None
+        try:
+            func = obter_tarefa(job.tarefa).func
+            # Timeout menor que o lease: o job não pode ser reivindicado por outro worker enquanto roda
+            await asyncio.wait_for(
+                func(*job.payload.get("args", []), **job.payload.get("kwargs", {})),
+                timeout=self.lease_segundos * 0.9,
+            )
+        except Exception as e:
+            erro = f"{type(e).__name__}: {e}"
+
+        try:
+            async with self.session_factory() as session:
+                if erro is None:
+                    await concluir_job(session, job.id)
+                    logger.info("Job concluído", extra=log_extra)
+                    return
+                status = await falhar_job(
+                    session, job, erro, self.backoff_base_segundos, self.backoff_max_segundos
+                )
+        except Exception:
+            # O lease expira e o job volta a ser elegível
+            logger.exception("Falha ao registrar resultado do job", extra=log_extra)
+            return
+
+        if status == MORTO:
+            logger.error("Job movido para o estado morto", extra={**log_extra, "erro": erro})
+        else:
+            logger.warning("Job falhou, nova tentativa agendada", extra={**log_extra, "erro": erro})
+
+    async def ciclo(self) -> int:
+        """Reivindica jobs até preencher a concorrência livre. Retorna quantos foram iniciados."""
+        livres = self.concorrencia - len(self._em_execucao)
+        if livres <= 0:
+            return 0
+
+        async with self.session_factory() as session:
+            jobs = await reivindicar_jobs(session, livres, self.lease_segundos)
+
+        for job in jobs:
+            task = asyncio.create_task(self.executar_job(job))
+            self._em_execucao.add(task)
+            task.add_done_callback(self._em_execucao.discard)
+        return len(jobs)
+
+    async def _limpar_se_necessario(self) -> None:
+        agora = time.monotonic()
+        if agora - self._ultima_limpeza < INTERVALO_LIMPEZA_SEGUNDOS:
+            return
+        self._ultima_limpeza = agora
+        async with self.session_factory() as session:
+            removidos = await limpar_concluidos(session, self.reter_concluidos_horas)
+            eventos = await stripe_eventos.limpar_eventos_processados(session, self.reter_eventos_stripe_dias)
+        if removidos:
+            logger.info("Jobs concluídos removidos", extra={"removidos": removidos})
+        if eventos:
+            logger.info("Eventos do Stripe antigos removidos", extra={"removidos": eventos})
+
+    async def rodar(self, parar: asyncio.Event) -> None:
+        logger.info("Worker iniciado", extra={"concorrencia": self.concorrencia})
+        while not parar.is_set():
+            try:
+                await self._limpar_se_necessario()
+                iniciados = await self.ciclo()
+            except Exception:
+                logger.exception("Erro ao reivindicar jobs")
+                iniciados = 0
+
+            # Fila vazia ou concorrência esgotada: espera um job terminar, o intervalo ou o sinal de parada
+            if iniciados == 0 or len(self._em_execucao) >= self.concorrencia:
+                espera = {asyncio.create_task(parar.wait()), *self._em_execucao}
+                _, pendentes = await asyncio.wait(
+                    espera, timeout=self.intervalo_segundos, return_when=asyncio.FIRST_COMPLETED
+                )
+                for t in pendentes - self._em_execucao:
+                    t.cancel()
+
+        # Encerramento gracioso: termina o que já foi reivindicado
+        if self._em_execucao:
+            logger.info("Aguardando jobs em execução", extra={"em_execucao": len(self._em_execucao)})
+            await asyncio.gather(*self._em_execucao, return_exceptions=True)
+        logger.info("Worker encerrado")
+
+
+async def main() -> None:
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, parar.set)
+
+    settings = get_settings()
+    instrumentar_engine(engine)
+    if settings.worker_metricas_porta:
+        # Servidor HTTP em thread própria; métricas da sync CalDAV e do pool
+        start_http_server(settings.worker_metricas_porta, registry=registro())
+
+    worker = Worker.from_settings(settings, AsyncSessionLocal)
+    try:
+        await worker.rodar(parar)
+    finally:
+        limpar_cache_caldav()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Benchmark da sincronização CalDAV incremental (hash + ETag).
+
+Reproduz um mês de edições contra o servidor CalDAV stub de bench_caldav_sync:
+30 turnos criados no dia 1 e, a cada dia, um lote de sync com `--lote` turnos
+dos quais só `--edicoes` mudaram de fato (os demais são re-syncs sem mudança:
+retry de lote, turno salvo de novo, sync agrupada do mesmo usuário). No dia 15
+o evento de um turno é alterado direto no calendário (exercita o 412).
+
+Estratégias comparadas (requisições HTTP ao servidor CalDAV):
+
+  - antes (descoberta + busca + PUT): versão original. O stub responde a busca
+    por UID vazia, então os DELETEs da versão antiga nem entram na conta
+    (o número é um limite inferior)
+  - PUT sempre: cliente e calendário em cache, sem estado da última sync
+  - delta: estado em integracao_calendario (hash pula inalterados, If-Match)
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_caldav_delta
+    python -m benchmarks.bench_caldav_delta --lote 30 --edicoes 3 --latencia-ms 20
+"""
+import argparse
+import random
+import threading
+import time
+from dataclasses import replace
+from datetime import date, datetime, time as dtime, timedelta
+from http.server import ThreadingHTTPServer
+from typing import Callable, Dict
+
+from app.core.config import get_settings
+from app.domain.entities.sincronizacao_calendario import SincronizacaoCalendario
+from app.domain.entities.turno import Turno
+from app.infrastructure.external import caldav_service
+from app.infrastructure.external.caldav_service import CalDAVService
+from benchmarks.bench_caldav_sync import LegacyCalDAVService, StubCalDAV
+
+DIAS = 30
+
+
+def _turnos_iniciais() -> Dict[int, Turno]:
+    return {
+        i: Turno(
+            id=i, telegram_user_id=42, data_referencia=date(2025, 1, i),
+            hora_inicio=dtime(8, 0), hora_fim=dtime(16, 0), duracao_minutos=480, tipo="Hospital",
+            criado_em=datetime(2025, 1, 1), atualizado_em=datetime(2025, 1, 1),
+        )
+        for i in range(1, DIAS + 1)
+    }
+
+
+def _roteiro(lote: int, edicoes: int, semente: int) -> list[tuple[list[int], list[int]]]:
+    """Por dia: (turnos no lote de sync, turnos efetivamente editados)."""
+    rng = random.Random(semente)
+    dias = []
+    for _ in range(DIAS):
+        no_lote = rng.sample(range(1, DIAS + 1), lote)
+        dias.append((no_lote, no_lote[:edicoes]))
+    return dias
+
+
+def _replay(
+    nome: str,
+    sincronizar: Callable[[Turno, SincronizacaoCalendario | None], SincronizacaoCalendario],
+    roteiro,
+    usar_estado: bool,
+) -> None:
+    turnos = _turnos_iniciais()
+    estados: Dict[int, SincronizacaoCalendario] = {}
+    for t in turnos.values():
+        estados[t.id] = sincronizar(t, None)
+        turnos[t.id].event_uid = estados[t.id].event_uid
+
+    StubCalDAV.contador.clear()
+    syncs = 0
+    t0 = time.perf_counter()
+    for dia, (no_lote, editados) in enumerate(roteiro, start=1):
+        for turno_id in editados:
+            t = turnos[turno_id]
+            fim = (datetime.combine(t.data_referencia, t.hora_fim) + timedelta(minutes=30)).time()
+            turnos[turno_id] = replace(t, hora_fim=fim, duracao_minutos=t.duracao_minutos + 30,
+                                       atualizado_em=datetime(2025, 1, 1) + timedelta(days=dia))
+        if dia == 15:
+            # Alteração feita direto no calendário: o ETag guardado deixa de valer
+            url = next(u for u in StubCalDAV.eventos if turnos[no_lote[-1]].event_uid in u)
+            StubCalDAV.eventos[url] = StubCalDAV.eventos[url] + b" "
+        for turno_id in no_lote:
+            anterior = estados.get(turno_id) if usar_estado else None
+            estados[turno_id] = sincronizar(turnos[turno_id], anterior)
+            syncs += 1
+    duracao = time.perf_counter() - t0
+
+    total = sum(StubCalDAV.contador.values())
+    detalhe = ", ".join(f"{m}={n}" for m, n in sorted(StubCalDAV.contador.items()))
+    print(f"{nome:<32} {total:6d} requisições  {total / syncs:5.2f}/sync  {duracao:7.2f}s   ({detalhe})")
+
+
+def main(lote: int, edicoes: int, latencia_ms: float, semente: int) -> None:
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), StubCalDAV)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    StubCalDAV.latencia_s = latencia_ms / 1000
+
+    settings = get_settings().model_copy(update={
+        "caldav_url": f"http://127.0.0.1:{servidor.server_address[1]}/",
+        "caldav_username": "leo",
+        "caldav_password": "x",
+        "caldav_calendar_path": "turnos",
+    })
+    roteiro = _roteiro(lote, edicoes, semente)
+    print(
+        f"{DIAS} dias, lote de {lote} turnos/dia com {edicoes} edições reais, "
+        f"latência simulada {latencia_ms}ms por requisição"
+    )
+    try:
+        _replay("antes (descoberta + busca + PUT)", LegacyCalDAVService(settings).sincronizar, roteiro, False)
+        StubCalDAV.eventos.clear()
+        _replay("PUT sempre", CalDAVService(settings).sincronizar, roteiro, False)
+        StubCalDAV.eventos.clear()
+        _replay("delta (hash + If-Match)", CalDAVService(settings).sincronizar, roteiro, True)
+    finally:
+        caldav_service.limpar_cache_caldav()
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lote", type=int, default=10)
+    parser.add_argument("--edicoes", type=int, default=2)
+    parser.add_argument("--latencia-ms", type=float, default=5.0)
+    parser.add_argument("--semente", type=int, default=7)
+    args = parser.parse_args()
+    main(args.lote, args.edicoes, args.latencia_ms, args.semente)
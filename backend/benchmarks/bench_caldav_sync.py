@@ -0,0 +1,213 @@
+"""
+Benchmark da sincronização CalDAV: requisições HTTP e latência por turno.
+
+Sobe um servidor CalDAV stub local (descoberta via PROPFIND, REPORT, PUT,
+DELETE, com atraso configurável por requisição para simular a rede) e compara:
+
+  - antes: cliente novo + descoberta do principal/calendários a cada sync,
+           busca pelo UID e DELETE antes do PUT (cópia da versão antiga)
+  - depois: CalDAVService com cliente compartilhado e URL do calendário em cache
+           (sem estado anterior: sempre um PUT; ver bench_caldav_delta para o
+           caso com ETag/hash)
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_caldav_sync
+    python -m benchmarks.bench_caldav_sync --turnos 200 --latencia-ms 20
+"""
+import argparse
+import hashlib
+import statistics
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, time as dtime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import caldav
+from caldav import DAVClient
+
+from app.core.config import get_settings
+from app.domain.entities.turno import Turno
+from app.domain.entities.sincronizacao_calendario import SincronizacaoCalendario
+from app.infrastructure.external import caldav_service
+from app.infrastructure.external.caldav_service import CalDAVService
+
+CALENDARIO = "/calendars/leo/turnos/"
+
+PRINCIPAL = """<?xml version="1.0" encoding="utf-8"?>
+<d:multistatus xmlns:d="DAV:" xmlns:c="urn:ietf:params:xml:ns:caldav">
+ <d:response><d:href>{href}</d:href><d:propstat><d:prop>
+  <d:current-user-principal><d:href>/principals/leo/</d:href></d:current-user-principal>
+  <c:calendar-home-set><d:href>/calendars/leo/</d:href></c:calendar-home-set>
+  <d:resourcetype><d:collection/></d:resourcetype>
+ </d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>
+</d:multistatus>"""
+
+CALENDARIOS = """<?xml version="1.0" encoding="utf-8"?>
+<d:multistatus xmlns:d="DAV:" xmlns:c="urn:ietf:params:xml:ns:caldav">
+ <d:response><d:href>/calendars/leo/</d:href><d:propstat><d:prop>
+  <d:resourcetype><d:collection/></d:resourcetype>
+ </d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>
+ <d:response><d:href>/calendars/leo/pessoal/</d:href><d:propstat><d:prop>
+  <d:resourcetype><d:collection/><c:calendar/></d:resourcetype><d:displayname>Pessoal</d:displayname>
+ </d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>
+ <d:response><d:href>""" + CALENDARIO + """</d:href><d:propstat><d:prop>
+  <d:resourcetype><d:collection/><c:calendar/></d:resourcetype><d:displayname>Turnos</d:displayname>
+ </d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>
+</d:multistatus>"""
+
+VAZIO = """<?xml version="1.0" encoding="utf-8"?><d:multistatus xmlns:d="DAV:"/>"""
+
+
+def _etag(corpo: bytes) -> str:
+    return '"' + hashlib.md5(corpo).hexdigest() + '"'
+
+
+class StubCalDAV(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    contador: Counter = Counter()
+    latencia_s = 0.0
+    eventos: dict = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status: int, corpo: str = "", tipo: str = "application/xml") -> None:
+        dados = corpo.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", f'{tipo}; charset="utf-8"')
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_corpo(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _contar(self) -> None:
+        StubCalDAV.contador[self.command] += 1
+        if StubCalDAV.latencia_s:
+            time.sleep(StubCalDAV.latencia_s)
+
+    def do_PROPFIND(self):
+        self._contar()
+        self._ler_corpo()
+        if self.path.rstrip("/") == "/calendars/leo" and self.headers.get("Depth") == "1":
+            self._responder(207, CALENDARIOS)
+        else:
+            self._responder(207, PRINCIPAL.format(href=self.path))
+
+    def do_REPORT(self):
+        self._contar()
+        self._ler_corpo()
+        self._responder(207, VAZIO)
+
+    def do_PUT(self):
+        self._contar()
+        corpo = self._ler_corpo()
+        if not self.path.startswith(CALENDARIO):
+            self._responder(404)
+            return
+        atual = StubCalDAV.eventos.get(self.path)
+        if_match = self.headers.get("If-Match")
+        if if_match and (atual is None or if_match != _etag(atual)):
+            self._responder(412)
+            return
+        StubCalDAV.eventos[self.path] = corpo
+        self.send_response(201 if atual is None else 204)
+        self.send_header("ETag", _etag(corpo))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_DELETE(self):
+        self._contar()
+        StubCalDAV.eventos.pop(self.path, None)
+        self._responder(204)
+
+    def do_OPTIONS(self):
+        self._contar()
+        self.send_response(200)
+        self.send_header("DAV", "1, 2, calendar-access")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class LegacyCalDAVService(CalDAVService):
+    """Versão anterior: cliente e descoberta novos a cada sync, busca + DELETE + add_event."""
+
+    def _legacy_calendar(self) -> caldav.Calendar:
+        client = DAVClient(
+            url=self.settings.caldav_url.rstrip("/"),
+            username=self.settings.caldav_username,
+            password=self.settings.caldav_password,
+        )
+        return self._descobrir_calendario(client)
+
+    def sincronizar(self, turno: Turno, anterior=None) -> SincronizacaoCalendario:
+        cal = self._legacy_calendar()
+        ical = self._build_event(turno).to_ical()
+        if turno.event_uid:
+            for ev in cal.search(uid=turno.event_uid):
+                ev.delete()
+        new_ev = cal.add_event(ical)
+        # (vobject_instance exige o pacote vobject)
+        return SincronizacaoCalendario(turno_id=turno.id, event_uid=str(new_ev.id))
+
+
+def _turno(i: int, event_uid: Optional[str]) -> Turno:
+    return Turno(
+        id=i, telegram_user_id=42, data_referencia=date(2025, 1, 1 + i % 28),
+        hora_inicio=dtime(8, 0), hora_fim=dtime(16, 0), duracao_minutos=480, tipo="Hospital",
+        criado_em=datetime(2025, 1, 1), atualizado_em=datetime(2025, 1, 1), event_uid=event_uid,
+    )
+
+
+def _medir(nome: str, servico: CalDAVService, total: int) -> None:
+    uids: dict[int, str] = {}
+    # Aquecimento (também cria os eventos: o ciclo medido é de atualização)
+    for i in range(total):
+        uids[i] = servico.sincronizar(_turno(i, None)).event_uid
+
+    StubCalDAV.contador.clear()
+    tempos = []
+    for i in range(total):
+        t0 = time.perf_counter()
+        servico.sincronizar(_turno(i, uids[i]))
+        tempos.append((time.perf_counter() - t0) * 1000)
+
+    requisicoes = sum(StubCalDAV.contador.values())
+    tempos.sort()
+    detalhe = ", ".join(f"{m}={n}" for m, n in sorted(StubCalDAV.contador.items()))
+    print(
+        f"{nome:<28} {requisicoes / total:5.1f} req/turno   "
+        f"p50={statistics.median(tempos):7.2f}ms  p95={tempos[int(len(tempos) * 0.95) - 1]:7.2f}ms   ({detalhe})"
+    )
+
+
+def main(total: int, latencia_ms: float) -> None:
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), StubCalDAV)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    porta = servidor.server_address[1]
+    StubCalDAV.latencia_s = latencia_ms / 1000
+
+    settings = get_settings().model_copy(update={
+        "caldav_url": f"http://127.0.0.1:{porta}/",
+        "caldav_username": "leo",
+        "caldav_password": "x",
+        "caldav_calendar_path": "turnos",
+    })
+    print(f"{total} atualizações de turno, latência simulada {latencia_ms}ms por requisição")
+    try:
+        _medir("antes (descoberta por sync)", LegacyCalDAVService(settings), total)
+        _medir("depois (cliente + URL cache)", CalDAVService(settings), total)
+    finally:
+        caldav_service.limpar_cache_caldav()
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turnos", type=int, default=100)
+    parser.add_argument("--latencia-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    main(args.turnos, args.latencia_ms)
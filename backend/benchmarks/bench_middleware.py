@@ -0,0 +1,175 @@
+"""
+Benchmark de throughput dos middlewares (RLS + Shared Secret).
+
+Gera carga ASGI direta contra `app.main:app` (sem socket, sem servidor) em
+GET /turnos/recentes e compara:
+
+  - antes: implementações com BaseHTTPMiddleware (cópia das versões antigas)
+  - depois: middlewares ASGI puros de app.infrastructure.middleware
+
+O use case do endpoint é substituído por um stub em memória para isolar o custo
+da pilha HTTP/middlewares do banco de dados.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_middleware
+    python -m benchmarks.bench_middleware --requisicoes 20000 --concorrencia 64
+"""
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+from datetime import date, datetime, time as dtime
+
+from fastapi import Request
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.config import get_settings
+from app.api.deps import get_listar_turnos_recentes_use_case
+from app.domain.entities.turno import Turno
+from app.infrastructure.middleware import RLSMiddleware, InternalSecurityMiddleware
+from app.main import app
+
+
+class LegacyRLSMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        user_id = request.headers.get("X-Telegram-User-ID")
+        if user_id:
+            try:
+                request.state.telegram_user_id = int(user_id)
+            except ValueError:
+                pass
+        return await call_next(request)
+
+
+class LegacyInternalSecurityMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        if (
+            path.startswith("/docs") or
+            path.startswith("/redoc") or
+            path.startswith("/openapi.json") or
+            path.startswith("/health") or
+            path.startswith("/webhook") or
+            path.startswith("/auth")
+        ):
+            return await call_next(request)
+        settings = get_settings()
+        secret = request.headers.get("X-Internal-Secret")
+        if secret and secrets.compare_digest(secret, settings.internal_api_key):
+            return await call_next(request)
+        if request.headers.get("Authorization") or request.cookies.get("auth_token"):
+            return await call_next(request)
+        return JSONResponse(status_code=403, content={"detail": "Forbidden: Invalid or missing Internal Secret"})
+
+
+class _ListarRecentesStub:
+    def __init__(self):
+        self.turnos = [
+            Turno(
+                id=i, telegram_user_id=42, data_referencia=date(2025, 1, i + 1),
+                hora_inicio=dtime(8, 0), hora_fim=dtime(16, 0), duracao_minutos=480, tipo="Hospital",
+                criado_em=datetime(2025, 1, 1), atualizado_em=datetime(2025, 1, 1),
+            )
+            for i in range(5)
+        ]
+
+    async def execute(self, telegram_user_id: int, limit: int = 5):
+        return self.turnos[:limit]
+
+
+def _configurar_middlewares(seguranca, rls) -> None:
+    # Mesma ordem de app.main: Security executa primeiro
+    outros = [
+        m for m in app.user_middleware
+        if m.cls not in (RLSMiddleware, InternalSecurityMiddleware,
+                         LegacyRLSMiddleware, LegacyInternalSecurityMiddleware)
+    ]
+    app.user_middleware = outros + [Middleware(seguranca), Middleware(rls)]
+    app.middleware_stack = app.build_middleware_stack()
+
+
+def _scope() -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/turnos/recentes",
+        "raw_path": b"/turnos/recentes",
+        "root_path": "",
+        "query_string": b"limit=5",
+        "headers": [
+            (b"host", b"bench"),
+            (b"x-internal-secret", get_settings().internal_api_key.encode()),
+            (b"x-telegram-user-id", b"42"),
+        ],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+
+
+async def _requisicao() -> float:
+    recebido = False
+    status = 0
+
+    async def receive():
+        nonlocal recebido
+        if not recebido:
+            recebido = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # Cliente nunca desconecta
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    t0 = time.perf_counter()
+    await app(_scope(), receive, send)
+    duracao = (time.perf_counter() - t0) * 1000
+    assert status == 200, status
+    return duracao
+
+
+async def _carga(nome: str, total: int, concorrencia: int) -> None:
+    for _ in range(200):  # Aquecimento
+        await _requisicao()
+
+    tempos: list[float] = []
+    restantes = iter(range(total))
+
+    async def trabalhador():
+        for _ in restantes:
+            tempos.append(await _requisicao())
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - t0
+    tempos.sort()
+    print(
+        f"{nome:<32} {total / duracao:9.0f} req/s   "
+        f"p50={statistics.median(tempos):6.3f}ms   p99={tempos[int(len(tempos) * 0.99) - 1]:6.3f}ms"
+    )
+
+
+async def main(total: int, concorrencia: int) -> None:
+    app.dependency_overrides[get_listar_turnos_recentes_use_case] = _ListarRecentesStub
+    print(f"GET /turnos/recentes: {total} requisições, concorrência {concorrencia}")
+
+    _configurar_middlewares(LegacyInternalSecurityMiddleware, LegacyRLSMiddleware)
+    await _carga("antes (BaseHTTPMiddleware)", total, concorrencia)
+
+    _configurar_middlewares(InternalSecurityMiddleware, RLSMiddleware)
+    await _carga("depois (ASGI puro)", total, concorrencia)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=10_000)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.requisicoes, args.concorrencia))
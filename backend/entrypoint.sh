@@ -20,6 +20,13 @@ else
     echo "⚠️  alembic.ini não encontrado, pulando migrations..."
 fi
 
+# Métricas com vários workers do uvicorn (WEB_CONCURRENCY): cada processo grava
+# em PROMETHEUS_MULTIPROC_DIR, que precisa começar vazio a cada start
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 if [ $# -eq 0 ]; then
     echo "🚀 Iniciando aplicação..."
     exec uv run uvicorn app.main:app --host 0.0.0.0 --port 8000
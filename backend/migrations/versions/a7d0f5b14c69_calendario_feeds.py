@@ -0,0 +1,35 @@
+"""feat: tokens de assinatura do calendário (.ics)
+
+Revision ID: a7d0f5b14c69
+Revises: f6c9e4a03b58
+Create Date: 2026-10-16 17:42:08.512376
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d0f5b14c69'
+down_revision: Union[str, Sequence[str], None] = 'f6c9e4a03b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sem RLS: o token é resolvido antes de existir contexto de usuário
+    op.create_table('calendario_feeds',
+    sa.Column('token', sa.String(length=64), nullable=False),
+    sa.Column('telegram_user_id', sa.BigInteger(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('token'),
+    sa.UniqueConstraint('telegram_user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('calendario_feeds')
@@ -0,0 +1,69 @@
+"""perf: índices compostos por usuário em turnos
+
+Revision ID: b7d41c2e9a10
+Revises: 8e287e42b953
+Create Date: 2026-10-16 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41c2e9a10'
+down_revision: Union[str, Sequence[str], None] = '8e287e42b953'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE/DROP INDEX CONCURRENTLY não pode rodar dentro de transação
+    with op.get_context().autocommit_block():
+        # ### Step 1: Índices compostos (com INCLUDE para index-only scans) ###
+        op.create_index(
+            'ix_turnos_usuario_data_hora',
+            'turnos',
+            ['telegram_user_id', 'data_referencia', 'hora_inicio'],
+            unique=False,
+            postgresql_include=['id', 'hora_fim', 'duracao_minutos', 'tipo_turno_id', 'tipo_livre'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_turnos_usuario_criado_em',
+            'turnos',
+            ['telegram_user_id', sa.text('criado_em DESC')],
+            unique=False,
+            postgresql_include=['id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        # ### Step 2: Remover índices de coluna única agora redundantes ###
+        # ix_turnos_telegram_user_id é prefixo dos compostos, ix_turnos_id duplica a PK
+        # e ix_turnos_data_referencia nunca é usado sem o filtro por usuário.
+        op.drop_index(op.f('ix_turnos_telegram_user_id'), table_name='turnos',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_turnos_data_referencia'), table_name='turnos',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_turnos_id'), table_name='turnos',
+                      postgresql_concurrently=True, if_exists=True)
+
+    op.execute('ANALYZE turnos')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_turnos_id'), 'turnos', ['id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_turnos_data_referencia'), 'turnos', ['data_referencia'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_turnos_telegram_user_id'), 'turnos', ['telegram_user_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+        op.drop_index('ix_turnos_usuario_criado_em', table_name='turnos',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_turnos_usuario_data_hora', table_name='turnos',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,52 @@
+"""perf: id na chave do índice por usuário/data (paginação por cursor)
+
+Revision ID: b8e1a6c25d7a
+Revises: a7d0f5b14c69
+Create Date: 2026-10-17 09:12:44.318052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1a6c25d7a'
+down_revision: Union[str, Sequence[str], None] = 'a7d0f5b14c69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY não pode rodar dentro de transação
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_turnos_usuario_data_hora_id',
+            'turnos',
+            ['telegram_user_id', 'data_referencia', 'hora_inicio', 'id'],
+            unique=False,
+            postgresql_include=['hora_fim', 'duracao_minutos', 'tipo_turno_id', 'tipo_livre'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # O novo índice cobre todas as consultas do anterior
+        op.drop_index('ix_turnos_usuario_data_hora', table_name='turnos',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_turnos_usuario_data_hora',
+            'turnos',
+            ['telegram_user_id', 'data_referencia', 'hora_inicio'],
+            unique=False,
+            postgresql_include=['id', 'hora_fim', 'duracao_minutos', 'tipo_turno_id', 'tipo_livre'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index('ix_turnos_usuario_data_hora_id', table_name='turnos',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,53 @@
+"""perf: contador mensal de turnos por usuário
+
+Revision ID: c91e5f0a7d23
+Revises: b7d41c2e9a10
+Create Date: 2026-10-16 11:03:47.918204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91e5f0a7d23'
+down_revision: Union[str, Sequence[str], None] = 'b7d41c2e9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('turnos_contagem_mensal',
+    sa.Column('telegram_user_id', sa.BigInteger(), nullable=False),
+    sa.Column('ano_mes', sa.Date(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('telegram_user_id', 'ano_mes')
+    )
+
+    # ✅ Backfill a partir dos turnos existentes
+    op.execute("""
+        INSERT INTO turnos_contagem_mensal (telegram_user_id, ano_mes, total)
+        SELECT telegram_user_id, date_trunc('month', data_referencia)::date, count(*)
+        FROM turnos
+        GROUP BY telegram_user_id, date_trunc('month', data_referencia)::date
+    """)
+
+    # ✅ Habilitar RLS na tabela de contagem
+    op.execute("""
+        ALTER TABLE turnos_contagem_mensal ENABLE ROW LEVEL SECURITY;
+    """)
+
+    # ✅ Política: usuário só vê/atualiza os próprios contadores
+    op.execute("""
+        CREATE POLICY turnos_contagem_mensal_isolation ON turnos_contagem_mensal
+        USING (telegram_user_id = CAST(current_setting('app.current_user_id', TRUE) AS BIGINT))
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP POLICY IF EXISTS turnos_contagem_mensal_isolation ON turnos_contagem_mensal')
+    op.drop_table('turnos_contagem_mensal')
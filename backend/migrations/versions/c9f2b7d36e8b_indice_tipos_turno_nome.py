@@ -0,0 +1,39 @@
+"""perf: índice (telegram_user_id, lower(nome)) em tipos_turno
+
+Revision ID: c9f2b7d36e8b
+Revises: b8e1a6c25d7a
+Create Date: 2026-10-17 11:03:27.519408
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f2b7d36e8b'
+down_revision: Union[str, Sequence[str], None] = 'b8e1a6c25d7a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY não pode rodar dentro de transação
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tipos_turno_usuario_nome_lower',
+            'tipos_turno',
+            ['telegram_user_id', sa.text('lower(nome)')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tipos_turno_usuario_nome_lower', table_name='tipos_turno',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,80 @@
+"""fix: contador mensal de turnos mantido por trigger
+
+Revision ID: d2b4e9f17a3c
+Revises: c9f2b7d36e8b
+Create Date: 2026-10-17 12:41:09.204733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b4e9f17a3c'
+down_revision: Union[str, Sequence[str], None] = 'c9f2b7d36e8b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ✅ Um upsert por comando (não por linha): as tabelas de transição trazem
+    # todas as linhas afetadas, agregadas por (usuário, mês). SECURITY DEFINER:
+    # o contador é dado derivado e não depende do app.current_user_id de quem escreve.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION turnos_contagem_mensal_ajustar() RETURNS trigger
+        LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+        DECLARE
+            origem text;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                origem := 'SELECT telegram_user_id, data_referencia, 1 AS delta FROM novos';
+            ELSIF TG_OP = 'DELETE' THEN
+                origem := 'SELECT telegram_user_id, data_referencia, -1 AS delta FROM antigos';
+            ELSE
+                origem := 'SELECT telegram_user_id, data_referencia, 1 AS delta FROM novos '
+                          'UNION ALL SELECT telegram_user_id, data_referencia, -1 FROM antigos';
+            END IF;
+
+            EXECUTE 'INSERT INTO turnos_contagem_mensal AS c (telegram_user_id, ano_mes, total) '
+                    'SELECT telegram_user_id, date_trunc(''month'', data_referencia)::date, sum(delta) '
+                    'FROM (' || origem || ') d '
+                    'GROUP BY 1, 2 HAVING sum(delta) <> 0 '
+                    'ON CONFLICT (telegram_user_id, ano_mes) DO UPDATE SET total = c.total + EXCLUDED.total';
+            RETURN NULL;
+        END $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER turnos_contagem_mensal_insert AFTER INSERT ON turnos
+        REFERENCING NEW TABLE AS novos
+        FOR EACH STATEMENT EXECUTE FUNCTION turnos_contagem_mensal_ajustar()
+    """)
+    op.execute("""
+        CREATE TRIGGER turnos_contagem_mensal_delete AFTER DELETE ON turnos
+        REFERENCING OLD TABLE AS antigos
+        FOR EACH STATEMENT EXECUTE FUNCTION turnos_contagem_mensal_ajustar()
+    """)
+    op.execute("""
+        CREATE TRIGGER turnos_contagem_mensal_update AFTER UPDATE ON turnos
+        REFERENCING OLD TABLE AS antigos NEW TABLE AS novos
+        FOR EACH STATEMENT EXECUTE FUNCTION turnos_contagem_mensal_ajustar()
+    """)
+
+    # ✅ Recalcula: turnos gravados fora do repositório (SQL direto) não entraram na contagem
+    op.execute("DELETE FROM turnos_contagem_mensal")
+    op.execute("""
+        INSERT INTO turnos_contagem_mensal (telegram_user_id, ano_mes, total)
+        SELECT telegram_user_id, date_trunc('month', data_referencia)::date, count(*)
+        FROM turnos
+        GROUP BY telegram_user_id, date_trunc('month', data_referencia)::date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS turnos_contagem_mensal_update ON turnos')
+    op.execute('DROP TRIGGER IF EXISTS turnos_contagem_mensal_delete ON turnos')
+    op.execute('DROP TRIGGER IF EXISTS turnos_contagem_mensal_insert ON turnos')
+    op.execute('DROP FUNCTION IF EXISTS turnos_contagem_mensal_ajustar()')
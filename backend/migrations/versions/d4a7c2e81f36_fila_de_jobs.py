@@ -0,0 +1,54 @@
+"""feat: fila de jobs persistente (sync CalDAV)
+
+Revision ID: d4a7c2e81f36
+Revises: c91e5f0a7d23
+Create Date: 2026-10-16 14:22:05.381947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7c2e81f36'
+down_revision: Union[str, Sequence[str], None] = 'c91e5f0a7d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('tarefa', sa.String(length=100), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('tentativas', sa.Integer(), nullable=False),
+    sa.Column('max_tentativas', sa.Integer(), nullable=False),
+    sa.Column('executar_apos', sa.DateTime(), nullable=False),
+    sa.Column('travado_ate', sa.DateTime(), nullable=True),
+    sa.Column('ultimo_erro', sa.Text(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Índices parciais: o worker só varre pendentes e leases vencidos
+    op.create_index(
+        'ix_jobs_pendentes', 'jobs', ['executar_apos'],
+        unique=False, postgresql_where=sa.text("status = 'pendente'"),
+    )
+    op.create_index(
+        'ix_jobs_executando', 'jobs', ['travado_ate'],
+        unique=False, postgresql_where=sa.text("status = 'executando'"),
+    )
+    # Sem RLS: tabela de sistema, lida apenas pelo worker
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_executando', table_name='jobs', postgresql_where=sa.text("status = 'executando'"))
+    op.drop_index('ix_jobs_pendentes', table_name='jobs', postgresql_where=sa.text("status = 'pendente'"))
+    op.drop_table('jobs')
@@ -0,0 +1,38 @@
+"""feat: chave de agrupamento na fila de jobs
+
+Revision ID: e5b8d3f92a47
+Revises: d4a7c2e81f36
+Create Date: 2026-10-16 15:40:12.604518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d3f92a47'
+down_revision: Union[str, Sequence[str], None] = 'd4a7c2e81f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('chave_agrupamento', sa.String(length=200), nullable=True))
+    # Busca dos jobs irmãos a fundir no lote (sync CalDAV por usuário)
+    op.create_index(
+        'ix_jobs_agrupamento', 'jobs', ['tarefa', 'chave_agrupamento'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pendente' AND chave_agrupamento IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_jobs_agrupamento', table_name='jobs',
+        postgresql_where=sa.text("status = 'pendente' AND chave_agrupamento IS NOT NULL"),
+    )
+    op.drop_column('jobs', 'chave_agrupamento')
@@ -0,0 +1,47 @@
+"""feat: stripe_eventos (webhook idempotente, processado pelo worker)
+
+Revision ID: e7c3a91f5d20
+Revises: d2b4e9f17a3c
+Create Date: 2026-10-17 10:12:48.530261
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c3a91f5d20'
+down_revision: Union[str, Sequence[str], None] = 'd2b4e9f17a3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stripe_eventos',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('tipo', sa.String(length=100), nullable=False),
+    sa.Column('criado_stripe', sa.DateTime(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('recebido_em', sa.DateTime(), nullable=False),
+    sa.Column('processado_em', sa.DateTime(), nullable=True),
+    sa.Column('resultado', sa.String(length=20), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_stripe_eventos_processado_em', 'stripe_eventos', ['processado_em'],
+        unique=False, postgresql_where=sa.text("processado_em IS NOT NULL"),
+    )
+    # Sem RLS: tabela de sistema, escrita pelo webhook e lida pelo worker
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_stripe_eventos_processado_em', table_name='stripe_eventos',
+        postgresql_where=sa.text("processado_em IS NOT NULL"),
+    )
+    op.drop_table('stripe_eventos')
@@ -0,0 +1,30 @@
+"""fix: stripe_evento_em em assinaturas (ordem dos eventos do Stripe)
+
+Revision ID: f1d8b26c4e73
+Revises: e7c3a91f5d20
+Create Date: 2026-10-17 15:03:27.918406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1d8b26c4e73'
+down_revision: Union[str, Sequence[str], None] = 'e7c3a91f5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nulo até o primeiro evento aplicado: escritas locais (assinatura FREE
+    # padrão, trial) não contam para a ordem dos eventos
+    op.add_column('assinaturas', sa.Column('stripe_evento_em', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('assinaturas', 'stripe_evento_em')
@@ -0,0 +1,32 @@
+"""perf: etag, url e hash do evento em integracao_calendario
+
+Revision ID: f6c9e4a03b58
+Revises: e5b8d3f92a47
+Create Date: 2026-10-16 16:55:31.227094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c9e4a03b58'
+down_revision: Union[str, Sequence[str], None] = 'e5b8d3f92a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('integracao_calendario', sa.Column('url', sa.String(length=1024), nullable=True))
+    op.add_column('integracao_calendario', sa.Column('etag', sa.String(length=255), nullable=True))
+    op.add_column('integracao_calendario', sa.Column('conteudo_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('integracao_calendario', 'conteudo_hash')
+    op.drop_column('integracao_calendario', 'etag')
+    op.drop_column('integracao_calendario', 'url')
@@ -0,0 +1,95 @@
+import pytest
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.infrastructure.database import models
+
+
+@pytest.mark.asyncio
+async def test_dashboard_resumo_e_etag(db_session_rls, async_client):
+    db = db_session_rls
+    telegram_id = 999888111
+    headers = {
+        "X-Telegram-User-ID": str(telegram_id),
+        "X-Internal-Secret": get_settings().internal_api_key,
+    }
+
+    await db.execute(text(f"SELECT set_config('app.current_user_id', '{telegram_id}', false)"))
+    await db.execute(text(f"DELETE FROM turnos WHERE telegram_user_id = {telegram_id}"))
+    await db.execute(text(f"DELETE FROM assinaturas WHERE telegram_user_id = {telegram_id}"))
+    await db.execute(text(f"DELETE FROM usuarios WHERE telegram_user_id = {telegram_id}"))
+    await db.commit()
+
+    # Usuário inexistente
+    response = await async_client.get("/dashboard", headers=headers)
+    assert response.status_code == 404
+
+    db.add(models.Usuario(telegram_user_id=telegram_id, nome="Teste Dashboard", numero_funcionario="DASH-1"))
+    await db.commit()
+
+    # Sem turnos: uma linha só, lista vazia
+    response = await async_client.get("/dashboard", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["turnos_recentes"] == []
+
+    # O dashboard usa o mês corrente no fuso da aplicação
+    hoje = datetime.now(ZoneInfo(get_settings().timezone)).date()
+    criado = datetime(2025, 1, 1, 12, 0)
+    for i in range(6):
+        db.add(models.TurnoModel(
+            telegram_user_id=telegram_id,
+            data_referencia=hoje,
+            hora_inicio=time(8, 0),
+            hora_fim=time(9, 0),
+            duracao_minutos=60,
+            tipo_livre=f"T{i}",
+            criado_em=criado + timedelta(minutes=i),
+        ))
+    # Mês anterior: aparece nos recentes, não nos contadores do mês
+    db.add(models.TurnoModel(
+        telegram_user_id=telegram_id,
+        data_referencia=hoje.replace(day=1) - timedelta(days=1),
+        hora_inicio=time(8, 0),
+        hora_fim=time(12, 0),
+        duracao_minutos=240,
+        tipo_livre="Antigo",
+        criado_em=criado + timedelta(minutes=10),
+    ))
+    await db.commit()
+
+    response = await async_client.get("/dashboard", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["usuario"] == {
+        "telegram_user_id": telegram_id, "nome": "Teste Dashboard", "numero_funcionario": "DASH-1",
+    }
+    assert data["plano"]["plano"] == "free"
+    assert data["plano"]["limite_turnos_mes"] == get_settings().free_tier_max_shifts
+    assert data["plano"]["turnos_disponiveis"] == get_settings().free_tier_max_shifts - 6
+    assert data["mes"] == {"inicio": hoje.replace(day=1).isoformat(), "turnos": 6, "total_minutos": 360}
+    assert [t["tipo"] for t in data["turnos_recentes"]] == ["Antigo", "T5", "T4", "T3", "T2"]
+    assert "criado_em" not in data["turnos_recentes"][0]
+
+    etag = response.headers["ETag"]
+    nao_modificado = await async_client.get("/dashboard", headers={**headers, "If-None-Match": etag})
+    assert nao_modificado.status_code == 304
+    assert nao_modificado.headers["ETag"] == etag
+    assert nao_modificado.content == b""
+
+    # Assinatura Pro ativa: sem limite, e o ETag muda
+    db.add(models.Assinatura(
+        telegram_user_id=telegram_id, stripe_customer_id="cus_dashboard", status="active", plano="pro",
+    ))
+    await db.commit()
+    response = await async_client.get("/dashboard", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["plano"]["limite_turnos_mes"] is None
+    assert response.json()["plano"]["turnos_disponiveis"] is None
+
+    await db.execute(text(f"DELETE FROM turnos WHERE telegram_user_id = {telegram_id}"))
+    await db.execute(text(f"DELETE FROM assinaturas WHERE telegram_user_id = {telegram_id}"))
+    await db.execute(text(f"DELETE FROM usuarios WHERE telegram_user_id = {telegram_id}"))
+    await db.commit()
@@ -27,3 +27,16 @@ def test_logging_json(caplog):
     assert data["message"] == "Mensagem de teste"
     assert "timestamp" in data
     assert data["level"] == "INFO"
+
+def test_health_db_pool():
+    """O resumo do pool traz estado atual e contadores de checkout."""
+    from app.core.config import get_settings
+
+    client.get("/health")
+    assert client.get("/health/db-pool").status_code == 403
+
+    segredo = get_settings().internal_api_key
+    data = client.get("/health/db-pool", headers={"Authorization": f"Bearer {segredo}"}).json()
+    assert data["pool_size"] >= 1
+    assert data["checkouts"] >= 1
+    assert {"em_uso", "overflow", "timeouts", "espera_p95_ms"} <= data.keys()
@@ -0,0 +1,162 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from app.infrastructure.database.models import JobModel
+from app.infrastructure.tasks.postgres_queue import (
+    EXECUTANDO,
+    MORTO,
+    PENDENTE,
+    JobReivindicado,
+    falhar_job,
+    reivindicar_jobs,
+)
+
+
+@pytest.fixture
+async def Session(db_engine):
+    Session = async_sessionmaker(bind=db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as s:
+        await s.execute(delete(JobModel).where(JobModel.tarefa.like("teste.%")))
+        await s.commit()
+    yield Session
+    async with Session() as s:
+        await s.execute(delete(JobModel).where(JobModel.tarefa.like("teste.%")))
+        await s.commit()
+
+
+def _novo_job(**kwargs) -> JobModel:
+    valores = dict(
+        tarefa="teste.job", payload={"args": [], "kwargs": {}}, status=PENDENTE,
+        tentativas=0, max_tentativas=3, executar_apos=datetime.now(UTC) - timedelta(seconds=1),
+    )
+    valores.update(kwargs)
+    return JobModel(**valores)
+
+
+@pytest.mark.asyncio
+async def test_workers_concorrentes_nao_reivindicam_o_mesmo_job(Session):
+    async with Session() as s:
+        s.add_all([_novo_job() for _ in range(20)])
+        await s.commit()
+
+    async def reivindicar():
+        async with Session() as s:
+            return await reivindicar_jobs(s, limite=8, lease_segundos=60)
+
+    lotes = await asyncio.gather(*(reivindicar() for _ in range(4)))
+    ids = [job.id for lote in lotes for job in lote]
+    assert len(ids) == len(set(ids))
+
+    async with Session() as s:
+        result = await s.execute(
+            select(JobModel.status, JobModel.tentativas).where(JobModel.id.in_(ids))
+        )
+        assert all(status == EXECUTANDO and tentativas == 1 for status, tentativas in result.all())
+
+
+@pytest.mark.asyncio
+async def test_falha_reagenda_e_depois_morre(Session):
+    async with Session() as s:
+        s.add(_novo_job(max_tentativas=2))
+        await s.commit()
+
+    async with Session() as s:
+        [job] = await reivindicar_jobs(s, limite=1, lease_segundos=60)
+        assert await falhar_job(s, job, "erro 1", 60, 600) == PENDENTE
+        # Backoff: ainda não elegível
+        assert await reivindicar_jobs(s, limite=1, lease_segundos=60) == []
+
+    ultima = JobReivindicado(job.id, job.tarefa, job.payload, tentativas=2, max_tentativas=2)
+    async with Session() as s:
+        await s.execute(
+            JobModel.__table__.update().where(JobModel.id == job.id).values(status=EXECUTANDO)
+        )
+        assert await falhar_job(s, ultima, "erro 2", 60, 600) == MORTO
+        modelo = await s.get(JobModel, job.id)
+        assert modelo.ultimo_erro == "erro 2"
+
+
+@pytest.mark.asyncio
+async def test_lease_expirado_volta_para_a_fila(Session):
+    async with Session() as s:
+        s.add(_novo_job(status=EXECUTANDO, tentativas=1, travado_ate=datetime.now(UTC) - timedelta(seconds=5)))
+        await s.commit()
+
+    async with Session() as s:
+        [job] = await reivindicar_jobs(s, limite=1, lease_segundos=60)
+        assert job.tentativas == 2
+
+
+@pytest.mark.asyncio
+async def test_jobs_do_mesmo_usuario_sao_fundidos(Session):
+    from app.infrastructure.tasks.registro import tarefa, TAREFAS
+
+    @tarefa("teste.lote", agrupar_por="telegram_user_id", mesclar="turno_ids")
+    async def lote(telegram_user_id, turno_ids):
+        pass
+
+    try:
+        async with Session() as s:
+            for turno_id in (1, 2, 3):
+                s.add(_novo_job(
+                    tarefa="teste.lote", chave_agrupamento="42",
+                    payload={"args": [], "kwargs": {"telegram_user_id": 42, "turno_ids": [turno_id]}},
+                ))
+            # Ainda dentro da janela: também entra no lote
+            s.add(_novo_job(
+                tarefa="teste.lote", chave_agrupamento="42",
+                executar_apos=datetime.now(UTC) + timedelta(seconds=30),
+                payload={"args": [], "kwargs": {"telegram_user_id": 42, "turno_ids": [4]}},
+            ))
+            s.add(_novo_job(
+                tarefa="teste.lote", chave_agrupamento="99",
+                payload={"args": [], "kwargs": {"telegram_user_id": 99, "turno_ids": [5]}},
+            ))
+            await s.commit()
+
+        async with Session() as s:
+            jobs = await reivindicar_jobs(s, limite=1, lease_segundos=60)
+            assert [j.payload["kwargs"]["turno_ids"] for j in jobs] == [[1, 2, 3, 4]]
+
+            restantes = await s.scalars(select(JobModel).where(JobModel.tarefa == "teste.lote"))
+            assert sorted(j.chave_agrupamento for j in restantes.all()) == ["42", "99"]
+    finally:
+        TAREFAS.pop("teste.lote", None)
+
+
+@pytest.mark.asyncio
+async def test_jobs_retentados_nao_entram_na_fusao(Session):
+    from app.infrastructure.tasks.registro import tarefa, TAREFAS
+
+    @tarefa("teste.lote", agrupar_por="telegram_user_id", mesclar="turno_ids")
+    async def lote(telegram_user_id, turno_ids):
+        pass
+
+    def _lote(turno_id, **kwargs):
+        return _novo_job(
+            tarefa="teste.lote", chave_agrupamento="42",
+            payload={"args": [], "kwargs": {"telegram_user_id": 42, "turno_ids": [turno_id]}}, **kwargs,
+        )
+
+    backoff_ate = datetime.now(UTC) + timedelta(minutes=5)
+    try:
+        async with Session() as s:
+            # Retentado, na última tentativa: turnos novos não podem ir junto para o estado morto
+            s.add(_lote(1, tentativas=2, executar_apos=datetime.now(UTC) - timedelta(seconds=2)))
+            s.add(_lote(2))
+            # Em backoff: não é puxado para frente nem perde as tentativas
+            s.add(_lote(3, tentativas=1, executar_apos=backoff_ate))
+            await s.commit()
+
+        async with Session() as s:
+            jobs = await reivindicar_jobs(s, limite=10, lease_segundos=60)
+            assert [(j.payload["kwargs"]["turno_ids"], j.tentativas) for j in jobs] == [([1], 3), ([2], 1)]
+
+            em_backoff = await s.scalar(select(JobModel).where(JobModel.tarefa == "teste.lote", JobModel.status == PENDENTE))
+            assert (em_backoff.payload["kwargs"]["turno_ids"], em_backoff.tentativas) == ([3], 1)
+            assert em_backoff.executar_apos == backoff_ate.replace(tzinfo=None)
+    finally:
+        TAREFAS.pop("teste.lote", None)
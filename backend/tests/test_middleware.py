@@ -0,0 +1,58 @@
+"""
+Testes dos middlewares ASGI (RLS e Shared Secret).
+"""
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.core.config import get_settings
+from app.infrastructure.middleware import RLSMiddleware, InternalSecurityMiddleware
+
+
+async def _app_eco(scope, receive, send):
+    """App ASGI mínima que devolve o telegram_user_id visto em request.state."""
+    request = Request(scope, receive)
+    response = JSONResponse({"user_id": getattr(request.state, "telegram_user_id", None)})
+    await response(scope, receive, send)
+
+
+def _client() -> AsyncClient:
+    app = InternalSecurityMiddleware(RLSMiddleware(_app_eco))
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_secret_valido_propaga_user_id_para_state():
+    async with _client() as ac:
+        response = await ac.get("/turnos/recentes", headers={
+            "X-Internal-Secret": get_settings().internal_api_key,
+            "X-Telegram-User-ID": "42",
+        })
+    assert response.status_code == 200
+    assert response.json() == {"user_id": 42}
+
+
+@pytest.mark.asyncio
+async def test_sem_credenciais_bloqueia():
+    async with _client() as ac:
+        response = await ac.get("/turnos/recentes", headers={"X-Internal-Secret": "errado"})
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_rota_publica_e_cookie_de_auth_passam():
+    async with _client() as ac:
+        assert (await ac.get("/health")).status_code == 200
+        response = await ac.get("/usuarios/me", headers={"Cookie": "outro=1; auth_token=abc"})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_user_id_invalido_e_ignorado():
+    async with _client() as ac:
+        response = await ac.get("/turnos/recentes", headers={
+            "X-Internal-Secret": get_settings().internal_api_key,
+            "X-Telegram-User-ID": "abc",
+        })
+    assert response.json() == {"user_id": None}
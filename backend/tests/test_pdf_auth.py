@@ -69,7 +69,7 @@ async def test_pdf_endpoint_allowed_for_pro_user():
     
     # Mock PDF Service
     mock_pdf_service = MagicMock()
-    mock_pdf_service.gerar_pdf_mes.return_value = b"%PDF-1.4..."
+    mock_pdf_service.gerar_pdf_mes = AsyncMock(return_value=b"%PDF-1.4...")
     
     # 3. Override Dependencies
     app.dependency_overrides[get_assinatura_repo] = lambda: mock_assinatura_repo
@@ -88,5 +88,14 @@ async def test_pdf_endpoint_allowed_for_pro_user():
             # Should be 200 OK
             assert response.status_code == 200
             assert response.content == b"%PDF-1.4..."
+            etag = response.headers["ETag"]
+
+            # Same content: 304 without rendering again
+            response = await ac.get(
+                "/relatorios/mes/pdf?ano=2025&mes=1", headers={**headers, "If-None-Match": etag}
+            )
+            assert response.status_code == 304
+            assert response.content == b""
+            mock_pdf_service.gerar_pdf_mes.assert_awaited_once()
     finally:
          app.dependency_overrides = {}
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import get_settings
+from app.infrastructure.database.pool_metrics import PoolMedido, resumo_pool
+
+
+@pytest.mark.asyncio
+async def test_pool_medido_registra_espera_pico_e_timeout():
+    url = get_settings().database_url.replace("postgresql://", "postgresql+psycopg://")
+    engine = create_async_engine(url, poolclass=PoolMedido, pool_size=1, max_overflow=1, pool_timeout=0.2)
+    try:
+        async with engine.connect() as c1, engine.connect() as c2:
+            await c1.execute(text("SELECT 1"))
+            await c2.execute(text("SELECT 1"))
+            assert resumo_pool(engine.sync_engine.pool)["overflow"] == 1
+
+            with pytest.raises(PoolTimeoutError):
+                await engine.connect().start()
+
+            # Espera de verdade: a conexão volta ao pool enquanto o checkout aguarda
+            async def devolver():
+                await asyncio.sleep(0.05)
+                await c2.close()
+
+            tarefa = asyncio.create_task(devolver())
+            async with engine.connect() as c3:
+                await c3.execute(text("SELECT 1"))
+            await tarefa
+
+        resumo = resumo_pool(engine.sync_engine.pool)
+        assert resumo["checkouts"] == 3
+        assert resumo["timeouts"] == 1
+        assert resumo["pico_em_uso"] == 2
+        assert resumo["espera_media_ms"] >= 40 / 3  # o timeout não entra na média
+        assert resumo["em_uso"] == 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_checkout_stripe_nao_prende_conexao_nem_o_event_loop(async_client, monkeypatch):
+    from app.api.routers import assinaturas
+    from app.infrastructure.database.session import engine
+
+    chamadas = []
+
+    def criar_sessao(telegram_user_id):
+        # Roda fora do event loop: asyncio.get_running_loop() falha numa thread
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        chamadas.append((telegram_user_id, resumo_pool(engine.sync_engine.pool)["em_uso"]))
+        return "https://checkout.stripe.test/sessao"
+
+    monkeypatch.setattr(assinaturas.StripeService, "create_checkout_session", staticmethod(criar_sessao))
+    checkouts_antes = resumo_pool(engine.sync_engine.pool)["checkouts"]
+
+    resposta = await async_client.post(
+        "/assinaturas/checkout",
+        json={"telegram_user_id": 123},
+        headers={"X-Internal-Secret": get_settings().internal_api_key},
+    )
+
+    assert resposta.json() == {"url": "https://checkout.stripe.test/sessao"}
+    assert chamadas == [(123, 0)]
+    assert resumo_pool(engine.sync_engine.pool)["checkouts"] == checkouts_antes
@@ -5,7 +5,8 @@ from app.infrastructure.database import models
 from app.presentation import schemas
 from app.core.config import get_settings
 from sqlalchemy import text, select
-from datetime import datetime
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
 
 
 # Mock the API client to test the logic or test the endpoint directly via test client?
@@ -22,6 +23,7 @@ async def test_get_usuario_com_plano(db_session_rls, client): # Assuming client
     
     # Clean up
     await db.execute(text(f"SELECT set_config('app.current_user_id', '{telegram_id}', false)"))
+    await db.execute(text(f"DELETE FROM turnos WHERE telegram_user_id = {telegram_id}"))
     await db.execute(text(f"DELETE FROM usuarios WHERE telegram_user_id = {telegram_id}"))
     await db.execute(text(f"DELETE FROM assinaturas WHERE telegram_user_id = {telegram_id}"))
     await db.commit()
@@ -43,6 +45,13 @@ async def test_get_usuario_com_plano(db_session_rls, client): # Assuming client
         data_fim=datetime.now()
     )
     db.add(assinatura)
+    # Contador do mês: mês corrente no fuso da aplicação; o turno do mês anterior não conta
+    hoje = datetime.now(ZoneInfo(get_settings().timezone)).date()
+    for data in (hoje, hoje.replace(day=1) - timedelta(days=1)):
+        db.add(models.TurnoModel(
+            telegram_user_id=telegram_id, data_referencia=data, hora_inicio=time(8, 0),
+            hora_fim=time(16, 0), duracao_minutos=480,
+        ))
     await db.commit()
     
     # Test Endpoint
@@ -63,3 +72,4 @@ async def test_get_usuario_com_plano(db_session_rls, client): # Assuming client
     assert data["telegram_user_id"] == telegram_id
     assert data["assinatura_status"] == "active"
     assert data["assinatura_plano"] == "especial"
+    assert data["turnos_registrados_mes_atual"] == 1
@@ -1,13 +1,19 @@
 """
 Testes para Repositórios e Use Cases (substituindo antigo test_crud).
 """
+import dataclasses
 import pytest
 from datetime import date, time, datetime
-from sqlalchemy import text
+from sqlalchemy import select, text
+from sqlalchemy.orm import selectinload
 
 from app.domain.entities.turno import Turno
-from app.infrastructure.repositories.sqlalchemy_turno_repository import SqlAlchemyTurnoRepository
+from app.domain.entities.sincronizacao_calendario import SincronizacaoCalendario
+from app.domain.value_objects.cursor_turno import CursorTurno
+from app.infrastructure.database import models
+from app.infrastructure.repositories.sqlalchemy_turno_repository import SqlAlchemyTurnoRepository, _select_turnos
 from app.infrastructure.repositories.sqlalchemy_usuario_repository import SqlAlchemyUsuarioRepository
+from app.infrastructure.repositories.sqlalchemy_calendario_feed_repository import SqlAlchemyCalendarioFeedRepository
 from app.presentation import schemas
 
 class TestCalcularDuracaoMinutos:
@@ -116,6 +122,26 @@ class TestTurnoRepository:
         assert count_out == 0
 
 
+    async def test_contar_mes_acompanha_criacao_e_remocao(self, db_session_rls):
+        """Testa que o contador mensal (triggers de turnos) acompanha criar/deletar do repositório."""
+        db = db_session_rls
+        repo = SqlAlchemyTurnoRepository(db)
+        
+        user_id = 887
+        await db.execute(text("BEGIN"))
+        await db.execute(text(f"SELECT set_config('app.current_user_id', '{user_id}', true)"))
+
+        antes = await repo.contar_mes(user_id, date(2024, 9, 10))
+        t1 = await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024, 9, 1), hora_inicio=time(8, 0), hora_fim=time(12, 0), duracao_minutos=240, tipo="A"))
+        await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024, 9, 30), hora_inicio=time(8, 0), hora_fim=time(12, 0), duracao_minutos=240, tipo="B"))
+
+        assert await repo.contar_mes(user_id, date(2024, 9, 10)) == antes + 2
+
+        await repo.deletar(t1.id, user_id)
+        assert await repo.contar_mes(user_id, date(2024, 9, 10)) == antes + 1
+
+        await db.rollback()
+
     async def test_listar_turnos_periodo(self, db_session_rls):
         """Testa listar_por_periodo."""
         db = db_session_rls
@@ -167,6 +193,119 @@ class TestTurnoRepository:
         assert await repo.deletar(t.id, user_id) is True
         assert await repo.deletar(t.id, user_id) is False # Already deleted
 
+    async def test_buscar_por_ids_e_salvar_sincronizacoes(self, db_session_rls):
+        """Testa busca em lote e upsert do estado de sync CalDAV."""
+        db = db_session_rls
+        repo = SqlAlchemyTurnoRepository(db)
+
+        user_id = 444
+        await db.execute(text("BEGIN"))
+        await db.execute(text(f"SELECT set_config('app.current_user_id', '{user_id}', true)"))
+
+        t1 = await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024,1,1), hora_inicio=time(8,0), hora_fim=time(12,0), duracao_minutos=240, tipo="A", event_uid="antigo"))
+        t2 = await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024,1,2), hora_inicio=time(8,0), hora_fim=time(12,0), duracao_minutos=240, tipo="B"))
+
+        assert (await repo.buscar_sincronizacoes([t1.id, t2.id], user_id))[t1.id].url is None
+
+        novos = [
+            SincronizacaoCalendario(turno_id=t1.id, event_uid="novo-1", url="https://dav/1.ics", etag='"a"', conteudo_hash="h1"),
+            SincronizacaoCalendario(turno_id=t2.id, event_uid="novo-2", url="https://dav/2.ics", etag='"b"', conteudo_hash="h2"),
+            SincronizacaoCalendario(turno_id=999999999, event_uid="x"),
+        ]
+        await repo.salvar_sincronizacoes(user_id, novos)
+        db.expire_all()
+
+        turnos = await repo.buscar_por_ids([t1.id, t2.id, 999999999], user_id)
+        assert {t.id: t.event_uid for t in turnos} == {t1.id: "novo-1", t2.id: "novo-2"}
+        assert await repo.buscar_sincronizacoes([t1.id, t2.id, 999999999], user_id) == {
+            t1.id: novos[0], t2.id: novos[1]
+        }
+
+
+    async def test_listar_pagina_por_cursor(self, db_session_rls):
+        """Testa a paginação keyset em (data, hora de início, id)."""
+        db = db_session_rls
+        repo = SqlAlchemyTurnoRepository(db)
+
+        user_id = 442
+        await db.execute(text("BEGIN"))
+        await db.execute(text(f"SELECT set_config('app.current_user_id', '{user_id}', true)"))
+
+        criados = [
+            await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024,5,d), hora_inicio=time(h,0), hora_fim=time(23,0), duracao_minutos=60, tipo="A"))
+            for d, h in [(2, 8), (1, 8), (1, 8), (1, 20)]
+        ]
+        esperado = [criados[1].id, criados[2].id, criados[3].id, criados[0].id]
+
+        primeira = await repo.listar_pagina(user_id, date(2024, 5, 1), date(2024, 5, 31), limite=2)
+        assert [t.id for t in primeira] == esperado[:2]
+
+        segunda = await repo.listar_pagina(
+            user_id, date(2024, 5, 1), date(2024, 5, 31), limite=2, apos=CursorTurno.do_turno(primeira[-1])
+        )
+        assert [t.id for t in segunda] == esperado[2:]
+
+        await db.rollback()
+
+    async def test_iterar_e_versao_periodo(self, db_session_rls):
+        """Testa a iteração em streaming e o validador (max atualizado_em, total) do período."""
+        db = db_session_rls
+        repo = SqlAlchemyTurnoRepository(db)
+
+        user_id = 443
+        await db.execute(text("BEGIN"))
+        await db.execute(text(f"SELECT set_config('app.current_user_id', '{user_id}', true)"))
+
+        vazio = await repo.versao_periodo(user_id, date(2024, 3, 1), date(2024, 3, 31))
+        assert (vazio.ultima_alteracao, vazio.total) == (None, 0)
+
+        t2 = await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024,3,2), hora_inicio=time(8,0), hora_fim=time(12,0), duracao_minutos=240, tipo="B"))
+        t1 = await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024,3,1), hora_inicio=time(8,0), hora_fim=time(12,0), duracao_minutos=240, tipo="A"))
+        await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024,4,1), hora_inicio=time(8,0), hora_fim=time(12,0), duracao_minutos=240, tipo="C"))
+
+        iterados = [t async for t in repo.iterar_por_periodo(user_id, date(2024, 3, 1), date(2024, 3, 31))]
+        assert [t.id for t in iterados] == [t1.id, t2.id]
+        assert [t.tipo for t in iterados] == ["A", "B"]
+
+        versao = await repo.versao_periodo(user_id, date(2024, 3, 1), date(2024, 3, 31))
+        assert versao.total == 2
+        assert versao.ultima_alteracao == max(t1.atualizado_em, t2.atualizado_em)
+
+        await db.rollback()
+
+    async def test_leitura_core_igual_ao_orm(self, db_session_rls):
+        """A leitura com LEFT JOIN monta as mesmas entidades que os modelos ORM."""
+        db = db_session_rls
+        repo = SqlAlchemyTurnoRepository(db)
+
+        user_id = 445
+        await db.execute(text("BEGIN"))
+        await db.execute(text(f"SELECT set_config('app.current_user_id', '{user_id}', true)"))
+
+        tipo = models.TipoTurno(telegram_user_id=user_id, nome="UTI")
+        db.add(tipo)
+        await db.flush()
+        await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024,6,1), hora_inicio=time(8,0), hora_fim=time(12,0), duracao_minutos=240, tipo="UTI", tipo_id=tipo.id))
+        await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024,6,2), hora_inicio=time(8,0), hora_fim=time(12,0), duracao_minutos=240, tipo="Livre", event_uid="uid-1"))
+        await repo.criar(Turno(id=None, telegram_user_id=user_id, data_referencia=date(2024,6,3), hora_inicio=time(8,0), hora_fim=time(12,0), duracao_minutos=240))
+
+        orm = await db.scalars(
+            select(models.TurnoModel)
+            .options(selectinload(models.TurnoModel.tipo), selectinload(models.TurnoModel.integracao))
+            .where(models.TurnoModel.telegram_user_id == user_id)
+            .order_by(models.TurnoModel.data_referencia)
+        )
+        esperado = [repo._to_entity(m) for m in orm.all()]
+
+        core = await repo.listar_por_periodo(user_id, date(2024, 6, 1), date(2024, 6, 30))
+        assert core == esperado
+        assert [(t.tipo, t.tipo_id is not None, t.event_uid) for t in core] == [
+            ("UTI", True, None), ("Livre", False, "uid-1"), (None, False, None)
+        ]
+        assert await repo.buscar_por_id(core[1].id, user_id) == esperado[1]
+
+        await db.rollback()
+
 
 @pytest.mark.asyncio
 class TestUsuarioRepository:
@@ -180,3 +319,26 @@ class TestUsuarioRepository:
         
         resultado = await repo.buscar_por_telegram_id(333333)
         assert resultado is None
+
+
+@pytest.mark.asyncio
+class TestCalendarioFeedRepository:
+    """Testes para SqlAlchemyCalendarioFeedRepository."""
+
+    async def test_salvar_token_substitui_o_anterior(self, db_session):
+        db = db_session
+        repo = SqlAlchemyCalendarioFeedRepository(db)
+
+        await repo.salvar_token(222222, "token-antigo")
+        assert await repo.buscar_usuario_por_token("token-antigo") == 222222
+
+        await repo.salvar_token(222222, "token-novo")
+        assert await repo.buscar_usuario_por_token("token-antigo") is None
+        assert await repo.buscar_usuario_por_token("token-novo") == 222222
+
+        await db.rollback()
+
+
+def test_colunas_da_leitura_sem_orm_tem_os_nomes_dos_campos_de_turno():
+    # Turno(**row._mapping): cada campo precisa de uma coluna com o mesmo nome
+    assert set(_select_turnos().selected_columns.keys()) == {f.name for f in dataclasses.fields(Turno)}
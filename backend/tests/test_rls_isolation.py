@@ -3,9 +3,16 @@ Testes de isolamento RLS (Row-Level Security).
 
 Valida que as políticas PostgreSQL garantem isolamento de dados entre usuários.
 """
+import inspect
+
+import psycopg
 import pytest
+from psycopg import generators
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from app.core.config import get_settings
+from app.infrastructure.database.rls_connection import RlsAsyncConnection
+from app.infrastructure.database.session import configurar_rls
 
 
 @pytest.mark.asyncio
@@ -132,3 +139,76 @@ async def test_rls_policies_exist(db_session):
     
     assert 'usuarios_isolation' in policy_names or 'turnos_isolation' in policy_names, \
         f"Políticas de isolamento não encontradas. Políticas existentes: {policy_names}"
+
+
+@pytest.mark.asyncio
+async def test_configurar_rls_vai_no_begin_e_nao_vaza_no_pool(db_engine):
+    """Teste: o usuário do RLS acompanha cada transação da sessão e não passa para o próximo checkout."""
+    # Uma conexão só: todas as sessões reutilizam a mesma
+    engine = create_async_engine(
+        db_engine.url, pool_size=1, max_overflow=0,
+        connect_args={"async_creator_fn": RlsAsyncConnection.connect},
+    )
+    atual = text("SELECT current_setting('app.current_user_id', true)")
+    try:
+        async with AsyncSession(engine) as db:
+            await configurar_rls(db, 111)
+            assert await db.scalar(atual) == "111"
+            driver = (await db.connection()).sync_connection.connection.driver_connection
+            assert driver.rls_transacao == 111
+
+            # Nova transação depois do commit: SET LOCAL é reaplicado
+            await db.commit()
+            assert await db.scalar(atual) == "111"
+
+            # Troca no meio da transação
+            await configurar_rls(db, 222)
+            assert await db.scalar(atual) == "222"
+
+        async with AsyncSession(engine) as db:
+            await configurar_rls(db, 333)  # nenhuma query: fica pendente
+
+        async with AsyncSession(engine) as db:
+            assert await db.scalar(atual) in ("", None)
+    finally:
+        await engine.dispose()
+
+
+def test_psycopg_ainda_expoe_o_que_a_rls_connection_sobrescreve():
+    """
+    Teste: RlsAsyncConnection depende de internos do psycopg (pyproject fixa a
+    série 3.3). Numa atualização, este teste aponta o que mudou antes que o
+    set_config deixe de ir no BEGIN sem ninguém perceber.
+    """
+    assert inspect.isgeneratorfunction(psycopg.AsyncConnection._start_query)
+    assert list(inspect.signature(psycopg.AsyncConnection._start_query).parameters) == ["self"]
+    assert callable(psycopg.AsyncConnection._check_connection_ok)
+    assert callable(psycopg.AsyncConnection._get_tx_start_command)
+    assert callable(generators.execute)
+
+
+@pytest.mark.asyncio
+async def test_set_config_sai_no_mesmo_envio_do_begin(db_engine, tmp_path):
+    """Teste: o BEGIN e o set_config vão numa única mensagem, sem round trip próprio."""
+    url = db_engine.url.render_as_string(hide_password=False).replace("postgresql+psycopg://", "postgresql://")
+    conn = await RlsAsyncConnection.connect(url)
+    try:
+        # Atributos de instância lidos pelo _start_query da subclasse
+        assert isinstance(conn._autocommit, bool)
+        assert conn._pipeline is None
+        assert isinstance(conn.pgconn._encoding, str)
+
+        trace = tmp_path / "libpq.trace"
+        with open(trace, "w") as arquivo:
+            conn.pgconn.trace(arquivo.fileno())
+            assert conn.adiar_rls(444)
+            cur = await conn.execute("SELECT current_setting('app.current_user_id', true)")
+            assert (await cur.fetchone())[0] == "444"
+            conn.pgconn.untrace()
+        assert conn.rls_transacao == 444
+
+        enviados = [linha for linha in trace.read_text().splitlines() if "\tF\t" in linha]
+        assert "BEGIN; SELECT set_config('app.current_user_id', '444', true)" in enviados[0]
+        assert not any('"BEGIN"' in linha for linha in enviados)
+    finally:
+        await conn.close()
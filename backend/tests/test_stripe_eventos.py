@@ -0,0 +1,170 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from app.api import webhook
+from app.infrastructure.database.models import Assinatura, JobModel, StripeEvento
+from app.infrastructure.tasks.stripe_eventos import aplicar_evento
+
+TELEGRAM_ID = 777000555
+SEGREDO = "whsec_teste"
+
+
+def _assinar(corpo: bytes) -> str:
+    t = int(time.time())
+    v1 = hmac.new(SEGREDO.encode(), f"{t}.".encode() + corpo, hashlib.sha256).hexdigest()
+    return f"t={t},v1={v1}"
+
+
+def _evento(evento_id: str, tipo: str, created: int, objeto: dict) -> bytes:
+    return json.dumps({"id": evento_id, "type": tipo, "created": created, "data": {"object": objeto}}).encode()
+
+
+async def _limpar(Session):
+    async with Session() as s:
+        await s.execute(text(f"DELETE FROM assinaturas WHERE telegram_user_id = {TELEGRAM_ID}"))
+        await s.execute(delete(StripeEvento).where(StripeEvento.id.like("evt_teste_%")))
+        await s.execute(delete(JobModel).where(JobModel.payload["kwargs"]["evento_id"].astext.like("evt_teste_%")))
+        await s.commit()
+
+
+@pytest.fixture
+async def Session(db_engine, monkeypatch):
+    monkeypatch.setattr(webhook.settings, "stripe_webhook_secret", SEGREDO)
+    Session = async_sessionmaker(bind=db_engine, class_=AsyncSession, expire_on_commit=False)
+    await _limpar(Session)
+    yield Session
+    await _limpar(Session)
+
+
+async def _postar(async_client, corpo: bytes):
+    return await async_client.post(
+        "/webhook/stripe", content=corpo, headers={"Stripe-Signature": _assinar(corpo)}
+    )
+
+
+@pytest.mark.asyncio
+async def test_webhook_grava_uma_vez_e_enfileira(Session, async_client):
+    corpo = _evento(
+        "evt_teste_checkout", "checkout.session.completed", 1_700_000_000,
+        {"client_reference_id": str(TELEGRAM_ID), "customer": "cus_teste_evt", "subscription": "sub_teste_evt"},
+    )
+
+    assert (await _postar(async_client, corpo)).json() == {"status": "success"}
+    # Reenvio do Stripe: nem grava nem enfileira de novo
+    assert (await _postar(async_client, corpo)).json() == {"status": "duplicate"}
+
+    async with Session() as s:
+        evento = await s.get(StripeEvento, "evt_teste_checkout")
+        assert evento.tipo == "checkout.session.completed"
+        assert evento.processado_em is None
+        jobs = (await s.scalars(
+            select(JobModel).where(JobModel.payload["kwargs"]["evento_id"].astext == "evt_teste_checkout")
+        )).all()
+        assert [job.tarefa for job in jobs] == ["stripe.processar_evento"]
+        # Ainda não processado: a assinatura só muda no worker
+        assert (await s.scalar(select(Assinatura).where(Assinatura.telegram_user_id == TELEGRAM_ID))) is None
+
+    async with Session() as s:
+        assert await aplicar_evento(s, "evt_teste_checkout") == TELEGRAM_ID
+    async with Session() as s:
+        # Job repetido (lease vencido): o evento já está processado
+        assert await aplicar_evento(s, "evt_teste_checkout") is None
+        evento = await s.get(StripeEvento, "evt_teste_checkout")
+        assert evento.resultado == "aplicado"
+        assinatura = await s.scalar(select(Assinatura).where(Assinatura.telegram_user_id == TELEGRAM_ID))
+        assert (assinatura.status, assinatura.plano) == ("active", "pro")
+
+
+@pytest.mark.asyncio
+async def test_evento_fora_de_ordem_nao_sobrescreve(Session, async_client):
+    checkout = _evento(
+        "evt_teste_ordem_checkout", "checkout.session.completed", 1_700_000_000,
+        {"client_reference_id": str(TELEGRAM_ID), "customer": "cus_teste_evt", "subscription": "sub_teste_evt"},
+    )
+    # O cancelamento chega antes da atualização que foi criada antes dele
+    cancelado = _evento("evt_teste_ordem_del", "customer.subscription.deleted", 1_700_000_200, {"id": "sub_teste_evt"})
+    atrasado = _evento(
+        "evt_teste_ordem_upd", "customer.subscription.updated", 1_700_000_100,
+        {"id": "sub_teste_evt", "status": "past_due"},
+    )
+    for corpo in (checkout, cancelado, atrasado):
+        assert (await _postar(async_client, corpo)).status_code == 200
+
+    for evento_id in ("evt_teste_ordem_checkout", "evt_teste_ordem_del", "evt_teste_ordem_upd"):
+        async with Session() as s:
+            await aplicar_evento(s, evento_id)
+
+    async with Session() as s:
+        assinatura = await s.scalar(select(Assinatura).where(Assinatura.telegram_user_id == TELEGRAM_ID))
+        assert (assinatura.status, assinatura.plano) == ("canceled", "free")
+        atrasado = await s.get(StripeEvento, "evt_teste_ordem_upd")
+        assert atrasado.processado_em is not None
+        assert atrasado.resultado == "ignorado"
+
+
+@pytest.mark.asyncio
+async def test_tipo_sem_handler_nao_e_gravado(Session, async_client):
+    corpo = _evento("evt_teste_outro", "invoice.paid", 1_700_000_000, {"id": "in_teste"})
+    assert (await _postar(async_client, corpo)).json() == {"status": "ignored"}
+
+    async with Session() as s:
+        assert await s.get(StripeEvento, "evt_teste_outro") is None
+
+
+@pytest.mark.asyncio
+async def test_checkout_aplicado_sobre_assinatura_free_local_mais_nova(Session, async_client):
+    # Usuário legacy registra um turno entre o checkout e o worker: a
+    # assinatura FREE padrão nasce com atualizado_em posterior ao evento
+    corpo = _evento(
+        "evt_teste_legacy", "checkout.session.completed", 1_700_000_000,
+        {"client_reference_id": str(TELEGRAM_ID), "customer": "cus_teste_evt", "subscription": "sub_teste_evt"},
+    )
+    assert (await _postar(async_client, corpo)).status_code == 200
+    async with Session() as s:
+        s.add(Assinatura(
+            telegram_user_id=TELEGRAM_ID, stripe_customer_id=f"legacy_{TELEGRAM_ID}",
+            status="active", plano="free",
+        ))
+        await s.commit()
+
+    async with Session() as s:
+        assert await aplicar_evento(s, "evt_teste_legacy") == TELEGRAM_ID
+
+    async with Session() as s:
+        assinatura = await s.scalar(select(Assinatura).where(Assinatura.telegram_user_id == TELEGRAM_ID))
+        assert (assinatura.status, assinatura.plano) == ("active", "pro")
+        assert assinatura.stripe_customer_id == "cus_teste_evt"
+        assert assinatura.stripe_evento_em == datetime(2023, 11, 14, 22, 13, 20)
+
+
+@pytest.mark.asyncio
+async def test_falha_depois_do_handler_nao_deixa_evento_pela_metade(Session, async_client, monkeypatch):
+    from app.infrastructure.tasks import stripe_eventos
+
+    corpo = _evento(
+        "evt_teste_falha", "checkout.session.completed", 1_700_000_000,
+        {"client_reference_id": str(TELEGRAM_ID), "customer": "cus_teste_evt", "subscription": "sub_teste_evt"},
+    )
+    assert (await _postar(async_client, corpo)).status_code == 200
+
+    async def aplica_e_falha(payload, db, evento_em=None):
+        await stripe_eventos.handle_checkout_completed(payload, db, evento_em=evento_em)
+        raise RuntimeError("worker caiu")
+
+    monkeypatch.setitem(stripe_eventos.HANDLERS, "checkout.session.completed", aplica_e_falha)
+    async with Session() as s:
+        with pytest.raises(RuntimeError):
+            await aplicar_evento(s, "evt_teste_falha")
+
+    # Nada foi gravado: o job repetido aplica o evento inteiro
+    async with Session() as s:
+        evento = await s.get(StripeEvento, "evt_teste_falha")
+        assert (evento.processado_em, evento.resultado) == (None, None)
+        assert (await s.scalar(select(Assinatura).where(Assinatura.telegram_user_id == TELEGRAM_ID))) is None
@@ -1,7 +1,7 @@
 import pytest
 from sqlalchemy import text, select
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from app.api.webhook import handle_checkout_completed, handle_subscription_updated, handle_subscription_deleted
+from app.infrastructure.tasks.stripe_eventos import handle_checkout_completed, handle_subscription_updated, handle_subscription_deleted
 from app.infrastructure.subscription_middleware import check_subscription
 from app.infrastructure.database.models import Assinatura
 
@@ -52,7 +52,7 @@ async def test_subscription_lifecycle():
                 'customer': stripe_customer_id,
                 'subscription': stripe_subscription_id
             }
-            await handle_checkout_completed(session_data, session)
+            assert await handle_checkout_completed(session_data, session) == telegram_user_id
             
             # Verificar criação
             result = await session.execute(select(Assinatura).filter_by(telegram_user_id=telegram_user_id))
@@ -68,7 +68,7 @@ async def test_subscription_lifecycle():
                 'status': 'past_due',
                 'current_period_end': 1735689600  # 2025-01-01
             }
-            await handle_subscription_updated(sub_data, session)
+            assert await handle_subscription_updated(sub_data, session) == telegram_user_id
             
             # Re-query para verificar atualização
             await session.refresh(assinatura)
@@ -78,7 +78,7 @@ async def test_subscription_lifecycle():
             sub_data_del = {
                 'id': stripe_subscription_id
             }
-            await handle_subscription_deleted(sub_data_del, session)
+            assert await handle_subscription_deleted(sub_data_del, session) == telegram_user_id
             
             # Re-query para verificar cancelamento
             await session.refresh(assinatura)
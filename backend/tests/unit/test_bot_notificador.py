@@ -0,0 +1,38 @@
+import httpx
+import pytest
+from unittest.mock import MagicMock
+
+from app.infrastructure.external import bot_notificador
+from app.infrastructure.external.bot_notificador import invalidar_perfil_no_bot
+
+
+def _cliente_com(transport):
+    original = httpx.AsyncClient
+    return lambda **kwargs: original(transport=transport, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_invalidar_perfil_envia_segredo(monkeypatch):
+    chamadas = []
+
+    def responder(request):
+        chamadas.append(request)
+        return httpx.Response(204)
+
+    monkeypatch.setattr(bot_notificador.httpx, "AsyncClient", _cliente_com(httpx.MockTransport(responder)))
+    settings = MagicMock(bot_interno_url="http://bot:8081/", internal_api_key="segredo")
+
+    assert await invalidar_perfil_no_bot(123, settings) is True
+    assert str(chamadas[0].url) == "http://bot:8081/interno/perfis/123/invalidar"
+    assert chamadas[0].headers["X-Internal-Secret"] == "segredo"
+
+
+@pytest.mark.asyncio
+async def test_invalidar_perfil_desligado_ou_com_falha(monkeypatch):
+    def falhar(request):
+        raise httpx.ConnectError("bot fora", request=request)
+
+    monkeypatch.setattr(bot_notificador.httpx, "AsyncClient", _cliente_com(httpx.MockTransport(falhar)))
+
+    assert await invalidar_perfil_no_bot(123, MagicMock(bot_interno_url="", internal_api_key="x")) is False
+    assert await invalidar_perfil_no_bot(123, MagicMock(bot_interno_url="http://bot:8081", internal_api_key="x")) is False
@@ -0,0 +1,179 @@
+import pytest
+from datetime import date, datetime, time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from caldav.lib import error as caldav_error
+
+from app.domain.entities.turno import Turno
+from app.infrastructure.external import caldav_service
+from app.infrastructure.external.caldav_service import CalDAVService
+
+
+class FakeClient:
+    instancias = 0
+
+    def __init__(self, **kwargs):
+        FakeClient.instancias += 1
+        self.puts = []
+        self.headers = []
+        self.status = []
+
+    def put(self, url, body, headers=None):
+        self.puts.append(url)
+        self.headers.append(headers or {})
+        return SimpleNamespace(
+            status=self.status.pop(0) if self.status else 201,
+            headers={"ETag": f'"v{len(self.puts)}"'},
+        )
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def settings():
+    s = MagicMock()
+    s.caldav_url = "https://dav.example/"
+    s.caldav_username = "leo"
+    s.caldav_password = "x"
+    s.caldav_calendar_path = "turnos"
+    s.caldav_cache_ttl_segundos = 3600
+    s.timezone = "America/Sao_Paulo"
+    return s
+
+
+@pytest.fixture
+def descobertas(monkeypatch):
+    caldav_service.limpar_cache_caldav()
+    FakeClient.instancias = 0
+    monkeypatch.setattr(caldav_service, "DAVClient", FakeClient)
+    urls = ["https://dav.example/cal/turnos/"]
+    chamadas = []
+
+    def descobrir(self, client):
+        chamadas.append(client)
+        return SimpleNamespace(url=urls[-1])
+
+    monkeypatch.setattr(CalDAVService, "_descobrir_calendario", descobrir)
+    yield SimpleNamespace(chamadas=chamadas, urls=urls)
+    caldav_service.limpar_cache_caldav()
+
+
+def _turno(event_uid=None) -> Turno:
+    return Turno(
+        id=1, telegram_user_id=123, data_referencia=date(2025, 1, 31),
+        hora_inicio=time(22, 0), hora_fim=time(6, 0), duracao_minutos=480, tipo="Plantão",
+        criado_em=datetime(2025, 1, 1), atualizado_em=datetime(2025, 1, 1), event_uid=event_uid,
+    )
+
+
+def test_sync_reaproveita_cliente_e_calendario(settings, descobertas):
+    uid = CalDAVService(settings).sincronizar(_turno()).event_uid
+    assert CalDAVService(settings).sincronizar(_turno(uid)).event_uid == uid
+
+    client = caldav_service._clientes[("https://dav.example", "leo", "x")]
+    assert FakeClient.instancias == 1
+    assert len(descobertas.chamadas) == 1
+    # Criação e atualização vão para o mesmo href: um PUT cada
+    assert client.puts == [f"https://dav.example/cal/turnos/{uid}.ics"] * 2
+
+
+def test_calendario_404_refaz_descoberta(settings, descobertas):
+    service = CalDAVService(settings)
+    service.sincronizar(_turno("abc"))
+
+    client = caldav_service._clientes[("https://dav.example", "leo", "x")]
+    client.status = [404, 201]
+    descobertas.urls.append("https://dav.example/cal/turnos-novo/")
+
+    service.sincronizar(_turno("abc"))
+
+    assert len(descobertas.chamadas) == 2
+    assert client.puts[-1] == "https://dav.example/cal/turnos-novo/abc.ics"
+
+
+def test_ttl_expirado_refaz_descoberta(settings, descobertas):
+    settings.caldav_cache_ttl_segundos = 0
+    service = CalDAVService(settings)
+    service.sincronizar(_turno("abc"))
+    service.sincronizar(_turno("abc"))
+    assert len(descobertas.chamadas) == 2
+
+
+def test_erro_do_servidor_e_propagado(settings, descobertas):
+    service = CalDAVService(settings)
+    service._get_client().status = [500]
+    with pytest.raises(caldav_error.PutError):
+        service.sincronizar(_turno("abc"))
+    # Contrato do CalendarService: sync_event não propaga
+    service._get_client().status = [500]
+    assert service.sync_event(_turno("abc")) is None
+
+
+def test_evento_noturno_no_fim_do_mes(settings):
+    ical = CalDAVService(settings)._build_event(_turno(), uid="abc").to_ical().decode()
+    assert "UID:abc" in ical
+    assert "DTEND;TZID=America/Sao_Paulo:20250201T060000" in ical
+
+
+def test_conteudo_igual_nao_faz_requisicao(settings, descobertas):
+    service = CalDAVService(settings)
+    primeiro = service.sincronizar(_turno())
+    client = service._get_client()
+
+    assert primeiro.url.endswith(f"/{primeiro.event_uid}.ics")
+    assert primeiro.etag == '"v1"'
+    assert service.sincronizar(_turno(), primeiro) is primeiro
+    assert len(client.puts) == 1
+
+
+def test_conteudo_alterado_faz_put_condicional(settings, descobertas):
+    service = CalDAVService(settings)
+    primeiro = service.sincronizar(_turno())
+    alterado = _turno()
+    alterado.hora_fim = time(7, 0)
+
+    segundo = service.sincronizar(alterado, primeiro)
+
+    client = service._get_client()
+    assert client.puts[-1] == primeiro.url
+    assert client.headers[-1]["If-Match"] == '"v1"'
+    assert segundo.etag == '"v2"'
+    assert segundo.conteudo_hash != primeiro.conteudo_hash
+    assert len(descobertas.chamadas) == 1
+
+
+def test_etag_divergente_sobrescreve(settings, descobertas):
+    service = CalDAVService(settings)
+    primeiro = service.sincronizar(_turno())
+    alterado = _turno()
+    alterado.hora_fim = time(7, 0)
+    client = service._get_client()
+    client.status = [412, 204]
+
+    service.sincronizar(alterado, primeiro)
+
+    assert "If-Match" in client.headers[-2]
+    assert "If-Match" not in client.headers[-1]
+
+
+def test_lote_continua_apos_erro_do_servidor_e_para_em_erro_de_rede(settings, descobertas, monkeypatch):
+    service = CalDAVService(settings)
+    respostas = iter(["uid-1", caldav_error.PutError("412"), "uid-3", ConnectionError("reset"), "uid-5"])
+
+    def sincronizar(turno, anterior=None):
+        r = next(respostas)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    monkeypatch.setattr(service, "sincronizar", sincronizar)
+    turnos = [_turno() for _ in range(5)]
+    for i, t in enumerate(turnos, start=1):
+        t.id = i
+
+    uids, erros = service.sincronizar_lote(turnos)
+
+    assert uids == {1: "uid-1", 3: "uid-3"}
+    assert set(erros) == {2, 4}
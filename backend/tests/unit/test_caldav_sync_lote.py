@@ -0,0 +1,91 @@
+import pytest
+from datetime import date, datetime, time
+from unittest.mock import AsyncMock, MagicMock
+
+from caldav.lib import error as caldav_error
+
+from app.domain.entities.turno import Turno
+from app.domain.entities.sincronizacao_calendario import SincronizacaoCalendario
+from app.infrastructure.tasks import caldav as tasks_caldav
+
+
+def _turno(turno_id, event_uid=None) -> Turno:
+    return Turno(
+        id=turno_id, telegram_user_id=123, data_referencia=date(2025, 1, turno_id),
+        hora_inicio=time(8, 0), hora_fim=time(16, 0), duracao_minutos=480, tipo="Hospital",
+        criado_em=datetime(2025, 1, 1), atualizado_em=datetime(2025, 1, 1), event_uid=event_uid,
+    )
+
+
+def _sinc(turno_id) -> SincronizacaoCalendario:
+    return SincronizacaoCalendario(
+        turno_id=turno_id, event_uid=f"uid-{turno_id}", url=f"https://dav.example/cal/uid-{turno_id}.ics",
+        etag=f'"e{turno_id}"', conteudo_hash=f"h{turno_id}",
+    )
+
+
+@pytest.fixture
+def ambiente(monkeypatch):
+    settings = MagicMock()
+    settings.caldav_url = "https://dav.example/"
+    monkeypatch.setattr(tasks_caldav, "get_settings", lambda: settings)
+
+    sessao = MagicMock()
+    sessao.__aenter__ = AsyncMock(return_value=sessao)
+    sessao.__aexit__ = AsyncMock(return_value=False)
+    monkeypatch.setattr(tasks_caldav, "AsyncSessionLocal", lambda: sessao)
+    monkeypatch.setattr(tasks_caldav, "configurar_rls", AsyncMock())
+
+    uow = MagicMock()
+    uow.__aenter__ = AsyncMock(return_value=uow)
+    uow.__aexit__ = AsyncMock(return_value=False)
+    uow.commit = AsyncMock()
+    uow.assinaturas.get_by_user_id = AsyncMock(return_value=MagicMock(is_free=False))
+    uow.turnos.buscar_por_ids = AsyncMock(return_value=[_turno(1), _turno(2, "uid-2"), _turno(3)])
+    uow.turnos.buscar_sincronizacoes = AsyncMock(return_value={2: _sinc(2)})
+    uow.turnos.salvar_sincronizacoes = AsyncMock()
+    monkeypatch.setattr(tasks_caldav, "SqlAlchemyUnitOfWork", lambda session: uow)
+
+    servico = MagicMock()
+    monkeypatch.setattr(tasks_caldav, "CalDAVService", lambda s: servico)
+    return uow, servico
+
+
+@pytest.mark.asyncio
+async def test_lote_sincroniza_com_uma_query_e_um_commit(ambiente):
+    uow, servico = ambiente
+    servico.sincronizar_lote.return_value = ({1: _sinc(1), 2: _sinc(2), 3: _sinc(3)}, {})
+
+    await tasks_caldav.sync_turnos_caldav_background(telegram_user_id=123, turno_ids=[1, 2, 3])
+
+    uow.assinaturas.get_by_user_id.assert_awaited_once_with(123)
+    uow.turnos.buscar_por_ids.assert_awaited_once_with([1, 2, 3], 123)
+    turnos, anteriores = servico.sincronizar_lote.call_args.args
+    assert [t.id for t in turnos] == [1, 2, 3]
+    assert anteriores == {2: _sinc(2)}
+    # Turno 2 não mudou: só os alterados são gravados
+    uow.turnos.salvar_sincronizacoes.assert_awaited_once_with(123, [_sinc(1), _sinc(3)])
+    uow.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lote_grava_parciais_e_propaga_falha(ambiente):
+    uow, servico = ambiente
+    servico.sincronizar_lote.return_value = ({1: _sinc(1)}, {3: caldav_error.PutError("500")})
+
+    with pytest.raises(RuntimeError, match="1 turno"):
+        await tasks_caldav.sync_turnos_caldav_background(telegram_user_id=123, turno_ids=[1, 2, 3])
+
+    uow.turnos.salvar_sincronizacoes.assert_awaited_once_with(123, [_sinc(1)])
+    uow.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lote_ignora_usuario_free(ambiente):
+    uow, servico = ambiente
+    uow.assinaturas.get_by_user_id.return_value = MagicMock(is_free=True)
+
+    await tasks_caldav.sync_turnos_caldav_background(telegram_user_id=123, turno_ids=[1])
+
+    uow.turnos.buscar_por_ids.assert_not_called()
+    servico.sincronizar_lote.assert_not_called()
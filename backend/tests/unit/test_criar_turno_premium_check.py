@@ -28,7 +28,7 @@ class MockUoW(AbstractUnitOfWork):
 @pytest.fixture
 def mock_repo():
     repo = MagicMock()
-    repo.contar_por_periodo = AsyncMock(return_value=0)
+    repo.contar_mes = AsyncMock(return_value=0)
     
     # Simulate a Turno being returned by the repository after creation
     def mock_create_turno(turno):
@@ -98,6 +98,6 @@ async def test_caldav_sync_called_for_pro_user(mock_repo, mock_assinatura_repo):
     # Assert
     # Sync is called (Pro User) via BackgroundQueue
     mock_caldav_sync_port.add_sync_task.assert_called_once_with(
-        SyncTurnoCalDavCommand(turno_id=1)
+        SyncTurnoCalDavCommand(turno_id=1, telegram_user_id=123)
     ) # Atualizar asserção
     mock_repo.criar.assert_called_once()
@@ -66,7 +66,7 @@ async def test_create_shift_free_user_within_limit(use_case, mock_assinatura_rep
         status="active", plano="free", data_inicio=None, data_fim=None, 
         criado_em=None, atualizado_em=None
     )
-    mock_turno_repo.contar_por_periodo.return_value = 29
+    mock_turno_repo.contar_mes.return_value = 29
     
     # Configure settings for this test
     mock_settings.free_tier_max_shifts = 30
@@ -98,7 +98,7 @@ async def test_create_shift_free_user_exceed_limit(use_case, mock_assinatura_rep
         status="active", plano="free", data_inicio=None, data_fim=None, 
         criado_em=None, atualizado_em=None
     )
-    mock_turno_repo.contar_por_periodo.return_value = 30
+    mock_turno_repo.contar_mes.return_value = 30
 
     with pytest.raises(LimiteTurnosExcedidoException):
         await use_case.execute(
@@ -120,9 +120,9 @@ async def test_create_shift_pro_user_ignores_limit(use_case, mock_assinatura_rep
         status="active", plano="pro", data_inicio=None, data_fim=None, 
         criado_em=None, atualizado_em=None
     )
-    mock_turno_repo.contar_por_periodo.return_value = 1000
+    mock_turno_repo.contar_mes.return_value = 1000
 
-    mock_turno_repo.contar_por_periodo.return_value = 1000
+    mock_turno_repo.contar_mes.return_value = 1000
 
     # Mock CalDAV success (handled by injected mock)
 
@@ -135,7 +135,7 @@ async def test_create_shift_pro_user_ignores_limit(use_case, mock_assinatura_rep
 
     mock_turno_repo.criar.assert_called_once()
     # Ensure validation logic was skipped (optimization)
-    mock_turno_repo.contar_por_periodo.assert_not_called()
+    mock_turno_repo.contar_mes.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_create_shift_caldav_failure_is_ignored(use_case, mock_assinatura_repo, mock_turno_repo, mock_settings, monkeypatch):
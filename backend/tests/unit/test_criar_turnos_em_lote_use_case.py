@@ -0,0 +1,128 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from datetime import date, time
+from app.application.use_cases.turnos.criar_turnos_em_lote import CriarTurnosEmLoteUseCase, CODIGO_LIMITE_TURNOS
+from app.application.dtos.turno_lote_dto import ItemTurnoLote
+from app.application.dtos.caldav_sync_dto import SyncTurnoCalDavCommand
+from app.domain.entities.assinatura import Assinatura
+from app.domain.entities.tipo_turno import TipoTurno
+from app.domain.uow import AbstractUnitOfWork
+
+
+class MockUoW(AbstractUnitOfWork):
+    def __init__(self, turno_repo, assinatura_repo):
+        self.turnos = turno_repo
+        self.assinaturas = assinatura_repo
+        self.usuarios = AsyncMock()
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def _assinatura(plano: str) -> Assinatura:
+    return Assinatura(
+        id=1, telegram_user_id=123, stripe_customer_id="cust_1", stripe_subscription_id=None,
+        status="active", plano=plano, data_inicio=None, data_fim=None,
+        criado_em=None, atualizado_em=None
+    )
+
+
+@pytest.fixture
+def mock_turno_repo():
+    repo = AsyncMock()
+
+    def criar_em_lote(turnos):
+        for i, t in enumerate(turnos, start=1):
+            t.id = i
+        return turnos
+
+    repo.criar_em_lote.side_effect = criar_em_lote
+    repo.buscar_tipos_por_nomes.return_value = {}
+    repo.contar_mes.return_value = 0
+    return repo
+
+
+@pytest.fixture
+def mock_assinatura_repo():
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_sync_port():
+    return MagicMock()
+
+
+@pytest.fixture
+def use_case(mock_turno_repo, mock_assinatura_repo, mock_sync_port):
+    settings = MagicMock()
+    settings.free_tier_max_shifts = 30
+    uow = MockUoW(mock_turno_repo, mock_assinatura_repo)
+    return CriarTurnosEmLoteUseCase(uow, settings, mock_sync_port)
+
+
+def _itens(*datas: date, tipo: str = "Hospital") -> list[ItemTurnoLote]:
+    return [ItemTurnoLote(data_referencia=d, hora_inicio=time(8, 0), hora_fim=time(16, 0), tipo=tipo) for d in datas]
+
+
+@pytest.mark.asyncio
+async def test_lote_usa_um_lock_um_insert_e_uma_consulta_de_tipos(use_case, mock_turno_repo, mock_assinatura_repo):
+    mock_assinatura_repo.get_by_user_id.return_value = _assinatura("free")
+    mock_turno_repo.buscar_tipos_por_nomes.return_value = {"hospital": TipoTurno(id=7, nome="Hospital")}
+
+    resultados = await use_case.execute(123, _itens(date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)))
+
+    assert [r.sucesso for r in resultados] == [True, True, True]
+    assert all(r.turno.tipo_id == 7 for r in resultados)
+    mock_assinatura_repo.get_by_user_id.assert_awaited_once_with(123, for_update=True)
+    mock_turno_repo.buscar_tipos_por_nomes.assert_awaited_once()
+    mock_turno_repo.criar_em_lote.assert_awaited_once()
+    # Todas as linhas no mesmo mês: uma única contagem
+    mock_turno_repo.contar_mes.assert_awaited_once_with(123, date(2025, 1, 1))
+    assert use_case.uow.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_lote_conta_uma_vez_por_mes_afetado(use_case, mock_turno_repo, mock_assinatura_repo):
+    mock_assinatura_repo.get_by_user_id.return_value = _assinatura("free")
+
+    await use_case.execute(123, _itens(date(2025, 1, 30), date(2025, 1, 31), date(2025, 2, 1)))
+
+    assert mock_turno_repo.contar_mes.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_lote_rejeita_apenas_linhas_acima_do_limite(use_case, mock_turno_repo, mock_assinatura_repo):
+    mock_assinatura_repo.get_by_user_id.return_value = _assinatura("free")
+    mock_turno_repo.contar_mes.return_value = 28
+
+    resultados = await use_case.execute(
+        123, _itens(date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 4))
+    )
+
+    assert [r.sucesso for r in resultados] == [True, True, False, False]
+    assert resultados[2].codigo_erro == CODIGO_LIMITE_TURNOS
+    assert "Limite de turnos excedido" in resultados[2].erro
+    inseridos = mock_turno_repo.criar_em_lote.call_args.args[0]
+    assert len(inseridos) == 2
+
+
+@pytest.mark.asyncio
+async def test_lote_pro_ignora_limite_e_agenda_sync(use_case, mock_turno_repo, mock_assinatura_repo, mock_sync_port):
+    mock_assinatura_repo.get_by_user_id.return_value = _assinatura("pro")
+
+    resultados = await use_case.execute(123, _itens(date(2025, 1, 1), date(2025, 1, 2)))
+
+    assert all(r.sucesso for r in resultados)
+    mock_turno_repo.contar_mes.assert_not_called()
+    assert mock_sync_port.add_sync_task.call_count == 2
+    mock_sync_port.add_sync_task.assert_any_call(SyncTurnoCalDavCommand(turno_id=1, telegram_user_id=123))
@@ -0,0 +1,206 @@
+from datetime import UTC, date, datetime, time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from icalendar import Calendar
+
+from app.api.deps import get_feed_user_id, get_obter_feed_calendario_use_case
+from app.application.use_cases.calendario.obter_feed import ObterFeedCalendarioUseCase
+from app.domain.entities.feed_calendario import VersaoPeriodo
+from app.domain.entities.turno import Turno
+from app.infrastructure.services.feed_cache import InvalidacaoCacheComposta, MemoriaFeedCache
+from app.infrastructure.services.ics_feed import IcsFeedService, construir_evento
+from app.main import app
+
+HOJE = date(2025, 6, 1)
+
+
+def _turno(id: int, dia: int, inicio: time = time(8, 0), fim: time = time(16, 0)) -> Turno:
+    return Turno(
+        id=id, telegram_user_id=123, data_referencia=date(2025, 6, dia), hora_inicio=inicio,
+        hora_fim=fim, duracao_minutos=480, tipo="Hospital",
+        criado_em=datetime(2025, 5, 1), atualizado_em=datetime(2025, 5, 1),
+    )
+
+
+class _Repo:
+    def __init__(self, turnos, ultima=datetime(2025, 5, 1, 12, 0)):
+        self.turnos = list(turnos)
+        self.ultima = ultima
+        self.versao_periodo = AsyncMock(side_effect=self._versao)
+        self.iteracoes = 0
+
+    async def _versao(self, telegram_user_id, inicio, fim):
+        return VersaoPeriodo(ultima_alteracao=self.ultima if self.turnos else None, total=len(self.turnos))
+
+    async def iterar_por_periodo(self, telegram_user_id, inicio, fim):
+        self.iteracoes += 1
+        for turno in self.turnos:
+            yield turno
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+def _use_case(repo, cache=None, relogio=None, **kwargs):
+    return ObterFeedCalendarioUseCase(
+        repo, IcsFeedService("America/Sao_Paulo"), cache,
+        ttl_segundos=60, tamanho_lote=2, hoje=lambda: HOJE, relogio=relogio or _Relogio(), **kwargs,
+    )
+
+
+async def _corpo(resultado) -> bytes:
+    if resultado.conteudo is not None:
+        return resultado.conteudo
+    return b"".join([parte async for parte in resultado.partes])
+
+
+def test_ics_feed_gera_vcalendar_valido():
+    feed = IcsFeedService("America/Sao_Paulo")
+    corpo = feed.cabecalho() + feed.eventos([_turno(1, 1), _turno(2, 2, time(22, 0), time(6, 0))]) + feed.rodape()
+
+    cal = Calendar.from_ical(corpo)
+    eventos = cal.walk("VEVENT")
+    assert [str(e["uid"]) for e in eventos] == ["turno-1@gestao-turnos", "turno-2@gestao-turnos"]
+    assert len(cal.walk("VTIMEZONE")) == 1
+    # Turno noturno termina no dia seguinte
+    assert eventos[1].decoded("dtend").date() == date(2025, 6, 3)
+
+
+def test_ics_feed_mesmo_conteudo_do_evento_caldav():
+    feed = IcsFeedService("America/Sao_Paulo")
+    turno = _turno(7, 1)
+    turno.tipo = "Plantão; UTI, ala \\ norte"
+
+    gerado = Calendar.from_ical(feed.cabecalho() + feed.eventos([turno]) + feed.rodape()).walk("VEVENT")[0]
+    esperado = construir_evento(turno, feed.tz, uid=IcsFeedService.uid(turno))
+    for campo in ("uid", "summary", "description", "dtstart", "dtend", "dtstamp"):
+        assert gerado.decoded(campo) == esperado.decoded(campo), campo
+
+
+@pytest.mark.asyncio
+async def test_feed_gerado_em_partes_e_guardado_no_cache():
+    repo = _Repo([_turno(i, i) for i in range(1, 6)])
+    cache = MemoriaFeedCache(max_entradas=10)
+    use_case = _use_case(repo, cache)
+
+    resultado = await use_case.execute(123)
+    assert resultado.conteudo is None
+    partes = [parte async for parte in resultado.partes]
+    # Cabeçalho + 3 lotes (2+2+1) + rodapé
+    assert len(partes) == 5
+    assert len(Calendar.from_ical(b"".join(partes)).walk("VEVENT")) == 5
+
+    segundo = await use_case.execute(123)
+    assert segundo.conteudo == b"".join(partes)
+    assert segundo.etag == resultado.etag
+    assert repo.versao_periodo.await_count == 1
+    assert repo.iteracoes == 1
+
+
+@pytest.mark.asyncio
+async def test_feed_nao_modificado_por_etag_e_por_data():
+    repo = _Repo([_turno(1, 1)])
+    use_case = _use_case(repo, MemoriaFeedCache(max_entradas=10))
+
+    primeiro = await use_case.execute(123)
+    assert primeiro.ultima_modificacao == datetime(2025, 5, 1, 12, 0, tzinfo=UTC)
+
+    assert (await use_case.execute(123, etag_cliente=primeiro.etag)).nao_modificado
+    assert (await use_case.execute(123, modificado_desde=primeiro.ultima_modificacao)).nao_modificado
+    assert not (await use_case.execute(123, etag_cliente="outra")).nao_modificado
+    assert repo.iteracoes == 0
+
+
+@pytest.mark.asyncio
+async def test_feed_revalida_apos_ttl_e_invalidacao():
+    repo = _Repo([_turno(1, 1)])
+    cache = MemoriaFeedCache(max_entradas=10)
+    relogio = _Relogio()
+    use_case = _use_case(repo, cache, relogio)
+    await _corpo(await use_case.execute(123))
+
+    # Depois do TTL, mesma versão: uma consulta ao validador, corpo do cache
+    relogio.agora += 61
+    resultado = await use_case.execute(123)
+    assert resultado.conteudo is not None
+    assert (repo.versao_periodo.await_count, repo.iteracoes) == (2, 1)
+
+    # Escrita no processo invalida na hora
+    repo.turnos.append(_turno(2, 2))
+    repo.ultima = datetime(2025, 5, 2)
+    await InvalidacaoCacheComposta([cache]).turnos_alterados(123, [date(2025, 6, 2)])
+    novo = await use_case.execute(123)
+    assert novo.etag != resultado.etag
+    assert b"turno-2@gestao-turnos" in await _corpo(novo)
+
+
+@pytest.mark.asyncio
+async def test_feed_remocao_avanca_last_modified():
+    repo = _Repo([_turno(1, 1), _turno(2, 2)])
+    cache = MemoriaFeedCache(max_entradas=10)
+    use_case = _use_case(repo, cache)
+    antes = await use_case.execute(123)
+
+    repo.turnos.pop()
+    await cache.turnos_alterados(123, [date(2025, 6, 2)])
+    depois = await use_case.execute(123, modificado_desde=antes.ultima_modificacao)
+
+    assert depois.etag != antes.etag
+    assert not depois.nao_modificado
+    assert depois.ultima_modificacao > antes.ultima_modificacao
+
+
+@pytest.mark.asyncio
+async def test_feed_grande_nao_guarda_corpo():
+    repo = _Repo([_turno(i, i) for i in range(1, 6)])
+    cache = MemoriaFeedCache(max_entradas=10)
+    use_case = _use_case(repo, cache, max_bytes_cache=1024)
+
+    await _corpo(await use_case.execute(123))
+    segundo = await use_case.execute(123)
+
+    assert cache.obter(123).conteudo is None
+    assert segundo.partes is not None
+    assert repo.versao_periodo.await_count == 1
+
+
+def test_cache_lru_descarta_menos_usado():
+    cache = MemoriaFeedCache(max_entradas=2)
+    feed = MagicMock()
+    cache.salvar(1, feed)
+    cache.salvar(2, feed)
+    cache.obter(1)
+    cache.salvar(3, feed)
+
+    assert cache.obter(2) is None
+    assert cache.obter(1) is feed and cache.obter(3) is feed
+
+
+def test_rota_publica_com_etag_e_304():
+    repo = _Repo([_turno(1, 1)])
+    use_case = _use_case(repo, MemoriaFeedCache(max_entradas=10))
+    app.dependency_overrides[get_feed_user_id] = lambda: 123
+    app.dependency_overrides[get_obter_feed_calendario_use_case] = lambda: use_case
+    try:
+        client = TestClient(app)
+        # Sem X-Internal-Secret: clientes de calendário só têm a URL
+        resposta = client.get("/calendario/abc.ics")
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"].startswith("text/calendar")
+        assert resposta.headers["last-modified"] == "Thu, 01 May 2025 12:00:00 GMT"
+        assert b"BEGIN:VCALENDAR" in resposta.content
+
+        etag = resposta.headers["etag"]
+        assert client.get("/calendario/abc.ics", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get(
+            "/calendario/abc.ics", headers={"If-Modified-Since": resposta.headers["last-modified"]}
+        ).status_code == 304
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import AsyncMock
+from datetime import date
+from app.application.use_cases.relatorios.gerar_relatorio import GerarRelatorioUseCase
+from app.domain.entities.total_turno import TotalDiaTipo
+
+
+@pytest.fixture
+def mock_turno_repo():
+    return AsyncMock()
+
+
+@pytest.mark.asyncio
+async def test_relatorio_montado_a_partir_das_linhas_agregadas(mock_turno_repo):
+    mock_turno_repo.agregar_por_dia_e_tipo.return_value = [
+        TotalDiaTipo(data=date(2025, 1, 1), tipo="Hospital", total_minutos=480),
+        TotalDiaTipo(data=date(2025, 1, 1), tipo="sem_tipo", total_minutos=60),
+        TotalDiaTipo(data=date(2025, 1, 3), tipo="Casino", total_minutos=720),
+    ]
+    use_case = GerarRelatorioUseCase(mock_turno_repo)
+
+    relatorio = await use_case.execute(123, date(2025, 1, 1), date(2025, 1, 31))
+
+    mock_turno_repo.agregar_por_dia_e_tipo.assert_awaited_once_with(123, date(2025, 1, 1), date(2025, 1, 31))
+    mock_turno_repo.listar_por_periodo.assert_not_called()
+    assert relatorio.total_minutos == 1260
+    assert [d.data for d in relatorio.dias] == [date(2025, 1, 1), date(2025, 1, 3)]
+    assert relatorio.dias[0].total_minutos == 540
+    assert relatorio.dias[0].por_tipo == {"Hospital": 480, "sem_tipo": 60}
+
+
+@pytest.mark.asyncio
+async def test_relatorio_vazio(mock_turno_repo):
+    mock_turno_repo.agregar_por_dia_e_tipo.return_value = []
+    use_case = GerarRelatorioUseCase(mock_turno_repo)
+
+    relatorio = await use_case.execute(123, date(2025, 1, 1), date(2025, 12, 31))
+
+    assert relatorio.total_minutos == 0
+    assert relatorio.dias == []
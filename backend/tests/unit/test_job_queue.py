@@ -0,0 +1,135 @@
+import pytest
+from datetime import datetime, UTC
+from unittest.mock import AsyncMock, MagicMock
+
+from app import worker as worker_module
+from app.application.dtos.caldav_sync_dto import SyncTurnoCalDavCommand
+from app.infrastructure.database.models import JobModel
+from app.infrastructure.services.caldav_sync_adapter import CalDavSyncTaskAdapter
+from app.infrastructure.tasks.postgres_queue import (
+    JobReivindicado,
+    MORTO,
+    PENDENTE,
+    PostgresJobQueue,
+    _mesclar_payload,
+    calcular_backoff,
+)
+from app.infrastructure.tasks.registro import TAREFAS, tarefa
+from app.worker import Worker
+
+
+def test_backoff_exponencial_com_teto():
+    atrasos = [calcular_backoff(n, 10, 3600, jitter=0) for n in range(1, 12)]
+    assert atrasos[:4] == [10, 20, 40, 80]
+    assert atrasos[-1] == 3600
+    assert 9 <= calcular_backoff(1, 10, 3600) <= 11
+
+
+def test_fila_postgres_grava_job_na_sessao():
+    session = MagicMock()
+    adapter = CalDavSyncTaskAdapter(PostgresJobQueue(session, max_tentativas=3))
+
+    adapter.add_sync_task(SyncTurnoCalDavCommand(turno_id=7, telegram_user_id=123))
+
+    job = session.add.call_args.args[0]
+    assert isinstance(job, JobModel)
+    assert job.tarefa == "caldav.sync_turnos"
+    assert job.payload == {"args": [], "kwargs": {"telegram_user_id": 123, "turno_ids": [7]}}
+    assert job.chave_agrupamento == "123"
+    assert job.status == PENDENTE
+    assert job.max_tentativas == 3
+    # Janela de agrupamento: não executa imediatamente
+    assert job.executar_apos > datetime.now(UTC)
+
+
+def test_mesclar_payload_concatena_sem_repetir():
+    lider = {"args": [], "kwargs": {"telegram_user_id": 1, "turno_ids": [1, 2]}}
+    irmao = {"args": [], "kwargs": {"telegram_user_id": 1, "turno_ids": [2, 3]}}
+
+    assert _mesclar_payload(lider, irmao, "turno_ids")["kwargs"] == {"telegram_user_id": 1, "turno_ids": [1, 2, 3]}
+    assert lider["kwargs"]["turno_ids"] == [1, 2]
+
+
+def test_fila_postgres_rejeita_funcao_nao_registrada():
+    async def avulsa():
+        pass
+
+    with pytest.raises(ValueError):
+        PostgresJobQueue(MagicMock()).add_task(avulsa)
+
+
+@pytest.fixture
+def worker():
+    session = MagicMock()
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    return Worker(
+        factory,
+        concorrencia=2,
+        intervalo_segundos=0.01,
+        lease_segundos=10,
+        backoff_base_segundos=1,
+        backoff_max_segundos=60,
+        reter_concluidos_horas=24,
+    )
+
+
+@pytest.fixture
+def tarefa_teste():
+    chamada = AsyncMock()
+
+    @tarefa("teste.job")
+    async def job(*args, **kwargs):
+        await chamada(*args, **kwargs)
+
+    yield chamada
+    TAREFAS.pop("teste.job", None)
+
+
+def _job(tentativas=1, max_tentativas=3) -> JobReivindicado:
+    return JobReivindicado(
+        id=1, tarefa="teste.job", payload={"args": [7], "kwargs": {"x": 1}},
+        tentativas=tentativas, max_tentativas=max_tentativas,
+    )
+
+
+@pytest.mark.asyncio
+async def test_worker_conclui_job(worker, tarefa_teste, monkeypatch):
+    concluir = AsyncMock()
+    falhar = AsyncMock()
+    monkeypatch.setattr(worker_module, "concluir_job", concluir)
+    monkeypatch.setattr(worker_module, "falhar_job", falhar)
+
+    await worker.executar_job(_job())
+
+    tarefa_teste.assert_awaited_once_with(7, x=1)
+    concluir.assert_awaited_once()
+    falhar.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_worker_registra_falha_para_retry(worker, tarefa_teste, monkeypatch):
+    tarefa_teste.side_effect = ConnectionError("caldav fora do ar")
+    concluir = AsyncMock()
+    falhar = AsyncMock(return_value=MORTO)
+    monkeypatch.setattr(worker_module, "concluir_job", concluir)
+    monkeypatch.setattr(worker_module, "falhar_job", falhar)
+
+    await worker.executar_job(_job(tentativas=3))
+
+    concluir.assert_not_called()
+    _, job, erro, base, maximo = falhar.await_args.args
+    assert job.tentativas == 3
+    assert erro == "ConnectionError: caldav fora do ar"
+    assert (base, maximo) == (1, 60)
+
+
+@pytest.mark.asyncio
+async def test_worker_tarefa_desconhecida_conta_como_falha(worker, monkeypatch):
+    falhar = AsyncMock(return_value=PENDENTE)
+    monkeypatch.setattr(worker_module, "falhar_job", falhar)
+
+    await worker.executar_job(_job())
+
+    assert "Tarefa desconhecida" in falhar.await_args.args[2]
@@ -0,0 +1,128 @@
+import json
+from datetime import date, datetime, time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user_id, get_listar_turnos_periodo_use_case
+from app.application.use_cases.turnos.listar_turnos import ListarTurnosPeriodoUseCase
+from app.domain.entities.turno import Turno
+from app.domain.value_objects.cursor_turno import CursorTurno
+from app.main import app
+
+
+def _turno(id: int, dia: int, hora: int = 8) -> Turno:
+    return Turno(
+        id=id, telegram_user_id=123, data_referencia=date(2025, 1, dia), hora_inicio=time(hora, 0),
+        hora_fim=time(16, 0), duracao_minutos=480, tipo="Hospital",
+        criado_em=datetime(2025, 1, 1), atualizado_em=datetime(2025, 1, 1),
+    )
+
+
+class _Repo:
+    """Repositório em memória com a mesma semântica de keyset do SQL."""
+
+    def __init__(self, turnos):
+        self.turnos = sorted(turnos, key=lambda t: (t.data_referencia, t.hora_inicio, t.id))
+        self.limites = []
+
+    async def listar_pagina(self, telegram_user_id, inicio, fim, limite, apos=None):
+        self.limites.append(limite)
+        chave = (apos.data_referencia, apos.hora_inicio, apos.id) if apos else None
+        return [
+            t for t in self.turnos
+            if inicio <= t.data_referencia <= fim
+            and (chave is None or (t.data_referencia, t.hora_inicio, t.id) > chave)
+        ][:limite]
+
+    async def iterar_por_periodo(self, telegram_user_id, inicio, fim):
+        for t in self.turnos:
+            if inicio <= t.data_referencia <= fim:
+                yield t
+
+
+def test_cursor_ida_e_volta():
+    cursor = CursorTurno(date(2025, 1, 2), time(22, 30), 41)
+    assert CursorTurno.decodificar(cursor.codificar()) == cursor
+
+
+@pytest.mark.parametrize("valor", ["", "não-base64!", "W10", "WyJ4IiwieSIsMV0"])
+def test_cursor_malformado(valor):
+    with pytest.raises(ValueError):
+        CursorTurno.decodificar(valor)
+
+
+@pytest.mark.asyncio
+async def test_paginas_percorrem_o_periodo_sem_repetir():
+    # Dois turnos no mesmo dia e hora: o id desempata
+    turnos = [_turno(1, 1), _turno(2, 1), _turno(3, 1, 20), _turno(4, 2), _turno(5, 3)]
+    repo = _Repo(turnos)
+    use_case = ListarTurnosPeriodoUseCase(repo)
+
+    ids, cursor = [], None
+    while True:
+        pagina = await use_case.execute(123, date(2025, 1, 1), date(2025, 1, 31), limite=2, cursor=cursor)
+        ids.extend(t.id for t in pagina.itens)
+        cursor = pagina.proximo_cursor
+        if cursor is None:
+            break
+
+    assert ids == [1, 2, 3, 4, 5]
+    # Pede um a mais para detectar a última página sem COUNT
+    assert set(repo.limites) == {3}
+
+
+@pytest.mark.asyncio
+async def test_ultima_pagina_exata_nao_tem_cursor():
+    use_case = ListarTurnosPeriodoUseCase(_Repo([_turno(1, 1), _turno(2, 2)]))
+    pagina = await use_case.execute(123, date(2025, 1, 1), date(2025, 1, 31), limite=2)
+    assert [t.id for t in pagina.itens] == [1, 2]
+    assert pagina.proximo_cursor is None
+
+
+@pytest.fixture
+def client():
+    repo = _Repo([_turno(i, i) for i in range(1, 6)])
+    app.dependency_overrides[get_current_user_id] = lambda: 123
+    app.dependency_overrides[get_listar_turnos_periodo_use_case] = lambda: ListarTurnosPeriodoUseCase(repo)
+    yield TestClient(app, headers={"X-Internal-Secret": "x"})
+    app.dependency_overrides.clear()
+
+
+def test_rota_json_paginada(client):
+    params = {"inicio": "2025-01-01", "fim": "2025-01-31", "limit": 3}
+    primeira = client.get("/turnos", params=params).json()
+    assert [t["id"] for t in primeira["itens"]] == [1, 2, 3]
+
+    segunda = client.get("/turnos", params={**params, "cursor": primeira["next_cursor"]}).json()
+    assert [t["id"] for t in segunda["itens"]] == [4, 5]
+    assert segunda["next_cursor"] is None
+
+    assert client.get("/turnos", params={**params, "cursor": "lixo"}).status_code == 400
+
+
+def test_rota_sem_paginacao_mantem_lista(client):
+    """Sem limit nem cursor a rota responde a lista do período, como antes da paginação."""
+    resposta = client.get("/turnos", params={"inicio": "2025-01-01", "fim": "2025-01-31"}).json()
+    assert [t["id"] for t in resposta] == [1, 2, 3, 4, 5]
+
+
+def test_rota_so_com_cursor_usa_limite_padrao(client):
+    primeira = client.get("/turnos", params={"inicio": "2025-01-01", "fim": "2025-01-31", "limit": 2}).json()
+    resto = client.get(
+        "/turnos", params={"inicio": "2025-01-01", "fim": "2025-01-31", "cursor": primeira["next_cursor"]}
+    ).json()
+    assert [t["id"] for t in resto["itens"]] == [3, 4, 5]
+    assert resto["next_cursor"] is None
+
+
+def test_rota_ndjson_por_parametro_e_accept(client):
+    params = {"inicio": "2025-01-01", "fim": "2025-01-31", "limit": 1}
+    por_parametro = client.get("/turnos", params={**params, "formato": "ndjson"})
+    por_accept = client.get("/turnos", params=params, headers={"Accept": "application/x-ndjson"})
+
+    for resposta in (por_parametro, por_accept):
+        assert resposta.headers["content-type"].startswith("application/x-ndjson")
+        linhas = resposta.text.strip().split("\n")
+        # Sem paginação: o período inteiro
+        assert [json.loads(linha)["id"] for linha in linhas] == [1, 2, 3, 4, 5]
@@ -0,0 +1,99 @@
+import io
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.infrastructure import logger as logger_module
+from app.infrastructure.logger import (
+    AmostragemInfoFilter,
+    JSONFormatter,
+    request_id_ctx,
+    rota_ctx,
+    setup_logging,
+)
+from app.infrastructure.middleware import RequestIdMiddleware
+
+
+def _record(msg="Mensagem", nivel=logging.INFO, **extra):
+    record = logging.LogRecord("test", nivel, "path", 10, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_formatter_inclui_extra_e_request_id():
+    data = json.loads(JSONFormatter().format(
+        _record(telegram_user_id=123, plano="pro", request_id="abc")
+    ))
+    assert data["telegram_user_id"] == 123
+    assert data["plano"] == "pro"
+    assert data["request_id"] == "abc"
+    assert "args" not in data and "msecs" not in data
+
+
+def test_formatter_fallback_stdlib(monkeypatch):
+    monkeypatch.setattr(logger_module, "dumps", logger_module._dumps_stdlib)
+    data = json.loads(JSONFormatter().format(_record("Olá", valor=object())))
+    assert data["message"] == "Olá"
+    assert data["valor"].startswith("<object")
+
+
+def test_amostragem_decide_por_requisicao():
+    filtro = AmostragemInfoFilter(0.5, ["/turnos"])
+    token = rota_ctx.set("/turnos/recentes")
+    try:
+        mantidas = 0
+        for i in range(1000):
+            request_id_ctx.set(f"req-{i}")
+            decisao = filtro.filter(_record())
+            assert filtro.filter(_record()) == decisao
+            assert filtro.filter(_record(nivel=logging.WARNING))
+            mantidas += decisao
+        assert 400 < mantidas < 600
+
+        rota_ctx.set("/health")
+        assert all(filtro.filter(_record()) for _ in range(10))
+    finally:
+        rota_ctx.reset(token)
+        request_id_ctx.set(None)
+
+
+def test_setup_logging_escreve_pelo_listener():
+    saida = io.StringIO()
+    root = logging.getLogger()
+    handlers_antes = root.handlers
+    listener = setup_logging(stream=saida)
+    try:
+        token = request_id_ctx.set("req-1")
+        args = ["original"]
+        logging.getLogger("teste").info("Valor %s", args, extra={"stripe_subscription_id": "sub_1"})
+        args[0] = "alterado"
+        request_id_ctx.reset(token)
+    finally:
+        listener.stop()
+        logger_module._listener = None
+        root.handlers = handlers_antes
+
+    data = json.loads(saida.getvalue().strip().splitlines()[-1])
+    assert data["message"] == "Valor ['original']"
+    assert data["request_id"] == "req-1"
+    assert data["stripe_subscription_id"] == "sub_1"
+
+
+def test_request_id_middleware_propaga_e_gera():
+    app = FastAPI()
+
+    @app.get("/eco")
+    async def eco():
+        return {"request_id": request_id_ctx.get()}
+
+    app.add_middleware(RequestIdMiddleware)
+    client = TestClient(app)
+
+    resposta = client.get("/eco", headers={"X-Request-ID": "bot-42"})
+    assert resposta.json() == {"request_id": "bot-42"}
+    assert resposta.headers["x-request-id"] == "bot-42"
+
+    gerado = client.get("/eco", headers={"X-Request-ID": "com espaco"})
+    assert gerado.headers["x-request-id"] == gerado.json()["request_id"] != "com espaco"
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import metrics
+from app.core.config import get_settings
+from app.infrastructure.metrics import HTTP_REQUISICOES, ROTA_NAO_MAPEADA, gerar_metricas
+from app.infrastructure.middleware import MetricasMiddleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    itens = APIRouter()
+
+    @itens.get("/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    app.include_router(itens, prefix="/itens")
+    app.include_router(metrics.router)
+    app.add_middleware(MetricasMiddleware)
+    app.dependency_overrides[get_settings] = lambda: get_settings().model_copy(update={"internal_api_key": "chave"})
+    return app
+
+
+def _contagem(rota: str, status: str) -> float:
+    return HTTP_REQUISICOES.labels("GET", rota, status)._value.get()
+
+
+def test_rotula_pelo_template_da_rota():
+    client = TestClient(_app())
+    antes, antes_404 = _contagem("/itens/{item_id}", "200"), _contagem(ROTA_NAO_MAPEADA, "404")
+
+    client.get("/itens/1")
+    client.get("/itens/2")
+    client.get("/nao-existe")
+
+    assert _contagem("/itens/{item_id}", "200") == antes + 2
+    assert _contagem(ROTA_NAO_MAPEADA, "404") == antes_404 + 1
+
+
+def test_metrics_exige_shared_secret():
+    client = TestClient(_app())
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer errada"}).status_code == 403
+
+    resposta = client.get("/metrics", headers={"Authorization": "Bearer chave"})
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"].startswith("text/plain")
+    assert b"http_request_duration_seconds_bucket" in resposta.content
+    assert client.get("/metrics", headers={"X-Internal-Secret": "chave"}).status_code == 200
+
+
+def test_multiprocesso_soma_os_workers(tmp_path, monkeypatch):
+    codigo = (
+        "from app.infrastructure.metrics import CALDAV_SYNC_TURNOS;"
+        "CALDAV_SYNC_TURNOS.labels('enviado').inc(3)"
+    )
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", codigo],
+            check=True,
+            env={**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)},
+        )
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    conteudo, _ = gerar_metricas()
+    assert b'caldav_sync_turnos_total{resultado="enviado"} 6.0' in conteudo
@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import AsyncMock
+from datetime import date, datetime, UTC
+
+from app.application.use_cases.usuarios import obter_dashboard
+from app.application.use_cases.usuarios.obter_dashboard import ObterDashboardUseCase
+from app.core.config import get_settings
+from app.domain.entities.dashboard import ResumoDashboard
+from app.domain.entities.usuario import Usuario
+
+
+class _Agora(datetime):
+    """31/01 23:30 UTC: já é fevereiro em fusos a leste de UTC."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2025, 1, 31, 23, 30, tzinfo=UTC).astimezone(tz)
+
+
+def _use_case(repo, timezone: str = "UTC") -> ObterDashboardUseCase:
+    settings = get_settings().model_copy(update={"timezone": timezone})
+    return ObterDashboardUseCase(repo, settings)
+
+
+def _resumo(status=None, plano=None) -> ResumoDashboard:
+    return ResumoDashboard(
+        usuario=Usuario(telegram_user_id=123, nome="Ana", numero_funcionario="1"),
+        mes_inicio=date(2025, 1, 1), turnos_mes=3, minutos_mes=0,
+        assinatura_status=status, assinatura_plano=plano,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("timezone,mes_inicio", [
+    ("America/Sao_Paulo", date(2025, 1, 1)),
+    ("Asia/Tokyo", date(2025, 2, 1)),
+])
+async def test_mes_corrente_no_fuso_da_aplicacao(monkeypatch, timezone, mes_inicio):
+    monkeypatch.setattr(obter_dashboard, "datetime", _Agora)
+    repo = AsyncMock()
+    repo.obter_resumo.return_value = _resumo("active", "pro")
+
+    await _use_case(repo, timezone).execute(123)
+
+    repo.obter_resumo.assert_awaited_once_with(123, mes_inicio, 5)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status,plano,limitado", [
+    (None, None, True),  # Sem assinatura
+    ("active", "free", True),
+    ("past_due", "pro", True),
+    ("active", "pro", False),
+    ("trialing", "pro", False),
+])
+async def test_limite_do_plano_segue_assinatura_is_free(status, plano, limitado):
+    repo = AsyncMock()
+    repo.obter_resumo.return_value = _resumo(status, plano)
+
+    dashboard = await _use_case(repo).execute(123, hoje=date(2025, 1, 15))
+
+    assert (dashboard.limite_turnos_mes is not None) == limitado
@@ -0,0 +1,133 @@
+import os
+import threading
+import pytest
+from datetime import date, time
+from unittest.mock import AsyncMock, MagicMock
+
+from app.application.use_cases.relatorios.baixar_relatorio import BaixarRelatorioPdfUseCase, calcular_chave_pdf
+from app.domain.entities.assinatura import Assinatura
+from app.domain.entities.turno import Turno
+from app.infrastructure.services.pdf_cache import DiskPdfCache
+
+
+def _turno(dia: int, minutos: int = 480) -> Turno:
+    return Turno(
+        telegram_user_id=123, data_referencia=date(2025, 1, dia), hora_inicio=time(8, 0),
+        hora_fim=time(16, 0), duracao_minutos=minutos, tipo="Hospital",
+    )
+
+
+@pytest.mark.asyncio
+async def test_cache_salva_obtem_e_substitui_versao_anterior(tmp_path):
+    cache = DiskPdfCache(str(tmp_path), max_bytes=10_000, max_entradas=100)
+
+    await cache.salvar(123, 2025, 1, "a" * 64, b"%PDF-v1")
+    assert await cache.obter(123, 2025, 1, "a" * 64) == b"%PDF-v1"
+
+    await cache.salvar(123, 2025, 1, "b" * 64, b"%PDF-v2")
+    assert await cache.obter(123, 2025, 1, "a" * 64) is None
+    assert await cache.obter(123, 2025, 1, "b" * 64) == b"%PDF-v2"
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidacao_por_datas_alteradas(tmp_path):
+    cache = DiskPdfCache(str(tmp_path), max_bytes=10_000, max_entradas=100)
+    await cache.salvar(123, 2025, 1, "a" * 64, b"jan")
+    await cache.salvar(123, 2025, 2, "a" * 64, b"fev")
+
+    await cache.turnos_alterados(123, [date(2025, 1, 20)])
+
+    assert await cache.obter(123, 2025, 1, "a" * 64) is None
+    assert await cache.obter(123, 2025, 2, "a" * 64) == b"fev"
+
+
+@pytest.mark.asyncio
+async def test_cache_limpeza_remove_menos_usados(tmp_path):
+    cache = DiskPdfCache(str(tmp_path), max_bytes=10_000, max_entradas=2)
+    for user in (1, 2, 3):
+        await cache.salvar(user, 2025, 1, "a" * 64, b"x")
+        caminho = tmp_path / str(user) / "2025-01" / f"{'a' * 64}.pdf"
+        os.utime(caminho, (1000 + user, 1000 + user))
+
+    await cache.limpar()
+
+    assert await cache.obter(1, 2025, 1, "a" * 64) is None
+    assert await cache.obter(3, 2025, 1, "a" * 64) == b"x"
+
+
+def test_chave_muda_com_o_conteudo():
+    base = calcular_chave_pdf([_turno(1)], date(2025, 1, 1), date(2025, 1, 31), {"nome": "Ana"})
+    assert base == calcular_chave_pdf([_turno(1)], date(2025, 1, 1), date(2025, 1, 31), {"nome": "Ana"})
+    assert base != calcular_chave_pdf([_turno(1, 300)], date(2025, 1, 1), date(2025, 1, 31), {"nome": "Ana"})
+    assert base != calcular_chave_pdf([_turno(1)], date(2025, 1, 1), date(2025, 1, 31), {"nome": "Bia"})
+
+
+@pytest.fixture
+def use_case_com_cache(tmp_path):
+    assinatura_repo = AsyncMock()
+    assinatura_repo.get_by_user_id.return_value = Assinatura(
+        id=1, telegram_user_id=123, stripe_customer_id="cust_1", stripe_subscription_id="sub_1",
+        status="active", plano="pro", data_inicio=None, data_fim=None, criado_em=None, atualizado_em=None
+    )
+    turno_repo = AsyncMock()
+    turno_repo.listar_por_periodo.return_value = [_turno(2)]
+    usuario_repo = AsyncMock()
+    usuario_repo.buscar_por_telegram_id.return_value = None
+    service = MagicMock()
+    service.gerar_pdf_mes = AsyncMock(return_value=b"%PDF-1.4")
+    cache = DiskPdfCache(str(tmp_path), max_bytes=10_000, max_entradas=100)
+    return BaixarRelatorioPdfUseCase(turno_repo, usuario_repo, assinatura_repo, service, cache), service
+
+
+@pytest.mark.asyncio
+async def test_use_case_renderiza_uma_vez_e_depois_usa_cache(use_case_com_cache):
+    use_case, service = use_case_com_cache
+    inicio, fim = date(2025, 1, 1), date(2025, 1, 31)
+
+    primeiro = await use_case.execute(123, inicio, fim)
+    segundo = await use_case.execute(123, inicio, fim)
+
+    assert primeiro.conteudo == segundo.conteudo == b"%PDF-1.4"
+    assert primeiro.chave == segundo.chave
+    service.gerar_pdf_mes.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_use_case_nao_modificado_quando_chave_do_cliente_confere(use_case_com_cache):
+    use_case, service = use_case_com_cache
+    inicio, fim = date(2025, 1, 1), date(2025, 1, 31)
+    chave = calcular_chave_pdf([_turno(2)], inicio, fim, None)
+
+    resultado = await use_case.execute(123, inicio, fim, chave_cliente=chave)
+
+    assert resultado.nao_modificado
+    service.gerar_pdf_mes.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_use_case_libera_conexao_antes_de_renderizar(use_case_com_cache):
+    use_case, service = use_case_com_cache
+    eventos = []
+    use_case.liberar_conexao = AsyncMock(side_effect=lambda: eventos.append("liberar"))
+    service.gerar_pdf_mes.side_effect = lambda *a: eventos.append("renderizar") or b"%PDF-1.4"
+
+    await use_case.execute(123, date(2025, 1, 1), date(2025, 1, 31))
+
+    assert eventos == ["liberar", "renderizar"]
+
+
+@pytest.mark.asyncio
+async def test_cache_acessa_o_disco_fora_do_event_loop(tmp_path, monkeypatch):
+    cache = DiskPdfCache(str(tmp_path), max_bytes=10_000, max_entradas=1)
+    threads = []
+    original = DiskPdfCache._remover_menos_usados
+
+    def remover(self):
+        threads.append(threading.current_thread())
+        original(self)
+
+    monkeypatch.setattr(DiskPdfCache, "_remover_menos_usados", remover)
+
+    await cache.salvar(123, 2025, 1, "a" * 64, b"x")  # max_entradas=1: dispara a limpeza
+
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time
+
+from app.domain.entities.turno import Turno
+from app.domain.exceptions import ServicoIndisponivelException
+from app.infrastructure.services.pdf_render_pool import PdfRenderPool
+from app.infrastructure.services.pdf_service import ReportLabPdfService
+
+
+def _pool(max_workers=1, max_fila=0, timeout=5.0) -> PdfRenderPool:
+    return PdfRenderPool(
+        ThreadPoolExecutor(max_workers=max_workers),
+        max_workers=max_workers,
+        max_fila=max_fila,
+        timeout_segundos=timeout,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_rejeita_quando_saturado():
+    pool = _pool(max_workers=1, max_fila=0)
+    liberar = threading.Event()
+    try:
+        job = asyncio.create_task(pool.executar(liberar.wait, 5))
+        await asyncio.sleep(0.05)
+        assert pool.em_andamento == 1
+
+        with pytest.raises(ServicoIndisponivelException):
+            await pool.executar(lambda: None)
+
+        liberar.set()
+        assert await job is True
+        await asyncio.sleep(0)
+        assert pool.em_andamento == 0
+    finally:
+        liberar.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_timeout_mantem_slot_ate_o_job_terminar():
+    pool = _pool(max_workers=1, max_fila=1, timeout=0.05)
+    liberar = threading.Event()
+    try:
+        with pytest.raises(ServicoIndisponivelException):
+            await pool.executar(liberar.wait, 5)
+        # O job ainda ocupa o worker
+        assert pool.em_andamento == 1
+
+        liberar.set()
+        await asyncio.sleep(0.05)
+        assert pool.em_andamento == 0
+    finally:
+        liberar.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_servico_gera_pdf_no_pool():
+    pool = _pool(max_workers=1, max_fila=1)
+    try:
+        service = ReportLabPdfService(pool)
+        turnos = [
+            Turno(telegram_user_id=1, data_referencia=date(2025, 1, 2), hora_inicio=time(8, 0),
+                  hora_fim=time(16, 0), duracao_minutos=480, tipo="Hospital"),
+        ]
+        pdf = await service.gerar_pdf_mes(turnos, date(2025, 1, 1), date(2025, 1, 31), {"nome": "Ana"})
+        assert pdf.startswith(b"%PDF")
+    finally:
+        pool.shutdown()
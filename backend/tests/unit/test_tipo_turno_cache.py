@@ -0,0 +1,133 @@
+from datetime import date, time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.application.use_cases.turnos.criar_turno import CriarTurnoUseCase
+from app.domain.entities.assinatura import Assinatura
+from app.domain.entities.tipo_turno import TipoTurno
+from app.infrastructure.database import models
+from app.infrastructure.services.tipo_turno_cache import TipoTurnoCache
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def _busca(tipo):
+    return AsyncMock(return_value=tipo)
+
+
+@pytest.mark.asyncio
+async def test_resolve_uma_vez_por_usuario_e_nome_normalizado():
+    cache = TipoTurnoCache(max_entradas=10, ttl_segundos=60)
+    buscar = _busca(TipoTurno(id=1, nome="Hospital"))
+
+    for nome in ("Hospital", "HOSPITAL", "hospital"):
+        assert (await cache.resolver(1, nome, buscar)).id == 1
+    assert buscar.await_count == 1
+
+    # O repositório compara lower(nome) = nome.lower(): sem strip nem casefold
+    assert (await cache.resolver(1, " hospital ", _busca(None))) is None
+    await cache.resolver(1, "Straße", _busca(TipoTurno(id=2, nome="Straße")))
+    assert (await cache.resolver(1, "STRASSE", _busca(None))) is None
+
+    # Outro usuário não compartilha a entrada
+    await cache.resolver(2, "hospital", _busca(None))
+    assert (await cache.resolver(2, "Hospital", buscar)) is None
+    assert buscar.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_guarda_ausencia_e_expira_pelo_ttl():
+    relogio = _Relogio()
+    cache = TipoTurnoCache(max_entradas=10, ttl_segundos=60, relogio=relogio)
+    buscar = _busca(None)
+
+    await cache.resolver(1, "Livre", buscar)
+    await cache.resolver(1, "livre", buscar)
+    assert buscar.await_count == 1
+
+    relogio.agora = 61
+    await cache.resolver(1, "livre", buscar)
+    assert buscar.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_e_invalidacao_por_usuario():
+    cache = TipoTurnoCache(max_entradas=2, ttl_segundos=60)
+    await cache.resolver(1, "a", _busca(None))
+    await cache.resolver(2, "b", _busca(None))
+    await cache.resolver(1, "a", _busca(None))
+    await cache.resolver(3, "c", _busca(None))
+
+    buscar = _busca(None)
+    await cache.resolver(1, "a", buscar)
+    assert buscar.await_count == 0
+    await cache.resolver(2, "b", buscar)
+    assert buscar.await_count == 1
+
+    cache.invalidar(1)
+    await cache.resolver(1, "a", buscar)
+    assert buscar.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_commit_orm_em_tipos_turno_invalida_o_usuario():
+    engine = create_engine("sqlite://")
+    models.TipoTurno.__table__.create(engine)
+    cache = TipoTurnoCache(max_entradas=10, ttl_segundos=60)
+    cache.escutar_escritas()
+    try:
+        await cache.resolver(7, "UTI", _busca(None))
+        await cache.resolver(8, "UTI", _busca(None))
+
+        # Rollback não invalida
+        with Session(engine) as session:
+            session.add(models.TipoTurno(telegram_user_id=7, nome="UTI"))
+            session.flush()
+            session.rollback()
+        buscar = _busca(None)
+        await cache.resolver(7, "uti", buscar)
+        assert buscar.await_count == 0
+
+        with Session(engine) as session:
+            session.add(models.TipoTurno(telegram_user_id=7, nome="UTI"))
+            session.commit()
+
+        novo = TipoTurno(id=1, nome="UTI")
+        assert await cache.resolver(7, "uti", _busca(novo)) == novo
+        assert await cache.resolver(8, "uti", _busca(novo)) is None
+    finally:
+        cache.parar_de_escutar()
+        engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_criar_turno_resolve_tipo_pelo_cache():
+    repo = AsyncMock()
+    repo.criar.side_effect = lambda t: t
+    repo.buscar_tipo_por_nome = AsyncMock(return_value=TipoTurno(id=3, nome="Hospital"))
+    assinatura = MagicMock(spec=Assinatura, is_free=False)
+    uow = MagicMock()
+    uow.__aenter__ = AsyncMock(return_value=uow)
+    uow.__aexit__ = AsyncMock(return_value=None)
+    uow.commit = AsyncMock()
+    uow.turnos = repo
+    uow.assinaturas.get_by_user_id = AsyncMock(return_value=assinatura)
+
+    use_case = CriarTurnoUseCase(
+        uow, MagicMock(), MagicMock(), MagicMock(),
+        tipo_cache=TipoTurnoCache(max_entradas=10, ttl_segundos=60),
+    )
+    for tipo in ("Hospital", "hospital"):
+        turno = await use_case.execute(123, date(2025, 1, 1), time(8, 0), time(16, 0), tipo=tipo)
+        assert turno.tipo_id == 3
+
+    repo.buscar_tipo_por_nome.assert_awaited_once_with("Hospital", 123)
@@ -0,0 +1,106 @@
+"""
+Microbenchmark: cliente httpx por chamada vs. cliente compartilhado.
+
+Sobe um backend stub local (asyncio, HTTP/1.1 com keep-alive) e mede a
+latência por chamada nos dois modos usados pelo bot:
+
+  - antes: `async with httpx.AsyncClient()` a cada chamada (nova conexão TCP)
+  - depois: cliente compartilhado de src.api_client (pool com keep-alive)
+
+Uso (a partir de bot/):
+    INTERNAL_API_KEY=x python -m benchmarks.bench_http_client
+    INTERNAL_API_KEY=x python -m benchmarks.bench_http_client --chamadas 2000 --concorrencia 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from src import api_client
+
+CORPO = b'{"id": 1, "nome": "Leo", "assinatura_status": "active"}'
+RESPOSTA = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: " + str(len(CORPO)).encode() + b"\r\n"
+    b"Connection: keep-alive\r\n"
+    b"\r\n" + CORPO
+)
+
+
+async def _atender(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            cabecalho = await reader.readuntil(b"\r\n\r\n")
+            tamanho = 0
+            for linha in cabecalho.split(b"\r\n"):
+                if linha.lower().startswith(b"content-length:"):
+                    tamanho = int(linha.split(b":", 1)[1])
+            if tamanho:
+                await reader.readexactly(tamanho)
+            writer.write(RESPOSTA)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _medir(nome: str, chamada, total: int, concorrencia: int) -> list[float]:
+    tempos: list[float] = []
+    fila = iter(range(total))
+
+    async def trabalhador():
+        for _ in fila:
+            t0 = time.perf_counter()
+            await chamada()
+            tempos.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - t0
+    tempos.sort()
+    print(
+        f"{nome:<32} p50={statistics.median(tempos):7.3f}ms  "
+        f"p95={tempos[int(len(tempos) * 0.95) - 1]:7.3f}ms  "
+        f"vazão={total / duracao:8.0f} req/s"
+    )
+    return tempos
+
+
+async def main(total: int, concorrencia: int) -> None:
+    servidor = await asyncio.start_server(_atender, "127.0.0.1", 0)
+    porta = servidor.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{porta}/usuarios/123"
+    headers = {"X-Internal-Secret": "x"}
+
+    async def por_chamada():
+        async with httpx.AsyncClient() as client:
+            resp = await client.get(url, headers=headers, timeout=10.0)
+            resp.json()
+
+    async def compartilhado():
+        resp = await api_client.get_http_client().get(url, headers=headers, timeout=10.0)
+        resp.json()
+
+    async with servidor:
+        # Aquecimento (imports, SSL context, etc.)
+        await por_chamada()
+        await compartilhado()
+
+        print(f"{total} chamadas, concorrência {concorrencia}, stub em {url}")
+        antes = await _medir("antes (cliente por chamada)", por_chamada, total, concorrencia)
+        depois = await _medir("depois (cliente compartilhado)", compartilhado, total, concorrencia)
+        print(f"ganho no p50: {statistics.median(antes) / statistics.median(depois):.1f}x")
+
+        await api_client.fechar_http_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chamadas", type=int, default=1000)
+    parser.add_argument("--concorrencia", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.chamadas, args.concorrencia))
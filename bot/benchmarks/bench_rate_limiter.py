@@ -0,0 +1,113 @@
+"""
+Benchmark do rate limit de mensagens: defaultdict(list) vs LimitadorTaxa.
+
+Simula o tráfego de N usuários distintos (padrão 100k) com relógio sintético:
+as mensagens chegam em ordem aleatória, com o relógio avançando a cada uma,
+de modo que a simulação cubra várias janelas de 60 s. Compara:
+
+  - antes: decorators.rate_limit original (lista reconstruída a cada
+    mensagem, usuários nunca removidos)
+  - depois: LimitadorTaxa (deque por usuário, ociosos removidos, teto)
+
+e mostra tempo por verificação, usuários rastreados no final e memória
+alocada pelo estado do limitador (tracemalloc).
+
+Uso (a partir de bot/):
+    INTERNAL_API_KEY=x python -m benchmarks.bench_rate_limiter
+    INTERNAL_API_KEY=x python -m benchmarks.bench_rate_limiter --usuarios 100000 --mensagens 2000000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+
+from src.decorators import RATE_LIMIT_MSG, RATE_LIMIT_WINDOW
+from src.rate_limiter import LimitadorTaxa
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+class LimitadorAntes:
+    """Lógica do decorator original, sem o Telegram em volta."""
+
+    def __init__(self, relogio):
+        self.relogio = relogio
+        self.timestamps = defaultdict(list)
+
+    def permitir(self, user_id: int) -> bool:
+        now = self.relogio()
+        self.timestamps[user_id] = [t for t in self.timestamps[user_id] if now - t < RATE_LIMIT_WINDOW]
+        if len(self.timestamps[user_id]) >= RATE_LIMIT_MSG:
+            return False
+        self.timestamps[user_id].append(now)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+def _rodar(nome, criar, usuarios, duracao_s, seed) -> None:
+    rng = random.Random(seed)
+    relogio = _Relogio()
+    passo = duracao_s / len(usuarios)
+
+    tracemalloc.start()
+    limitador = criar(relogio)
+    recusadas = 0
+    t0 = time.perf_counter()
+    for user_id in usuarios:
+        relogio.agora += passo * rng.random() * 2
+        if not limitador.permitir(user_id):
+            recusadas += 1
+    decorrido = time.perf_counter() - t0
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{nome:<8} {decorrido / len(usuarios) * 1e9:8.0f} ns/msg   "
+        f"recusadas {recusadas:7d}   rastreados {len(limitador):7d}   "
+        f"memória {memoria / 2**20:7.1f} MiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=100_000)
+    parser.add_argument("--mensagens", type=int, default=1_000_000)
+    parser.add_argument("--duracao-s", type=float, default=600.0, help="tempo simulado total")
+    parser.add_argument("--max-usuarios", type=int, default=50_000, help="teto do LimitadorTaxa")
+    args = parser.parse_args()
+
+    # 20% dos usuários mandam 80% das mensagens; o resto aparece pouco (cauda longa)
+    rng = random.Random(42)
+    quentes = max(1, args.usuarios // 5)
+    usuarios = [
+        rng.randrange(quentes) if rng.random() < 0.8 else rng.randrange(quentes, args.usuarios)
+        for _ in range(args.mensagens)
+    ]
+
+    print(
+        f"{args.mensagens} mensagens de {args.usuarios} usuários em {args.duracao_s:.0f} s simulados "
+        f"(limite {RATE_LIMIT_MSG}/{RATE_LIMIT_WINDOW}s, teto {args.max_usuarios})"
+    )
+    _rodar("antes", LimitadorAntes, usuarios, args.duracao_s, seed=1)
+    _rodar(
+        "depois",
+        lambda relogio: LimitadorTaxa(
+            RATE_LIMIT_MSG, RATE_LIMIT_WINDOW, max_chaves=args.max_usuarios, relogio=relogio
+        ),
+        usuarios,
+        args.duracao_s,
+        seed=1,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Simulação de carga do bot: updates sintéticos pelos handlers reais.
+
+Monta o Application de src.bot.build_application com dois stubs locais:
+
+  - Bot API: um BaseRequest que responde getMe/sendMessage/sendDocument sem
+    rede (os envios não são limitados: LIMITAR_ENVIOS=false);
+  - backend: servidor HTTP asyncio com /usuarios/{id}, /turnos/lote e
+    /relatorios/mes/pdf; o PDF demora --pdf-ms, como um relatório pesado.
+
+Cada usuário manda --mensagens linhas de turno (em ordem, numeradas) e uma
+fração deles pede antes um /mes pdf. Os updates entram na update_queue na
+ordem de chegada, intercalados entre usuários, e são processados com:
+
+  - sequencial: um update por vez (comportamento padrão do PTB)
+  - concorrente: ProcessadorUpdatesPorUsuario com --concorrencia vagas
+
+Mostra vazão, latência (da entrada na fila ao fim do handler) das linhas de
+turno e do /mes pdf, e confere se os lotes de cada usuário chegaram ao
+backend na ordem em que foram enviados.
+
+Uso (a partir de bot/):
+    python -m benchmarks.simular_carga
+    python -m benchmarks.simular_carga --usuarios 500 --concorrencia 32 --pdf-ms 3000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+os.environ.setdefault("INTERNAL_API_KEY", "carga")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:stub")
+os.environ.setdefault("LIMITAR_ENVIOS", "false")
+os.environ.setdefault("PERFIL_INVALIDACAO_PORTA", "0")
+
+from telegram import Update  # noqa: E402
+from telegram.request import BaseRequest, RequestData  # noqa: E402
+
+from src import api_client  # noqa: E402
+from src.bot import COMANDOS, build_application  # noqa: E402
+from src.decorators import limitador_mensagens  # noqa: E402
+from src.processador_updates import ProcessadorUpdatesPorUsuario  # noqa: E402
+
+_LOTE = re.compile(r"^/turnos/lote")
+_USUARIO = re.compile(r"^/usuarios/(\d+)")
+
+
+class BackendStub:
+    """Backend HTTP/1.1 mínimo (keep-alive) que registra os lotes recebidos."""
+
+    def __init__(self, api_ms: float, pdf_ms: float):
+        self.api_s = api_ms / 1000
+        self.pdf_s = pdf_ms / 1000
+        # telegram_user_id -> tipos recebidos, na ordem de chegada
+        self.lotes: Dict[int, List[str]] = defaultdict(list)
+
+    async def _responder(self, metodo: str, caminho: str, headers: dict, corpo: bytes) -> Tuple[str, bytes, bytes]:
+        if caminho.startswith("/relatorios/mes/pdf"):
+            await asyncio.sleep(self.pdf_s)
+            return "200 OK", b"application/pdf", b"%PDF-1.4 carga"
+        await asyncio.sleep(self.api_s)
+        if metodo == "POST" and _LOTE.match(caminho):
+            user_id = int(headers["x-telegram-user-id"])
+            turnos = json.loads(corpo)["turnos"]
+            self.lotes[user_id].extend(t["tipo"] for t in turnos)
+            resultados = [
+                {
+                    "indice": i,
+                    "sucesso": True,
+                    "turno": {
+                        "hora_inicio": t["hora_inicio"],
+                        "hora_fim": t["hora_fim"],
+                        "data_referencia": t["data_referencia"],
+                        "duracao_minutos": 480,
+                    },
+                }
+                for i, t in enumerate(turnos)
+            ]
+            return "200 OK", b"application/json", json.dumps({"resultados": resultados}).encode()
+        usuario = _USUARIO.match(caminho)
+        if usuario:
+            perfil = {"telegram_user_id": int(usuario.group(1)), "nome": "Carga", "assinatura_status": "active"}
+            return "200 OK", b"application/json", json.dumps(perfil).encode()
+        return "404 Not Found", b"application/json", b"{}"
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                cabecalho = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+                metodo, caminho, _ = cabecalho[0].split(" ", 2)
+                headers = {}
+                for linha in cabecalho[1:]:
+                    if linha:
+                        nome, _, valor = linha.partition(":")
+                        headers[nome.strip().lower()] = valor.strip()
+                tamanho = int(headers.get("content-length") or 0)
+                corpo = await reader.readexactly(tamanho) if tamanho else b""
+                status, tipo, resposta = await self._responder(metodo, caminho, headers, corpo)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Length: {len(resposta)}\r\n".encode()
+                    + b"Content-Type: " + tipo + b"\r\nConnection: keep-alive\r\n\r\n"
+                    + resposta
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+class TelegramStub(BaseRequest):
+    """Bot API falsa: responde na hora, sem rede."""
+
+    def __init__(self):
+        self.envios = 0
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None, **_kwargs):
+        endpoint = url.rsplit("/", 1)[-1]
+        if endpoint == "getMe":
+            resultado = {"id": 1, "is_bot": True, "first_name": "Carga", "username": "carga_bot"}
+        else:
+            self.envios += 1
+            chat_id = int((request_data.parameters if request_data else {}).get("chat_id", 0))
+            resultado = {
+                "message_id": self.envios,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": "ok",
+            }
+        return 200, json.dumps({"ok": True, "result": resultado}).encode()
+
+
+class ProcessadorMedido(ProcessadorUpdatesPorUsuario):
+    """Registra, por rótulo, o tempo entre a entrada na fila e o fim do handler."""
+
+    def __init__(self, max_concorrentes: int, enfileirados: Dict[int, float]):
+        super().__init__(max_concorrentes, comandos=COMANDOS)
+        self.enfileirados = enfileirados
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+
+    async def do_process_update(self, update, coroutine) -> None:
+        try:
+            await super().do_process_update(update, coroutine)
+        finally:
+            inicio = self.enfileirados.get(getattr(update, "update_id", None))
+            if inicio is not None:
+                self.latencias[self.rotulo(update)].append(time.perf_counter() - inicio)
+
+
+def _gerar_updates(usuarios: int, mensagens: int, fracao_pdf: float, seed: int) -> List[dict]:
+    """Updates intercalados entre usuários; os de cada usuário em ordem."""
+    rng = random.Random(seed)
+    pendentes = {}
+    for user_id in range(1_000, 1_000 + usuarios):
+        textos = ["/mes pdf"] if rng.random() < fracao_pdf else []
+        textos += [f"Dia 0{1 + n % 9}/01/2025 - L{n} 08:00 as 16:00" for n in range(mensagens)]
+        pendentes[user_id] = textos
+
+    updates = []
+    while pendentes:
+        user_id = rng.choice(list(pendentes))
+        texto = pendentes[user_id].pop(0)
+        if not pendentes[user_id]:
+            del pendentes[user_id]
+        update_id = len(updates) + 1
+        updates.append({
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "Carga"},
+                "text": texto,
+                **({"entities": [{"type": "bot_command", "offset": 0, "length": 4}]} if texto.startswith("/") else {}),
+            },
+        })
+    return updates
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+async def _rodar(nome: str, concorrencia: int, dados: List[dict], backend: BackendStub) -> None:
+    backend.lotes.clear()
+    limitador_mensagens.limpar()
+    api_client.usuario_client.perfil_cache.limpar()
+
+    enfileirados: Dict[int, float] = {}
+    processador = ProcessadorMedido(concorrencia, enfileirados)
+    application = build_application(request=TelegramStub(), processador=processador)
+    await application.initialize()
+    await application.start()
+
+    inicio = time.perf_counter()
+    for dado in dados:
+        update = Update.de_json(dado, application.bot)
+        enfileirados[update.update_id] = time.perf_counter()
+        application.update_queue.put_nowait(update)
+    await application.update_queue.join()
+    duracao = time.perf_counter() - inicio
+
+    await application.stop()
+    await application.shutdown()
+
+    fora_de_ordem = sum(
+        1 for tipos in backend.lotes.values() if tipos != sorted(tipos, key=lambda t: int(t[1:]))
+    )
+    texto = [s * 1000 for s in processador.latencias["texto"]]
+    pdf = [s * 1000 for s in processador.latencias["/mes"]]
+    print(
+        f"{nome:<12} {len(dados) / duracao:8.0f} updates/s   total {duracao:6.2f}s   "
+        f"texto p50={_percentil(texto, 0.5):8.1f}ms p95={_percentil(texto, 0.95):8.1f}ms   "
+        f"/mes pdf p50={_percentil(pdf, 0.5):8.1f}ms   "
+        f"usuários fora de ordem: {fora_de_ordem}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    backend = BackendStub(args.api_ms, args.pdf_ms)
+    servidor = await asyncio.start_server(backend.atender, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{servidor.sockets[0].getsockname()[1]}"
+    for cliente in (api_client.turno_client, api_client.relatorio_client, api_client.usuario_client):
+        cliente.base_url = url
+
+    dados = _gerar_updates(args.usuarios, args.mensagens, args.fracao_pdf, seed=42)
+    pdfs = sum(1 for d in dados if d["message"]["text"].startswith("/mes"))
+    print(
+        f"{len(dados)} updates de {args.usuarios} usuários ({pdfs} /mes pdf de {args.pdf_ms:.0f} ms, "
+        f"API {args.api_ms:.0f} ms por chamada)"
+    )
+    try:
+        await _rodar("sequencial", 1, dados, backend)
+        await _rodar("concorrente", args.concorrencia, dados, backend)
+    finally:
+        # Fecha o cliente antes: wait_closed espera as conexões keep-alive
+        await api_client.fechar_http_client()
+        servidor.close()
+        await servidor.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--mensagens", type=int, default=3, help="linhas de turno por usuário (até 5: rate limit)")
+    parser.add_argument("--fracao-pdf", type=float, default=0.02, help="fração dos usuários que pede /mes pdf")
+    parser.add_argument("--pdf-ms", type=float, default=2000.0)
+    parser.add_argument("--api-ms", type=float, default=5.0)
+    parser.add_argument("--concorrencia", type=int, default=16)
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(parser.parse_args()))
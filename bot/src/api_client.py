@@ -2,6 +2,7 @@
 API client for Telegram bot to communicate with the FastAPI backend.
 """
 import logging
+from collections import OrderedDict
 from datetime import date
 from typing import Optional
 
@@ -9,6 +10,8 @@ import httpx
 
 import os
 from src.config import get_settings
+from src.logger import request_id_ctx
+from src.perfil_cache import PerfilCache
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +19,77 @@ logger = logging.getLogger(__name__)
 API_BASE_URL = os.getenv("API_BASE_URL", "http://backend:8000")
 INTERNAL_API_KEY = get_settings().internal_api_key
 
+# Máximo de turnos por POST /turnos/lote (TurnoLoteCreate.turnos no backend)
+MAX_TURNOS_POR_LOTE = 100
+
+# Cliente HTTP compartilhado pelo processo (pool de conexões com keep-alive).
+# Criado em iniciar_http_client (post_init do Application) ou sob demanda.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_disponivel() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def _propagar_request_id(request: httpx.Request) -> None:
+    """Envia o request_id do update ao backend, para correlacionar os logs."""
+    request_id = request_id_ctx.get()
+    if request_id and "X-Request-ID" not in request.headers:
+        request.headers["X-Request-ID"] = request_id
+
+
+def _criar_http_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    http2 = settings.http2
+    if http2 and not _http2_disponivel():
+        logger.warning("HTTP/2 solicitado mas o pacote 'h2' não está instalado; usando HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_conexoes,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_segundos,
+        ),
+        timeout=httpx.Timeout(settings.http_timeout_padrao, connect=settings.http_timeout_conexao),
+        event_hooks={"request": [_propagar_request_id]},
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Retorna o cliente HTTP compartilhado, criando-o na primeira chamada."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _criar_http_client()
+    return _http_client
+
+
+async def iniciar_http_client(*_args) -> None:
+    """Cria o cliente compartilhado (usado como post_init do Application)."""
+    get_http_client()
+    logger.info("Cliente HTTP da API iniciado")
+
+
+async def fechar_http_client(*_args) -> None:
+    """Fecha o cliente compartilhado (usado como post_shutdown do Application)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("Cliente HTTP da API encerrado")
+
 
 class TurnoAPIClient:
     """Client for interacting with Turno API endpoints."""
     
-    def __init__(self, base_url: str = API_BASE_URL, timeout: float = 10.0):
+    def __init__(self, base_url: str = API_BASE_URL, timeout: Optional[float] = None):
         self.base_url = base_url
-        self.timeout = timeout
+        self.timeout = timeout if timeout is not None else get_settings().http_timeout_padrao
     
     async def criar_turno(
         self,
@@ -45,15 +112,57 @@ class TurnoAPIClient:
         Returns:
             Dicionário com dados do turno criado
         """
-        async with httpx.AsyncClient() as client:
+        client = get_http_client()
+        resp = await client.post(
+            f"{self.base_url}/turnos",
+            json={
+                "data_referencia": data_ref.isoformat(),
+                "hora_inicio": hora_inicio,
+                "hora_fim": hora_fim,
+                "tipo": tipo,
+                "origem": "telegram",
+            },
+            headers={
+                "X-Telegram-User-ID": str(telegram_user_id),
+                "X-Internal-Secret": INTERNAL_API_KEY,
+            },
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return resp.json()
+    
+    async def criar_turnos_em_lote(
+        self,
+        turnos: list[dict],
+        telegram_user_id: int,
+    ) -> dict:
+        """
+        Cria vários turnos via /turnos/lote, em blocos de até MAX_TURNOS_POR_LOTE.
+        
+        Args:
+            turnos: Lista de dicts com tipo, data_ref, hora_inicio e hora_fim
+            telegram_user_id: ID do usuário do Telegram
+            
+        Returns:
+            Dicionário com contadores e o resultado de cada linha (mesma ordem da
+            entrada; o indice de cada resultado é relativo à lista inteira)
+        """
+        client = get_http_client()
+        lote = {"criados": 0, "rejeitados": 0, "resultados": []}
+        for inicio in range(0, len(turnos), MAX_TURNOS_POR_LOTE):
             resp = await client.post(
-                f"{self.base_url}/turnos",
+                f"{self.base_url}/turnos/lote",
                 json={
-                    "data_referencia": data_ref.isoformat(),
-                    "hora_inicio": hora_inicio,
-                    "hora_fim": hora_fim,
-                    "tipo": tipo,
-                    "origem": "telegram",
+                    "turnos": [
+                        {
+                            "data_referencia": t["data_ref"].isoformat(),
+                            "hora_inicio": t["hora_inicio"],
+                            "hora_fim": t["hora_fim"],
+                            "tipo": t["tipo"],
+                            "origem": "telegram",
+                        }
+                        for t in turnos[inicio:inicio + MAX_TURNOS_POR_LOTE]
+                    ],
                 },
                 headers={
                     "X-Telegram-User-ID": str(telegram_user_id),
@@ -62,7 +171,14 @@ class TurnoAPIClient:
                 timeout=self.timeout,
             )
             resp.raise_for_status()
-            return resp.json()
+            bloco = resp.json()
+            lote["criados"] += bloco["criados"]
+            lote["rejeitados"] += bloco["rejeitados"]
+            lote["resultados"].extend(
+                {**resultado, "indice": resultado["indice"] + inicio}
+                for resultado in bloco["resultados"]
+            )
+        return lote
     
     async def listar_turnos_recentes(
         self,
@@ -70,18 +186,18 @@ class TurnoAPIClient:
         limit: int = 5,
     ) -> list[dict]:
         """Lista os turnos mais recentes do usuário."""
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/turnos/recentes",
-                params={"limit": limit},
-                headers={
-                    "X-Telegram-User-ID": str(telegram_user_id),
-                    "X-Internal-Secret": INTERNAL_API_KEY,
-                },
-                timeout=self.timeout,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = get_http_client()
+        resp = await client.get(
+            f"{self.base_url}/turnos/recentes",
+            params={"limit": limit},
+            headers={
+                "X-Telegram-User-ID": str(telegram_user_id),
+                "X-Internal-Secret": INTERNAL_API_KEY,
+            },
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return resp.json()
     
     async def deletar_turno(
         self,
@@ -94,27 +210,32 @@ class TurnoAPIClient:
         Returns:
             True se deletado, False se não encontrado
         """
-        async with httpx.AsyncClient() as client:
-            resp = await client.delete(
-                f"{self.base_url}/turnos/{turno_id}",
-                headers={
-                    "X-Telegram-User-ID": str(telegram_user_id),
-                    "X-Internal-Secret": INTERNAL_API_KEY,
-                },
-                timeout=self.timeout,
-            )
-            if resp.status_code == 404:
-                return False
-            resp.raise_for_status()
-            return True
+        client = get_http_client()
+        resp = await client.delete(
+            f"{self.base_url}/turnos/{turno_id}",
+            headers={
+                "X-Telegram-User-ID": str(telegram_user_id),
+                "X-Internal-Secret": INTERNAL_API_KEY,
+            },
+            timeout=self.timeout,
+        )
+        if resp.status_code == 404:
+            return False
+        resp.raise_for_status()
+        return True
 
 
 class RelatorioAPIClient:
     """Client for interacting with Relatório API endpoints."""
     
-    def __init__(self, base_url: str = API_BASE_URL, timeout: float = 10.0):
+    # Quantidade de PDFs mantidos em memória (revalidados via ETag)
+    PDF_CACHE_MAX = 32
+
+    def __init__(self, base_url: str = API_BASE_URL, timeout: Optional[float] = None):
         self.base_url = base_url
-        self.timeout = timeout
+        self.timeout = timeout if timeout is not None else get_settings().http_timeout_padrao
+        # (telegram_user_id, ano, mes) -> (etag, conteúdo), em ordem LRU
+        self._pdf_cache: OrderedDict[tuple[int, int, int], tuple[str, bytes]] = OrderedDict()
     
     async def relatorio_semana(
         self,
@@ -123,18 +244,18 @@ class RelatorioAPIClient:
         telegram_user_id: int,
     ) -> dict:
         """Busca relatório semanal."""
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/relatorios/semana",
-                params={"ano": ano, "semana": semana},
-                headers={
-                    "X-Telegram-User-ID": str(telegram_user_id),
-                    "X-Internal-Secret": INTERNAL_API_KEY,
-                },
-                timeout=self.timeout,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = get_http_client()
+        resp = await client.get(
+            f"{self.base_url}/relatorios/semana",
+            params={"ano": ano, "semana": semana},
+            headers={
+                "X-Telegram-User-ID": str(telegram_user_id),
+                "X-Internal-Secret": INTERNAL_API_KEY,
+            },
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return resp.json()
     
     async def relatorio_mes(
         self,
@@ -143,18 +264,18 @@ class RelatorioAPIClient:
         telegram_user_id: int,
     ) -> dict:
         """Busca relatório mensal."""
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/relatorios/mes",
-                params={"ano": ano, "mes": mes},
-                headers={
-                    "X-Telegram-User-ID": str(telegram_user_id),
-                    "X-Internal-Secret": INTERNAL_API_KEY,
-                },
-                timeout=self.timeout,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = get_http_client()
+        resp = await client.get(
+            f"{self.base_url}/relatorios/mes",
+            params={"ano": ano, "mes": mes},
+            headers={
+                "X-Telegram-User-ID": str(telegram_user_id),
+                "X-Internal-Secret": INTERNAL_API_KEY,
+            },
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return resp.json()
     
     async def relatorio_periodo(
         self,
@@ -163,21 +284,21 @@ class RelatorioAPIClient:
         telegram_user_id: int,
     ) -> dict:
         """Busca relatório de período customizado."""
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/relatorios/periodo",
-                params={
-                    "inicio": inicio.isoformat(),
-                    "fim": fim.isoformat(),
-                },
-                headers={
-                    "X-Telegram-User-ID": str(telegram_user_id),
-                    "X-Internal-Secret": INTERNAL_API_KEY,
-                },
-                timeout=self.timeout,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = get_http_client()
+        resp = await client.get(
+            f"{self.base_url}/relatorios/periodo",
+            params={
+                "inicio": inicio.isoformat(),
+                "fim": fim.isoformat(),
+            },
+            headers={
+                "X-Telegram-User-ID": str(telegram_user_id),
+                "X-Internal-Secret": INTERNAL_API_KEY,
+            },
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        return resp.json()
     
     async def relatorio_mes_pdf(
         self,
@@ -185,49 +306,81 @@ class RelatorioAPIClient:
         mes: int,
         telegram_user_id: int,
     ) -> bytes:
-        """Busca relatório mensal em PDF."""
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/relatorios/mes/pdf",
-                params={
-                    "ano": ano,
-                    "mes": mes,
-                    "telegram_user_id": telegram_user_id,
-                },
-                headers={
-                    "X-Telegram-User-ID": str(telegram_user_id),
-                    "X-Internal-Secret": INTERNAL_API_KEY,
-                },
-                timeout=30.0,  # PDF pode demorar mais
-            )
-            resp.raise_for_status()
-            return resp.content
+        """
+        Busca relatório mensal em PDF.
+        
+        Envia If-None-Match com o ETag da última versão baixada; em 304 reutiliza
+        o PDF em memória sem baixá-lo de novo.
+        """
+        chave = (telegram_user_id, ano, mes)
+        em_cache = self._pdf_cache.get(chave)
+        headers = {
+            "X-Telegram-User-ID": str(telegram_user_id),
+            "X-Internal-Secret": INTERNAL_API_KEY,
+        }
+        if em_cache:
+            headers["If-None-Match"] = em_cache[0]
+
+        client = get_http_client()
+        resp = await client.get(
+            f"{self.base_url}/relatorios/mes/pdf",
+            params={
+                "ano": ano,
+                "mes": mes,
+                "telegram_user_id": telegram_user_id,
+            },
+            headers=headers,
+            timeout=get_settings().http_timeout_pdf,  # PDF pode demorar mais
+        )
+        if resp.status_code == 304 and em_cache:
+            self._pdf_cache.move_to_end(chave)
+            return em_cache[1]
+        resp.raise_for_status()
+
+        etag = resp.headers.get("ETag")
+        if etag:
+            self._pdf_cache[chave] = (etag, resp.content)
+            self._pdf_cache.move_to_end(chave)
+            while len(self._pdf_cache) > self.PDF_CACHE_MAX:
+                self._pdf_cache.popitem(last=False)
+        return resp.content
 
 
 class UsuarioAPIClient:
     """Client for interacting with Usuario API endpoints."""
     
-    def __init__(self, base_url: str = API_BASE_URL, timeout: float = 10.0):
+    def __init__(self, base_url: str = API_BASE_URL, timeout: Optional[float] = None):
         self.base_url = base_url
-        self.timeout = timeout
+        self.timeout = timeout if timeout is not None else get_settings().http_timeout_padrao
+        settings = get_settings()
+        self.perfil_cache = PerfilCache(
+            self._consultar_usuario,
+            ttl_segundos=settings.perfil_cache_ttl_segundos,
+            ttl_negativo_segundos=settings.perfil_cache_ttl_negativo_segundos,
+        )
     
+    async def _consultar_usuario(self, telegram_user_id: int) -> Optional[dict]:
+        """GET /usuarios/{id}: dados do usuário, None em 404; outros erros sobem."""
+        client = get_http_client()
+        resp = await client.get(
+            f"{self.base_url}/usuarios/{telegram_user_id}",
+            headers={"X-Internal-Secret": INTERNAL_API_KEY},
+            timeout=self.timeout,
+        )
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return resp.json()
+
     async def buscar_usuario(self, telegram_user_id: int) -> Optional[dict]:
         """
-        Busca usuário por telegram_user_id.
+        Busca usuário por telegram_user_id, passando pelo PerfilCache.
         
         Returns:
-            Dados do usuário ou None se não encontrado
+            Dados do usuário ou None se não encontrado (ou se a API falhou)
         """
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(
-                    f"{self.base_url}/usuarios/{telegram_user_id}",
-                    headers={"X-Internal-Secret": INTERNAL_API_KEY},
-                    timeout=self.timeout,
-                )
-                if resp.status_code == 200:
-                    return resp.json()
-                return None
+            return await self.perfil_cache.obter(telegram_user_id)
         except Exception as e:
             logger.error(
                 "Erro ao buscar usuário",
@@ -247,19 +400,21 @@ class UsuarioAPIClient:
         Raises:
             httpx.HTTPStatusError: Se houver erro (ex: 400 para usuário duplicado)
         """
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{self.base_url}/usuarios",
-                headers={"X-Internal-Secret": INTERNAL_API_KEY},
-                json={
-                    "telegram_user_id": telegram_user_id,
-                    "nome": nome,
-                    "numero_funcionario": numero_funcionario,
-                },
-                timeout=self.timeout,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        client = get_http_client()
+        resp = await client.post(
+            f"{self.base_url}/usuarios",
+            headers={"X-Internal-Secret": INTERNAL_API_KEY},
+            json={
+                "telegram_user_id": telegram_user_id,
+                "nome": nome,
+                "numero_funcionario": numero_funcionario,
+            },
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        # O "não cadastrado" em cache deixou de valer
+        self.perfil_cache.invalidar(telegram_user_id)
+        return resp.json()
 
     async def criar_checkout_session(self, telegram_user_id: int) -> str:
         """
@@ -268,16 +423,16 @@ class UsuarioAPIClient:
         Returns:
             URL de checkout
         """
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{self.base_url}/assinaturas/checkout",
-                headers={"X-Internal-Secret": INTERNAL_API_KEY},
-                json={"telegram_user_id": telegram_user_id},
-                timeout=self.timeout,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return data["url"]
+        client = get_http_client()
+        resp = await client.post(
+            f"{self.base_url}/assinaturas/checkout",
+            headers={"X-Internal-Secret": INTERNAL_API_KEY},
+            json={"telegram_user_id": telegram_user_id},
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data["url"]
 
 
 # Singleton instances for convenience
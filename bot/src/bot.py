@@ -5,18 +5,28 @@ This module provides the main entry point for building and configuring
 the Telegram bot application with all handlers.
 """
 import logging
+from typing import Optional
 
 from telegram.ext import (
     Application,
     ApplicationBuilder,
+    BaseUpdateProcessor,
     CommandHandler,
     CallbackQueryHandler,
     ConversationHandler,
     MessageHandler,
+    TypeHandler,
     filters,
 )
+from telegram import Update
+from telegram.request import BaseRequest
 
 from src.config import get_settings
+from src.api_client import iniciar_http_client, fechar_http_client
+from src.logger import definir_request_id
+from src.processador_updates import ProcessadorUpdatesPorUsuario
+from src.rate_limiter import LimitadorEnviosTelegram
+from src.servidor_invalidacao import iniciar_servidor_invalidacao, parar_servidor_invalidacao
 from src.handlers.commands import (
     start_command,
     ajuda_command,
@@ -46,17 +56,52 @@ from src.handlers.menu import (
 
 logger = logging.getLogger(__name__)
 
+# Comandos registrados abaixo (rótulos das métricas por handler)
+COMANDOS = ("start", "cancel", "ajuda", "help", "assinar", "perfil", "menu", "semana", "mes", "remover")
 
-def build_application() -> Application:
+
+async def _ao_iniciar(application: Application) -> None:
+    await iniciar_http_client()
+    await iniciar_servidor_invalidacao()
+
+
+async def _ao_encerrar(application: Application) -> None:
+    await parar_servidor_invalidacao()
+    await fechar_http_client()
+
+
+def build_application(
+    request: Optional[BaseRequest] = None,
+    processador: Optional[BaseUpdateProcessor] = None,
+) -> Application:
     """
     Builds and configures the Telegram bot application.
     
+    Args:
+        request: Transporte da Bot API (padrão: HTTPXRequest do PTB); a
+            simulação de carga passa um stub
+        processador: Processador de updates (padrão: ProcessadorUpdatesPorUsuario
+            com settings.updates_concorrentes)
+    
     Returns:
         Configured Application instance ready to run
     """
     settings = get_settings()
     
-    application = ApplicationBuilder().token(settings.telegram_bot_token).build()
+    builder = (
+        ApplicationBuilder()
+        .token(settings.telegram_bot_token)
+        .post_init(_ao_iniciar)
+        .post_shutdown(_ao_encerrar)
+        .concurrent_updates(
+            processador or ProcessadorUpdatesPorUsuario(settings.updates_concorrentes, comandos=COMANDOS)
+        )
+    )
+    if request is not None:
+        builder = builder.request(request).get_updates_request(request)
+    if settings.limitar_envios:
+        builder = builder.rate_limiter(LimitadorEnviosTelegram())
+    application = builder.build()
     
     # ConversationHandler para onboarding de novos usuários
     onboarding_handler = ConversationHandler(
@@ -68,6 +113,9 @@ def build_application() -> Application:
         fallbacks=[CommandHandler("cancel", cancelar_onboarding)],
     )
     
+    # request_id dos logs (e do header X-Request-ID) antes de qualquer handler
+    application.add_handler(TypeHandler(Update, definir_request_id), group=-1)
+
     # Registrar handlers na ordem correta
     # 1. ConversationHandler primeiro para capturar /start
     application.add_handler(onboarding_handler)
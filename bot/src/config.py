@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
-from typing import Optional, List
+from typing import Optional, List, Union
 from functools import lru_cache
 import os
 
@@ -14,6 +14,32 @@ class Settings(BaseSettings):
     base_url: str = "http://localhost:8000"
     internal_api_key: str
 
+    # Cliente HTTP compartilhado (pool/keep-alive)
+    http_max_conexoes: int = 20
+    http_max_keepalive: int = 10
+    http_keepalive_segundos: float = 30.0
+    http2: bool = False
+    http_timeout_conexao: float = 5.0
+    http_timeout_padrao: float = 10.0
+    http_timeout_pdf: float = 30.0
+
+    # Logs: fração dos updates com logs INFO dos loggers listados (prefixos)
+    log_amostragem_info: float = 1.0
+    log_loggers_amostrados: Union[List[str], str] = ["httpx"]
+
+    # Cache de perfis (PerfilCache) e porta onde o backend pede invalidações (0 desliga)
+    perfil_cache_ttl_segundos: float = 300.0
+    perfil_cache_ttl_negativo_segundos: float = 30.0
+    perfil_invalidacao_porta: int = 8081
+
+    # Updates processados ao mesmo tempo (os de um mesmo usuário, sempre em ordem)
+    updates_concorrentes: int = 16
+    # Porta do servidor de métricas Prometheus (0 desliga)
+    metricas_porta: int = 0
+
+    # Limite das chamadas do bot à Bot API (LimitadorEnviosTelegram)
+    limitar_envios: bool = True
+
     # Execution Mode (polling / webhook)
     execution_mode: str = Field(default="polling", validation_alias="MODE")
     host: str = "0.0.0.0"
@@ -24,6 +50,13 @@ class Settings(BaseSettings):
     telegram_bot_token: str = ""
     telegram_allowed_users: List[int] = []
 
+    @field_validator("log_loggers_amostrados", mode="before")
+    @classmethod
+    def parse_loggers_amostrados(cls, v):
+        if isinstance(v, str):
+            return [nome.strip() for nome in v.split(",") if nome.strip()]
+        return v
+
     @field_validator("telegram_allowed_users", mode="before")
     @classmethod
     def parse_allowed_users(cls, v):
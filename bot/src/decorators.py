@@ -1,22 +1,23 @@
 """
 Rate limiting and subscription decorators for Telegram bot handlers.
 """
-import time
 import logging
-from collections import defaultdict
 from functools import wraps
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from src.api_client import usuario_client
+from src.rate_limiter import LimitadorTaxa
 
 logger = logging.getLogger(__name__)
 
 # Rate Limit: 5 mensagens por minuto por usuário
 RATE_LIMIT_MSG = 5
 RATE_LIMIT_WINDOW = 60
-user_message_timestamps: dict[int, list[float]] = defaultdict(list)
+# Usuários sem mensagem na janela saem da memória; acima do teto, os menos recentes
+RATE_LIMIT_MAX_USUARIOS = 100_000
+limitador_mensagens = LimitadorTaxa(RATE_LIMIT_MSG, RATE_LIMIT_WINDOW, max_chaves=RATE_LIMIT_MAX_USUARIOS)
 
 
 def rate_limit(func):
@@ -27,23 +28,15 @@ def rate_limit(func):
     @wraps(func)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
         user_id = update.effective_user.id
-        now = time.time()
-        
-        # Limpar timestamps antigos
-        user_message_timestamps[user_id] = [
-            t for t in user_message_timestamps[user_id] 
-            if now - t < RATE_LIMIT_WINDOW
-        ]
-        
-        if len(user_message_timestamps[user_id]) >= RATE_LIMIT_MSG:
+
+        if not limitador_mensagens.permitir(user_id):
             logger.warning(
                 "Rate limit exceeded",
-                extra={"user_id": user_id, "count": len(user_message_timestamps[user_id])}
+                extra={"user_id": user_id, "count": RATE_LIMIT_MSG}
             )
             await update.message.reply_text("⚠️ **Muitas mensagens!** Aguarde um pouco.")
             return
 
-        user_message_timestamps[user_id].append(now)
         return await func(update, context, *args, **kwargs)
     return wrapper
 
@@ -54,7 +47,6 @@ def subscription_required(func):
     Permite comandos básicos (/start, /help, /assinar) sem assinatura.
     """
     @wraps(func)
-    @wraps(func)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
         user = update.effective_user
         if not user:
@@ -68,25 +60,9 @@ def subscription_required(func):
             if text.startswith(('/start', '/help', '/assinar', '/ajuda')):
                 return await func(update, context, *args, **kwargs)
 
-        # Verificar Cache (5 minutos)
-        now = time.time()
-        cached_status = context.user_data.get("sub_status")
-        cached_time = context.user_data.get("sub_check_time", 0)
-        
-        if cached_status and (now - cached_time < 300):
-            status = cached_status
-        else:
-            # Verificar assinatura via API
-            try:
-                usuario = await usuario_client.buscar_usuario(user_id)
-                status = usuario.get("assinatura_status") if usuario else None
-                
-                # Atualizar Cache
-                context.user_data["sub_status"] = status
-                context.user_data["sub_check_time"] = now
-            except Exception:
-                logger.error(f"Erro ao verificar assinatura para {user_id}")
-                status = None
+        # Perfil via PerfilCache (TTL, invalidado pelo backend quando a assinatura muda)
+        usuario = await usuario_client.buscar_usuario(user_id)
+        status = usuario.get("assinatura_status") if usuario else None
 
         if status not in ("active", "trialing"):
             await update.message.reply_text(
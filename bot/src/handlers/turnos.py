@@ -59,41 +59,51 @@ async def registrar_turno_msg(update: Update, context: ContextTypes.DEFAULT_TYPE
         await update.message.reply_text(str(e))
         return
 
+    try:
+        lote = await turno_client.criar_turnos_em_lote(
+            [
+                {
+                    "tipo": parsed.tipo,
+                    "data_ref": parsed.data_referencia,
+                    "hora_inicio": parsed.hora_inicio,
+                    "hora_fim": parsed.hora_fim,
+                }
+                for parsed in entradas
+            ],
+            telegram_user_id=user.id,
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 422:
+            await update.message.reply_text("❌ Erro de validação: Verifique os dados enviados.")
+        else:
+            await update.message.reply_text(f"❌ Erro ao registrar: {e.response.text}")
+        return
+    except Exception as exc:
+        await update.message.reply_text(f"Erro desconhecido ao registrar turnos: {exc}")
+        return
+
     mensagens_resposta: list[str] = []
 
-    for idx, parsed in enumerate(entradas, start=1):
-        try:
-            turno = await turno_client.criar_turno(
-                tipo=parsed.tipo,
-                data_ref=parsed.data_referencia,
-                hora_inicio=parsed.hora_inicio,
-                hora_fim=parsed.hora_fim,
-                telegram_user_id=user.id,
+    for parsed, resultado in zip(entradas, lote["resultados"]):
+        idx = resultado["indice"] + 1
+        if resultado["sucesso"]:
+            turno = resultado["turno"]
+            dur_horas = turno["duracao_minutos"] / 60.0
+            mensagens_resposta.append(
+                f"Linha {idx}: Registrado {parsed.tipo} {turno['hora_inicio']} - {turno['hora_fim']} "
+                f"({dur_horas:.2f}h) em {turno['data_referencia']}."
+            )
+        elif resultado.get("codigo_erro") == "limite_turnos":
+            mensagens_resposta.append(
+                f"⚠️ **Limite de turnos atingido!** ({parsed.data_referencia})\n"
+                "O plano Free permite apenas 30 turnos recentes.\n"
+                "Use /assinar para liberar turnos ilimitados."
             )
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 403:
-                mensagens_resposta.append(
-                    f"⚠️ **Limite de turnos atingido!** ({parsed.data_referencia})\n"
-                    "O plano Free permite apenas 30 turnos recentes.\n"
-                    "Use /assinar para liberar turnos ilimitados."
-                )
-            elif e.response.status_code == 422:
-                 mensagens_resposta.append(f"❌ Erro de validação: Verifique os dados enviados.")
-            else:
-                 mensagens_resposta.append(f"❌ Erro ao registrar: {e.response.text}")
-            continue
-        except Exception as exc:
+        else:
             mensagens_resposta.append(
                 f"Linha {idx} ({parsed.tipo} {parsed.hora_inicio}-{parsed.hora_fim} "
-                f"{parsed.data_referencia}): erro desconhecido: {exc}"
+                f"{parsed.data_referencia}): {resultado.get('erro')}"
             )
-            continue
-
-        dur_horas = turno["duracao_minutos"] / 60.0
-        mensagens_resposta.append(
-            f"Linha {idx}: Registrado {parsed.tipo} {turno['hora_inicio']} - {turno['hora_fim']} "
-            f"({dur_horas:.2f}h) em {turno['data_referencia']}."
-        )
 
     await update.message.reply_text("\n".join(mensagens_resposta))
 
@@ -0,0 +1,154 @@
+"""
+Logging JSON do bot, escrito fora do event loop.
+
+Mesmo esquema do backend: um QueueHandler no root resolve só a mensagem no
+thread de quem loga; um QueueListener em thread própria serializa (orjson
+quando instalado, senão json da stdlib) e escreve no stdout.
+
+Cada update do Telegram ganha um request_id (`tg-<update_id>`), incluído nos
+logs e enviado ao backend no header X-Request-ID, para correlacionar as duas
+pontas. Logs INFO de loggers barulhentos (p.ex. `httpx`, uma linha por
+chamada à API) podem ser amostrados.
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, UTC
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Any, Callable, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+# request_id do update em processamento
+request_id_ctx: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Atributos padrão do LogRecord: o resto do __dict__ veio de extra={...}
+_ATRIBUTOS_PADRAO = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName", "request_id"}
+
+
+def _dumps_stdlib(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+def _dumps_orjson(obj: Any) -> str:
+    return orjson.dumps(obj, default=str).decode("utf-8")
+
+
+dumps: Callable[[Any], str] = _dumps_orjson if orjson is not None else _dumps_stdlib
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        log_record = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            log_record["request_id"] = request_id
+
+        for chave, valor in record.__dict__.items():
+            if chave not in _ATRIBUTOS_PADRAO and chave not in log_record:
+                log_record[chave] = valor
+
+        if record.exc_info:
+            log_record["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_record["exception"] = record.exc_text
+
+        return dumps(log_record)
+
+
+class ContextoUpdateFilter(logging.Filter):
+    """Copia o request_id do contexto para o record (no thread de quem loga)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_ctx.get()
+        return True
+
+
+class AmostragemInfoFilter(logging.Filter):
+    """
+    Mantém só uma fração dos logs INFO (e abaixo) dos loggers listados.
+    A decisão é por update (request_id): ou todos os logs dele, ou nenhum.
+    """
+
+    def __init__(self, taxa: float, loggers: Sequence[str]):
+        super().__init__()
+        self.limite = int(max(0.0, min(taxa, 1.0)) * 10_000)
+        self.loggers = tuple(loggers)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not record.name.startswith(self.loggers):
+            return True
+        request_id = getattr(record, "request_id", None) or request_id_ctx.get() or ""
+        return zlib.crc32(request_id.encode()) % 10_000 < self.limite
+
+
+class FilaHandler(QueueHandler):
+    """QueueHandler que só resolve a mensagem; a formatação fica com o listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def _parar_listener() -> None:
+    """Esvazia a fila no encerramento do processo."""
+    if _listener is not None:
+        _listener.stop()
+
+
+def setup_logging(
+    amostragem_info: float = 1.0,
+    loggers_amostrados: Sequence[str] = (),
+    stream: Optional[IO[str]] = None,
+) -> QueueListener:
+    """Configura logging JSON no stdout, escrito por um QueueListener."""
+    global _listener
+    if _listener is None:
+        atexit.register(_parar_listener)
+    else:
+        _listener.stop()
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JSONFormatter())
+
+    fila: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    fila_handler = FilaHandler(fila)
+    fila_handler.addFilter(ContextoUpdateFilter())
+    if amostragem_info < 1.0 and loggers_amostrados:
+        fila_handler.addFilter(AmostragemInfoFilter(amostragem_info, loggers_amostrados))
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.handlers = []
+    root_logger.addHandler(fila_handler)
+
+    _listener = QueueListener(fila, handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+async def definir_request_id(update, context) -> None:
+    """Handler (grupo -1, antes dos demais) que define o request_id do update."""
+    request_id_ctx.set(f"tg-{update.update_id}")
@@ -2,16 +2,20 @@
 Telegram Bot Entrypoint.
 """
 import logging
+
+from prometheus_client import start_http_server
+
 from src.bot import build_application
+from src.config import get_settings
+from src.logger import setup_logging
 
 # Configure logging
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO
+setup_logging(
+    amostragem_info=get_settings().log_amostragem_info,
+    loggers_amostrados=get_settings().log_loggers_amostrados,
 )
 logger = logging.getLogger(__name__)
 
-from src.config import get_settings
 import socket
 import time
 
@@ -37,6 +41,9 @@ if __name__ == "__main__":
     logger.info("Iniciando Bot Telegram...")
     application = build_application()
     settings = get_settings()
+    if settings.metricas_porta:
+        # Servidor HTTP em thread própria (fila de updates por handler)
+        start_http_server(settings.metricas_porta)
     
     if settings.execution_mode == "webhook":
         logger.info(f"Modo Webhook: Escutando em {settings.host}:{settings.port} com URL {settings.webhook_url}")
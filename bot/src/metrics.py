@@ -0,0 +1,36 @@
+"""
+Métricas do bot no formato Prometheus.
+
+Expostas por um servidor HTTP próprio (prometheus_client.start_http_server)
+na porta `metricas_porta` das settings; 0 desliga. O bot roda num único
+processo, então o registry padrão basta.
+
+Os updates são rotulados pelo handler que deve tratá-los ("/mes", "callback",
+"texto"...; ver ProcessadorUpdatesPorUsuario.rotulo), com cardinalidade fixa.
+"""
+from prometheus_client import Gauge, Histogram
+
+BUCKETS_UPDATE = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+UPDATES_EM_ESPERA = Gauge(
+    "bot_updates_waiting",
+    "Updates na fila: esperando o update anterior do mesmo usuário ou uma vaga de concorrência.",
+    ["handler"],
+)
+UPDATES_EM_ANDAMENTO = Gauge(
+    "bot_updates_in_progress",
+    "Updates sendo processados pelos handlers.",
+    ["handler"],
+)
+UPDATE_ESPERA = Histogram(
+    "bot_update_wait_seconds",
+    "Tempo entre a chegada do update e o início do processamento.",
+    ["handler"],
+    buckets=BUCKETS_UPDATE,
+)
+UPDATE_DURACAO = Histogram(
+    "bot_update_duration_seconds",
+    "Duração do processamento de um update pelos handlers.",
+    ["handler"],
+    buckets=BUCKETS_UPDATE,
+)
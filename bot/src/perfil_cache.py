@@ -0,0 +1,106 @@
+"""
+Cache em memória dos perfis de usuário (GET /usuarios/{id}).
+
+Cada mensagem de turno, o menu e o subscription_required precisam do perfil;
+sem cache, cada um é uma chamada ao backend. PerfilCache guarda o perfil por
+`ttl_segundos` e o "não cadastrado" (None) por `ttl_negativo_segundos`, mais
+curto, para o usuário que acabou de fazer o onboarding não esperar muito.
+
+Consultas simultâneas do mesmo usuário compartilham uma única chamada em voo
+(request coalescing). Erros não entram no cache: todos os que esperavam a
+chamada recebem a exceção e a próxima consulta tenta de novo.
+
+O backend invalida uma entrada quando o perfil muda (p.ex. assinatura pelo
+webhook do Stripe) via servidor_invalidacao; `invalidar` também descarta a
+chamada em voo, para que uma resposta anterior à mudança não volte ao cache.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+Perfil = Optional[dict]
+
+
+class PerfilCache:
+    def __init__(
+        self,
+        buscar: Callable[[int], Awaitable[Perfil]],
+        ttl_segundos: float = 300.0,
+        ttl_negativo_segundos: float = 30.0,
+        max_entradas: int = 10_000,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.buscar = buscar
+        self.ttl_segundos = ttl_segundos
+        self.ttl_negativo_segundos = ttl_negativo_segundos
+        self.max_entradas = max_entradas
+        self.relogio = relogio
+        # user_id -> (expira_em, perfil), em ordem LRU
+        self._entradas: "OrderedDict[int, Tuple[float, Perfil]]" = OrderedDict()
+        self._em_voo: Dict[int, "asyncio.Future[Perfil]"] = {}
+        # Referências às tarefas das consultas (o loop só guarda referências fracas)
+        self._tarefas: Set["asyncio.Task[None]"] = set()
+        self.acertos = 0
+        self.consultas = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    async def obter(self, user_id: int) -> Perfil:
+        """Perfil do usuário (None se não cadastrado), do cache ou do backend."""
+        entrada = self._entradas.get(user_id)
+        if entrada is not None:
+            if entrada[0] > self.relogio():
+                self._entradas.move_to_end(user_id)
+                self.acertos += 1
+                return entrada[1]
+            del self._entradas[user_id]
+
+        futuro = self._em_voo.get(user_id)
+        if futuro is None:
+            futuro = asyncio.get_running_loop().create_future()
+            self._em_voo[user_id] = futuro
+            # Tarefa própria: o cancelamento de quem abriu a consulta não
+            # derruba os outros que estão esperando por ela
+            tarefa = asyncio.create_task(self._consultar(user_id, futuro))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+        # shield: cancelar um dos que esperam não cancela o futuro compartilhado
+        return await asyncio.shield(futuro)
+
+    async def _consultar(self, user_id: int, futuro: "asyncio.Future[Perfil]") -> None:
+        self.consultas += 1
+        try:
+            perfil = await self.buscar(user_id)
+        except BaseException as e:
+            if self._em_voo.get(user_id) is futuro:
+                del self._em_voo[user_id]
+            if isinstance(e, asyncio.CancelledError):
+                futuro.cancel()
+                raise
+            futuro.set_exception(e)
+            # Marca como recuperada: sem ninguém esperando, não vira aviso no loop
+            futuro.exception()
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        # Invalidada durante a consulta: entrega a resposta, mas não guarda
+        if self._em_voo.get(user_id) is futuro:
+            del self._em_voo[user_id]
+            ttl = self.ttl_segundos if perfil is not None else self.ttl_negativo_segundos
+            self._entradas[user_id] = (self.relogio() + ttl, perfil)
+            self._entradas.move_to_end(user_id)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        futuro.set_result(perfil)
+
+    def invalidar(self, user_id: int) -> bool:
+        """Descarta o perfil do usuário; True se havia algo em cache ou em voo."""
+        havia = self._entradas.pop(user_id, None) is not None
+        return self._em_voo.pop(user_id, None) is not None or havia
+
+    def limpar(self) -> None:
+        self._entradas.clear()
+        self._em_voo.clear()
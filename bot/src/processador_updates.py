@@ -0,0 +1,144 @@
+"""
+Processamento concorrente de updates, em ordem por usuário.
+
+Por padrão o Application do PTB trata um update por vez: um /mes pdf lento
+(até http_timeout_pdf segundos) segura as mensagens de todos os usuários.
+ProcessadorUpdatesPorUsuario deixa até `max_concorrentes` updates em
+andamento ao mesmo tempo, mas serializa os de um mesmo usuário (ou chat, na
+falta de usuário): as linhas de turno de uma pessoa são registradas na ordem
+em que ela mandou, e o ConversationHandler do onboarding (que assume um update
+por vez por conversa) continua correto.
+
+O Application cria uma tarefa por update na ordem de chegada e chama o
+process_update do PTB, que repassa a do_process_update; ali cada update pede
+o lock do usuário antes de qualquer outro await; como asyncio.Lock atende em
+ordem FIFO, a ordem de chegada é a ordem de processamento. Só depois de obter
+o lock o update disputa uma das vagas globais, para que um usuário com vários
+updates na fila não ocupe vagas só esperando a própria vez.
+
+Os updates esperando e em andamento são exportados por handler em
+src.metrics (bot_updates_waiting / bot_updates_in_progress).
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Hashable, Iterable, List, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from src.metrics import UPDATE_DURACAO, UPDATE_ESPERA, UPDATES_EM_ANDAMENTO, UPDATES_EM_ESPERA
+
+
+def chave_do_update(update: object) -> Optional[Hashable]:
+    """Usuário (ou chat) dono do update; None para updates sem dono."""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_user is not None:
+        return update.effective_user.id
+    if update.effective_chat is not None:
+        return ("chat", update.effective_chat.id)
+    return None
+
+
+class ProcessadorUpdatesPorUsuario(BaseUpdateProcessor):
+    # O semáforo do BaseUpdateProcessor.process_update é pego antes de
+    # do_process_update, ou seja, antes do lock do usuário: com ele limitado,
+    # updates presos atrás de outro do mesmo usuário ocupariam vagas. Ele fica
+    # sem limite na prática (max_concurrent_updates só decide, no Application,
+    # se os updates rodam em tarefas separadas) e as vagas reais são um
+    # semáforo próprio, pego já com o lock do usuário.
+    _ADMISSAO_SEM_LIMITE = 2**31 - 1
+
+    def __init__(self, max_concorrentes: int, comandos: Iterable[str] = ()):
+        if max_concorrentes < 1:
+            raise ValueError("`max_concorrentes` deve ser positivo")
+        super().__init__(self._ADMISSAO_SEM_LIMITE)
+        self.max_concorrentes = max_concorrentes
+        self._vagas = asyncio.Semaphore(max_concorrentes)
+        # Comandos conhecidos viram rótulo próprio; os demais, "comando"
+        self.comandos = frozenset(comandos)
+        # chave -> [lock, updates esperando ou em andamento]; removida ao zerar
+        self._filas: Dict[Hashable, List[Any]] = {}
+        self.em_espera = 0
+        self.em_andamento = 0
+
+    @property
+    def current_concurrent_updates(self) -> int:
+        """Updates em andamento (não conta os que esperam pelo usuário ou por vaga)."""
+        return self.em_andamento
+
+    def rotulo(self, update: object) -> str:
+        """Handler provável do update, para as métricas."""
+        if not isinstance(update, Update):
+            return "outro"
+        if update.callback_query is not None:
+            return "callback"
+        mensagem = update.effective_message
+        if mensagem is None or not mensagem.text:
+            return "outro"
+        if not mensagem.text.startswith("/"):
+            return "texto"
+        partes = mensagem.text[1:].split(maxsplit=1)
+        comando = partes[0].split("@", 1)[0].lower() if partes else ""
+        return f"/{comando}" if comando in self.comandos else "comando"
+
+    @property
+    def usuarios_com_updates(self) -> int:
+        """Usuários com updates esperando ou em andamento."""
+        return len(self._filas)
+
+    async def do_process_update(self, update: object, coroutine: "Awaitable[Any]") -> None:
+        rotulo = self.rotulo(update)
+        chegada = time.perf_counter()
+        chave = chave_do_update(update)
+        fila = None
+        if chave is not None:
+            fila = self._filas.get(chave)
+            if fila is None:
+                fila = self._filas[chave] = [asyncio.Lock(), 0]
+            fila[1] += 1
+
+        self.em_espera += 1
+        UPDATES_EM_ESPERA.labels(rotulo).inc()
+        esperando = True
+        try:
+            if fila is not None:
+                await fila[0].acquire()
+            try:
+                async with self._vagas:
+                    self.em_espera -= 1
+                    UPDATES_EM_ESPERA.labels(rotulo).dec()
+                    esperando = False
+                    UPDATE_ESPERA.labels(rotulo).observe(time.perf_counter() - chegada)
+                    await self._executar(rotulo, coroutine)
+            finally:
+                if fila is not None:
+                    fila[0].release()
+        finally:
+            if esperando:
+                # Cancelado antes de começar (encerramento do Application)
+                self.em_espera -= 1
+                UPDATES_EM_ESPERA.labels(rotulo).dec()
+                if hasattr(coroutine, "close"):
+                    coroutine.close()
+            if fila is not None:
+                fila[1] -= 1
+                if fila[1] == 0:
+                    del self._filas[chave]
+
+    async def _executar(self, rotulo: str, coroutine: "Awaitable[Any]") -> None:
+        inicio = time.perf_counter()
+        self.em_andamento += 1
+        UPDATES_EM_ANDAMENTO.labels(rotulo).inc()
+        try:
+            await coroutine
+        finally:
+            self.em_andamento -= 1
+            UPDATES_EM_ANDAMENTO.labels(rotulo).dec()
+            UPDATE_DURACAO.labels(rotulo).observe(time.perf_counter() - inicio)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
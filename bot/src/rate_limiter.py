@@ -0,0 +1,172 @@
+"""
+Rate limiting por token bucket com memória limitada.
+
+LimitadorTaxa dá a cada chave (usuário ou chat) um balde de `max_mensagens`
+fichas, repostas continuamente ao ritmo de `max_mensagens` por
+`janela_segundos`: rajadas de até `max_mensagens`, depois uma ação a cada
+janela/max_mensagens segundos. Verificar é O(1) e cada chave ocupa só
+[fichas, instante]. As chaves ficam num OrderedDict em ordem de uso; as
+ociosas (balde cheio de novo) são removidas periodicamente a partir da mais
+antiga e, acima de `max_chaves`, a menos recente é descartada (ela recomeça
+com o balde cheio).
+
+Usos:
+  - decorators.rate_limit: mensagens recebidas por usuário, recusando o excesso;
+  - LimitadorEnviosTelegram: BaseRateLimiter do PTB para as chamadas à Bot API,
+    esperando (em vez de recusar) quando o chat ou o bot inteiro estão no limite.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Coroutine, Dict, Hashable, List, Optional, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class LimitadorTaxa:
+    def __init__(
+        self,
+        max_mensagens: int,
+        janela_segundos: float,
+        max_chaves: int = 100_000,
+        intervalo_limpeza_segundos: float = 60.0,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.max_mensagens = max_mensagens
+        self.janela_segundos = janela_segundos
+        self.taxa = max_mensagens / janela_segundos  # fichas repostas por segundo
+        self.max_chaves = max_chaves
+        self.intervalo_limpeza_segundos = intervalo_limpeza_segundos
+        self.relogio = relogio
+        # chave -> [fichas, instante da última ação]; lista de 2 posições por ser
+        # a menor estrutura mutável (um deque vazio ocupa ~760 bytes)
+        self._baldes: "OrderedDict[Hashable, List[float]]" = OrderedDict()
+        self._proxima_limpeza = relogio() + intervalo_limpeza_segundos
+
+    def __len__(self) -> int:
+        return len(self._baldes)
+
+    def _fichas(self, balde: List[float], agora: float) -> float:
+        return min(self.max_mensagens, balde[0] + (agora - balde[1]) * self.taxa)
+
+    def permitir(self, chave: Hashable) -> bool:
+        """Consome uma ficha da chave se houver; False quando no limite."""
+        agora = self.relogio()
+        if agora >= self._proxima_limpeza:
+            self.remover_ociosos(agora)
+
+        balde = self._baldes.get(chave)
+        if balde is None:
+            balde = [float(self.max_mensagens), agora]
+            self._baldes[chave] = balde
+            if len(self._baldes) > self.max_chaves:
+                self._baldes.popitem(last=False)
+        else:
+            self._baldes.move_to_end(chave)
+            balde[0] = self._fichas(balde, agora)
+            balde[1] = agora
+
+        if balde[0] < 1:
+            return False
+        balde[0] -= 1
+        return True
+
+    def tempo_ate_liberar(self, chave: Hashable) -> float:
+        """Segundos até a chave ter uma ficha (0 se já tem). Não consome nada."""
+        balde = self._baldes.get(chave)
+        if balde is None:
+            return 0.0
+        return max(0.0, (1 - self._fichas(balde, self.relogio())) / self.taxa)
+
+    def remover_ociosos(self, agora: Optional[float] = None) -> int:
+        """
+        Remove as chaves sem ação há uma janela inteira (balde cheio de novo,
+        igual a uma chave nova). Percorre a partir da menos recente e para na
+        primeira ativa: as seguintes foram usadas depois dela.
+        """
+        agora = self.relogio() if agora is None else agora
+        self._proxima_limpeza = agora + self.intervalo_limpeza_segundos
+        limite = agora - self.janela_segundos
+        removidas = 0
+        while self._baldes:
+            chave, balde = next(iter(self._baldes.items()))
+            if balde[1] > limite:
+                break
+            del self._baldes[chave]
+            removidas += 1
+        return removidas
+
+    def esquecer(self, chave: Hashable) -> None:
+        self._baldes.pop(chave, None)
+
+    def limpar(self) -> None:
+        self._baldes.clear()
+
+
+RespostaApi = Union[bool, Dict[str, Any], List[Dict[str, Any]]]
+
+
+class LimitadorEnviosTelegram(BaseRateLimiter[int]):
+    """
+    Limita as chamadas do bot à Bot API: um limite global e um por chat
+    (padrões próximos dos da documentação do Telegram). Chamadas sem chat_id
+    (getUpdates, getMe...) passam direto. Em RetryAfter, espera o tempo pedido
+    e tenta de novo até `max_tentativas` (sobrescrito por `rate_limit_args`).
+    """
+
+    def __init__(
+        self,
+        global_por_segundo: int = 30,
+        por_chat_por_minuto: int = 20,
+        max_chats: int = 100_000,
+        max_tentativas: int = 2,
+    ):
+        self.global_ = LimitadorTaxa(global_por_segundo, 1.0, max_chaves=1)
+        self.por_chat = LimitadorTaxa(por_chat_por_minuto, 60.0, max_chaves=max_chats)
+        self.max_tentativas = max_tentativas
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        self.global_.limpar()
+        self.por_chat.limpar()
+
+    async def _aguardar_vez(self, chat_id: Hashable) -> None:
+        while True:
+            espera = max(self.global_.tempo_ate_liberar(None), self.por_chat.tempo_ate_liberar(chat_id))
+            if espera <= 0:
+                # Sem await entre a verificação e o registro: as duas janelas têm espaço
+                self.global_.permitir(None)
+                self.por_chat.permitir(chat_id)
+                return
+            await asyncio.sleep(espera)
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, RespostaApi]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> RespostaApi:
+        chat_id = data.get("chat_id")
+        tentativas = rate_limit_args if rate_limit_args is not None else self.max_tentativas
+        while True:
+            if chat_id is not None:
+                await self._aguardar_vez(chat_id)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if tentativas <= 0:
+                    raise
+                tentativas -= 1
+                espera = e.retry_after
+                espera = espera.total_seconds() if hasattr(espera, "total_seconds") else float(espera)
+                logger.warning("Bot API pediu espera", extra={"endpoint": endpoint, "segundos": espera})
+                await asyncio.sleep(espera)
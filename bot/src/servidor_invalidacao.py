@@ -0,0 +1,84 @@
+"""
+Endpoint interno do bot para o backend invalidar perfis em cache.
+
+    POST /interno/perfis/{telegram_user_id}/invalidar
+    X-Internal-Secret: <INTERNAL_API_KEY>
+
+Responde 204 (invalidado, mesmo que não houvesse nada em cache), 403 (segredo
+errado), 404 (rota desconhecida), 405 ou 400 (corpo acima de MAX_CORPO_BYTES).
+Roda no HTTPServer do tornado (o mesmo que o PTB usa no modo webhook, pelo
+extra `webhooks`), no mesmo loop do Application: o modo polling não tem
+servidor web, e a porta do modo webhook é do PTB. Só deve ser exposto na rede
+interna (docker-compose), como a porta 8000 do backend.
+"""
+import hmac
+import logging
+from typing import Optional
+
+from tornado.httpserver import HTTPServer
+from tornado.web import Application, RequestHandler
+
+from src.api_client import usuario_client
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Limite de tempo para ler a requisição inteira (conexões presas não acumulam)
+TIMEOUT_LEITURA_SEGUNDOS = 5.0
+# As requisições não têm corpo
+MAX_CORPO_BYTES = 1024
+
+_servidor: Optional[HTTPServer] = None
+
+
+class InvalidarPerfilHandler(RequestHandler):
+    def post(self, telegram_user_id: str) -> None:
+        segredo = self.request.headers.get("X-Internal-Secret", "")
+        if not hmac.compare_digest(segredo.encode(), get_settings().internal_api_key.encode()):
+            self.send_error(403)
+            return
+        usuario_client.perfil_cache.invalidar(int(telegram_user_id))
+        logger.info("Perfil invalidado pelo backend", extra={"telegram_user_id": int(telegram_user_id)})
+        self.set_status(204)
+
+
+def _sem_log_de_acesso(handler: RequestHandler) -> None:
+    # Uma linha por invalidação já sai no handler; o access log do tornado só duplicaria
+    pass
+
+
+def criar_servidor() -> HTTPServer:
+    """HTTPServer com a rota de invalidação, ainda sem porta."""
+    app = Application(
+        [(r"/interno/perfis/(\d+)/invalidar", InvalidarPerfilHandler)],
+        log_function=_sem_log_de_acesso,
+    )
+    return HTTPServer(
+        app,
+        idle_connection_timeout=TIMEOUT_LEITURA_SEGUNDOS,
+        body_timeout=TIMEOUT_LEITURA_SEGUNDOS,
+        max_body_size=MAX_CORPO_BYTES,
+    )
+
+
+async def iniciar_servidor_invalidacao(*_args) -> None:
+    """Abre o endpoint interno (post_init); porta 0 nas settings desliga."""
+    global _servidor
+    settings = get_settings()
+    if not settings.perfil_invalidacao_porta or _servidor is not None:
+        return
+    _servidor = criar_servidor()
+    _servidor.listen(settings.perfil_invalidacao_porta, address=settings.host)
+    logger.info(
+        "Endpoint de invalidação de perfis ativo",
+        extra={"host": settings.host, "porta": settings.perfil_invalidacao_porta},
+    )
+
+
+async def parar_servidor_invalidacao(*_args) -> None:
+    """Fecha o endpoint interno (post_shutdown)."""
+    global _servidor
+    if _servidor is not None:
+        _servidor.stop()
+        await _servidor.close_all_connections()
+        _servidor = None
@@ -0,0 +1,13 @@
+import pytest
+
+import src.api_client
+
+
+@pytest.fixture(autouse=True)
+def reset_http_client():
+    """Garante que cada teste crie seu próprio cliente HTTP e comece sem perfis em cache."""
+    src.api_client._http_client = None
+    src.api_client.usuario_client.perfil_cache.limpar()
+    yield
+    src.api_client._http_client = None
+    src.api_client.usuario_client.perfil_cache.limpar()
@@ -1,7 +1,16 @@
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 import httpx
-from src.api_client import TurnoAPIClient, UsuarioAPIClient, INTERNAL_API_KEY
+import src.api_client
+from src.api_client import (
+    TurnoAPIClient,
+    UsuarioAPIClient,
+    RelatorioAPIClient,
+    INTERNAL_API_KEY,
+    MAX_TURNOS_POR_LOTE,
+    iniciar_http_client,
+    fechar_http_client,
+)
 from datetime import date
 
 @pytest.fixture
@@ -26,6 +35,7 @@ def mock_httpx(monkeypatch):
     mock_client_instance.post = AsyncMock()
     mock_client_instance.get = AsyncMock()
     mock_client_instance.delete = AsyncMock()
+    mock_client_instance.is_closed = False
 
     # Factory that returns our mocked client
     mock_constructor = MagicMock(return_value=mock_client_instance)
@@ -57,6 +67,57 @@ async def test_criar_turno_success(mock_httpx):
     assert call_kwargs["headers"]["X-Internal-Secret"] == INTERNAL_API_KEY
     assert call_kwargs["headers"]["X-Telegram-User-ID"] == "123"
 
+@pytest.mark.asyncio
+async def test_criar_turnos_em_lote(mock_httpx):
+    client = TurnoAPIClient()
+    
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"criados": 2, "rejeitados": 0, "resultados": []}
+    mock_response.raise_for_status = MagicMock()
+    
+    mock_httpx.post.return_value = mock_response
+    
+    turnos = [
+        {"tipo": "Hospital", "data_ref": date(2025, 1, 1), "hora_inicio": "08:00", "hora_fim": "16:00"},
+        {"tipo": "Casino", "data_ref": date(2025, 1, 2), "hora_inicio": "15:00", "hora_fim": "03:00"},
+    ]
+    result = await client.criar_turnos_em_lote(turnos, 123)
+    
+    assert result["criados"] == 2
+    mock_httpx.post.assert_called_once()
+    call_args = mock_httpx.post.call_args
+    assert call_args.args[0].endswith("/turnos/lote")
+    assert len(call_args.kwargs["json"]["turnos"]) == 2
+    assert call_args.kwargs["json"]["turnos"][0]["data_referencia"] == "2025-01-01"
+
+@pytest.mark.asyncio
+async def test_criar_turnos_em_lote_divide_em_blocos(mock_httpx):
+    """Acima de MAX_TURNOS_POR_LOTE linhas, um POST por bloco e indices globais."""
+    client = TurnoAPIClient()
+
+    def _resposta(url, json, **kwargs):
+        n = len(json["turnos"])
+        resp = MagicMock()
+        resp.raise_for_status = MagicMock()
+        resp.json.return_value = {
+            "criados": n, "rejeitados": 0,
+            "resultados": [{"indice": i, "sucesso": True} for i in range(n)],
+        }
+        return resp
+
+    mock_httpx.post.side_effect = _resposta
+
+    turnos = [
+        {"tipo": "Hospital", "data_ref": date(2025, 1, 1), "hora_inicio": "08:00", "hora_fim": "16:00"}
+    ] * (MAX_TURNOS_POR_LOTE + 5)
+    result = await client.criar_turnos_em_lote(turnos, 123)
+
+    tamanhos = [len(c.kwargs["json"]["turnos"]) for c in mock_httpx.post.call_args_list]
+    assert tamanhos == [MAX_TURNOS_POR_LOTE, 5]
+    assert result["criados"] == MAX_TURNOS_POR_LOTE + 5
+    assert [r["indice"] for r in result["resultados"]] == list(range(MAX_TURNOS_POR_LOTE + 5))
+
 @pytest.mark.asyncio
 async def test_listar_turnos_recentes(mock_httpx):
     client = TurnoAPIClient()
@@ -110,6 +171,21 @@ async def test_usuario_client_buscar_usuario(mock_httpx):
     result = await client.buscar_usuario(123)
     assert result["nome"] == "Leo"
 
+@pytest.mark.asyncio
+async def test_usuario_client_buscar_usuario_usa_cache(mock_httpx):
+    cliente = UsuarioAPIClient()
+    resposta = MagicMock(status_code=200)
+    resposta.json.return_value = {"nome": "Leo"}
+    mock_httpx.get.return_value = resposta
+
+    assert (await cliente.buscar_usuario(123))["nome"] == "Leo"
+    assert (await cliente.buscar_usuario(123))["nome"] == "Leo"
+    assert mock_httpx.get.await_count == 1
+
+    mock_httpx.get.side_effect = httpx.ConnectError("backend fora")
+    assert await cliente.buscar_usuario(456) is None
+    assert 456 not in cliente.perfil_cache._entradas
+
 @pytest.mark.asyncio
 async def test_usuario_client_criar_usuario(mock_httpx):
     client = UsuarioAPIClient()
@@ -123,3 +199,50 @@ async def test_usuario_client_criar_usuario(mock_httpx):
     
     await client.criar_usuario(123, "Leo", "001")
     mock_httpx.post.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_relatorio_mes_pdf_reutiliza_cache_com_304(mock_httpx):
+    client = RelatorioAPIClient()
+    
+    primeira = MagicMock()
+    primeira.status_code = 200
+    primeira.content = b"%PDF-1.4"
+    primeira.headers = {"ETag": '"abc"'}
+    primeira.raise_for_status = MagicMock()
+    
+    nao_modificado = MagicMock()
+    nao_modificado.status_code = 304
+    nao_modificado.content = b""
+    nao_modificado.headers = {"ETag": '"abc"'}
+    
+    mock_httpx.get.side_effect = [primeira, nao_modificado]
+    
+    assert await client.relatorio_mes_pdf(2025, 1, 123) == b"%PDF-1.4"
+    assert "If-None-Match" not in mock_httpx.get.call_args.kwargs["headers"]
+    
+    assert await client.relatorio_mes_pdf(2025, 1, 123) == b"%PDF-1.4"
+    assert mock_httpx.get.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+
+@pytest.mark.asyncio
+async def test_cliente_http_compartilhado_entre_chamadas(mock_httpx, monkeypatch):
+    constructor = httpx.AsyncClient  # patched by mock_httpx
+    
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = []
+    mock_response.raise_for_status = MagicMock()
+    mock_httpx.get.return_value = mock_response
+    
+    await iniciar_http_client()
+    client = TurnoAPIClient()
+    await client.listar_turnos_recentes(123)
+    await client.listar_turnos_recentes(123)
+    await UsuarioAPIClient().buscar_usuario(123)
+    
+    constructor.assert_called_once()
+    assert "limits" in constructor.call_args.kwargs
+    assert mock_httpx.get.await_count == 3
+    
+    await fechar_http_client()
+    mock_httpx.aclose.assert_awaited_once()
+    assert src.api_client._http_client is None
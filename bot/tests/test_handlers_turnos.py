@@ -28,14 +28,18 @@ async def test_registrar_turno_msg_success(mock_deps, monkeypatch):
     # Patching the method on the instance imported in api_client so it affects decorators too
     monkeypatch.setattr("src.api_client.usuario_client.buscar_usuario", AsyncMock(return_value=user_mock))
 
-    # Mock criar_turno
+    # Mock criar_turnos_em_lote
     mock_turno = {
         "id": 1, "tipo": "Hospital", 
         "hora_inicio": "08:00", "hora_fim": "16:00", 
         "data_referencia": "2025-01-01",
         "duracao_minutos": 480
     }
-    monkeypatch.setattr("src.handlers.turnos.turno_client.criar_turno", AsyncMock(return_value=mock_turno))
+    mock_lote = {
+        "criados": 1, "rejeitados": 0,
+        "resultados": [{"indice": 0, "sucesso": True, "turno": mock_turno, "erro": None, "codigo_erro": None}],
+    }
+    monkeypatch.setattr("src.handlers.turnos.turno_client.criar_turnos_em_lote", AsyncMock(return_value=mock_lote))
 
     await registrar_turno_msg(update, context)
 
@@ -43,6 +47,42 @@ async def test_registrar_turno_msg_success(mock_deps, monkeypatch):
     args, _ = update.message.reply_text.call_args
     assert "Registrado Hospital" in args[0]
 
+@pytest.mark.asyncio
+async def test_registrar_turno_msg_varias_linhas_uma_chamada(mock_deps, monkeypatch):
+    update = MagicMock()
+    update.effective_user.id = 123
+    update.message.text = "Hospital 08:00 as 16:00\nCasino 15:00 as 03:00"
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    context.user_data = {}
+
+    user_mock = {"id": 1, "assinatura_status": "active"}
+    monkeypatch.setattr("src.api_client.usuario_client.buscar_usuario", AsyncMock(return_value=user_mock))
+
+    mock_turno = {
+        "id": 1, "tipo": "Hospital",
+        "hora_inicio": "08:00", "hora_fim": "16:00",
+        "data_referencia": "2025-01-01",
+        "duracao_minutos": 480
+    }
+    mock_lote = {
+        "criados": 1, "rejeitados": 1,
+        "resultados": [
+            {"indice": 0, "sucesso": True, "turno": mock_turno, "erro": None, "codigo_erro": None},
+            {"indice": 1, "sucesso": False, "turno": None, "erro": "Limite", "codigo_erro": "limite_turnos"},
+        ],
+    }
+    mock_criar_lote = AsyncMock(return_value=mock_lote)
+    monkeypatch.setattr("src.handlers.turnos.turno_client.criar_turnos_em_lote", mock_criar_lote)
+
+    await registrar_turno_msg(update, context)
+
+    mock_criar_lote.assert_awaited_once()
+    assert len(mock_criar_lote.call_args.args[0]) == 2
+    texto = update.message.reply_text.call_args[0][0]
+    assert "Linha 1: Registrado Hospital" in texto
+    assert "Limite de turnos atingido" in texto
+
 @pytest.mark.asyncio
 async def test_registrar_turno_msg_parse_error(mock_deps, monkeypatch):
     update = MagicMock()
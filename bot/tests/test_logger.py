@@ -0,0 +1,42 @@
+import io
+import json
+import logging
+from types import SimpleNamespace
+
+import httpx
+
+import src.logger as logger_module
+from src.api_client import _propagar_request_id
+from src.logger import definir_request_id, request_id_ctx, setup_logging
+
+
+async def test_request_id_do_update_vai_no_header():
+    await definir_request_id(SimpleNamespace(update_id=77), None)
+    try:
+        request = httpx.Request("GET", "http://backend/turnos")
+        await _propagar_request_id(request)
+        assert request.headers["X-Request-ID"] == "tg-77"
+    finally:
+        request_id_ctx.set(None)
+
+
+def test_logs_json_com_extra_e_amostragem():
+    saida = io.StringIO()
+    root = logging.getLogger()
+    handlers_antes = root.handlers
+    listener = setup_logging(amostragem_info=0.0, loggers_amostrados=["httpx"], stream=saida)
+    try:
+        token = request_id_ctx.set("tg-1")
+        logging.getLogger("src.handlers").info("Turno criado", extra={"telegram_user_id": 123})
+        logging.getLogger("httpx").info("HTTP Request: GET ...")
+        logging.getLogger("httpx").warning("Falha HTTP")
+        request_id_ctx.reset(token)
+    finally:
+        listener.stop()
+        logger_module._listener = None
+        root.handlers = handlers_antes
+
+    linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+    assert [linha["message"] for linha in linhas] == ["Turno criado", "Falha HTTP"]
+    assert linhas[0]["telegram_user_id"] == 123
+    assert linhas[0]["request_id"] == "tg-1"
@@ -0,0 +1,134 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from tornado.netutil import bind_sockets
+
+from src.api_client import usuario_client
+from src.perfil_cache import PerfilCache
+from src import servidor_invalidacao
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.mark.asyncio
+async def test_ttl_positivo_e_negativo():
+    relogio = _Relogio()
+    perfis = {1: {"nome": "Leo"}}
+    buscar = AsyncMock(side_effect=lambda user_id: perfis.get(user_id))
+    cache = PerfilCache(buscar, ttl_segundos=300, ttl_negativo_segundos=30, relogio=relogio)
+
+    assert await cache.obter(1) == {"nome": "Leo"}
+    assert await cache.obter(2) is None
+    assert await cache.obter(1) == {"nome": "Leo"}
+    assert await cache.obter(2) is None
+    assert buscar.await_count == 2
+
+    # O "não cadastrado" expira antes do perfil
+    relogio.agora = 31
+    perfis[2] = {"nome": "Ana"}
+    assert await cache.obter(2) == {"nome": "Ana"}
+    assert await cache.obter(1) == {"nome": "Leo"}
+    assert buscar.await_count == 3
+
+    relogio.agora = 301
+    await cache.obter(1)
+    assert buscar.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_consultas_simultaneas_compartilham_uma_chamada():
+    liberar = asyncio.Event()
+
+    async def buscar(user_id):
+        await liberar.wait()
+        return {"id": user_id}
+
+    buscar_mock = AsyncMock(side_effect=buscar)
+    cache = PerfilCache(buscar_mock)
+
+    tarefas = [asyncio.create_task(cache.obter(7)) for _ in range(20)]
+    await asyncio.sleep(0)
+    liberar.set()
+    resultados = await asyncio.gather(*tarefas)
+
+    assert resultados == [{"id": 7}] * 20
+    assert buscar_mock.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_erro_chega_a_todos_e_nao_fica_em_cache():
+    liberar = asyncio.Event()
+    falhar = True
+
+    async def buscar(user_id):
+        await liberar.wait()
+        if falhar:
+            raise httpx.ConnectError("backend fora")
+        return {"id": user_id}
+
+    cache = PerfilCache(buscar)
+    tarefas = [asyncio.create_task(cache.obter(7)) for _ in range(3)]
+    await asyncio.sleep(0)
+    liberar.set()
+    resultados = await asyncio.gather(*tarefas, return_exceptions=True)
+    assert all(isinstance(r, httpx.ConnectError) for r in resultados)
+
+    falhar = False
+    assert await cache.obter(7) == {"id": 7}
+
+
+@pytest.mark.asyncio
+async def test_invalidar_durante_consulta_nao_guarda_resposta_antiga():
+    liberar = asyncio.Event()
+    status = "incomplete"
+
+    async def buscar(user_id):
+        atual = status
+        await liberar.wait()
+        return {"assinatura_status": atual}
+
+    cache = PerfilCache(buscar)
+    antiga = asyncio.create_task(cache.obter(7))
+    for _ in range(3):  # obter agenda a consulta, que então lê o status
+        await asyncio.sleep(0)
+
+    status = "active"
+    assert cache.invalidar(7) is True
+    liberar.set()
+    assert (await antiga)["assinatura_status"] == "incomplete"
+    assert (await cache.obter(7))["assinatura_status"] == "active"
+
+
+@pytest.mark.asyncio
+async def test_endpoint_de_invalidacao(monkeypatch):
+    settings = MagicMock(perfil_invalidacao_porta=0, internal_api_key="segredo")
+    monkeypatch.setattr(servidor_invalidacao, "get_settings", lambda: settings)
+    usuario_client.perfil_cache._entradas[123] = (float("inf"), {"nome": "Leo"})
+
+    servidor = servidor_invalidacao.criar_servidor()
+    [sock] = bind_sockets(0, "127.0.0.1")
+    servidor.add_sockets([sock])
+    porta = sock.getsockname()[1]
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{porta}") as client:
+            negado = await client.post("/interno/perfis/123/invalidar", headers={"X-Internal-Secret": "errado"})
+            assert negado.status_code == 403
+            assert 123 in usuario_client.perfil_cache._entradas
+
+            ok = await client.post("/interno/perfis/123/invalidar", headers={"X-Internal-Secret": "segredo"})
+            assert ok.status_code == 204
+            assert 123 not in usuario_client.perfil_cache._entradas
+
+            assert (await client.post("/outra", headers={"X-Internal-Secret": "segredo"})).status_code == 404
+            assert (await client.get("/interno/perfis/123/invalidar")).status_code == 405
+    finally:
+        servidor.stop()
+        await servidor.close_all_connections()
@@ -0,0 +1,115 @@
+import asyncio
+from datetime import datetime, UTC
+
+import pytest
+from prometheus_client import REGISTRY
+from telegram import CallbackQuery, Chat, Message, Update, User
+
+from src.processador_updates import ProcessadorUpdatesPorUsuario
+
+
+def _update(update_id: int, user_id: int, texto: str = "REN 08:00 as 16:00") -> Update:
+    usuario = User(user_id, "Teste", False)
+    mensagem = Message(
+        update_id, datetime.now(UTC), Chat(user_id, Chat.PRIVATE), from_user=usuario, text=texto
+    )
+    return Update(update_id, message=mensagem)
+
+
+def _esperando(rotulo: str) -> float:
+    return REGISTRY.get_sample_value("bot_updates_waiting", {"handler": rotulo}) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_updates_do_mesmo_usuario_em_ordem_e_outros_em_paralelo():
+    processador = ProcessadorUpdatesPorUsuario(4)
+    ordem = []
+
+    async def handler(nome: str, segundos: float):
+        await asyncio.sleep(segundos)
+        ordem.append(nome)
+
+    # O primeiro update do usuário 1 é o mais lento: os seguintes esperam por
+    # ele, o do usuário 2 não
+    tarefas = [
+        asyncio.create_task(processador.process_update(_update(1, 1), handler("u1-a", 0.05))),
+        asyncio.create_task(processador.process_update(_update(2, 1), handler("u1-b", 0.0))),
+        asyncio.create_task(processador.process_update(_update(3, 2), handler("u2-a", 0.0))),
+        asyncio.create_task(processador.process_update(_update(4, 1), handler("u1-c", 0.0))),
+    ]
+    await asyncio.gather(*tarefas)
+
+    assert ordem == ["u2-a", "u1-a", "u1-b", "u1-c"]
+    assert processador.usuarios_com_updates == 0
+    assert processador.em_espera == 0
+
+
+@pytest.mark.asyncio
+async def test_limite_de_concorrencia_e_gauge_de_espera():
+    processador = ProcessadorUpdatesPorUsuario(3)
+    liberar = asyncio.Event()
+    em_andamento = 0
+    pico = 0
+
+    async def handler():
+        nonlocal em_andamento, pico
+        em_andamento += 1
+        pico = max(pico, em_andamento)
+        await liberar.wait()
+        em_andamento -= 1
+
+    antes = _esperando("texto")
+    tarefas = [
+        asyncio.create_task(processador.process_update(_update(i, 100 + i), handler()))
+        for i in range(10)
+    ]
+    await asyncio.sleep(0.01)
+    assert processador.current_concurrent_updates == 3
+    assert _esperando("texto") - antes == 7
+
+    liberar.set()
+    await asyncio.gather(*tarefas)
+    assert pico == 3
+    assert _esperando("texto") == antes
+
+
+def test_rotulo_por_handler():
+    processador = ProcessadorUpdatesPorUsuario(1, comandos=["mes", "menu"])
+    assert processador.rotulo(_update(1, 1, "/mes pdf")) == "/mes"
+    assert processador.rotulo(_update(1, 1, "/MENU@MeuTurnoBot")) == "/menu"
+    assert processador.rotulo(_update(1, 1, "/qualquer")) == "comando"
+    assert processador.rotulo(_update(1, 1, "REN 08:00 as 16:00")) == "texto"
+
+    usuario = User(1, "Teste", False)
+    callback = Update(2, callback_query=CallbackQuery("1", usuario, "instancia", data="menu_main"))
+    assert processador.rotulo(callback) == "callback"
+    assert processador.rotulo(object()) == "outro"
+
+
+@pytest.mark.asyncio
+async def test_updates_na_fila_do_usuario_nao_ocupam_vagas():
+    # process_update é @final no PTB: a ordem por usuário fica em do_process_update
+    assert "process_update" not in vars(ProcessadorUpdatesPorUsuario)
+    processador = ProcessadorUpdatesPorUsuario(2)
+    liberar = asyncio.Event()
+    iniciados = []
+
+    async def handler(nome: str):
+        iniciados.append(nome)
+        await liberar.wait()
+
+    tarefas = [
+        asyncio.create_task(processador.process_update(_update(i, 1), handler(f"u1-{i}")))
+        for i in range(4)
+    ]
+    tarefas.append(asyncio.create_task(processador.process_update(_update(9, 2), handler("u2"))))
+    await asyncio.sleep(0.01)
+
+    # Os 3 updates parados atrás do primeiro do usuário 1 não tomaram a vaga do usuário 2
+    assert iniciados == ["u1-0", "u2"]
+    assert processador.current_concurrent_updates == 2
+
+    liberar.set()
+    await asyncio.gather(*tarefas)
+    assert iniciados == ["u1-0", "u2", "u1-1", "u1-2", "u1-3"]
+    assert processador.current_concurrent_updates == 0
@@ -1,7 +1,8 @@
 import pytest
 import time
 from unittest.mock import AsyncMock, MagicMock
-from src.decorators import rate_limit, user_message_timestamps, RATE_LIMIT_MSG, RATE_LIMIT_WINDOW
+from src.rate_limiter import LimitadorEnviosTelegram, LimitadorTaxa
+from src.decorators import rate_limit, limitador_mensagens, RATE_LIMIT_MSG, RATE_LIMIT_WINDOW
 
 @pytest.mark.asyncio
 async def test_rate_limit_decorator():
@@ -17,7 +18,7 @@ async def test_rate_limit_decorator():
     decorated_func = rate_limit(mock_func)
     
     # Limpar estado do rate limit
-    user_message_timestamps.clear()
+    limitador_mensagens.limpar()
     
     # 1. Executar N vezes dentro do limite
     for _ in range(RATE_LIMIT_MSG):
@@ -30,10 +31,73 @@ async def test_rate_limit_decorator():
     update.message.reply_text.assert_called_with("⚠️ **Muitas mensagens!** Aguarde um pouco.")
     
     # 3. Simular passagem do tempo (limpar timestamps)
-    # Como não podemos esperar 60s no teste, vamos manipular o dicionário diretamente
-    # ou mockar time.time. Vamos manipular o dicionário para ser mais rápido.
-    user_message_timestamps[12345] = [] # Reset manual
+    # Como não podemos esperar 60s no teste, esquecemos o histórico do usuário
+    limitador_mensagens.esquecer(12345) # Reset manual
     
     # 4. Deve funcionar novamente
     result = await decorated_func(update, context)
     assert result == "success"
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_limitador_rajada_e_reposicao():
+    relogio = _Relogio()
+    limitador = LimitadorTaxa(3, 9.0, relogio=relogio)
+
+    assert all(limitador.permitir(1) for _ in range(3))
+    assert not limitador.permitir(1)
+    assert limitador.tempo_ate_liberar(1) == pytest.approx(3.0)
+
+    relogio.agora += 3.0  # uma ficha a cada 9 / 3 segundos
+    assert limitador.permitir(1)
+    assert not limitador.permitir(1)
+
+    relogio.agora += 60.0  # nunca acumula mais que max_mensagens
+    assert all(limitador.permitir(1) for _ in range(3))
+    assert not limitador.permitir(1)
+
+
+def test_limitador_remove_ociosos_e_respeita_teto():
+    relogio = _Relogio()
+    limitador = LimitadorTaxa(2, 10.0, max_chaves=3, intervalo_limpeza_segundos=30.0, relogio=relogio)
+
+    for usuario in range(5):
+        limitador.permitir(usuario)
+    assert len(limitador) == 3  # 0 e 1 descartados pelo teto
+
+    relogio.agora += 25.0
+    limitador.permitir(99)
+    assert len(limitador) == 3
+
+    relogio.agora += 6.0  # passou o intervalo de limpeza: só o 99 ainda está na janela
+    limitador.permitir(99)
+    assert len(limitador) == 1
+
+
+@pytest.mark.asyncio
+async def test_limitador_envios_espera_vez_do_chat(monkeypatch):
+    envios = LimitadorEnviosTelegram(global_por_segundo=100, por_chat_por_minuto=2)
+    relogio = _Relogio()
+    envios.por_chat.relogio = envios.global_.relogio = relogio
+    esperas = []
+
+    async def sleep(segundos):
+        esperas.append(segundos)
+        relogio.agora += segundos
+
+    monkeypatch.setattr("src.rate_limiter.asyncio.sleep", sleep)
+    callback = AsyncMock(return_value=True)
+
+    for _ in range(3):
+        await envios.process_request(callback, (), {}, "sendMessage", {"chat_id": 7}, None)
+    await envios.process_request(callback, (), {}, "getMe", {}, None)
+
+    assert callback.await_count == 4
+    assert esperas == [pytest.approx(30.0)]
@@ -32,33 +32,45 @@ interface User {
     turnos_registrados_mes_atual?: number;
 }
 
+// GET /dashboard: perfil, plano, mês e turnos recentes numa chamada (com ETag)
+interface DashboardResponse {
+    usuario: { telegram_user_id: number; nome: string; numero_funcionario: string };
+    plano: {
+        status: string;
+        plano: string;
+        data_fim?: string;
+        limite_turnos_mes?: number | null;
+        turnos_disponiveis?: number | null;
+    };
+    mes: { inicio: string; turnos: number; total_minutos: number };
+    turnos_recentes: Turno[];
+}
+
 
 // Fetchers
-const fetchUser = async () => {
-    const { data } = await api.get('/usuarios/me');
+const fetchDashboard = async () => {
+    const { data } = await api.get<DashboardResponse>('/dashboard');
     return data;
 };
 
-const fetchTurnos = async () => {
-    const { data } = await api.get<Turno[]>('/turnos/recentes');
-    return data;
-};
+const toUser = (dashboard: DashboardResponse): User => ({
+    ...dashboard.usuario,
+    assinatura_plano: dashboard.plano.plano,
+    assinatura_status: dashboard.plano.status,
+    assinatura_data_fim: dashboard.plano.data_fim,
+    turnos_registrados_mes_atual: dashboard.mes.turnos,
+});
 
 export default function Dashboard() {
     const router = useRouter();
 
-    const { data: user, isLoading: loadingUser, error: userError } = useQuery<User>({
-        queryKey: ['user'],
-        queryFn: fetchUser,
+    const { data: dashboard, isLoading: loadingUser, error: userError } = useQuery<DashboardResponse>({
+        queryKey: ['dashboard'],
+        queryFn: fetchDashboard,
         retry: 1,
-        staleTime: 1000 * 60 * 5,
-    });
-
-    const { data: turnos, isLoading: loadingTurnos, error: turnosError } = useQuery({
-        queryKey: ['turnos'],
-        queryFn: fetchTurnos,
-        enabled: !!user,
     });
+    const user = dashboard ? toUser(dashboard) : undefined;
+    const turnos = dashboard?.turnos_recentes;
 
     // Error Handling with Toast
     const handleLogout = async () => {
@@ -84,10 +96,7 @@ export default function Dashboard() {
                 toast.error("Erro ao carregar perfil. Tente recarregar a página.");
             }
         }
-        if (turnosError) {
-            toast.error("Não foi possível carregar os turnos.");
-        }
-    }, [userError, turnosError, router]);
+    }, [userError, router]);
 
     if (loadingUser) {
         return (
@@ -106,7 +115,7 @@ export default function Dashboard() {
 
                 <PlanStatusCard user={user} />
 
-                <RecentShiftsTable loadingTurnos={loadingTurnos} turnos={turnos} />
+                <RecentShiftsTable loadingTurnos={loadingUser} turnos={turnos} />
             </main>
         </div>
     );
@@ -75,8 +75,9 @@ export function NovoTurnoDialog() {
         onSuccess: () => {
             setOpen(false);
             form.reset();
-            // Atualiza a lista de turnos automaticamente
+            // Atualiza a lista de turnos e o dashboard automaticamente
             queryClient.invalidateQueries({ queryKey: ['turnos'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard'] });
         },
         onError: (error: unknown) => {
             console.error("Erro ao criar turno:", error);